@@ -0,0 +1,88 @@
+# backend/benchmarks/bench_async_db.py
+"""
+Concurrent request throughput: sync Session vs AsyncSession inside `async def` routes.
+
+Builds a tiny FastAPI app with two routes that run the same slow query
+(`SELECT pg_sleep(:delay)`), one through the legacy sync `SessionLocal`
+and one through the asyncpg-backed `AsyncSessionLocal`, then fires
+`--concurrency` simultaneous requests at each via an in-process ASGI client.
+
+Usage (from backend/, with DATABASE_URL pointing at a reachable Postgres):
+    python -m benchmarks.bench_async_db --requests 200 --concurrency 50 --delay 0.02
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+import httpx
+from fastapi import Depends, FastAPI
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from db.session import SessionLocal, async_engine, get_db
+
+SLEEP_SQL = text("SELECT pg_sleep(:delay)")
+
+def build_app(delay: float) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/sync")
+    async def sync_route():
+        # What the routers did before: blocking driver call on the event loop
+        with SessionLocal() as db:
+            db.execute(SLEEP_SQL, {"delay": delay})
+        return {"ok": True}
+
+    @app.get("/async")
+    async def async_route(db: AsyncSession = Depends(get_db)):
+        await db.execute(SLEEP_SQL, {"delay": delay})
+        return {"ok": True}
+
+    return app
+
+
+async def run_route(client: httpx.AsyncClient, path: str, total: int, concurrency: int) -> dict:
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async def one():
+        async with semaphore:
+            t0 = time.perf_counter()
+            resp = await client.get(path)
+            resp.raise_for_status()
+            latencies.append(time.perf_counter() - t0)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(total)))
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "route": path,
+        "requests": total,
+        "elapsed_s": round(elapsed, 3),
+        "throughput_rps": round(total / elapsed, 1),
+        "p50_ms": round(statistics.median(latencies) * 1000, 1),
+        "p99_ms": round(latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] * 1000, 1),
+    }
+
+
+async def main(args):
+    app = build_app(args.delay)
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        # Warm both pools so connection setup is not measured
+        await client.get("/sync")
+        await client.get("/async")
+        for path in ("/sync", "/async"):
+            print(await run_route(client, path, args.requests, args.concurrency))
+    await async_engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--delay", type=float, default=0.02, help="Server-side query time in seconds")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,161 @@
+# backend/benchmarks/bench_import.py
+"""
+Bulk import throughput: 100k sets through `import_service.import_workouts`.
+
+Generates a synthetic CSV or NDJSON file on the fly (never materialised in memory)
+and streams it through the importer in 64 KiB chunks, like the request body of
+POST /workouts/import. Reports wall time and sets/s, plus peak traced memory with
+--trace-memory (tracing slows the run down, so it is off by default).
+
+With --baseline it also inserts the same workouts one commit per workout (what a
+client replaying POST /workouts would cost) for comparison.
+
+Usage (from backend/):
+    python -m benchmarks.bench_import --dry-run                  # parse + validate only, no DB needed
+    python -m benchmarks.bench_import --sets 100000 --format ndjson
+    python -m benchmarks.bench_import --sets 20000 --baseline    # needs DATABASE_URL
+Rows are written for a random user id and deleted afterwards (unless --keep).
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+import tracemalloc
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import delete
+
+from db.session import AsyncSessionLocal, async_engine
+from models.insight import DailyAggregate
+from models.workout import Workout
+from services import import_service, insight_service, workout_sets_service
+
+EXERCISES = ["Squat", "Bench Press", "Deadlift", "Overhead Press", "Barbell Row", "Pull Up", "Lunge", "Dip"]
+EXERCISES_PER_WORKOUT = 4
+SETS_PER_EXERCISE = 5
+READ_SIZE = 64 * 1024
+
+
+def synthetic_workouts(total_sets: int, seed: int = 0):
+    """ Yields (timestamp, exercises) one workout per day going back in time. """
+    rng = random.Random(seed)
+    day = datetime(2024, 1, 1, 7, 30, tzinfo=timezone.utc)
+    per_workout = EXERCISES_PER_WORKOUT * SETS_PER_EXERCISE
+    for _ in range(total_sets // per_workout):
+        exercises = [
+            {"name": name, "sets": [{"reps": rng.randint(3, 12), "weight": float(rng.randrange(20, 200, 5))}
+                                    for _ in range(SETS_PER_EXERCISE)]}
+            for name in rng.sample(EXERCISES, EXERCISES_PER_WORKOUT)
+        ]
+        yield day, exercises
+        day -= timedelta(days=1)
+
+
+def render_lines(fmt: str, total_sets: int):
+    if fmt == "csv":
+        yield "timestamp,exercise,reps,weight\n"
+    for timestamp, exercises in synthetic_workouts(total_sets):
+        stamp = timestamp.isoformat()
+        if fmt == "csv":
+            for exercise in exercises:
+                for set_log in exercise["sets"]:
+                    yield f"{stamp},{exercise['name']},{set_log['reps']},{set_log['weight']}\n"
+        else:
+            yield json.dumps({"timestamp": stamp, "exercises": exercises}) + "\n"
+
+
+async def body_chunks(fmt: str, total_sets: int):
+    """ The file as READ_SIZE byte chunks, generated lazily. """
+    buffer = []
+    size = 0
+    for line in render_lines(fmt, total_sets):
+        buffer.append(line)
+        size += len(line)
+        if size >= READ_SIZE:
+            yield "".join(buffer).encode()
+            buffer, size = [], 0
+    if buffer:
+        yield "".join(buffer).encode()
+
+
+async def run_bulk(args, user_id: uuid.UUID) -> dict:
+    async with AsyncSessionLocal() as db:
+        if args.trace_memory:
+            tracemalloc.start()
+        started = time.perf_counter()
+        report = await import_service.import_workouts(
+            db, user_id, body_chunks(args.format, args.sets), args.format,
+            dry_run=args.dry_run, chunk_size=args.chunk_size,
+        )
+        elapsed = time.perf_counter() - started
+        peak = None
+        if args.trace_memory:
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+    return {
+        "mode": "bulk-dry-run" if args.dry_run else "bulk",
+        "format": args.format,
+        "workouts": report.workouts_imported,
+        "sets": report.sets_imported,
+        "errors": report.error_count,
+        "elapsed_s": round(elapsed, 3),
+        "sets_per_s": round(report.sets_imported / elapsed),
+        "peak_traced_mb": round(peak / 1024 / 1024, 2) if peak is not None else None,
+    }
+
+
+async def run_baseline(args, user_id: uuid.UUID) -> dict:
+    """ One workout INSERT + set rows + aggregate upsert + COMMIT per workout (the POST /workouts path). """
+    workouts = sets = 0
+    started = time.perf_counter()
+    async with AsyncSessionLocal() as db:
+        for timestamp, exercises in synthetic_workouts(args.sets):
+            workout = Workout(user_id=user_id, timestamp=timestamp, exercises=exercises)
+            db.add(workout)
+            await db.flush()
+            await insight_service.record_workout(db, user_id, timestamp, exercises)
+            await workout_sets_service.record_workout_sets(db, workout.id, user_id, timestamp, exercises)
+            await db.commit()
+            workouts += 1
+            sets += sum(len(exercise["sets"]) for exercise in exercises)
+    elapsed = time.perf_counter() - started
+    return {"mode": "per-workout", "workouts": workouts, "sets": sets,
+            "elapsed_s": round(elapsed, 3), "sets_per_s": round(sets / elapsed)}
+
+
+async def cleanup(user_id: uuid.UUID) -> None:
+    async with AsyncSessionLocal() as db:
+        await db.execute(delete(Workout).where(Workout.user_id == user_id))
+        await db.execute(delete(DailyAggregate).where(DailyAggregate.user_id == user_id))
+        await db.commit()
+
+
+async def main(args):
+    user_ids = []
+    try:
+        user_id = uuid.uuid4()
+        user_ids.append(user_id)
+        print(await run_bulk(args, user_id))
+        if args.baseline and not args.dry_run:
+            user_id = uuid.uuid4()
+            user_ids.append(user_id)
+            print(await run_baseline(args, user_id))
+    finally:
+        if not args.dry_run and not args.keep:
+            for user_id in user_ids:
+                await cleanup(user_id)
+        await async_engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sets", type=int, default=100_000)
+    parser.add_argument("--format", choices=import_service.IMPORT_FORMATS, default="csv")
+    parser.add_argument("--chunk-size", type=int, default=None, help="Workouts per INSERT (default: IMPORT_CHUNK_SIZE)")
+    parser.add_argument("--dry-run", action="store_true", help="Validate only; no database writes")
+    parser.add_argument("--baseline", action="store_true", help="Also time one-commit-per-workout inserts")
+    parser.add_argument("--trace-memory", action="store_true", help="Report peak Python memory (tracemalloc)")
+    parser.add_argument("--keep", action="store_true", help="Keep the imported rows")
+    asyncio.run(main(parser.parse_args()))
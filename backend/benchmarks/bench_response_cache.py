@@ -0,0 +1,106 @@
+# backend/benchmarks/bench_response_cache.py
+"""
+Response cache (services/response_cache_service.py) on both backends.
+
+For each of the memory LRU and the Redis-protocol backend (against the in-process
+stand-in testing/fake_redis.py):
+- stampede: `--concurrency` simultaneous requests for one cold key run the
+  (simulated, `--compute-ms`) dashboard query exactly once;
+- hit latency vs. the compute it replaces;
+- invalidation: after `invalidate(user)` the next read recomputes, and a read
+  that started before the write cannot store its stale result for later readers.
+
+No database is involved. Exits non-zero if a correctness check fails.
+
+Usage (from backend/):
+    python -m benchmarks.bench_response_cache --iterations 2000
+"""
+import argparse
+import asyncio
+import sys
+import time
+import uuid
+
+from fastapi import Response
+
+from core.redis_client import RedisClient
+from services.response_cache_service import MemoryBackend, RedisBackend, ResponseCache
+from testing.fake_redis import FakeRedisServer
+
+
+class Source:
+    """ Stands in for the dashboard query: counts calls, returns the user's current data. """
+
+    def __init__(self, compute_ms: float):
+        self.compute_ms = compute_ms
+        self.calls = 0
+        self.version = 0
+
+    async def compute(self) -> Response:
+        self.calls += 1
+        version = self.version # Snapshot taken when the "query" starts
+        await asyncio.sleep(self.compute_ms / 1000)
+        body = b'{"version": %d, "items": [%s]}' % (version, b",".join(b"%d" % i for i in range(500)))
+        return Response(content=body, media_type="application/json", headers={"X-Next-Cursor": f"c{version}"})
+
+
+async def run(name: str, cache: ResponseCache, args) -> bool:
+    user_id = uuid.uuid4()
+    source = Source(args.compute_ms)
+    ok = True
+
+    # Stampede: one cold key, many concurrent readers
+    pages = await asyncio.gather(*(cache.cached(user_id, "dashboard", source.compute) for _ in range(args.concurrency)))
+    stampede_ok = source.calls == 1 and len({page.body for page in pages}) == 1
+    ok &= stampede_ok
+
+    # Hit latency
+    started = time.perf_counter()
+    for _ in range(args.iterations):
+        page = await cache.cached(user_id, "dashboard", source.compute)
+    hit_ms = (time.perf_counter() - started) / args.iterations * 1000
+    ok &= page.headers.get("x-next-cursor") == "c0" and source.calls == 1
+
+    # Write-driven invalidation, with a slow reader racing the write
+    slow_reader = asyncio.create_task(cache.cached(user_id, "list", source.compute))
+    await asyncio.sleep(0)            # Reader has read the generation and started its query
+    source.version = 1                # ... the write commits ...
+    await cache.invalidate(user_id)   # ... and invalidates
+    await slow_reader                 # Stale page finishes and is stored under the old generation
+    fresh = await cache.cached(user_id, "list", source.compute)
+    dashboard = await cache.cached(user_id, "dashboard", source.compute)
+    invalidation_ok = b'"version": 1' in fresh.body and b'"version": 1' in dashboard.body
+    ok &= invalidation_ok
+
+    print({
+        "backend": name,
+        "stampede": f"{args.concurrency} requests -> {1 if stampede_ok else 'MORE THAN 1'} computation",
+        "compute_ms": args.compute_ms,
+        "hit_ms": round(hit_ms, 4),
+        "invalidation": "ok" if invalidation_ok else "STALE",
+        "stats": cache.stats(),
+    })
+    return ok
+
+
+async def main(args) -> int:
+    ttl = 300.0
+    ok = await run("memory", ResponseCache(MemoryBackend(1000, 64 * 1024 * 1024, 2 * ttl), ttl), args)
+
+    server = FakeRedisServer()
+    port = await server.start()
+    cache = ResponseCache(RedisBackend(RedisClient(f"redis://127.0.0.1:{port}/0"), 2 * ttl), ttl)
+    try:
+        ok &= await run("redis (fake_redis)", cache, args)
+    finally:
+        await cache.close()
+        await server.stop()
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=200)
+    parser.add_argument("--compute-ms", type=float, default=20.0, help="Simulated cost of the uncached query")
+    sys.exit(asyncio.run(main(parser.parse_args())))
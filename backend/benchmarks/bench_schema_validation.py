@@ -0,0 +1,174 @@
+# backend/benchmarks/bench_schema_validation.py
+"""
+Request validation cost of the workout and mood create schemas, at realistic and
+extreme payload sizes.
+
+workouts: model  = WorkoutCreate.model_validate() + model_dump() of every exercise
+                   (what POST /workouts/ and the batch endpoint used to do)
+          lean   = schemas.workout.workout_create_adapter (validates straight into
+                   the JSONB dicts, no intermediate model objects)
+moods:    MoodCreate as POST /moods/ and the batch endpoint validate it (flat model,
+          nothing to re-dump; measured for reference)
+
+No database or HTTP is involved; payloads are plain dicts, as FastAPI hands them
+to validation after parsing the JSON body. Before timing, both workout paths are
+checked to produce the same JSONB payload for every valid input and exactly the
+same errors for a set of invalid ones; a mismatch exits non-zero.
+
+Usage (from backend/):
+    python -m benchmarks.bench_schema_validation --iterations 2000
+"""
+import argparse
+import random
+import time
+from typing import Any, Callable, Dict, List
+
+from pydantic import TypeAdapter, ValidationError
+
+from schemas.mood import MoodBatchCreate, MoodCreate
+from schemas.workout import WorkoutBatchCreate, WorkoutCreate, WorkoutCreateBody, workout_create_adapter
+
+# name -> (exercises, sets per exercise)
+WORKOUT_SIZES = {
+    "typical": (4, 5),
+    "long session": (12, 6),
+    "extreme": (40, 10),
+}
+
+# Every error branch: non-dict levels, missing/extra keys, coercion, bounds, the empty-sets validator
+INVALID_WORKOUTS: List[Any] = [
+    None, 5, "workout", [], {},
+    {"exercises": "abc"},
+    {"exercises": []},
+    {"exercises": [None, 3, "Squat"]},
+    {"exercises": [{"name": "", "sets": []}]},
+    {"exercises": [{"name": "Squat", "sets": []}, {"name": "Bench", "sets": []}]},
+    {"exercises": [{"name": 5, "sets": {}}]},
+    {"exercises": [{"sets": [{"reps": 5, "weight": 100}]}]},
+    {"exercises": [{"name": "Squat", "sets": [None, "5x100", {"reps": 5}]}]},
+    {"exercises": [{"name": "Squat", "sets": [{"reps": 0, "weight": -2.5}, {"reps": 1.5, "weight": "heavy"}]}]},
+    {"exercises": [{"name": "Squat", "sets": [{"reps": "abc", "weight": None}]}]},
+    {"exercises": [{"name": "Squat", "sets": [{"reps": 5, "weight": 100}]}, {"name": "Bench", "sets": []}]},
+]
+
+
+def make_workout(rng: random.Random, exercises: int, sets: int) -> Dict[str, Any]:
+    return {"exercises": [
+        {"name": f"Exercise {e}", "sets": [
+            # Mixed int/float/str numbers, like real clients send them
+            {"reps": rng.choice([rng.randint(1, 12), str(rng.randint(1, 12))]),
+             "weight": rng.choice([rng.randrange(0, 200, 5), rng.randrange(0, 2000, 25) / 10])}
+            for _ in range(sets)
+        ]}
+        for e in range(exercises)
+    ]}
+
+
+def make_mood(rng: random.Random, journal_words: int) -> Dict[str, Any]:
+    words = ["slept", "well", "tired", "gym", "work", "happy", "stressed", "walk", "friends", "rain"]
+    text = " ".join(rng.choice(words) for _ in range(journal_words)) if journal_words else None
+    return {"mood_score": rng.randint(1, 10), "journal_text": text}
+
+
+def model_path(item: Any) -> List[dict]:
+    workout_in = WorkoutCreate.model_validate(item)
+    return [ex.model_dump() for ex in workout_in.exercises]
+
+
+def lean_path(item: Any) -> List[dict]:
+    return workout_create_adapter.validate_python(item)["exercises"]
+
+
+def outcome(fn: Callable[[Any], Any], item: Any):
+    try:
+        return "ok", fn(item)
+    except ValidationError as e:
+        return "invalid", e.errors(include_url=False)
+
+
+def check_equivalence(valid: List[Any]) -> None:
+    # FastAPI validates request bodies with from_attributes=True, which changes some error types
+    body_adapter = TypeAdapter(WorkoutCreateBody)
+    pairs = {
+        "batch item": (model_path, lean_path),
+        "request body": (
+            lambda item: WorkoutCreate.model_validate(item, from_attributes=True).model_dump()["exercises"],
+            lambda item: body_adapter.validate_python(item, from_attributes=True)["exercises"],
+        ),
+    }
+    for label, (model_fn, lean_fn) in pairs.items():
+        for item in valid + INVALID_WORKOUTS:
+            expected, actual = outcome(model_fn, item), outcome(lean_fn, item)
+            # repr() so that 100 vs 100.0 (and str vs int) count as differences too
+            if repr(expected) != repr(actual):
+                raise SystemExit(f"Lean path ({label}) disagrees with WorkoutCreate for {item!r}:\n  {expected}\n  {actual}")
+
+
+def time_it(fn: Callable[[], Any], iterations: int) -> float:
+    fn() # warm-up
+    started = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return (time.perf_counter() - started) / iterations
+
+
+def us(seconds: float) -> float:
+    return round(seconds * 1e6, 2)
+
+
+def main(args):
+    rng = random.Random(0)
+    workouts = {name: make_workout(rng, *size) for name, size in WORKOUT_SIZES.items()}
+    check_equivalence(list(workouts.values()))
+
+    for name, item in workouts.items():
+        exercises, sets = WORKOUT_SIZES[name]
+        iterations = max(10, args.iterations * 20 // (exercises * sets))
+        t_model = time_it(lambda: model_path(item), iterations)
+        t_lean = time_it(lambda: lean_path(item), iterations)
+        print({
+            "schema": "WorkoutCreate", "payload": f"{name}: {exercises} exercises x {sets} sets",
+            "model_us": us(t_model), "lean_us": us(t_lean), "speedup": round(t_model / t_lean, 2),
+        })
+
+    # Batch endpoint: envelope + each item on its own, BATCH_MAX_ITEMS-sized
+    batch = {"items": [make_workout(rng, *WORKOUT_SIZES["typical"]) for _ in range(args.batch_items)]}
+
+    def batch_with(validate_item):
+        return lambda: [validate_item(item) for item in WorkoutBatchCreate.model_validate(batch).items]
+
+    iterations = max(5, args.iterations // args.batch_items)
+    t_model = time_it(batch_with(model_path), iterations)
+    t_lean = time_it(batch_with(lean_path), iterations)
+    print({
+        "schema": "WorkoutBatchCreate", "payload": f"{args.batch_items} typical workouts",
+        "model_us": us(t_model), "lean_us": us(t_lean), "speedup": round(t_model / t_lean, 2),
+    })
+
+    t_invalid_model = time_it(lambda: [outcome(model_path, item) for item in INVALID_WORKOUTS], args.iterations // 10)
+    t_invalid_lean = time_it(lambda: [outcome(lean_path, item) for item in INVALID_WORKOUTS], args.iterations // 10)
+    print({
+        "schema": "WorkoutCreate", "payload": f"{len(INVALID_WORKOUTS)} invalid workouts (error path)",
+        "model_us": us(t_invalid_model), "lean_us": us(t_invalid_lean),
+        "speedup": round(t_invalid_model / t_invalid_lean, 2),
+    })
+
+    for name, words in (("no journal", 0), ("typical journal", 80), ("extreme journal", 5000)):
+        mood = make_mood(rng, words)
+        print({
+            "schema": "MoodCreate", "payload": f"{name} ({len(mood['journal_text'] or '')} chars)",
+            "model_us": us(time_it(lambda: MoodCreate.model_validate(mood).model_dump(), args.iterations)),
+        })
+    moods = {"items": [make_mood(rng, 80) for _ in range(args.batch_items)]}
+    t_moods = time_it(
+        lambda: [MoodCreate.model_validate(item) for item in MoodBatchCreate.model_validate(moods).items],
+        max(5, args.iterations // args.batch_items),
+    )
+    print({"schema": "MoodBatchCreate", "payload": f"{args.batch_items} entries", "model_us": us(t_moods)})
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=2000, help="Base iteration count (scaled down for big payloads)")
+    parser.add_argument("--batch-items", type=int, default=100)
+    main(parser.parse_args())
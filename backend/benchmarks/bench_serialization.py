@@ -0,0 +1,99 @@
+# backend/benchmarks/bench_serialization.py
+"""
+Response serialization cost of one GET /workouts page: 100 workouts x 20 sets.
+
+before: what FastAPI does with ORM objects + response_model=List[WorkoutRead]
+        (validate every row, nested exercises/sets and validators included,
+        then serialize and encode with the stdlib json in JSONResponse).
+after:  the fast path in routers/workouts.py (row tuples -> dicts, raw JSONB,
+        orjson via core.serialization.FastJSONResponse).
+
+No database is involved; both sides start from in-memory rows shaped like the
+query results. The two bodies are also checked to decode to the same JSON.
+
+Usage (from backend/):
+    python -m benchmarks.bench_serialization --iterations 500
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+import uuid
+from collections import namedtuple
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+from typing import List
+
+from asyncpg.pgproto.pgproto import UUID as AsyncpgUUID
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_model_field
+
+from core.serialization import FastJSONResponse, rows_as_dicts
+from routers.workouts import WORKOUT_READ_DEFAULTS
+from schemas.workout import WorkoutRead
+
+WorkoutRow = namedtuple("WorkoutRow", ["exercises", "id", "user_id", "timestamp", "created_at"])
+
+
+def make_page(workouts: int, exercises: int, sets: int, seed: int = 0):
+    rng = random.Random(seed)
+    # IDs as asyncpg returns them (a uuid.UUID subclass orjson doesn't encode natively)
+    user_id = AsyncpgUUID(str(uuid.uuid4()))
+    now = datetime.now(timezone.utc)
+    rows = []
+    for i in range(workouts):
+        payload = [
+            {"name": f"Exercise {e}", "sets": [{"reps": rng.randint(1, 12), "weight": float(rng.randrange(0, 200, 5))}
+                                             for _ in range(sets)]}
+            for e in range(exercises)
+        ]
+        timestamp = now - timedelta(days=i)
+        rows.append(WorkoutRow(payload, AsyncpgUUID(str(uuid.uuid4())), user_id, timestamp, timestamp))
+    # ORM-like objects for the old path (attribute access, like Workout instances)
+    orm_objects = [SimpleNamespace(**row._asdict()) for row in rows]
+    return rows, orm_objects
+
+
+async def time_it(fn, iterations: int) -> float:
+    await fn() # warm-up
+    started = time.perf_counter()
+    for _ in range(iterations):
+        await fn()
+    return (time.perf_counter() - started) / iterations
+
+
+async def main(args):
+    rows, orm_objects = make_page(args.workouts, args.exercises, args.sets)
+    field = create_model_field(name="Response_read_workouts", type_=List[WorkoutRead], mode="serialization")
+
+    async def before() -> bytes:
+        # The exact steps FastAPI runs for a route returning ORM objects
+        content = await serialize_response(field=field, response_content=orm_objects)
+        return JSONResponse(content).body
+
+    async def after() -> bytes:
+        return FastJSONResponse(rows_as_dicts(rows, WORKOUT_READ_DEFAULTS)).body
+
+    if json.loads(await before()) != json.loads(await after()):
+        raise SystemExit("Fast path output differs from the validated response!")
+
+    t_before = await time_it(before, args.iterations)
+    t_after = await time_it(after, args.iterations)
+    print({
+        "page": f"{args.workouts} workouts x {args.exercises * args.sets} sets",
+        "body_bytes": len(await after()),
+        "before_ms": round(t_before * 1000, 3),
+        "after_ms": round(t_after * 1000, 3),
+        "speedup": round(t_before / t_after, 1),
+    })
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=500)
+    parser.add_argument("--workouts", type=int, default=100)
+    parser.add_argument("--exercises", type=int, default=4)
+    parser.add_argument("--sets", type=int, default=5, help="Sets per exercise (4 x 5 = 20 sets per workout)")
+    asyncio.run(main(parser.parse_args()))
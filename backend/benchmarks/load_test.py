@@ -0,0 +1,368 @@
+# backend/benchmarks/load_test.py
+"""
+End-to-end load test: what one API worker sustains under realistic request mixes.
+
+1. Creates any missing tables in DATABASE_URL (a local Postgres; remote hosts are
+   refused unless --allow-remote, since the run writes data).
+2. Starts `uvicorn main:app` (one worker) with a test SUPABASE_JWT_SECRET, the fake
+   OpenAI client and /metrics enabled - or targets --url (then pass the server's
+   --jwt-secret).
+3. Mints HS256 access tokens for --users synthetic users and seeds each with
+   workouts and mood entries through the batch endpoints - or, with --user-ids,
+   uses the users of a dataset loaded by scripts.generate_dataset as they are.
+4. For every mix x concurrency level, runs closed-loop clients for --duration
+   seconds and reports per operation throughput and p50/p95/p99 latency, plus DB
+   time and queries per request per route (from the server's /metrics, diffed
+   around the stage).
+5. Writes everything as JSON (--out); --baseline prints throughput/p95 deltas
+   against a previous run's JSON.
+
+Mixes (--mix, comma-separated): read_heavy, write_heavy, auth. "auth" only calls
+GET /auth/users/me, i.e. the token-verification dependency and nothing else.
+
+Usage (from backend/, with DATABASE_URL and the other required settings in the env):
+    python -m benchmarks.load_test --users 20 --concurrency 1,8,32,64 --duration 15
+    python -m benchmarks.load_test --mix read_heavy --baseline load_test-20260101-120000.json
+
+The load generator shares this machine; at high concurrency check that it isn't
+the bottleneck (client CPU near 100% flattens throughput).
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import re
+import subprocess
+import sys
+import time
+import uuid
+from collections import defaultdict
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+
+import httpx
+from jose import jwt
+from sqlalchemy.engine import make_url
+
+API = "/api/v1"
+LOCAL_HOSTS = ("localhost", "127.0.0.1", "::1", None)
+EXERCISES = ["Bench Press", "Squat", "Deadlift", "Overhead Press", "Barbell Row", "Pull Up", "Lunge", "Dip"]
+JOURNAL = [
+    "Slept badly, training felt heavy.", "Great session, new energy.", "Busy day at work, short workout.",
+    "Feeling calm after a long walk.", None, None,
+]
+
+# Operation name -> (method, path); POST bodies come from make_workout / make_mood
+OPERATIONS = {
+    "GET /workouts": ("GET", f"{API}/workouts/?limit=50"),
+    "GET /moods": ("GET", f"{API}/moods/?limit=50"),
+    "GET /insights": ("GET", f"{API}/insights/"),
+    "GET /auth/users/me": ("GET", f"{API}/auth/users/me"),
+    "POST /workouts": ("POST", f"{API}/workouts/"),
+    "POST /moods": ("POST", f"{API}/moods/"),
+}
+
+MIXES: Dict[str, Dict[str, int]] = {
+    # App open + browsing history, occasional logging
+    "read_heavy": {"GET /workouts": 30, "GET /moods": 25, "GET /insights": 25, "GET /auth/users/me": 10,
+                   "POST /workouts": 5, "POST /moods": 5},
+    # Logging a session: mostly writes, each followed by a refresh
+    "write_heavy": {"POST /workouts": 35, "POST /moods": 25, "GET /workouts": 20, "GET /insights": 20},
+    "auth": {"GET /auth/users/me": 1},
+}
+
+
+# --- Data ---
+
+def mint_token(secret: str, user_id: uuid.UUID, ttl_seconds: int = 6 * 3600) -> str:
+    now = int(time.time())
+    claims = {
+        "sub": str(user_id), "aud": "authenticated", "role": "authenticated",
+        "email": f"load-{user_id.hex[:8]}@example.com", "iat": now, "exp": now + ttl_seconds,
+    }
+    return jwt.encode(claims, secret, algorithm="HS256")
+
+
+def make_workout(rng: random.Random) -> dict:
+    exercises = []
+    for name in rng.sample(EXERCISES, rng.randint(2, 4)):
+        weight = rng.choice([20, 40, 60, 80, 100])
+        exercises.append({"name": name, "sets": [
+            {"reps": rng.randint(3, 12), "weight": weight + 2.5 * i} for i in range(rng.randint(2, 5))
+        ]})
+    return {"exercises": exercises}
+
+
+def make_mood(rng: random.Random) -> dict:
+    return {"mood_score": rng.randint(1, 10), "journal_text": rng.choice(JOURNAL)}
+
+
+# --- Server ---
+
+def prepare_database(allow_remote: bool) -> None:
+    from db.session import engine, sync_database_url # Imported late: needs DATABASE_URL
+    import db.base # noqa: F401 - registers every model on Base.metadata
+
+    host = make_url(sync_database_url).host
+    if host not in LOCAL_HOSTS and not allow_remote:
+        sys.exit(f"Refusing to seed a non-local database ({host}); pass --allow-remote if you mean it.")
+    db.base.Base.metadata.create_all(bind=engine)
+    engine.dispose()
+
+
+def start_server(port: int, jwt_secret: str, cache_backend: str) -> subprocess.Popen:
+    env = dict(
+        os.environ,
+        SUPABASE_JWT_SECRET=jwt_secret,
+        OPENAI_USE_FAKE="true",
+        METRICS_ENABLED="true",
+        METRICS_ALLOWED_IPS="",
+        RESPONSE_CACHE_BACKEND=cache_backend,
+    )
+    return subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(port),
+         "--workers", "1", "--log-level", "warning", "--no-access-log"],
+        env=env,
+    )
+
+
+async def wait_until_ready(client: httpx.AsyncClient, timeout: float = 30.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if (await client.get("/metrics")).status_code == 200:
+                return
+        except httpx.TransportError:
+            pass
+        await asyncio.sleep(0.2)
+    raise RuntimeError("Server did not become ready (is /metrics enabled and reachable?)")
+
+
+async def seed(client: httpx.AsyncClient, tokens: List[str], workouts: int, moods: int, batch: int, seed_: int) -> None:
+    rng = random.Random(seed_)
+    for token in tokens:
+        headers = {"Authorization": f"Bearer {token}"}
+        for path, total, make in ((f"{API}/workouts/batch", workouts, make_workout), (f"{API}/moods/batch", moods, make_mood)):
+            for start in range(0, total, batch):
+                items = [make(rng) for _ in range(min(batch, total - start))]
+                resp = await client.post(path, json={"items": items}, headers=headers)
+                resp.raise_for_status()
+
+
+# --- /metrics ---
+
+_SAMPLE = re.compile(r'^(\w+)(?:\{(.*)\})? (\S+)$')
+_LABEL = re.compile(r'(\w+)="((?:[^"\\]|\\.)*)"')
+
+
+async def scrape(client: httpx.AsyncClient) -> Dict[Tuple[str, str, str], float]:
+    """ (metric, method, route) -> value for the per-request DB histograms' _sum/_count. """
+    resp = await client.get("/metrics")
+    resp.raise_for_status()
+    samples = {}
+    for line in resp.text.splitlines():
+        match = _SAMPLE.match(line)
+        if not match or not match.group(1).startswith(("http_request_db_seconds_", "http_request_db_queries_")):
+            continue
+        name, labels, value = match.groups()
+        if name.endswith("_bucket"):
+            continue
+        labels = dict(_LABEL.findall(labels or ""))
+        samples[(name, labels.get("method", ""), labels.get("route", ""))] = float(value)
+    return samples
+
+
+def db_breakdown(before: dict, after: dict) -> Dict[str, dict]:
+    delta = {key: value - before.get(key, 0.0) for key, value in after.items()}
+    routes = {}
+    for (name, method, route), count in delta.items():
+        if name != "http_request_db_seconds_count" or count <= 0 or route == "/metrics":
+            continue
+        seconds = delta.get(("http_request_db_seconds_sum", method, route), 0.0)
+        queries = delta.get(("http_request_db_queries_sum", method, route), 0.0)
+        routes[f"{method} {route}"] = {
+            "requests": int(count),
+            "db_ms_per_request": round(seconds / count * 1000, 3),
+            "queries_per_request": round(queries / count, 2),
+        }
+    return routes
+
+
+# --- Load ---
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * pct / 100))]
+
+
+async def run_stage(client: httpx.AsyncClient, tokens: List[str], mix: Dict[str, int],
+                    concurrency: int, duration: float, seed_: int) -> dict:
+    names, weights = list(mix), list(mix.values())
+    latencies: Dict[str, List[float]] = defaultdict(list)
+    statuses: Dict[str, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+    deadline = time.perf_counter() + duration
+
+    async def worker(n: int):
+        rng = random.Random(seed_ * 1000 + n)
+        while time.perf_counter() < deadline:
+            name = rng.choices(names, weights)[0]
+            method, path = OPERATIONS[name]
+            headers = {"Authorization": f"Bearer {rng.choice(tokens)}"}
+            body = None
+            if method == "POST":
+                body = make_workout(rng) if "workouts" in path else make_mood(rng)
+            started = time.perf_counter()
+            try:
+                resp = await client.request(method, path, json=body, headers=headers)
+                outcome = str(resp.status_code)
+            except httpx.HTTPError as e:
+                outcome = type(e).__name__
+            latencies[name].append(time.perf_counter() - started)
+            statuses[name][outcome] += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker(n) for n in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    operations = {}
+    for name, values in sorted(latencies.items()):
+        values.sort()
+        operations[name] = {
+            "requests": len(values),
+            "throughput_rps": round(len(values) / elapsed, 1),
+            "p50_ms": round(percentile(values, 50) * 1000, 2),
+            "p95_ms": round(percentile(values, 95) * 1000, 2),
+            "p99_ms": round(percentile(values, 99) * 1000, 2),
+            "max_ms": round(values[-1] * 1000, 2),
+            "status": dict(statuses[name]),
+        }
+    total = sum(op["requests"] for op in operations.values())
+    errors = sum(n for op in operations.values() for code, n in op["status"].items() if not code.startswith("2"))
+    return {
+        "elapsed_s": round(elapsed, 3),
+        "requests": total,
+        "throughput_rps": round(total / elapsed, 1),
+        "errors": errors,
+        "operations": operations,
+    }
+
+
+def compare(current: dict, baseline_path: str) -> None:
+    with open(baseline_path) as f:
+        baseline = {(r["mix"], r["concurrency"]): r for r in json.load(f)["runs"]}
+    print(f"\nvs. {baseline_path}:")
+    for run in current["runs"]:
+        old = baseline.get((run["mix"], run["concurrency"]))
+        if old is None:
+            continue
+        rps = (run["throughput_rps"] / old["throughput_rps"] - 1) * 100 if old["throughput_rps"] else 0.0
+        print(f"  {run['mix']:<12} c={run['concurrency']:<4} throughput {rps:+6.1f}%")
+        for name, op in run["operations"].items():
+            old_op = old["operations"].get(name)
+            if old_op and old_op["p95_ms"]:
+                print(f"      {name:<20} p95 {op['p95_ms']:8.2f} ms ({(op['p95_ms'] / old_op['p95_ms'] - 1) * 100:+6.1f}%)")
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def main(args) -> int:
+    unknown = [m for m in args.mix if m not in MIXES]
+    if unknown:
+        sys.exit(f"Unknown mix(es) {unknown}; choose from {sorted(MIXES)}")
+
+    server = None
+    base_url = args.url
+    if base_url is None:
+        prepare_database(args.allow_remote)
+        server = start_server(args.port, args.jwt_secret, args.cache)
+        base_url = f"http://127.0.0.1:{args.port}"
+
+    result = {
+        "meta": {
+            "started_at": datetime.now(timezone.utc).isoformat(),
+            "commit": git_commit(),
+            "python": platform.python_version(),
+            "server": base_url,
+            "args": vars(args),
+        },
+        "runs": [],
+    }
+    limits = httpx.Limits(max_connections=max(args.concurrency), max_keepalive_connections=max(args.concurrency))
+    try:
+        async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=30.0) as client:
+            await wait_until_ready(client)
+            if args.user_ids:
+                with open(args.user_ids) as f:
+                    user_ids = [uuid.UUID(line.strip()) for line in f if line.strip()][:args.users]
+                tokens = [mint_token(args.jwt_secret, user_id) for user_id in user_ids]
+                print(f"Using {len(tokens)} pre-generated users from {args.user_ids}")
+            else:
+                tokens = [mint_token(args.jwt_secret, uuid.uuid4()) for _ in range(args.users)]
+                print(f"Seeding {args.users} users x ({args.workouts} workouts, {args.moods} moods) ...")
+                await seed(client, tokens, args.workouts, args.moods, args.batch_size, args.seed)
+
+            for mix_name in args.mix:
+                for concurrency in args.concurrency:
+                    # Warm-up (connection pools, caches); not measured
+                    await run_stage(client, tokens, MIXES[mix_name], concurrency, min(2.0, args.duration), args.seed)
+                    before = await scrape(client)
+                    stage = await run_stage(client, tokens, MIXES[mix_name], concurrency, args.duration, args.seed)
+                    stage = {"mix": mix_name, "concurrency": concurrency, **stage,
+                             "db": db_breakdown(before, await scrape(client))}
+                    result["runs"].append(stage)
+                    print(f"{mix_name:<12} c={concurrency:<4} {stage['throughput_rps']:8.1f} req/s  "
+                          f"errors={stage['errors']}")
+                    for name, op in stage["operations"].items():
+                        print(f"    {name:<20} {op['throughput_rps']:8.1f} req/s  p50 {op['p50_ms']:7.2f}  "
+                              f"p95 {op['p95_ms']:7.2f}  p99 {op['p99_ms']:7.2f} ms")
+    finally:
+        if server is not None:
+            server.terminate()
+            try:
+                server.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                server.kill()
+
+    out = args.out or f"load_test-{datetime.now():%Y%m%d-%H%M%S}.json"
+    with open(out, "w") as f:
+        json.dump(result, f, indent=2)
+    print(f"Results written to {out}")
+    if args.baseline:
+        compare(result, args.baseline)
+    return 1 if any(run["errors"] for run in result["runs"]) else 0
+
+
+def _int_list(value: str) -> List[int]:
+    return [int(v) for v in value.split(",") if v.strip()]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--workouts", type=int, default=200, help="Seeded workouts per user")
+    parser.add_argument("--moods", type=int, default=200, help="Seeded mood entries per user")
+    parser.add_argument("--user-ids", default=None,
+                        help="File of user IDs (scripts.generate_dataset --user-ids-out) to use instead of seeding")
+    parser.add_argument("--batch-size", type=int, default=100, help="Items per seeding batch request (<= BATCH_MAX_ITEMS)")
+    parser.add_argument("--mix", type=lambda v: [m.strip() for m in v.split(",") if m.strip()],
+                        default=["read_heavy", "write_heavy", "auth"])
+    parser.add_argument("--concurrency", type=_int_list, default=[1, 8, 32, 64], help="Comma-separated levels")
+    parser.add_argument("--duration", type=float, default=15.0, help="Seconds per mix x concurrency stage")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--url", default=None, help="Target an already running server instead of starting one")
+    parser.add_argument("--jwt-secret", default="load-test-jwt-secret")
+    parser.add_argument("--cache", default="memory", help="RESPONSE_CACHE_BACKEND for the started server")
+    parser.add_argument("--allow-remote", action="store_true")
+    parser.add_argument("--out", default=None, help="JSON results path (default: load_test-<timestamp>.json)")
+    parser.add_argument("--baseline", default=None, help="Previous results JSON to compare against")
+    sys.exit(asyncio.run(main(parser.parse_args())))
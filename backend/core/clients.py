@@ -1,12 +1,14 @@
 # backend/core/clients.py
 from supabase import create_client, Client as SupabaseClient # Use the main sync client type/creator
-from openai import AsyncOpenAI                          # Use async OpenAI client
+from openai import AsyncOpenAI, DefaultAsyncHttpxClient # Use async OpenAI client
+import httpx                                            # Async HTTP client for Spotify
 from functools import lru_cache                         # For singleton pattern/caching
 from typing import Optional                             # For type hinting
 import logging                                          # For logging
 
 # Import the settings object AFTER it's defined and loaded in config.py
 from .config import settings
+from .instrumentation import InstrumentedTransport # Counts/times external calls for /metrics
 
 logger = logging.getLogger(__name__)
 
@@ -48,19 +50,54 @@ _openai_async_client: Optional[AsyncOpenAI] = None
 def get_openai_client() -> AsyncOpenAI:
     """Initializes and returns the Async OpenAI client."""
     global _openai_async_client
+    if _openai_async_client is None and settings.OPENAI_USE_FAKE:
+        from testing.fake_openai import FakeAsyncOpenAI # Local stand-in, never used in production
+        _openai_async_client = FakeAsyncOpenAI()
+        logger.warning("OPENAI_USE_FAKE is set: using the local fake OpenAI client.")
     if _openai_async_client is None:
         if not settings.OPENAI_API_KEY:
             logger.error("OpenAI API Key not configured in .env!")
             raise ValueError("OpenAI API Key not configured!")
         try:
             # Pass the actual secret key string using .get_secret_value()
-            _openai_async_client = AsyncOpenAI(api_key=settings.OPENAI_API_KEY.get_secret_value())
+            # Our own transport (same pool sizes as the SDK's default client) so calls show up in /metrics
+            transport = InstrumentedTransport("openai", httpx.AsyncHTTPTransport(
+                limits=httpx.Limits(max_connections=1000, max_keepalive_connections=100),
+            ))
+            _openai_async_client = AsyncOpenAI(
+                api_key=settings.OPENAI_API_KEY.get_secret_value(),
+                http_client=DefaultAsyncHttpxClient(transport=transport),
+            )
             logger.info("Async OpenAI client initialized.")
         except Exception as e:
             logger.error(f"Failed to initialize async OpenAI client: {e}")
             raise
     return _openai_async_client
 
+# --- Spotify HTTP Client Initialization ---
+@lru_cache() # One pooled client per process (keeps TLS connections to Spotify warm)
+def get_spotify_http_client() -> httpx.AsyncClient:
+    """ Returns a shared httpx.AsyncClient for the Spotify Web API (base URL from settings). """
+    logger.info(f"Spotify HTTP client initialized for {settings.SPOTIFY_API_BASE_URL}.")
+    return httpx.AsyncClient(
+        base_url=settings.SPOTIFY_API_BASE_URL,
+        timeout=httpx.Timeout(10.0, connect=5.0),
+        # With a custom transport the pool limits go on the transport, not the client
+        transport=InstrumentedTransport("spotify", httpx.AsyncHTTPTransport(
+            limits=httpx.Limits(max_connections=20, max_keepalive_connections=10),
+        )),
+    )
+
+@lru_cache()
+def get_spotify_accounts_http_client() -> httpx.AsyncClient:
+    """ Shared client for Spotify's accounts service (OAuth token exchange / refresh). """
+    return httpx.AsyncClient(
+        base_url=settings.SPOTIFY_ACCOUNTS_BASE_URL,
+        timeout=httpx.Timeout(10.0, connect=5.0),
+        auth=httpx.BasicAuth(settings.SPOTIFY_CLIENT_ID, settings.SPOTIFY_CLIENT_SECRET.get_secret_value()),
+        transport=InstrumentedTransport("spotify_accounts", httpx.AsyncHTTPTransport()),
+    )
+
 # --- Usage Note ---
 # It's generally recommended to call these getter functions
 # (e.g., `get_supabase_client()`, `get_openai_client()`)
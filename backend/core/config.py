@@ -31,16 +31,68 @@ class Settings(BaseSettings):
 
     # OpenAI
     OPENAI_API_KEY: SecretStr # Keep secret
+    OPENAI_USE_FAKE: bool = False # Use the local fake client (testing/fake_openai.py) instead of the real API
 
     # Spotify
     SPOTIFY_CLIENT_ID: str
     SPOTIFY_CLIENT_SECRET: SecretStr # Keep secret
     SPOTIFY_REDIRECT_URI: str
+    SPOTIFY_API_BASE_URL: str = "https://api.spotify.com/v1" # Point at testing/fake_spotify.py for local runs
+    SPOTIFY_ACCOUNTS_BASE_URL: str = "https://accounts.spotify.com" # OAuth authorize + token endpoints
+    SPOTIFY_SCOPES: str = "user-read-recently-played"
+    SPOTIFY_TOKEN_REFRESH_MARGIN_SECONDS: int = 120 # Refresh access tokens this long before expires_at
+    SPOTIFY_TOKEN_CACHE_SIZE: int = 10000 # Users whose tokens are kept in memory (LRU; 0 disables the cache)
+    SPOTIFY_POST_CONNECT_REDIRECT: str = "/?spotify_callback=success" # Where /spotify/callback sends the user (deeplink for mobile)
+    SPOTIFY_SYNC_MAX_PAGES: int = 20 # Upper bound on recently-played pages fetched per sync
 
     # Application Secrets / Tokens
     APP_SECRET_KEY: SecretStr # Used for state in OAuth etc., keep secret
+    TOKEN_ENCRYPTION_KEY: Optional[SecretStr] = None # Fernet key for tokens at rest; derived from APP_SECRET_KEY if unset
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30 # Example: for any custom JWTs if needed
     ALGORITHM: str = "HS256" # Example algorithm for custom JWTs
+    AUTH_TOKEN_CACHE_SIZE: int = 4096 # Max verified JWT payloads kept in memory (0 disables the cache)
+
+    # Background Jobs (services/job_queue.py)
+    JOB_WORKERS_ENABLED: bool = True # Run the worker pool inside the API process
+    JOB_WORKER_CONCURRENCY: int = 4 # Max jobs processed concurrently per process
+    JOB_POLL_INTERVAL_SECONDS: float = 5.0 # Idle poll interval (new jobs also wake workers directly)
+    JOB_MAX_ATTEMPTS: int = 5
+    JOB_RETRY_BASE_SECONDS: float = 2.0 # Backoff: base * 2^(attempt-1), jittered
+    JOB_RETRY_MAX_SECONDS: float = 300.0
+    JOB_LEASE_SECONDS: int = 300 # 'running' jobs older than this are reclaimed on startup
+
+    # Bulk Import (services/import_service.py)
+    IMPORT_CHUNK_SIZE: int = 500 # Workouts validated + written per multi-row INSERT/commit
+    IMPORT_MAX_ERRORS: int = 1000 # Row errors returned in the report (the total is always counted)
+    IMPORT_MAX_LINE_BYTES: int = 1024 * 1024 # Longer lines are reported as row errors (bounds the line buffer)
+
+    # Batch create (POST /workouts/batch, /moods/batch)
+    BATCH_MAX_ITEMS: int = 100 # Max items per batch request (each batch is one transaction)
+
+    # Conditional GET (services/data_version_service.py)
+    DATA_VERSION_CACHE_SIZE: int = 10000 # Users whose data version is kept in memory (LRU)
+    DATA_VERSION_TTL_SECONDS: float = 1.0 # Max age of an in-memory version before re-reading the DB (bounds staleness across workers; 0 = always read)
+
+    # Delta sync (services/sync_service.py)
+    SYNC_SAFETY_WINDOW_SECONDS: float = 30.0 # Tokens trail now() by this much so slow in-flight writes aren't skipped
+
+    # Response cache (services/response_cache_service.py)
+    RESPONSE_CACHE_BACKEND: str = "memory" # memory | redis | off
+    RESPONSE_CACHE_REDIS_URL: str = "redis://127.0.0.1:6379/0" # Any Redis-protocol server (testing/fake_redis.py locally)
+    RESPONSE_CACHE_TTL_SECONDS: float = 300.0 # Safety net only: writers invalidate explicitly
+    RESPONSE_CACHE_MAX_ENTRIES: int = 5000 # memory backend: LRU bound on cached responses
+    RESPONSE_CACHE_MAX_BYTES: int = 64 * 1024 * 1024 # memory backend: LRU bound on cached bytes
+
+    # Exercise autocomplete (services/exercise_suggest_service.py)
+    EXERCISE_SUGGEST_CACHE_USERS: int = 1024 # Per-user name indexes kept in memory (LRU; 0 disables caching)
+
+    # Metrics (core/metrics.py, core/instrumentation.py)
+    METRICS_ENABLED: bool = True # Record request/DB/external-call metrics and serve them at METRICS_PATH
+    METRICS_PATH: str = "/metrics" # Prometheus text format, no user auth
+    METRICS_ALLOWED_IPS: Optional[str] = None # Comma-separated IPs/CIDRs allowed to scrape (None = anyone)
+    DB_DIAGNOSTICS_ENABLED: bool = False # Slow-query log + per-request N+1 detection ("db.diagnostics" logger)
+    DB_SLOW_QUERY_MS: float = 200.0 # Log statements slower than this (diagnostics mode)
+    DB_REPEATED_QUERY_THRESHOLD: int = 10 # Flag requests running one statement template more often than this
 
     # CORS - Store as a simple string, parse later if needed
     CLIENT_ORIGIN_URL: Optional[str] = None # e.g., "http://localhost:5173,https://your.domain.com"
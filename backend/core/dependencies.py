@@ -7,6 +7,7 @@ import uuid # Import uuid
 
 # Import settings FOR JWT secret and algorithm
 from .config import settings
+from .token_cache import VerifiedTokenCache
 
 # Imports for DB lookups (Uncomment if/when needed)
 # from sqlalchemy.orm import Session
@@ -20,6 +21,11 @@ logger = logging.getLogger(__name__)
 # from fastapi.security import OAuth2PasswordBearer
 # oauth2_scheme = OAuth2PasswordBearer(tokenUrl=f"/api/v1/auth/login") # Adjust tokenUrl if needed
 
+# --- Verified Token Cache ---
+# The mobile app reuses one access token for many calls; skip re-verifying it
+# until it expires. Entries are keyed by a hash of the token and expire at `exp`.
+token_cache = VerifiedTokenCache(maxsize=settings.AUTH_TOKEN_CACHE_SIZE)
+
 # --- Dependency to Extract Token ---
 # Tries Header first (standard for APIs), then falls back to Cookie
 async def get_token_data_optional(
@@ -56,6 +62,11 @@ async def get_token_data_optional(
         logger.debug("No token found in header or cookie.")
         return None # No token provided
 
+    # --- Fast path: token already verified and not yet expired ---
+    cached_payload = token_cache.get(token)
+    if cached_payload is not None:
+        return cached_payload
+
     # --- *** VERIFY THE TOKEN *** ---
     try:
         payload = jwt.decode(
@@ -78,6 +89,7 @@ async def get_token_data_optional(
              raise credentials_exception
 
         logger.debug(f"Token successfully verified for user ID: {user_id}")
+        token_cache.put(token, payload)
         return payload # Return the verified payload
 
     except JWTError as e:
@@ -0,0 +1,295 @@
+# backend/core/instrumentation.py
+"""
+What the app measures, and the hooks that measure it (exposed by GET /metrics, see main.py):
+
+- MetricsMiddleware (pure ASGI, outermost): per-route latency histogram, status
+  codes and in-flight requests. The route label is the matched path template
+  (e.g. "/api/v1/workouts/{workout_id}"), never the raw URL, so cardinality stays
+  bounded; requests that match no route are labelled "unmatched".
+- instrument_engine(): SQLAlchemy before/after_cursor_execute hooks (db/session.py
+  installs them on both engines). Every statement is timed; statements run while
+  a request is being served are also added to that request's RequestDbStats (via
+  a ContextVar, which SQLAlchemy's async greenlets inherit), giving per-route
+  query-count and DB-time histograms.
+- Diagnostics (DB_DIAGNOSTICS_ENABLED, off by default): statements slower than
+  DB_SLOW_QUERY_MS are logged to the "db.diagnostics" logger with their
+  bound-parameter shape (types only, never values) and issuing route; a request
+  that runs one statement template more than DB_REPEATED_QUERY_THRESHOLD times
+  (the N+1 pattern) is logged once per template when it finishes. For CI, see
+  testing/query_count.py.
+- External calls: InstrumentedTransport wraps the httpx transports of the OpenAI
+  and Spotify clients (core/clients.py); `external_call()` times the Supabase SDK
+  calls in routers/auth.py.
+"""
+import contextvars
+import logging
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional
+
+import httpx
+
+from core.config import settings
+from core.metrics import registry
+
+diagnostics_logger = logging.getLogger("db.diagnostics")
+
+# --- HTTP ---
+HTTP_REQUESTS = registry.counter(
+    "http_requests_total", "HTTP requests served", ("method", "route", "status"))
+HTTP_LATENCY = registry.histogram(
+    "http_request_duration_seconds", "Time to serve a request, including streaming the body", ("method", "route"))
+HTTP_IN_FLIGHT = registry.gauge(
+    "http_requests_in_flight", "Requests currently being served", ("method",))
+
+# --- Database ---
+DB_QUERIES = registry.counter(
+    "db_queries_total", "SQL statements executed, by the route that issued them ('' = outside a request)", ("route",))
+DB_QUERY_LATENCY = registry.histogram(
+    "db_query_duration_seconds", "Execution time of single SQL statements",
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0))
+REQUEST_DB_QUERIES = registry.histogram(
+    "http_request_db_queries", "SQL statements executed per request", ("method", "route"),
+    buckets=(0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 100))
+REQUEST_DB_TIME = registry.histogram(
+    "http_request_db_seconds", "Time spent in SQL statements per request", ("method", "route"))
+
+# --- External services ---
+EXTERNAL_CALLS = registry.counter(
+    "external_calls_total", "Calls to external services, by HTTP status or 'error'", ("service", "outcome"))
+EXTERNAL_LATENCY = registry.histogram(
+    "external_call_duration_seconds", "Latency of calls to external services", ("service",))
+
+# --- Diagnostics (only recorded while enabled) ---
+SLOW_QUERIES = registry.counter(
+    "db_slow_queries_total", "SQL statements slower than DB_SLOW_QUERY_MS", ("route",))
+REPEATED_QUERY_REQUESTS = registry.counter(
+    "db_repeated_query_requests_total",
+    "Requests that ran one statement template more than DB_REPEATED_QUERY_THRESHOLD times (N+1)", ("route",))
+
+UNMATCHED_ROUTE = "unmatched"
+
+
+class RequestDbStats:
+    """ SQL statements run on behalf of one request. """
+
+    __slots__ = ("scope", "queries", "seconds", "statements")
+
+    def __init__(self, scope):
+        self.scope = scope
+        self.queries = 0
+        self.seconds = 0.0
+        # statement template -> executions; only kept in diagnostics mode
+        self.statements: Optional[Dict[str, int]] = {} if _diagnostics.enabled else None
+
+    @property
+    def route(self) -> str:
+        # Statements run in dependencies/handlers, i.e. after routing has matched
+        return _route_label(self.scope)
+
+
+_request_db_stats: contextvars.ContextVar[Optional[RequestDbStats]] = contextvars.ContextVar(
+    "request_db_stats", default=None)
+
+
+def current_request_db_stats() -> Optional[RequestDbStats]:
+    return _request_db_stats.get()
+
+
+def _route_label(scope) -> str:
+    route = scope.get("route") # Set by the router when a route matched
+    return getattr(route, "path", None) or UNMATCHED_ROUTE
+
+
+class MetricsMiddleware:
+    """ Pure ASGI (no BaseHTTPMiddleware task/queue overhead); add it last so it wraps everything. """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status = "500" # If the app raises before starting a response
+        stats = RequestDbStats(scope)
+        token = _request_db_stats.set(stats)
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = str(message["status"])
+            await send(message)
+
+        HTTP_IN_FLIGHT.inc(method)
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - started
+            HTTP_IN_FLIGHT.dec(method)
+            _request_db_stats.reset(token)
+            route = _route_label(scope)
+            HTTP_REQUESTS.inc(method, route, status)
+            HTTP_LATENCY.observe(elapsed, method, route)
+            REQUEST_DB_QUERIES.observe(stats.queries, method, route)
+            REQUEST_DB_TIME.observe(stats.seconds, method, route)
+            if stats.statements:
+                _report_repeated_statements(method, route, stats.statements)
+
+
+# --- SQLAlchemy hooks ---
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    starts = conn.info.get("query_start")
+    if not starts:
+        return
+    elapsed = time.perf_counter() - starts.pop()
+    DB_QUERY_LATENCY.observe(elapsed)
+    stats = _request_db_stats.get()
+    if stats is None:
+        DB_QUERIES.inc("")
+    else:
+        stats.queries += 1
+        stats.seconds += elapsed
+        DB_QUERIES.inc(stats.route)
+        if stats.statements is not None:
+            stats.statements[statement] = stats.statements.get(statement, 0) + 1
+    if _diagnostics.enabled and elapsed >= _diagnostics.slow_query_seconds:
+        route = stats.route if stats is not None else "(no request)"
+        SLOW_QUERIES.inc(route)
+        diagnostics_logger.warning(
+            f"Slow query ({elapsed * 1000:.1f} ms) from {route}: {compact_statement(statement)} "
+            f"| params: {parameter_shape(parameters, executemany)}"
+        )
+
+
+def _handle_error(exception_context):
+    # after_cursor_execute doesn't fire for failed statements: drop their start time
+    conn = exception_context.connection
+    if conn is not None and conn.info.get("query_start"):
+        conn.info["query_start"].pop()
+
+
+# --- Diagnostics ---
+
+class DiagnosticsConfig:
+    __slots__ = ("enabled", "slow_query_seconds", "repeated_query_threshold")
+
+    def __init__(self, enabled: bool, slow_query_ms: float, repeated_query_threshold: int):
+        self.enabled = enabled
+        self.slow_query_seconds = slow_query_ms / 1000
+        self.repeated_query_threshold = repeated_query_threshold
+
+
+_diagnostics = DiagnosticsConfig(
+    settings.DB_DIAGNOSTICS_ENABLED, settings.DB_SLOW_QUERY_MS, settings.DB_REPEATED_QUERY_THRESHOLD,
+)
+
+
+def configure_diagnostics(enabled: bool, slow_query_ms: Optional[float] = None,
+                          repeated_query_threshold: Optional[int] = None) -> None:
+    """ Switch diagnostics at runtime (tests, benchmarks); requests already in flight keep their mode. """
+    global _diagnostics
+    _diagnostics = DiagnosticsConfig(
+        enabled,
+        settings.DB_SLOW_QUERY_MS if slow_query_ms is None else slow_query_ms,
+        settings.DB_REPEATED_QUERY_THRESHOLD if repeated_query_threshold is None else repeated_query_threshold,
+    )
+
+
+def compact_statement(statement: str, limit: int = 500) -> str:
+    statement = " ".join(statement.split())
+    return statement if len(statement) <= limit else statement[:limit] + " ..."
+
+
+def _type_name(value) -> str:
+    if isinstance(value, (list, tuple)):
+        return f"{type(value).__name__}[{len(value)}]"
+    return type(value).__name__
+
+
+def parameter_shape(parameters, executemany: bool = False, limit: int = 20) -> str:
+    """ Types of the bound parameters, e.g. "(UUID, datetime, int)" - values are never logged. """
+    if executemany:
+        rows = list(parameters or ())
+        return f"{len(rows)} x {parameter_shape(rows[0], limit=limit)}" if rows else "[]"
+    if isinstance(parameters, dict):
+        items = [f"{key}: {_type_name(value)}" for key, value in list(parameters.items())[:limit]]
+        total, opening, closing = len(parameters), "{", "}"
+    elif isinstance(parameters, (list, tuple)):
+        items = [_type_name(value) for value in parameters[:limit]]
+        total, opening, closing = len(parameters), "(", ")"
+    else:
+        return _type_name(parameters)
+    if total > limit:
+        items.append(f"... {total} params")
+    return opening + ", ".join(items) + closing
+
+
+def _report_repeated_statements(method: str, route: str, statements: Dict[str, int]) -> None:
+    threshold = _diagnostics.repeated_query_threshold
+    repeated = [(count, statement) for statement, count in statements.items() if count > threshold]
+    if not repeated:
+        return
+    REPEATED_QUERY_REQUESTS.inc(route)
+    for count, statement in sorted(repeated, reverse=True):
+        diagnostics_logger.warning(
+            f"Possible N+1: {method} {route} ran the same statement {count} times "
+            f"(threshold {threshold}): {compact_statement(statement)}"
+        )
+
+
+def instrument_engine(engine) -> None:
+    """ Attach the query hooks to a (sync) Engine; for an AsyncEngine pass `.sync_engine`. """
+    from sqlalchemy import event
+
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(engine, "handle_error", _handle_error)
+
+
+# --- External services ---
+
+def _record_external(service: str, outcome: str, started: float) -> None:
+    EXTERNAL_CALLS.inc(service, outcome)
+    EXTERNAL_LATENCY.observe(time.perf_counter() - started, service)
+
+
+class InstrumentedTransport(httpx.AsyncBaseTransport):
+    """ httpx transport wrapper counting every request (retries included) to `service`. """
+
+    def __init__(self, service: str, transport: httpx.AsyncBaseTransport):
+        self.service = service
+        self._transport = transport
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        started = time.perf_counter()
+        try:
+            response = await self._transport.handle_async_request(request)
+        except Exception:
+            _record_external(self.service, "error", started)
+            raise
+        _record_external(self.service, str(response.status_code), started)
+        return response
+
+    async def aclose(self) -> None:
+        await self._transport.aclose()
+
+
+@contextmanager
+def external_call(service: str) -> Iterator[None]:
+    """ Times an SDK call we can't hook at the transport level; raising counts as 'error'. """
+    started = time.perf_counter()
+    try:
+        yield
+    except Exception:
+        _record_external(service, "error", started)
+        raise
+    _record_external(service, "ok", started)
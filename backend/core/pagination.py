@@ -0,0 +1,77 @@
+# backend/core/pagination.py
+import base64
+import json
+import uuid
+from datetime import datetime
+from typing import Dict, Optional, Tuple
+
+from fastapi import HTTPException, status
+from sqlalchemy import and_, or_
+
+# Response header carrying the opaque cursor for the next page.
+# Lists keep returning a plain JSON array so existing clients are unaffected.
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(sort_value: datetime, row_id: uuid.UUID) -> str:
+    """ Encodes a (timestamp, id) keyset position into an opaque URL-safe token. """
+    raw = json.dumps([sort_value.isoformat(), str(row_id)], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, uuid.UUID]:
+    """
+    Decodes a token produced by `encode_cursor`.
+    Raises HTTP 400 if the token is malformed (clients should treat cursors as opaque).
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        sort_value, row_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return datetime.fromisoformat(sort_value), uuid.UUID(row_id)
+    except Exception:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid pagination cursor.")
+
+
+def keyset_after(sort_col, id_col, cursor):
+    """
+    WHERE clause selecting rows strictly after `cursor` in
+    ORDER BY sort_col DESC, id_col ASC order (matches the composite indexes).
+    `cursor` is either an opaque token or an already-decoded (timestamp, id) pair.
+    """
+    sort_value, row_id = decode_cursor(cursor) if isinstance(cursor, str) else cursor
+    return or_(sort_col < sort_value, and_(sort_col == sort_value, id_col > row_id))
+
+
+def next_cursor_for(rows: list, limit: int, sort_attr: str) -> Optional[str]:
+    """ Returns the cursor after the last row, or None if this was the final page. """
+    if not rows or len(rows) < limit:
+        return None
+    last = rows[-1]
+    return encode_cursor(getattr(last, sort_attr), last.id)
+
+
+# --- Composite cursors (one keyset position per source, e.g. the merged timeline) ---
+
+def encode_multi_cursor(positions: Dict[str, Optional[Tuple[datetime, uuid.UUID]]]) -> str:
+    """
+    Encodes {source: (timestamp, id) | None} into one opaque token.
+    A None position means "start of this source"; sources left out of the dict are exhausted.
+    """
+    raw = {
+        name: ([pos[0].isoformat(), str(pos[1])] if pos else None)
+        for name, pos in positions.items()
+    }
+    return base64.urlsafe_b64encode(json.dumps(raw, separators=(",", ":")).encode()).decode().rstrip("=")
+
+
+def decode_multi_cursor(cursor: str) -> Dict[str, Optional[Tuple[datetime, uuid.UUID]]]:
+    """ Inverse of `encode_multi_cursor`; raises HTTP 400 on a malformed token. """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        raw = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return {
+            str(name): ((datetime.fromisoformat(pos[0]), uuid.UUID(pos[1])) if pos else None)
+            for name, pos in raw.items()
+        }
+    except Exception:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid pagination cursor.")
@@ -0,0 +1,118 @@
+# backend/core/redis_client.py
+"""
+Minimal asyncio client for the Redis protocol (RESP2).
+
+Just enough for the response cache (services/response_cache_service.py): pooled
+connections, one command per round trip, and replies decoded to Python values
+(bulk strings stay bytes). Works against Redis, Valkey, KeyDB or the local
+stand-in in testing/fake_redis.py.
+"""
+import asyncio
+import logging
+import urllib.parse
+from typing import List, Optional, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+Reply = Union[None, int, bytes, str, list]
+
+
+class RedisError(Exception):
+    """ An error reply from the server (e.g. "ERR unknown command"). """
+
+
+def encode_command(*args) -> bytes:
+    parts = [b"*%d\r\n" % len(args)]
+    for arg in args:
+        if isinstance(arg, bytes):
+            data = arg
+        elif isinstance(arg, (int, float)):
+            data = str(arg).encode()
+        else:
+            data = str(arg).encode("utf-8")
+        parts.append(b"$%d\r\n%s\r\n" % (len(data), data))
+    return b"".join(parts)
+
+
+async def read_reply(reader: asyncio.StreamReader) -> Reply:
+    line = await reader.readline()
+    if not line.endswith(b"\r\n"):
+        raise ConnectionError("Connection closed by the Redis server")
+    kind, rest = line[:1], line[1:-2]
+    if kind == b"+":
+        return rest.decode()
+    if kind == b"-":
+        raise RedisError(rest.decode())
+    if kind == b":":
+        return int(rest)
+    if kind == b"$":
+        length = int(rest)
+        if length < 0:
+            return None
+        data = await reader.readexactly(length + 2)
+        return data[:-2]
+    if kind == b"*":
+        count = int(rest)
+        if count < 0:
+            return None
+        return [await read_reply(reader) for _ in range(count)]
+    raise ConnectionError(f"Unexpected RESP reply type: {line[:20]!r}")
+
+
+def parse_url(url: str) -> Tuple[str, int, int, Optional[str]]:
+    """ redis://[:password@]host[:port][/db] -> (host, port, db, password). """
+    parsed = urllib.parse.urlparse(url)
+    if parsed.scheme != "redis":
+        raise ValueError(f"Unsupported Redis URL scheme: {parsed.scheme!r}")
+    db = int(parsed.path.lstrip("/") or 0)
+    return parsed.hostname or "127.0.0.1", parsed.port or 6379, db, parsed.password
+
+
+class RedisClient:
+    """ Small connection pool; each `execute` borrows one connection for one round trip. """
+
+    def __init__(self, url: str, max_connections: int = 10, timeout: float = 1.0):
+        self.host, self.port, self.db, self.password = parse_url(url)
+        self.timeout = timeout
+        self._idle: List[Tuple[asyncio.StreamReader, asyncio.StreamWriter]] = []
+        self._slots = asyncio.Semaphore(max_connections)
+
+    async def _connect(self) -> Tuple[asyncio.StreamReader, asyncio.StreamWriter]:
+        reader, writer = await asyncio.open_connection(self.host, self.port)
+        try:
+            if self.password:
+                await self._round_trip(reader, writer, ("AUTH", self.password))
+            if self.db:
+                await self._round_trip(reader, writer, ("SELECT", self.db))
+        except BaseException:
+            writer.close()
+            raise
+        return reader, writer
+
+    @staticmethod
+    async def _round_trip(reader, writer, args) -> Reply:
+        writer.write(encode_command(*args))
+        await writer.drain()
+        return await read_reply(reader)
+
+    async def execute(self, *args) -> Reply:
+        async with self._slots:
+            conn = self._idle.pop() if self._idle else None
+            try:
+                if conn is None:
+                    conn = await asyncio.wait_for(self._connect(), self.timeout)
+                reply = await asyncio.wait_for(self._round_trip(*conn, args), self.timeout)
+            except RedisError:
+                self._idle.append(conn) # Error replies leave the connection in a clean state
+                raise
+            except BaseException:
+                if conn is not None:
+                    conn[1].close() # Timed out / broken mid-reply: never reuse
+                raise
+            self._idle.append(conn)
+            return reply
+
+    async def close(self) -> None:
+        while self._idle:
+            _, writer = self._idle.pop()
+            writer.close()
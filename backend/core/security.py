@@ -0,0 +1,62 @@
+# backend/core/security.py
+import base64
+import hashlib
+import secrets
+import time
+import uuid
+from functools import lru_cache
+from typing import Optional
+
+from cryptography.fernet import Fernet, InvalidToken
+from jose import JWTError, jwt
+
+from .config import settings
+
+# --- Encryption at rest (third-party OAuth tokens etc.) ---
+
+@lru_cache()
+def _fernet() -> Fernet:
+    """
+    Fernet (AES-128-CBC + HMAC-SHA256) keyed by TOKEN_ENCRYPTION_KEY if set,
+    otherwise derived from APP_SECRET_KEY. Rotating the key makes stored tokens unreadable.
+    """
+    if settings.TOKEN_ENCRYPTION_KEY:
+        return Fernet(settings.TOKEN_ENCRYPTION_KEY.get_secret_value().encode())
+    digest = hashlib.sha256(settings.APP_SECRET_KEY.get_secret_value().encode()).digest()
+    return Fernet(base64.urlsafe_b64encode(digest))
+
+
+def encrypt_secret(value: str) -> str:
+    return _fernet().encrypt(value.encode()).decode()
+
+
+def decrypt_secret(value: str) -> str:
+    """ Raises ValueError if the ciphertext was tampered with or the key changed. """
+    try:
+        return _fernet().decrypt(value.encode()).decode()
+    except InvalidToken as e:
+        raise ValueError("Could not decrypt stored secret (wrong key or corrupted value).") from e
+
+
+# --- Signed OAuth `state` parameter ---
+
+OAUTH_STATE_TTL_SECONDS = 600
+
+
+def create_oauth_state(user_id: uuid.UUID, purpose: str) -> str:
+    """ Short-lived signed token binding an OAuth redirect to the user who started it. """
+    now = int(time.time())
+    claims = {"sub": str(user_id), "purpose": purpose, "nonce": secrets.token_urlsafe(8),
+              "iat": now, "exp": now + OAUTH_STATE_TTL_SECONDS}
+    return jwt.encode(claims, settings.APP_SECRET_KEY.get_secret_value(), algorithm=settings.ALGORITHM)
+
+
+def verify_oauth_state(state: str, purpose: str) -> Optional[uuid.UUID]:
+    """ Returns the user ID the state was issued for, or None if invalid/expired/wrong purpose. """
+    try:
+        claims = jwt.decode(state, settings.APP_SECRET_KEY.get_secret_value(), algorithms=[settings.ALGORITHM])
+        if claims.get("purpose") != purpose:
+            return None
+        return uuid.UUID(claims["sub"])
+    except (JWTError, KeyError, ValueError):
+        return None
@@ -0,0 +1,42 @@
+# backend/core/serialization.py
+"""
+Fast-path JSON for trusted database reads.
+
+List endpoints normally hand ORM objects to FastAPI, which re-validates every row
+against the response model (nested exercises/sets and their validators included)
+before encoding with the stdlib `json`. For data we wrote ourselves that work is
+redundant: routes can instead build plain dicts from row tuples (JSONB columns
+arrive as ready-made lists/dicts) and return them in a `FastJSONResponse`.
+
+The output matches what FastAPI would produce for the declared response_model:
+same keys, UUIDs as strings, and UTC datetimes ending in "Z" like pydantic.
+"""
+import uuid
+from typing import Any, Dict, Iterable, List
+
+import orjson
+from fastapi.responses import ORJSONResponse
+
+
+def _default(value: Any) -> Any:
+    # orjson only encodes exact uuid.UUID; asyncpg returns its own subclass
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+
+class FastJSONResponse(ORJSONResponse):
+    """ orjson-encoded response; UTC datetimes are written with a "Z" suffix like pydantic does. """
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, default=_default, option=orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS)
+
+
+def rows_as_dicts(rows: Iterable, defaults: Dict[str, Any] = None) -> List[dict]:
+    """
+    Row tuples (select of labelled columns) -> response dicts, with no validation.
+    `defaults` fills response-model fields that are not stored (e.g. per-request flags).
+    """
+    if defaults:
+        return [{**row._asdict(), **defaults} for row in rows]
+    return [row._asdict() for row in rows]
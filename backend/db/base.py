@@ -2,8 +2,11 @@
 # Import all the models, so that Base has them before being
 # imported by Alembic or used by create_all
 from db.session import Base # noqa
-from models.user import User # noqa
-from models.workout import Workout # noqa
-from models.mood import MoodEntry # <-- ENSURE THIS IS UNCOMMENTED/PRESENT noqa
-from models.spotify import SpotifyTrack # noqa (Ensure spotify.py model exists if using)
+# from models.user import User # models/user.py is commented out (users live in Supabase auth.users)
+from models.workout import Workout, WorkoutSet, PersonalRecord # noqa
+from models.mood import MoodEntry, SentimentCache # <-- ENSURE THIS IS UNCOMMENTED/PRESENT noqa
+from models.spotify import SpotifyTrack, SpotifySyncState, SpotifyAccount # noqa
+from models.insight import DailyAggregate, CorrelationReport # noqa
+from models.job import BackgroundJob # noqa
+from models.data_version import UserDataVersion # noqa
 # from models.profile import Profile # Uncomment if you create a Profile model
\ No newline at end of file
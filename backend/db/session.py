@@ -1,7 +1,10 @@
 # backend/db/session.py
 from sqlalchemy import create_engine, text # Import text for raw SQL execution if needed
 from sqlalchemy.orm import sessionmaker, declarative_base, Session
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
+from typing import AsyncIterator
 from core.config import settings # Import settings to get DATABASE_URL
+from core.instrumentation import instrument_engine # Query count / DB time per request for /metrics
 import logging
 
 logger = logging.getLogger(__name__)
@@ -32,13 +35,27 @@ else:
     raise ValueError("DATABASE_URL configuration is missing or empty!")
 # --- *** END CHANGE *** ---
 
+# The request path uses asyncpg so queries never block the event loop.
+# Derive its URL from the same DATABASE_URL, only swapping the driver.
+async_database_url = None
+if database_url_str.startswith("postgresql://"):
+    async_database_url = database_url_str.replace("postgresql://", "postgresql+asyncpg://", 1)
+elif database_url_str.startswith("postgres://"):
+    async_database_url = database_url_str.replace("postgres://", "postgresql+asyncpg://", 1)
+else:
+    async_database_url = database_url_str
+    logger.warning("Async engine will use DATABASE_URL as-is (no asyncpg driver prefix applied).")
+
 
 # Setup database engine using the correctly processed URL string
+# NOTE: The sync engine is kept for scripts (backfills, create_all, etc.).
+# FastAPI routes should depend on the async `get_db` below.
 try:
     if sync_database_url is None:
          raise ValueError("sync_database_url was not correctly determined from DATABASE_URL")
 
     engine = create_engine(sync_database_url, pool_pre_ping=True, echo=False)
+    instrument_engine(engine)
 
     SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
     logger.info("Database session factory configured.")
@@ -47,18 +64,32 @@ except Exception as e:
     logger.error(f"Failed to create database engine or session factory: {e}")
     raise
 
+# Setup async engine + session factory for the API
+try:
+    async_engine = create_async_engine(async_database_url, pool_pre_ping=True, echo=False)
+    instrument_engine(async_engine.sync_engine) # Events are registered on the underlying sync Engine
+
+    # expire_on_commit=False so returned ORM objects can still be serialized
+    # after commit without triggering a (forbidden) implicit async refresh.
+    AsyncSessionLocal = async_sessionmaker(
+        bind=async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False
+    )
+    logger.info("Async database session factory configured (asyncpg).")
+
+except Exception as e:
+    logger.error(f"Failed to create async database engine or session factory: {e}")
+    raise
+
 
 # Base class for declarative models (SQLAlchemy ORM)
 Base = declarative_base()
 
-# Dependency for FastAPI endpoints to get a DB session
-def get_db():
-    db: Session = SessionLocal() # Create a new session
-    try:
-        yield db # Provide the session to the route
-    except Exception as e:
-        logger.error(f"Database session error during request: {e}")
-        db.rollback() # Rollback any changes if an error occurred
-        raise # Re-raise the exception to be handled by FastAPI error handlers
-    finally:
-        db.close() # Always close the session when the request is done
\ No newline at end of file
+# Dependency for FastAPI endpoints to get an (async) DB session
+async def get_db() -> AsyncIterator[AsyncSession]:
+    async with AsyncSessionLocal() as db: # Session is closed when the block exits
+        try:
+            yield db # Provide the session to the route
+        except Exception as e:
+            logger.error(f"Database session error during request: {e}")
+            await db.rollback() # Rollback any changes if an error occurred
+            raise # Re-raise the exception to be handled by FastAPI error handlers
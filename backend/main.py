@@ -2,24 +2,34 @@
 import os
 from fastapi import FastAPI, Request, status, Depends # Ensure Depends is imported
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse, RedirectResponse
+from fastapi.responses import JSONResponse, RedirectResponse, Response
 from fastapi.exceptions import RequestValidationError
 from jose import JWTError, jwt
 from sqlalchemy import text # Import text for raw SQL query in lifespan
 from contextlib import asynccontextmanager
+import ipaddress
 import logging
 
 # --- Core Components ---
 from core.config import settings # Load settings first
-from core.dependencies import get_current_active_user # Import the primary dependency
+from core.dependencies import get_current_active_user, token_cache # Import the primary dependency
+from core.instrumentation import MetricsMiddleware
+from core.metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE, registry as metrics_registry
 
 # --- Database ---
 # Ensure engine is created in session.py; Base is needed if using create_all
-from db.session import engine, SessionLocal, Base
+from db.session import engine, async_engine, Base
+
+# --- Background Jobs ---
+from services.job_queue import job_queue
+from services.response_cache_service import response_cache
+from services.data_version_service import data_versions
+from services.exercise_suggest_service import suggest_index
+from services.spotify_token_service import token_cache as spotify_token_cache
 
 # --- Routers ---
 # Import all defined router modules
-from routers import auth, workouts, moods, spotify, insights
+from routers import auth, workouts, moods, spotify, insights, timeline, export, sync
 
 # Configure logging (Ensure this runs before app creation if complex setup)
 logging.basicConfig(level=logging.INFO)
@@ -48,14 +58,24 @@ async def lifespan(app: FastAPI):
 
     # Test DB connection
     try:
-        with SessionLocal() as db:
-            db.execute(text("SELECT 1")) # Simple query to test connection
+        async with async_engine.connect() as conn:
+            await conn.execute(text("SELECT 1")) # Simple query to test connection
         logger.info("Database connection successful on startup.")
     except Exception as e:
         logger.error(f"Database connection failed on startup: {e}")
+
+    # Start background workers (sentiment analysis etc.)
+    if settings.JOB_WORKERS_ENABLED:
+        try:
+            await job_queue.start()
+        except Exception as e:
+            logger.error(f"Failed to start background job queue: {e}")
     yield
     # Code to run on shutdown
     logger.info(f"Shutting down {settings.APP_NAME}...")
+    await job_queue.stop()
+    await response_cache.close()
+    await async_engine.dispose() # Close pooled asyncpg connections
 
 
 # --- FastAPI App Initialization ---
@@ -83,9 +103,26 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "Content-Disposition", "ETag", "Last-Modified"], # Keyset pagination cursor for list endpoints
 )
 logger.info(f"CORS configured for origins: {origins}")
 
+# --- Metrics Middleware ---
+# Added last so it is the outermost layer and times everything, CORS included.
+# DB diagnostics (N+1 detection) also rely on its per-request state.
+if settings.METRICS_ENABLED or settings.DB_DIAGNOSTICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+if settings.METRICS_ENABLED:
+    for name, stats in {
+        "job_queue": job_queue.stats,
+        "response_cache": response_cache.stats,
+        "data_versions": data_versions.stats,
+        "auth_token_cache": token_cache.stats,
+        "spotify_token_cache": spotify_token_cache.stats,
+        "exercise_suggest": suggest_index.stats,
+    }.items():
+        metrics_registry.add_stats_source(name, stats)
+
 # --- Exception Handlers ---
 @app.exception_handler(RequestValidationError)
 async def validation_exception_handler(request: Request, exc: RequestValidationError):
@@ -120,6 +157,26 @@ async def read_root():
     """Redirects to the API documentation."""
     return RedirectResponse(url='/api/v1/docs')
 
+# --- Metrics Endpoint ---
+# No user auth (scrapers don't have a JWT); optionally restricted to METRICS_ALLOWED_IPS
+_metrics_networks = [
+    ipaddress.ip_network(entry.strip(), strict=False)
+    for entry in (settings.METRICS_ALLOWED_IPS or "").split(",") if entry.strip()
+]
+
+if settings.METRICS_ENABLED:
+    @app.get(settings.METRICS_PATH, include_in_schema=False)
+    async def read_metrics(request: Request):
+        """Prometheus text exposition of this process's metrics."""
+        if _metrics_networks:
+            try:
+                client_ip = ipaddress.ip_address(request.client.host if request.client else "")
+            except ValueError:
+                client_ip = None
+            if client_ip is None or not any(client_ip in network for network in _metrics_networks):
+                return JSONResponse(status_code=status.HTTP_403_FORBIDDEN, content={"detail": "Forbidden"})
+        return Response(content=metrics_registry.render(), media_type=METRICS_CONTENT_TYPE)
+
 # --- Include Routers ---
 api_prefix = "/api/v1"
 
@@ -131,6 +188,9 @@ app.include_router(workouts.router, prefix=f"{api_prefix}/workouts", tags=["Work
 app.include_router(moods.router, prefix=f"{api_prefix}/moods", tags=["Mood & Journal"], dependencies=[Depends(get_current_active_user)])
 app.include_router(spotify.router, prefix=f"{api_prefix}/spotify", tags=["Spotify"]) # Add dependency if needed for specific spotify routes
 app.include_router(insights.router, prefix=f"{api_prefix}/insights", tags=["Insights"], dependencies=[Depends(get_current_active_user)])
+app.include_router(timeline.router, prefix=f"{api_prefix}/timeline", tags=["Timeline"], dependencies=[Depends(get_current_active_user)])
+app.include_router(export.router, prefix=f"{api_prefix}/export", tags=["Export"], dependencies=[Depends(get_current_active_user)])
+app.include_router(sync.router, prefix=f"{api_prefix}/sync", tags=["Sync"], dependencies=[Depends(get_current_active_user)])
 
 
 # --- Development Server Startup (for debugging) ---
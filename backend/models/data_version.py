@@ -0,0 +1,18 @@
+# backend/models/data_version.py
+from sqlalchemy import Column, DateTime
+from sqlalchemy.dialects.postgresql import UUID
+from db.session import Base
+
+class UserDataVersion(Base):
+    """
+    Per-user "last modified" watermark, bumped in the same transaction as every write
+    to the user's workouts, moods or Spotify plays (services/data_version_service.py).
+    Backs ETag / Last-Modified on the read endpoints.
+    """
+    __tablename__ = "user_data_versions"
+
+    user_id = Column(UUID(as_uuid=True), primary_key=True)
+    updated_at = Column(DateTime(timezone=True), nullable=False) # Strictly increasing per user
+
+    def __repr__(self):
+        return f"<UserDataVersion(user={self.user_id}, updated_at='{self.updated_at}')>"
@@ -0,0 +1,50 @@
+# backend/models/insight.py
+from sqlalchemy import Column, Date, DateTime, Float, Integer, func
+from sqlalchemy.dialects.postgresql import UUID, JSONB
+from db.session import Base
+
+class DailyAggregate(Base):
+    """
+    Per-user, per-day (UTC) rollup of workouts and mood entries.
+    Maintained incrementally by the create endpoints (see services/insight_service.py)
+    so the dashboard reads O(days) rows instead of rescanning raw history.
+    """
+    __tablename__ = "user_daily_aggregates"
+
+    user_id = Column(UUID(as_uuid=True), primary_key=True)
+    day = Column(Date, primary_key=True) # (user_id, day) PK doubles as the range-scan index
+
+    # Training
+    workout_count = Column(Integer, nullable=False, default=0, server_default="0")
+    total_sets = Column(Integer, nullable=False, default=0, server_default="0")
+    total_volume = Column(Float, nullable=False, default=0.0, server_default="0") # sum(reps * weight)
+
+    # Mood (average is derived as mood_sum / mood_count)
+    mood_count = Column(Integer, nullable=False, default=0, server_default="0")
+    mood_sum = Column(Integer, nullable=False, default=0, server_default="0")
+    mood_min = Column(Integer, nullable=True)
+    mood_max = Column(Integer, nullable=True)
+
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+    @property
+    def mood_avg(self):
+        return (self.mood_sum / self.mood_count) if self.mood_count else None
+
+    def __repr__(self):
+        return f"<DailyAggregate(user_id={self.user_id}, day={self.day})>"
+
+
+class CorrelationReport(Base):
+    """
+    Latest mood-vs-training correlation report per user (see services/analytics_service.py).
+    Recomputed nightly by scripts/recompute_correlations.py or on demand by the API.
+    """
+    __tablename__ = "user_correlation_reports"
+
+    user_id = Column(UUID(as_uuid=True), primary_key=True)
+    report = Column(JSONB, nullable=False)
+    computed_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+    def __repr__(self):
+        return f"<CorrelationReport(user_id={self.user_id}, computed_at={self.computed_at})>"
@@ -0,0 +1,33 @@
+# backend/models/job.py
+import uuid
+from sqlalchemy import Column, DateTime, Index, Integer, String, Text, func
+from sqlalchemy.dialects.postgresql import UUID, JSONB
+from db.session import Base
+
+class BackgroundJob(Base):
+    """
+    Persisted unit of background work (see services/job_queue.py).
+    Rows outlive the process, so queued work survives restarts; workers claim
+    them with SELECT ... FOR UPDATE SKIP LOCKED.
+    """
+    __tablename__ = "background_jobs"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    kind = Column(String, nullable=False)          # Handler name, e.g. "sentiment_analysis"
+    payload = Column(JSONB, nullable=False, default=dict)
+    status = Column(String, nullable=False, default="pending", server_default="pending") # pending | running | done | failed
+    attempts = Column(Integer, nullable=False, default=0, server_default="0")
+    max_attempts = Column(Integer, nullable=False, default=5, server_default="5")
+    run_after = Column(DateTime(timezone=True), server_default=func.now(), nullable=False) # Backoff: not claimable before this
+    locked_at = Column(DateTime(timezone=True), nullable=True) # Set while running; stale locks are reclaimed
+    last_error = Column(Text, nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+    # Claim query: WHERE status = 'pending' AND run_after <= now() ORDER BY run_after
+    __table_args__ = (
+        Index("ix_background_jobs_status_run_after", status, run_after),
+    )
+
+    def __repr__(self):
+        return f"<BackgroundJob(id={self.id}, kind={self.kind}, status={self.status})>"
@@ -1,7 +1,7 @@
 # backend/models/mood.py
 import uuid
 from datetime import datetime
-from sqlalchemy import Column, DateTime, ForeignKey, Integer, String, Text
+from sqlalchemy import Column, DateTime, ForeignKey, Index, Integer, String, Text, func
 from sqlalchemy.dialects.postgresql import UUID
 # from sqlalchemy.orm import relationship
 from db.session import Base
@@ -16,7 +16,19 @@ class MoodEntry(Base):
     sentiment_label = Column(String, nullable=True)
     sentiment_intensity = Column(Integer, nullable=True)
     sentiment_summary = Column(Text, nullable=True)
-    created_at = Column(DateTime(timezone=True), server_default='now()', nullable=False)
+    # Background analysis state: pending -> done | failed; None when there is no journal text
+    sentiment_status = Column(String, nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    # Delta sync (services/sync_service.py): every write moves updated_at; deletes are soft (tombstones)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
+    deleted_at = Column(DateTime(timezone=True), nullable=True)
+
+    __table_args__ = (
+        # Composite index backing keyset pagination (ORDER BY created_at DESC, id)
+        Index("ix_mood_entries_user_id_created_at_id", user_id, created_at.desc(), id),
+        # Delta sync range scan: WHERE user_id = ? AND (updated_at, id) > (?, ?)
+        Index("ix_mood_entries_user_id_updated_at_id", user_id, updated_at, id),
+    )
 
     def __repr__(self):
         # --- SAFER REPR ---
@@ -24,4 +36,23 @@ class MoodEntry(Base):
         # Avoid accessing potentially unloaded fields like created_at here
         # to prevent DetachedInstanceError during complex error handling.
         return f"<MoodEntry(id={self.id}, score={self.mood_score})>"
-        # --- END SAFER REPR ---
\ No newline at end of file
+        # --- END SAFER REPR ---
+
+class SentimentCache(Base):
+    """
+    Content-addressed sentiment results: identical (normalized) journal text analyzed
+    with the same model + prompt version is never sent to OpenAI twice.
+    Key = sha256(model, prompt version, normalized text); see services/openai_service.py.
+    """
+    __tablename__ = "sentiment_cache"
+
+    cache_key = Column(String(64), primary_key=True)
+    sentiment_label = Column(String, nullable=False)
+    sentiment_intensity = Column(Integer, nullable=False)
+    sentiment_summary = Column(Text, nullable=True)
+    model = Column(String, nullable=False)
+    prompt_version = Column(String, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+    def __repr__(self):
+        return f"<SentimentCache(key={self.cache_key[:12]}..., label={self.sentiment_label})>"
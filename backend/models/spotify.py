@@ -1,48 +1,82 @@
-# # backend/models/spotify.py
-# import uuid
-# from datetime import datetime
-# from sqlalchemy import Column, DateTime, ForeignKey, Integer, String, Text, Float, Boolean # Added Float/Boolean
-# from sqlalchemy.dialects.postgresql import UUID
+# backend/models/spotify.py
+import uuid
+from datetime import datetime
+from sqlalchemy import Boolean, Column, DateTime, Index, Integer, String, Text, UniqueConstraint, func
+from sqlalchemy.dialects.postgresql import UUID
 # from sqlalchemy.orm import relationship
-# from db.session import Base
-
-# class SpotifyTrack(Base):
-#     __tablename__ = "spotify_tracks" # Choose your table name
-
-#     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4) # Internal DB ID
-
-#     # Link to the user
-#     user_id = Column(UUID(as_uuid=True), nullable=False, index=True) # Linked via RLS/API logic
-
-#     # Spotify specific identifiers and data
-#     spotify_track_id = Column(String, nullable=False, index=True) # Spotify's own track ID
-#     played_at = Column(DateTime(timezone=True), nullable=False, index=True) # Timestamp from Spotify history
-
-#     # Track metadata (denormalized for easier querying/display)
-#     track_name = Column(Text, nullable=True)
-#     artist_name = Column(Text, nullable=True) # Could be primary artist, or comma-separated
-#     album_name = Column(Text, nullable=True)
-#     track_uri = Column(String, nullable=True) # e.g., "spotify:track:..."
-#     duration_ms = Column(Integer, nullable=True)
-#     explicit = Column(Boolean, nullable=True)
-#     popularity = Column(Integer, nullable=True) # 0-100 scale from Spotify
-
-#     # Optional: Store fetched audio features (consider performance/necessity)
-#     # energy = Column(Float, nullable=True)
-#     # valence = Column(Float, nullable=True)
-#     # tempo = Column(Float, nullable=True)
-#     # danceability = Column(Float, nullable=True)
-#     # acousticness = Column(Float, nullable=True)
-#     # instrumentalness = Column(Float, nullable=True)
-#     # liveness = Column(Float, nullable=True)
-#     # speechiness = Column(Float, nullable=True)
-#     # mode = Column(Integer, nullable=True) # Major (1) or minor (0)
-#     # time_signature = Column(Integer, nullable=True)
-
-#     created_at = Column(DateTime(timezone=True), server_default='now()', nullable=False) # Record creation time in *our* DB
-
-#     # --- Relationship (Optional) ---
-#     # user = relationship("User", back_populates="spotify_tracks")
-
-#     def __repr__(self):
-#         return f"<SpotifyTrack(id={self.id}, user={self.user_id}, track='{self.track_name}', time='{self.played_at}')>"
\ No newline at end of file
+from db.session import Base
+
+class SpotifyTrack(Base):
+    """ One play from the user's Spotify 'recently played' history (see services/spotify_service.py). """
+    __tablename__ = "spotify_tracks"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4) # Internal DB ID
+
+    # Link to the user
+    user_id = Column(UUID(as_uuid=True), nullable=False, index=True) # Linked via RLS/API logic
+
+    # Spotify specific identifiers and data
+    spotify_track_id = Column(String, nullable=False, index=True) # Spotify's own track ID
+    played_at = Column(DateTime(timezone=True), nullable=False) # Timestamp from Spotify history
+
+    # Track metadata (denormalized for easier querying/display)
+    track_name = Column(Text, nullable=True)
+    artist_name = Column(Text, nullable=True) # Comma-separated artist names
+    album_name = Column(Text, nullable=True)
+    track_uri = Column(String, nullable=True) # e.g., "spotify:track:..."
+    duration_ms = Column(Integer, nullable=True)
+    explicit = Column(Boolean, nullable=True)
+    popularity = Column(Integer, nullable=True) # 0-100 scale from Spotify
+
+    # Optional: Store fetched audio features (consider performance/necessity)
+    # energy = Column(Float, nullable=True)
+    # valence = Column(Float, nullable=True)
+    # tempo = Column(Float, nullable=True)
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False) # Record creation time in *our* DB
+
+    __table_args__ = (
+        # A user can't play two things at the same instant: makes re-ingestion idempotent
+        # (INSERT ... ON CONFLICT (user_id, played_at) DO NOTHING)
+        UniqueConstraint("user_id", "played_at", name="uq_spotify_tracks_user_id_played_at"),
+        # Keyset pagination / timeline merge: ORDER BY played_at DESC, id
+        Index("ix_spotify_tracks_user_id_played_at_id", user_id, played_at.desc(), id),
+    )
+
+    # --- Relationship (Optional) ---
+    # user = relationship("User", back_populates="spotify_tracks")
+
+    def __repr__(self):
+        return f"<SpotifyTrack(id={self.id}, user={self.user_id}, track='{self.track_name}', time='{self.played_at}')>"
+
+
+class SpotifySyncState(Base):
+    """ Per-user ingestion high-water mark for the recently-played `after` cursor. """
+    __tablename__ = "spotify_sync_state"
+
+    user_id = Column(UUID(as_uuid=True), primary_key=True)
+    last_played_at = Column(DateTime(timezone=True), nullable=True) # Newest play ingested so far
+    last_synced_at = Column(DateTime(timezone=True), nullable=True) # Last successful sync run
+
+    def __repr__(self):
+        return f"<SpotifySyncState(user={self.user_id}, last_played_at='{self.last_played_at}')>"
+
+
+class SpotifyAccount(Base):
+    """
+    Linked Spotify account + OAuth tokens for a user.
+    Tokens are stored ENCRYPTED (core/security.encrypt_secret) - never read these
+    columns directly; use services/spotify_token_service.py.
+    """
+    __tablename__ = "spotify_accounts"
+
+    user_id = Column(UUID(as_uuid=True), primary_key=True)
+    access_token_encrypted = Column(Text, nullable=False)
+    refresh_token_encrypted = Column(Text, nullable=True)
+    expires_at = Column(DateTime(timezone=True), nullable=False)
+    scope = Column(Text, nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+    def __repr__(self):
+        return f"<SpotifyAccount(user={self.user_id}, expires_at='{self.expires_at}')>"
@@ -1,9 +1,9 @@
 # backend/models/workout.py
 import uuid
 from datetime import datetime
-from sqlalchemy import Column, DateTime, ForeignKey
+from sqlalchemy import Column, DateTime, Float, ForeignKey, Index, Integer, String, func
 from sqlalchemy.dialects.postgresql import UUID, JSONB # Use JSONB for exercises
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import relationship, synonym
 from db.session import Base
 
 class Workout(Base):
@@ -14,15 +14,84 @@ class Workout(Base):
     # We link it via the RLS policies and by inserting the correct ID
     user_id = Column(UUID(as_uuid=True), nullable=False, index=True) # Link to auth.uid()
     timestamp = Column(DateTime(timezone=True), nullable=False, default=datetime.utcnow)
-    createdAt = Column(DateTime(timezone=True), server_default='now()', nullable=False) # Use server_default
+    createdAt = Column(DateTime(timezone=True), server_default=func.now(), nullable=False) # func.now(): the quoted 'now()' default was frozen at CREATE TABLE
+    created_at = synonym("createdAt") # snake_case alias so WorkoutRead(from_attributes) can read it
+    # Delta sync (services/sync_service.py): every write moves updated_at; deletes are soft (tombstones)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
+    deleted_at = Column(DateTime(timezone=True), nullable=True)
 
     # Store the list of exercises and their sets as JSONB
     exercises = Column(JSONB, nullable=True)
 
+    # Composite index backing keyset pagination of a user's history:
+    # WHERE user_id = ? ORDER BY timestamp DESC, id -> pure index range scan
+    __table_args__ = (
+        Index("ix_workouts_user_id_timestamp_id", user_id, timestamp.desc(), id),
+        # "Changed since X for user Y": WHERE user_id = ? AND (updated_at, id) > (?, ?) -> range scan
+        Index("ix_workouts_user_id_updated_at_id", user_id, updated_at, id),
+    )
+
     # --- Relationship (Optional but good practice if querying from User) ---
     # If you modify models/user.py, ensure the back_populates matches
     # user = relationship("User", back_populates="workouts")
 
     # Define __repr__ for easier debugging (optional)
     def __repr__(self):
-        return f"<Workout(id={self.id}, user_id={self.user_id}, timestamp='{self.timestamp}')>"
\ No newline at end of file
+        return f"<Workout(id={self.id}, user_id={self.user_id}, timestamp='{self.timestamp}')>"
+
+class WorkoutSet(Base):
+    """
+    One set of one exercise, normalized out of `Workout.exercises` so per-exercise
+    questions are indexed SQL instead of JSONB walks. Written in the same transaction
+    as the workout (services/workout_sets_service.py); the JSONB stays the source of truth
+    (rebuild with `python -m scripts.backfill_workout_sets`).
+    """
+    __tablename__ = "workout_sets"
+
+    workout_id = Column(UUID(as_uuid=True), ForeignKey("workouts.id", ondelete="CASCADE"), primary_key=True)
+    exercise_index = Column(Integer, primary_key=True) # Position in Workout.exercises (names may repeat)
+    set_index = Column(Integer, primary_key=True) # Position in that exercise's sets
+    user_id = Column(UUID(as_uuid=True), nullable=False)
+    exercise_name = Column(String, nullable=False)
+    reps = Column(Integer, nullable=False)
+    weight = Column(Float, nullable=False)
+    timestamp = Column(DateTime(timezone=True), nullable=False) # Denormalized from the workout
+
+    __table_args__ = (
+        # Per-exercise history: WHERE user_id = ? AND exercise_name = ? ORDER BY timestamp
+        Index("ix_workout_sets_user_id_exercise_name_timestamp", user_id, exercise_name, timestamp),
+    )
+
+    def __repr__(self):
+        return f"<WorkoutSet(workout={self.workout_id}, exercise='{self.exercise_name}', set={self.set_index}, reps={self.reps}, weight={self.weight})>"
+
+
+class PersonalRecord(Base):
+    """
+    Per-user, per-exercise bests, maintained incrementally by create_workout
+    (services/records_service.py). Each record keeps the workout that set it;
+    ties go to the earliest workout, so the table doesn't depend on insert order.
+    Rebuild/verify with `python -m scripts.rebuild_personal_records`.
+    """
+    __tablename__ = "personal_records"
+
+    user_id = Column(UUID(as_uuid=True), primary_key=True)
+    exercise_name = Column(String, primary_key=True)
+
+    max_weight = Column(Float, nullable=False) # Heaviest single set
+    max_weight_reps = Column(Integer, nullable=False)
+    max_weight_workout_id = Column(UUID(as_uuid=True), nullable=False)
+    max_weight_at = Column(DateTime(timezone=True), nullable=False)
+
+    best_e1rm = Column(Float, nullable=False) # Best estimated 1RM (Epley) of any set
+    best_e1rm_workout_id = Column(UUID(as_uuid=True), nullable=False)
+    best_e1rm_at = Column(DateTime(timezone=True), nullable=False)
+
+    best_volume = Column(Float, nullable=False) # Most reps*weight for this exercise in one workout
+    best_volume_workout_id = Column(UUID(as_uuid=True), nullable=False)
+    best_volume_at = Column(DateTime(timezone=True), nullable=False)
+
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+    def __repr__(self):
+        return f"<PersonalRecord(user={self.user_id}, exercise='{self.exercise_name}', max_weight={self.max_weight}, e1rm={self.best_e1rm})>"
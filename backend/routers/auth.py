@@ -15,6 +15,7 @@ from schemas.message import Message
 # Import Core components
 from core.config import settings
 from core.clients import get_supabase_client # Use Supabase client helper
+from core.instrumentation import external_call # Counts/times the Supabase SDK calls for /metrics
 # --- ADD THIS IMPORT ---
 from supabase import Client as SupabaseClient, AuthApiError # Import Client type and specific Exception
 # --- END ADD ---
@@ -51,15 +52,16 @@ async def signup(
     """
     logger.info(f"Attempting signup for email: {user_in.email}")
     try:
-        auth_response = await supabase.auth.sign_up({
-            "email": user_in.email,
-            "password": user_in.password,
-            "options": {
-                "data": {
-                    "full_name": user_in.full_name
+        with external_call("supabase"):
+            auth_response = await supabase.auth.sign_up({
+                "email": user_in.email,
+                "password": user_in.password,
+                "options": {
+                    "data": {
+                        "full_name": user_in.full_name
+                    }
                 }
-            }
-        })
+            })
 
         logger.debug(f"Supabase signup response: User={auth_response.user is not None}, Session={auth_response.session is not None}")
 
@@ -126,10 +128,11 @@ async def login(
     """
     logger.info(f"Login attempt for user: {form_data.username}")
     try:
-        auth_response = await supabase.auth.sign_in_with_password({
-            "email": form_data.username,
-            "password": form_data.password
-        })
+        with external_call("supabase"):
+            auth_response = await supabase.auth.sign_in_with_password({
+                "email": form_data.username,
+                "password": form_data.password
+            })
 
         if auth_response.user and auth_response.session:
             logger.info(f"Login successful for user {auth_response.user.id}")
@@ -185,7 +188,8 @@ async def logout(
     """
     logger.info("Logout attempt.")
     try:
-        await supabase.auth.sign_out()
+        with external_call("supabase"):
+            await supabase.auth.sign_out()
         logger.info("Supabase sign_out called successfully.")
     except Exception as e:
         logger.warning(f"Error calling Supabase sign_out (proceeding with cookie clear): {e}")
@@ -213,7 +217,8 @@ async def refresh_token(
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Refresh token not found")
 
     try:
-        auth_response = await supabase.auth.refresh_session(refresh_token_value)
+        with external_call("supabase"):
+            auth_response = await supabase.auth.refresh_session(refresh_token_value)
 
         if auth_response.session:
             logger.info("Token refresh successful.")
@@ -0,0 +1,52 @@
+# backend/routers/export.py
+from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi.responses import StreamingResponse
+from typing import List, Literal, Optional
+from datetime import datetime, timezone
+import uuid
+import logging
+
+from core.dependencies import get_current_active_user
+from services import export_service
+
+logger = logging.getLogger(__name__)
+router = APIRouter()
+
+MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+
+@router.get("/", summary="Export All My Data")
+async def export_data(
+    current_user_payload: dict = Depends(get_current_active_user),
+    format: Literal["ndjson", "csv"] = Query("ndjson"),
+    include: Optional[List[Literal["workout", "mood", "spotify"]]] = Query(None, description="Datasets to export (default: all). CSV exports exactly one."),
+    gzip: bool = Query(False, description="Compress the download on the fly (.gz)"),
+):
+    """
+    Streams the user's complete history as a file download.
+    - **ndjson**: one `{"type", "timestamp", "data"}` object per line (same shape as timeline items).
+    - **csv**: one dataset per file; workouts are one line per set, re-importable via POST /workouts/import.
+
+    Rows are read with a server-side cursor, so memory use is independent of history size.
+    """
+    user_id_str = current_user_payload.get("sub")
+    if not user_id_str: raise HTTPException(status.HTTP_401_UNAUTHORIZED, "Could not validate credentials")
+    try: user_id = uuid.UUID(user_id_str)
+    except ValueError: raise HTTPException(status.HTTP_401_UNAUTHORIZED, "Invalid user identifier")
+
+    datasets = list(dict.fromkeys(include)) if include else list(export_service.EXPORT_DATASETS)
+    if format == "csv" and len(datasets) != 1:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="CSV exports one dataset at a time: pass exactly one `include` (workout, mood or spotify).",
+        )
+
+    stamp = datetime.now(timezone.utc).strftime("%Y%m%d")
+    label = datasets[0] if len(datasets) == 1 else "all"
+    filename = f"fmmt-export-{label}-{stamp}.{format}" + (".gz" if gzip else "")
+
+    return StreamingResponse(
+        export_service.stream_export(user_id, format, datasets, gzip=gzip),
+        media_type="application/gzip" if gzip else MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
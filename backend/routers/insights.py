@@ -1,43 +1,92 @@
 # backend/routers/insights.py
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-# --- ADD THESE IMPORTS ---
-from typing import Dict, Any, Optional # Import Optional
-from pydantic import BaseModel # Import BaseModel
-# --- END ADD IMPORTS ---
-
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+from datetime import datetime, timezone
+import uuid
+import logging
 
 from db.session import get_db
 from core.dependencies import get_current_active_user
-#from services.insight_service import *
+from models.insight import CorrelationReport
+from schemas.insight import InsightDashboard, CorrelationReportRead
+from services import analytics_service, data_version_service, insight_service
+from services.response_cache_service import response_cache
 
+logger = logging.getLogger(__name__)
 router = APIRouter()
 
-# Placeholder response model
-# Needs BaseModel imported to work
-class InsightDataPlaceholder(BaseModel):
-    message: str
-    data: Optional[Dict[str, Any]] = None # Dictionary for flexible data structure
-
 
-@router.get("/", summary="Get Dashboard Insights", response_model=InsightDataPlaceholder)
+@router.get("/", summary="Get Dashboard Insights", response_model=InsightDashboard)
 async def get_dashboard_insights(
-    db: Session = Depends(get_db),
+    request: Request,
+    db: AsyncSession = Depends(get_db),
+    current_user_payload: dict = Depends(get_current_active_user),
+    days: int = Query(30, ge=1, le=366, description="Size of the look-back window in days (UTC)"),
+):
+    """
+    Summarizes training volume and mood for the last `days` days.
+    Reads the per-user daily aggregates maintained on every workout/mood write,
+    so the cost is O(days) regardless of how much raw history the user has.
+    Supports conditional GET; the ETag also changes at UTC midnight (the window moves).
+    Rendered dashboards are kept in the per-user response cache until the user writes.
+    """
+    user_id_str = current_user_payload.get("sub")
+    if not user_id_str: raise HTTPException(status.HTTP_401_UNAUTHORIZED, "Could not validate credentials")
+    try: user_id = uuid.UUID(user_id_str)
+    except ValueError: raise HTTPException(status.HTTP_401_UNAUTHORIZED, "Invalid user identifier")
+
+    today = datetime.now(timezone.utc).date().isoformat()
+    validators = await data_version_service.validators_for(request, db, user_id, extra=today)
+    if validators and validators.matches(request):
+        return validators.not_modified_response() # Nothing changed since the client's copy: skip the query
+
+    async def render() -> Response:
+        dashboard = await insight_service.generate_insights(db, user_id, days=days)
+        return Response(content=dashboard.model_dump_json(), media_type="application/json")
+
+    try:
+        variant = response_cache.variant(request, validators.etag if validators else today)
+        rendered = await response_cache.cached(user_id, variant, render)
+        if validators:
+            validators.apply(rendered)
+        return rendered
+    except Exception as db_error:
+        logger.error(f"Error generating insights for user {user_id}: {db_error}", exc_info=True)
+        raise HTTPException(status_code=500, detail="Could not generate insights.")
+
+
+@router.get("/correlations", summary="Get Mood vs Training Correlations", response_model=CorrelationReportRead)
+async def get_correlation_report(
+    db: AsyncSession = Depends(get_db),
     current_user_payload: dict = Depends(get_current_active_user),
-    # Add query params for date range etc. if needed
+    refresh: bool = Query(False, description="Recompute now instead of returning the last nightly report"),
 ):
     """
-    (Placeholder) Gathers and correlates data to generate insights for the dashboard.
-    Requires insight_service implementation.
+    Returns correlations (same-day, lagged and rolling 7/28-day) between daily
+    training volume and mood score / sentiment intensity.
+    Served from the nightly report when available; computed on demand otherwise.
     """
-    user_id = current_user_payload.get("sub")
+    user_id_str = current_user_payload.get("sub")
+    if not user_id_str: raise HTTPException(status.HTTP_401_UNAUTHORIZED, "Could not validate credentials")
+    try: user_id = uuid.UUID(user_id_str)
+    except ValueError: raise HTTPException(status.HTTP_401_UNAUTHORIZED, "Invalid user identifier")
+
+    stored = None if refresh else await db.get(CorrelationReport, user_id)
+    if stored is not None:
+        return stored
 
-    print(f"Placeholder: Generate insights for user {user_id}")
-    # TODO: Implement logic in insight_service
-    # insights_data = await insight_service.generate_insights(db=db, user_id=user_id)
-    # return insights_data
+    try:
+        series = await analytics_service.load_daily_series(db, user_id)
+        if series is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="No workout or mood data to analyze yet.")
+        report = analytics_service.compute_correlation_report(series)
+        await db.execute(analytics_service.upsert_report_stmt(user_id, report))
+        await db.commit()
+    except HTTPException:
+        raise
+    except Exception as db_error:
+        await db.rollback()
+        logger.error(f"Error computing correlations for user {user_id}: {db_error}", exc_info=True)
+        raise HTTPException(status_code=500, detail="Could not compute correlations.")
 
-    return InsightDataPlaceholder(
-        message="Insights generation not yet implemented.",
-        data={"example_metric": 123, "trend": "positive"} # Example data structure
-    )
\ No newline at end of file
+    return CorrelationReportRead(computed_at=datetime.now(timezone.utc), report=report)
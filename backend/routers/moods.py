@@ -1,18 +1,22 @@
 # backend/routers/moods.py
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request, Response
+from sqlalchemy import func, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
 import uuid
 from datetime import datetime
-from pydantic import BaseModel # Keep for safety, though not used by placeholders now
+from pydantic import BaseModel, ValidationError # BaseModel kept for safety, though not used by placeholders now
 
 from db.session import get_db
+from core.config import settings
 from core.dependencies import get_current_active_user
+from core.pagination import NEXT_CURSOR_HEADER, keyset_after, next_cursor_for
+from core.serialization import FastJSONResponse, rows_as_dicts
 from schemas import mood as mood_schemas # Use the actual schemas
 from models import mood as mood_models # Use the actual model
-# from services import openai_service # Temporarily commented out if service not ready
-# from core.clients import get_openai_client
-# from openai import AsyncOpenAI
+from services import data_version_service, insight_service, sentiment_service
+from services.job_queue import job_queue
+from services.response_cache_service import response_cache
 import logging
 
 logger = logging.getLogger(__name__)
@@ -21,6 +25,19 @@ logger = logging.getLogger(__name__)
 router = APIRouter()
 # --- *** END FIX *** ---
 
+# Columns of MoodRead, selected as plain tuples for the history fast path
+MOOD_READ_COLUMNS = (
+    mood_models.MoodEntry.mood_score,
+    mood_models.MoodEntry.journal_text,
+    mood_models.MoodEntry.id,
+    mood_models.MoodEntry.user_id,
+    mood_models.MoodEntry.created_at,
+    mood_models.MoodEntry.sentiment_label,
+    mood_models.MoodEntry.sentiment_intensity,
+    mood_models.MoodEntry.sentiment_summary,
+    mood_models.MoodEntry.sentiment_status,
+)
+
 
 # --- POST Endpoint to Create Mood Entry ---
 @router.post(
@@ -31,9 +48,8 @@ router = APIRouter()
 )
 async def create_mood_entry(
     mood_in: mood_schemas.MoodCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user_payload: dict = Depends(get_current_active_user),
-    # openai_client: AsyncOpenAI = Depends(get_openai_client) # Keep commented if not using yet
 ):
     # ... (rest of the create_mood_entry function remains the same) ...
     user_id_str = current_user_payload.get("sub")
@@ -41,38 +57,148 @@ async def create_mood_entry(
     try: user_id = uuid.UUID(user_id_str)
     except ValueError: raise HTTPException(401, "Invalid user identifier")
 
-    sentiment_label = None; sentiment_intensity = None; sentiment_summary = None
-    # if mood_in.journal_text and mood_in.journal_text.strip(): # Keep commented
-    #    ... (openai analysis logic) ...
-
+    # Sentiment analysis runs in the background job queue (OpenAI can take up to ~25s);
+    # the entry is returned immediately with sentiment_status='pending'.
     try:
         db_mood = mood_models.MoodEntry(
+            id=uuid.uuid4(), # Assigned up front so the job payload can reference it
             user_id=user_id, mood_score=mood_in.mood_score,
             journal_text=mood_in.journal_text,
-            sentiment_label=sentiment_label, sentiment_intensity=sentiment_intensity,
-            sentiment_summary=sentiment_summary,
         )
     except Exception as model_error:
         logger.error(f"Error creating MoodEntry model instance: {model_error}", exc_info=True)
         raise HTTPException(status_code=500, detail="Internal error preparing mood data.")
 
+    needs_analysis = sentiment_service.needs_analysis(mood_in.journal_text)
     try:
-        db.add(db_mood); db.commit(); db.refresh(db_mood)
+        db.add(db_mood)
+        if needs_analysis:
+            sentiment_service.enqueue_sentiment_analysis(db, db_mood) # Job row commits with the entry
+        await insight_service.record_mood(db, user_id, db_mood.mood_score) # Same transaction as the entry
+        await data_version_service.bump(db, user_id)
+        await db.commit(); await db.refresh(db_mood)
+        await response_cache.invalidate(user_id)
         logger.info(f"Mood entry saved successfully for user {user_id}, ID: {db_mood.id}")
+        if needs_analysis:
+            job_queue.notify()
         return db_mood
     except Exception as db_error:
-        db.rollback()
+        await db.rollback()
         logger.error(f"Database error saving mood entry: {db_error}", exc_info=True)
         raise HTTPException(500, detail="Could not save mood entry.")
 
 
+# --- POST Endpoint for Offline-Queued Entries ---
+@router.post("/batch", summary="Log Several Mood Entries", response_model=mood_schemas.MoodBatchResult)
+async def create_mood_entries_batch(
+    batch_in: mood_schemas.MoodBatchCreate,
+    db: AsyncSession = Depends(get_db),
+    current_user_payload: dict = Depends(get_current_active_user),
+):
+    """
+    Creates up to BATCH_MAX_ITEMS entries in one transaction (one multi-row INSERT ... RETURNING).
+    Items are validated like `POST /moods/` and reported per index; invalid ones are skipped.
+    Sentiment analysis for the whole batch is queued as ONE background job.
+    """
+    user_id_str = current_user_payload.get("sub")
+    if not user_id_str: raise HTTPException(401, "Could not validate credentials")
+    try: user_id = uuid.UUID(user_id_str)
+    except ValueError: raise HTTPException(401, "Invalid user identifier")
+
+    if len(batch_in.items) > settings.BATCH_MAX_ITEMS:
+        raise HTTPException(status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail=f"At most {settings.BATCH_MAX_ITEMS} items per batch.")
+
+    results = {}
+    rows = []
+    for index, item in enumerate(batch_in.items):
+        try:
+            mood_in = mood_schemas.MoodCreate.model_validate(item)
+        except ValidationError as e:
+            results[index] = mood_schemas.MoodBatchItemResult(
+                index=index, status="invalid", errors=e.errors(include_url=False, include_context=False),
+            )
+            continue
+        needs_analysis = sentiment_service.needs_analysis(mood_in.journal_text)
+        rows.append((index, {
+            "id": uuid.uuid4(), "user_id": user_id, "mood_score": mood_in.mood_score,
+            "journal_text": mood_in.journal_text, "sentiment_status": "pending" if needs_analysis else None,
+        }))
+
+    if rows:
+        values = [row for _, row in rows]
+        to_analyze = [row["id"] for row in values if row["sentiment_status"] == "pending"]
+        try:
+            created = await db.execute(insert(mood_models.MoodEntry).values(values).returning(*MOOD_READ_COLUMNS))
+            by_id = {row.id: row for row in created}
+            if to_analyze:
+                sentiment_service.enqueue_sentiment_batch(db, to_analyze) # Job row commits with the entries
+            await insight_service.record_moods_bulk(db, user_id, [row["mood_score"] for row in values])
+            await data_version_service.bump(db, user_id)
+            await db.commit()
+        except Exception as db_error:
+            await db.rollback()
+            logger.error(f"Database error saving mood batch: {db_error}", exc_info=True)
+            raise HTTPException(500, detail="Could not save mood entries.")
+        await response_cache.invalidate(user_id)
+        if to_analyze:
+            job_queue.notify()
+        for index, row in rows:
+            results[index] = mood_schemas.MoodBatchItemResult(
+                index=index, status="created", entry=mood_schemas.MoodRead(**by_id[row["id"]]._asdict()),
+            )
+        logger.info(f"Mood batch saved for user {user_id}: {len(rows)} created, {len(batch_in.items) - len(rows)} invalid")
+
+    return mood_schemas.MoodBatchResult(
+        created=len(rows),
+        invalid=len(batch_in.items) - len(rows),
+        results=[results[index] for index in range(len(batch_in.items))],
+    )
+
+
+# --- DELETE Endpoint for a Mood Entry ---
+@router.delete("/{entry_id}", status_code=status.HTTP_204_NO_CONTENT, summary="Delete Mood Entry")
+async def delete_mood_entry(
+    entry_id: uuid.UUID,
+    db: AsyncSession = Depends(get_db),
+    current_user_payload: dict = Depends(get_current_active_user),
+):
+    """ Soft-deletes an entry (a tombstone for delta sync) and recomputes that day's aggregate. """
+    user_id_str = current_user_payload.get("sub")
+    if not user_id_str: raise HTTPException(401, "Could not validate credentials")
+    try: user_id = uuid.UUID(user_id_str)
+    except ValueError: raise HTTPException(401, "Invalid user identifier")
+
+    MoodEntry = mood_models.MoodEntry
+    db_mood = await db.scalar(
+        select(MoodEntry)
+        .where(MoodEntry.id == entry_id, MoodEntry.user_id == user_id, MoodEntry.deleted_at.is_(None))
+        .with_for_update()
+    )
+    if db_mood is None:
+        raise HTTPException(status.HTTP_404_NOT_FOUND, detail="Mood entry not found.")
+    try:
+        db_mood.deleted_at = func.now() # updated_at moves too (onupdate)
+        await db.flush()
+        await insight_service.rebuild_day(db, user_id, insight_service.utc_day(db_mood.created_at))
+        await data_version_service.bump(db, user_id)
+        await db.commit()
+    except Exception as db_error:
+        await db.rollback()
+        logger.error(f"Database error deleting mood entry {entry_id}: {db_error}", exc_info=True)
+        raise HTTPException(500, detail="Could not delete mood entry.")
+    await response_cache.invalidate(user_id)
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
+
+
 # --- GET Endpoint for Mood History ---
-@router.get("/", summary="Get Mood History", response_model=List[mood_schemas.MoodRead])
+@router.get("/", summary="Get Mood History", response_model=List[mood_schemas.MoodRead], response_class=FastJSONResponse)
 async def read_mood_history(
-    db: Session = Depends(get_db),
+    request: Request,
+    db: AsyncSession = Depends(get_db),
     current_user_payload: dict = Depends(get_current_active_user),
     skip: int = 0,
-    limit: int = 100
+    limit: int = 100,
+    cursor: Optional[str] = Query(None, description=f"Opaque keyset cursor from the {NEXT_CURSOR_HEADER} header of the previous page (takes precedence over skip)"),
 ):
     # ... (rest of the read_mood_history function remains the same) ...
      user_id_str = current_user_payload.get("sub")
@@ -80,12 +206,36 @@ async def read_mood_history(
      try: user_id = uuid.UUID(user_id_str)
      except ValueError: raise HTTPException(401, "Invalid user identifier")
 
-     logger.info(f"Fetching mood history for user {user_id}, skip={skip}, limit={limit}")
-     try:
-        query = db.query(mood_models.MoodEntry).filter(mood_models.MoodEntry.user_id == user_id)
-        moods = query.order_by(mood_models.MoodEntry.created_at.desc()).offset(skip).limit(limit).all()
+     logger.info(f"Fetching mood history for user {user_id}, skip={skip}, limit={limit}, cursor={'yes' if cursor else 'no'}")
+     validators = await data_version_service.validators_for(request, db, user_id)
+     if validators and validators.matches(request):
+         return validators.not_modified_response() # Nothing changed since the client's copy: skip the query
+     MoodEntry = mood_models.MoodEntry
+     query = select(*MOOD_READ_COLUMNS).where(MoodEntry.user_id == user_id, MoodEntry.deleted_at.is_(None)).order_by(MoodEntry.created_at.desc(), MoodEntry.id)
+     if cursor:
+        query = query.where(keyset_after(MoodEntry.created_at, MoodEntry.id, cursor)) # 400 on a bad cursor
+     else:
+        query = query.offset(skip) # Legacy offset paging
+
+     async def load_page() -> Response:
+        result = await db.execute(query.limit(limit))
+        moods = result.all()
         logger.info(f"Found {len(moods)} mood entries for user {user_id}")
-        return moods
+        fast_response = FastJSONResponse(rows_as_dicts(moods)) # Trusted rows: no per-row re-validation
+        next_cursor = next_cursor_for(moods, limit, "created_at")
+        if next_cursor:
+            fast_response.headers[NEXT_CURSOR_HEADER] = next_cursor
+        return fast_response
+
+     try:
+        if cursor is None and skip == 0: # First page: per-user response cache
+            variant = response_cache.variant(request, validators.etag if validators else "")
+            page = await response_cache.cached(user_id, variant, load_page)
+        else:
+            page = await load_page()
+        if validators:
+            validators.apply(page)
+        return page
      except Exception as db_error:
          logger.error(f"Database error fetching mood history: {db_error}", exc_info=True)
          raise HTTPException(status_code=500, detail="Could not retrieve mood history.")
\ No newline at end of file
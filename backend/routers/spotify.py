@@ -1,92 +1,150 @@
 # backend/routers/spotify.py
 from fastapi import APIRouter, Depends, HTTPException, status, Request, Response, Query # Added Query
-from sqlalchemy.orm import Session
+from fastapi.responses import RedirectResponse
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 # --- ADD THESE IMPORTS ---
 from typing import List, Optional
 from pydantic import BaseModel, HttpUrl # Import BaseModel and HttpUrl
 from datetime import datetime # Import datetime
 # --- END ADD IMPORTS ---
+import uuid
+import logging
 
 # Import necessary dependencies, schemas, models, services when implemented
 from db.session import get_db
+from core.clients import get_spotify_http_client
 from core.dependencies import get_current_active_user
 from core.config import settings
-from services import spotify_service # Needs implementation
-# from schemas import spotify as spotify_schemas # Use actual schemas later
-# from models import user as user_models # To store/retrieve tokens
+from core.pagination import NEXT_CURSOR_HEADER, keyset_after, next_cursor_for
+from services import data_version_service, spotify_service, spotify_token_service
+from schemas import spotify as spotify_schemas
+from models.spotify import SpotifyTrack, SpotifySyncState
 
+logger = logging.getLogger(__name__)
 router = APIRouter()
 
-# Placeholder response models
-# These now inherit correctly from the imported BaseModel
-class SpotifyTrackPlaceholder(BaseModel):
-    id: str
-    name: str
-    artist: str
-    played_at: datetime # Uses imported datetime type
+def _user_id_from(payload: dict) -> uuid.UUID:
+    user_id_str = payload.get("sub")
+    if not user_id_str: raise HTTPException(status.HTTP_401_UNAUTHORIZED, "Could not validate credentials")
+    try: return uuid.UUID(user_id_str)
+    except ValueError: raise HTTPException(status.HTTP_401_UNAUTHORIZED, "Invalid user identifier")
 
-class SpotifyConnectResponse(BaseModel):
-    authorization_url: str
 
 # --- Endpoint to initiate Spotify OAuth flow ---
-@router.get("/connect", summary="Connect Spotify Account", response_model=SpotifyConnectResponse)
+@router.get("/connect", summary="Connect Spotify Account", response_model=spotify_schemas.SpotifyConnectResponse)
 async def connect_spotify(
     request: Request,
     current_user_payload: dict = Depends(get_current_active_user)
 ):
     """
-    (Placeholder) Initiates the Spotify OAuth2 flow.
-    Redirects the user to Spotify's authorization page.
-    Requires spotify_service implementation.
+    Returns the Spotify authorization URL to open for the user.
+    The `state` parameter is a short-lived signed token identifying the user,
+    verified again in /callback.
     """
-    user_id = current_user_payload.get("sub")
-    print(f"Placeholder: Generate Spotify auth URL for user {user_id}")
-    # Replace with actual call to spotify_service.create_authorization_url(request, user_id)
-    return SpotifyConnectResponse(authorization_url="https://accounts.spotify.com/authorize?client_id=DUMMY&response_type=code&redirect_uri=DUMMY&scope=user-read-recently-played&state=DUMMYSTATE")
+    user_id = _user_id_from(current_user_payload)
+    return spotify_schemas.SpotifyConnectResponse(
+        authorization_url=spotify_token_service.create_authorization_url(user_id)
+    )
 
 # --- Endpoint for Spotify OAuth Callback ---
 @router.get("/callback", summary="Spotify OAuth Callback Handler")
 async def spotify_callback(
-    request: Request,
-    response: Response,
     code: Optional[str] = None,
     error: Optional[str] = None,
     state: Optional[str] = None,
-    db: Session = Depends(get_db),
 ):
     """
-    (Placeholder) Handles the redirect from Spotify after user authorization.
-    Exchanges the authorization code for tokens and stores them securely.
-    Requires spotify_service implementation.
+    Handles the redirect from Spotify after user authorization.
+    Verifies `state`, exchanges the code for tokens and stores them encrypted,
+    then redirects to SPOTIFY_POST_CONNECT_REDIRECT.
     """
     if error:
-        print(f"Spotify OAuth Error: {error}")
+        logger.warning(f"Spotify OAuth Error: {error}")
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Spotify authorization failed: {error}")
     if not code:
-         print("Spotify OAuth Error: No authorization code received.")
-         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Missing authorization code from Spotify.")
+        logger.warning("Spotify OAuth Error: No authorization code received.")
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Missing authorization code from Spotify.")
+
+    user_id = spotify_token_service.user_id_from_state(state)
+    if user_id is None:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid or expired OAuth state.")
+
+    try:
+        await spotify_token_service.exchange_code(user_id, code)
+    except spotify_service.SpotifyAPIError as e:
+        logger.warning(f"Spotify token exchange failed for user {user_id}: {e}")
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Could not exchange Spotify authorization code.")
 
-    print(f"Placeholder: Received Spotify callback code: {code[:10]}... State: {state}")
-    # TODO: Implement state verification, token exchange, token storage in spotify_service
-    response.status_code = status.HTTP_307_TEMPORARY_REDIRECT
-    # Redirect to a frontend page indicating success/failure (use deeplink for mobile)
-    response.headers["Location"] = "/?spotify_callback=success" # Placeholder redirect
-    return response
+    logger.info(f"Spotify account connected for user {user_id}.")
+    # Redirect to a frontend page indicating success (use deeplink for mobile)
+    return RedirectResponse(url=settings.SPOTIFY_POST_CONNECT_REDIRECT, status_code=status.HTTP_307_TEMPORARY_REDIRECT)
+
+
+# --- Endpoint to pull new plays from Spotify into our DB ---
+@router.post("/sync", summary="Sync Recently Played Tracks", response_model=spotify_schemas.SpotifySyncResult)
+async def sync_recent_tracks(
+    db: AsyncSession = Depends(get_db),
+    current_user_payload: dict = Depends(get_current_active_user),
+):
+    """
+    Incrementally ingests the user's Spotify 'recently played' history, starting
+    after the newest play already stored. Safe to call repeatedly.
+    """
+    user_id = _user_id_from(current_user_payload)
+    http = get_spotify_http_client()
+    try:
+        access_token = await spotify_token_service.get_access_token(user_id)
+        try:
+            inserted = await spotify_service.ingest_recently_played(db, http, user_id, access_token)
+        except spotify_service.SpotifyAPIError as e:
+            if e.status_code != 401:
+                raise
+            # Token revoked/rotated early: refresh once (single-flight) and retry
+            access_token = await spotify_token_service.get_access_token(user_id, force_refresh=True)
+            inserted = await spotify_service.ingest_recently_played(db, http, user_id, access_token)
+    except spotify_service.SpotifyNotConnectedError:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Spotify account not connected.")
+    except spotify_service.SpotifyAPIError as e:
+        logger.warning(f"Spotify API error during sync for user {user_id}: {e}")
+        headers = {"Retry-After": str(e.retry_after)} if e.retry_after is not None else None
+        code = status.HTTP_429_TOO_MANY_REQUESTS if e.status_code == 429 else status.HTTP_502_BAD_GATEWAY
+        raise HTTPException(status_code=code, detail="Spotify request failed.", headers=headers)
+
+    state = await db.get(SpotifySyncState, user_id)
+    return spotify_schemas.SpotifySyncResult(inserted=inserted, last_played_at=state.last_played_at if state else None)
 
 
 # --- Endpoint to fetch recent tracks ---
-@router.get("/tracks", summary="Get Recent Spotify Tracks", response_model=List[SpotifyTrackPlaceholder])
+@router.get("/tracks", summary="Get Recent Spotify Tracks", response_model=List[spotify_schemas.SpotifyTrackRead])
 async def get_recent_tracks(
-    db: Session = Depends(get_db),
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_db),
     current_user_payload: dict = Depends(get_current_active_user),
-    limit: int = Query(20, ge=1, le=50)
+    limit: int = Query(20, ge=1, le=50),
+    cursor: Optional[str] = Query(None, description=f"Opaque keyset cursor from the {NEXT_CURSOR_HEADER} header of the previous page"),
 ):
     """
-    (Placeholder) Fetches recently played tracks from Spotify for the authenticated user.
-    Requires spotify_service and token retrieval logic.
+    Returns the user's stored plays, newest first, from our own table
+    (populated by /spotify/sync) - no Spotify API call per request.
     """
-    user_id = current_user_payload.get("sub")
-    print(f"Placeholder: Fetch Spotify tracks for user {user_id}")
-    # TODO: Implement token retrieval, refresh check, API call via spotify_service
-    # Return actual data using schemas.spotify.SpotifyTrackRead later
-    return [] # Return empty list placeholder
\ No newline at end of file
+    user_id = _user_id_from(current_user_payload)
+    validators = await data_version_service.validators_for(request, db, user_id)
+    if validators and validators.matches(request):
+        return validators.not_modified_response() # Nothing changed since the client's copy: skip the query
+
+    query = (
+        select(SpotifyTrack).where(SpotifyTrack.user_id == user_id)
+        .order_by(SpotifyTrack.played_at.desc(), SpotifyTrack.id)
+    )
+    if cursor:
+        query = query.where(keyset_after(SpotifyTrack.played_at, SpotifyTrack.id, cursor))
+    tracks = (await db.scalars(query.limit(limit))).all()
+
+    next_cursor = next_cursor_for(tracks, limit, "played_at")
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+    if validators:
+        validators.apply(response)
+    return tracks
@@ -0,0 +1,40 @@
+# backend/routers/sync.py
+from fastapi import APIRouter, Depends, HTTPException, status, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Optional
+import uuid
+import logging
+
+from db.session import get_db
+from core.dependencies import get_current_active_user
+from schemas.sync import SyncResponse
+from services import sync_service
+
+logger = logging.getLogger(__name__)
+router = APIRouter()
+
+
+@router.get("/", summary="Delta Sync", response_model=SyncResponse)
+async def sync_changes(
+    db: AsyncSession = Depends(get_db),
+    current_user_payload: dict = Depends(get_current_active_user),
+    since: Optional[str] = Query(None, description="`next_since` from the previous sync; omit for a full sync"),
+    limit: int = Query(500, ge=1, le=1000, description="Max changed rows per data type in this response"),
+):
+    """
+    Workouts and mood entries created, updated or deleted since the client's last
+    sync token. Live rows are returned in full (upsert by id), deletions as tombstones.
+    Keep calling with `next_since` while `has_more` is true, then store the last token.
+    """
+    user_id_str = current_user_payload.get("sub")
+    if not user_id_str: raise HTTPException(status.HTTP_401_UNAUTHORIZED, "Could not validate credentials")
+    try: user_id = uuid.UUID(user_id_str)
+    except ValueError: raise HTTPException(status.HTTP_401_UNAUTHORIZED, "Invalid user identifier")
+
+    try:
+        return await sync_service.changes_since(db, user_id, since, limit)
+    except HTTPException:
+        raise # 400 for a malformed token
+    except Exception as db_error:
+        logger.error(f"Database error during sync for user {user_id}: {db_error}", exc_info=True)
+        raise HTTPException(status_code=500, detail="Could not compute changes.")
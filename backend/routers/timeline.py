@@ -0,0 +1,52 @@
+# backend/routers/timeline.py
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Optional
+import uuid
+import logging
+
+from db.session import get_db
+from core.dependencies import get_current_active_user
+from schemas.timeline import TimelinePage
+from services import data_version_service, timeline_service
+
+logger = logging.getLogger(__name__)
+router = APIRouter()
+
+
+@router.get("/", summary="Get Merged Timeline", response_model=TimelinePage)
+async def read_timeline(
+    request: Request,
+    db: AsyncSession = Depends(get_db),
+    current_user_payload: dict = Depends(get_current_active_user),
+    limit: int = Query(50, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from the previous page's next_cursor"),
+):
+    """
+    Returns workouts, mood entries and Spotify plays interleaved by time (newest first) in one call.
+    Each source is paged with its own keyset position, so only rows this page
+    can use are fetched, and the page is streamed out item by item.
+    """
+    user_id_str = current_user_payload.get("sub")
+    if not user_id_str: raise HTTPException(status.HTTP_401_UNAUTHORIZED, "Could not validate credentials")
+    try: user_id = uuid.UUID(user_id_str)
+    except ValueError: raise HTTPException(status.HTTP_401_UNAUTHORIZED, "Invalid user identifier")
+
+    validators = await data_version_service.validators_for(request, db, user_id)
+    if validators and validators.matches(request):
+        return validators.not_modified_response() # Nothing changed since the client's copy: skip the query
+
+    try:
+        items, next_cursor = await timeline_service.get_timeline_page(db, user_id, limit, cursor)
+    except HTTPException:
+        raise # e.g. 400 for a malformed cursor
+    except Exception as db_error:
+        logger.error(f"Database error building timeline: {db_error}", exc_info=True)
+        raise HTTPException(status_code=500, detail="Could not retrieve timeline.")
+
+    return StreamingResponse(
+        timeline_service.stream_timeline_page(items, next_cursor),
+        media_type="application/json",
+        headers=validators.headers if validators else None,
+    )
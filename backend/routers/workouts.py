@@ -1,18 +1,38 @@
 # backend/routers/workouts.py
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
-from typing import List, Optional
+from fastapi import APIRouter, Body, Depends, HTTPException, status, Query, Request, Response
+from sqlalchemy import func, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Annotated, List, Literal, Optional
 from datetime import datetime
 import uuid # Import uuid
 
 from db.session import get_db
 from models.workout import Workout as WorkoutModel # Alias model to avoid name clash
 from schemas import workout as workout_schemas # Use alias for schemas too
+from core.config import settings
 from core.dependencies import get_current_active_user
-from pydantic import BaseModel
+from core.pagination import NEXT_CURSOR_HEADER, keyset_after, next_cursor_for
+from core.serialization import FastJSONResponse, rows_as_dicts
+from services import data_version_service, import_service, insight_service, records_service, workout_sets_service
+from services.exercise_suggest_service import suggest_index
+from services.response_cache_service import response_cache
+from pydantic import BaseModel, ValidationError
+import logging
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+# Columns of WorkoutRead, selected as plain tuples for the list fast path (no ORM objects, no re-validation)
+WORKOUT_READ_COLUMNS = (
+    WorkoutModel.exercises,
+    WorkoutModel.id,
+    WorkoutModel.user_id,
+    WorkoutModel.timestamp,
+    WorkoutModel.createdAt.label("created_at"),
+)
+WORKOUT_READ_DEFAULTS = {"new_pr": False, "new_personal_records": []} # Only meaningful on create
+
 @router.post(
     "/",
     response_model=workout_schemas.WorkoutRead,
@@ -20,8 +40,8 @@ router = APIRouter()
     summary="Log a new workout session"
 )
 async def create_workout(
-    workout_in: workout_schemas.WorkoutCreate,
-    db: Session = Depends(get_db),
+    workout_in: Annotated[workout_schemas.WorkoutCreateBody, Body()], # Validates like WorkoutCreate, into plain dicts
+    db: AsyncSession = Depends(get_db),
     current_user_payload: dict = Depends(get_current_active_user)
 ):
     """
@@ -37,8 +57,8 @@ async def create_workout(
     except ValueError:
          raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid user identifier")
 
-    # Convert Pydantic exercises list to a list of dicts suitable for JSONB
-    exercises_data = [ex.model_dump() for ex in workout_in.exercises]
+    # Already validated into plain dicts suitable for JSONB (no model objects to dump)
+    exercises_data = workout_in["exercises"]
 
     db_workout = WorkoutModel(
         user_id=user_id,
@@ -48,11 +68,21 @@ async def create_workout(
 
     try:
         db.add(db_workout)
-        db.commit()
-        db.refresh(db_workout)
-        return db_workout
+        await db.flush() # workout_sets has a FK to the workout row (the session doesn't autoflush)
+        # Keep the dashboard's daily rollup in the same transaction as the workout
+        await insight_service.record_workout(db, user_id, db_workout.timestamp, exercises_data)
+        await workout_sets_service.record_workout_sets(db, db_workout.id, user_id, db_workout.timestamp, exercises_data)
+        new_records = await records_service.record_workout(db, user_id, db_workout.id, db_workout.timestamp, exercises_data)
+        await data_version_service.bump(db, user_id)
+        await db.commit()
+        await db.refresh(db_workout)
+        suggest_index.record_names(user_id, [ex["name"] for ex in exercises_data])
+        await response_cache.invalidate(user_id)
+        return workout_schemas.WorkoutRead.model_validate(db_workout).model_copy(
+            update={"new_pr": bool(new_records), "new_personal_records": new_records}
+        )
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         print(f"Error saving workout: {e}") # Log the error server-side
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -60,22 +90,111 @@ async def create_workout(
         )
 
 
+@router.post(
+    "/batch",
+    response_model=workout_schemas.WorkoutBatchResult,
+    summary="Log several workout sessions at once (offline replay)"
+)
+async def create_workouts_batch(
+    batch_in: workout_schemas.WorkoutBatchCreate,
+    db: AsyncSession = Depends(get_db),
+    current_user_payload: dict = Depends(get_current_active_user)
+):
+    """
+    Creates up to BATCH_MAX_ITEMS workouts in one transaction (one multi-row INSERT ... RETURNING).
+    Each item is validated like `POST /workouts/`; invalid items are reported per index
+    and skipped, the valid ones are created. Personal records are updated, but broken
+    records aren't reported per item (`new_pr` is always false here).
+    """
+    user_id_str = current_user_payload.get("sub")
+    if not user_id_str:
+         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Could not validate credentials")
+
+    try:
+        user_id = uuid.UUID(user_id_str)
+    except ValueError:
+         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid user identifier")
+
+    if len(batch_in.items) > settings.BATCH_MAX_ITEMS:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"At most {settings.BATCH_MAX_ITEMS} items per batch.",
+        )
+
+    results = {}
+    rows = []
+    timestamp = datetime.utcnow() # Set timestamp on server using UTC (same as POST /workouts/)
+    for index, item in enumerate(batch_in.items):
+        try:
+            workout_in = workout_schemas.workout_create_adapter.validate_python(item)
+        except ValidationError as e:
+            results[index] = workout_schemas.WorkoutBatchItemResult(
+                index=index, status="invalid", errors=e.errors(include_url=False, include_context=False),
+            )
+            continue
+        rows.append((index, {
+            "id": uuid.uuid4(), "user_id": user_id, "timestamp": timestamp,
+            "exercises": workout_in["exercises"],
+        }))
+
+    if rows:
+        values = [row for _, row in rows]
+        try:
+            created = await db.execute(insert(WorkoutModel).values(values).returning(*WORKOUT_READ_COLUMNS))
+            by_id = {row.id: row for row in created}
+            await workout_sets_service.record_sets(db, [
+                set_row
+                for row in values
+                for set_row in workout_sets_service.set_rows(row["id"], user_id, row["timestamp"], row["exercises"])
+            ])
+            await insight_service.record_workouts_bulk(db, user_id, [(row["timestamp"], row["exercises"]) for row in values])
+            await records_service.record_workouts_bulk(db, user_id, [(row["id"], row["timestamp"], row["exercises"]) for row in values])
+            await data_version_service.bump(db, user_id)
+            await db.commit()
+        except Exception as e:
+            await db.rollback()
+            logger.error(f"Database error saving workout batch: {e}", exc_info=True)
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="Could not save workouts.",
+            )
+        for index, row in rows:
+            results[index] = workout_schemas.WorkoutBatchItemResult(
+                index=index, status="created", workout=workout_schemas.WorkoutRead(**by_id[row["id"]]._asdict()),
+            )
+            suggest_index.record_names(user_id, [ex["name"] for ex in row["exercises"]])
+        await response_cache.invalidate(user_id)
+
+    return workout_schemas.WorkoutBatchResult(
+        created=len(rows),
+        invalid=len(batch_in.items) - len(rows),
+        results=[results[index] for index in range(len(batch_in.items))],
+    )
+
+
 @router.get(
     "/",
-    response_model=List[workout_schemas.WorkoutRead], # Use WorkoutRead for detail now
+    response_model=List[workout_schemas.WorkoutRead], # Use WorkoutRead for detail now (documents the fast-path output)
+    response_class=FastJSONResponse,
     summary="Retrieve workout sessions"
 )
 async def read_workouts(
-    db: Session = Depends(get_db),
+    request: Request,
+    db: AsyncSession = Depends(get_db),
     current_user_payload: dict = Depends(get_current_active_user),
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = Query(None, description=f"Opaque keyset cursor from the {NEXT_CURSOR_HEADER} header of the previous page (takes precedence over skip)"),
     start_date: Optional[datetime] = Query(None, description="Filter workouts after this date (ISO 8601 format)"),
     end_date: Optional[datetime] = Query(None, description="Filter workouts before this date (ISO 8601 format)")
 ):
     """
     Retrieves a list of workout logs for the authenticated user, ordered by most recent first.
     Supports pagination and date range filtering.
+    Prefer `cursor` over `skip` for deep pages: the next cursor is returned in the
+    `X-Next-Cursor` response header whenever more rows may exist.
+    Supports conditional GET (`If-None-Match` / `If-Modified-Since` -> 304).
+    The first page (no cursor, skip=0) is served from the per-user response cache.
     """
     user_id_str = current_user_payload.get("sub")
     if not user_id_str:
@@ -86,15 +205,222 @@ async def read_workouts(
     except ValueError:
          raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid user identifier")
 
-    query = db.query(WorkoutModel).filter(WorkoutModel.user_id == user_id)
+    validators = await data_version_service.validators_for(request, db, user_id)
+    if validators and validators.matches(request):
+        return validators.not_modified_response() # Nothing changed since the client's copy: skip the query
+
+    query = select(*WORKOUT_READ_COLUMNS).where(WorkoutModel.user_id == user_id, WorkoutModel.deleted_at.is_(None))
 
     if start_date:
-        query = query.filter(WorkoutModel.timestamp >= start_date)
+        query = query.where(WorkoutModel.timestamp >= start_date)
     if end_date:
-        query = query.filter(WorkoutModel.timestamp <= end_date)
+        query = query.where(WorkoutModel.timestamp <= end_date)
+
+    # Order by (timestamp DESC, id) so ties are stable and match the composite index
+    query = query.order_by(WorkoutModel.timestamp.desc(), WorkoutModel.id)
+    if cursor:
+        query = query.where(keyset_after(WorkoutModel.timestamp, WorkoutModel.id, cursor))
+    else:
+        query = query.offset(skip) # Legacy offset paging (kept for older clients)
+
+    async def load_page() -> Response:
+        result = await db.execute(query.limit(limit))
+        workouts = result.all()
+
+        # Trusted rows we wrote ourselves: build the WorkoutRead-shaped dicts directly
+        # (raw JSONB exercises) and encode with orjson instead of re-validating each row
+        fast_response = FastJSONResponse(rows_as_dicts(workouts, WORKOUT_READ_DEFAULTS))
+        next_cursor = next_cursor_for(workouts, limit, "timestamp")
+        if next_cursor:
+            fast_response.headers[NEXT_CURSOR_HEADER] = next_cursor
+        return fast_response
+
+    if cursor is None and skip == 0:
+        variant = response_cache.variant(request, validators.etag if validators else "")
+        page = await response_cache.cached(user_id, variant, load_page)
+    else:
+        page = await load_page()
+    if validators:
+        validators.apply(page)
 
-    workouts = query.order_by(WorkoutModel.timestamp.desc()).offset(skip).limit(limit).all()
+    return page
+
+
+@router.get(
+    "/records",
+    response_model=List[workout_schemas.PersonalRecordRead],
+    summary="Personal records per exercise"
+)
+async def read_personal_records(
+    db: AsyncSession = Depends(get_db),
+    current_user_payload: dict = Depends(get_current_active_user),
+    exercise: Optional[str] = Query(None, description="Only this exercise (exact name)")
+):
+    """
+    Heaviest set, best estimated 1RM and best single-workout volume for each exercise.
+    Read from the incrementally maintained `personal_records` table (no history scan).
+    """
+    user_id_str = current_user_payload.get("sub")
+    if not user_id_str:
+         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Could not validate credentials")
+
+    try:
+        user_id = uuid.UUID(user_id_str)
+    except ValueError:
+         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid user identifier")
+
+    return await records_service.get_records(db, user_id, exercise)
+
+
+@router.get(
+    "/exercises/suggest",
+    response_model=List[workout_schemas.ExerciseSuggestion],
+    summary="Autocomplete exercise names"
+)
+async def suggest_exercises(
+    db: AsyncSession = Depends(get_db),
+    current_user_payload: dict = Depends(get_current_active_user),
+    prefix: str = Query("", max_length=100, description="What the user has typed so far (case-insensitive; matches any word start)"),
+    limit: int = Query(10, ge=1, le=50)
+):
+    """
+    Suggests exercise names: the user's own names first (most logged first), then the global catalog.
+    Served from an in-memory prefix index; the database is only read the first time a user's names are needed.
+    """
+    user_id_str = current_user_payload.get("sub")
+    if not user_id_str:
+         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Could not validate credentials")
+
+    try:
+        user_id = uuid.UUID(user_id_str)
+    except ValueError:
+         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid user identifier")
+
+    return await suggest_index.suggest(db, user_id, prefix, limit)
+
+
+@router.get(
+    "/exercises/progress",
+    response_model=List[workout_schemas.ExerciseProgressPoint],
+    summary="Progress for one exercise over time"
+)
+async def read_exercise_progress(
+    db: AsyncSession = Depends(get_db),
+    current_user_payload: dict = Depends(get_current_active_user),
+    name: str = Query(..., min_length=1, description="Exact exercise name as logged"),
+    start_date: Optional[datetime] = Query(None, description="Only workouts after this date (ISO 8601 format)"),
+    end_date: Optional[datetime] = Query(None, description="Only workouts before this date (ISO 8601 format)")
+):
+    """
+    Per-workout totals (sets, reps, top weight, volume) for one exercise, oldest first.
+    Served from the normalized `workout_sets` table via its (user_id, exercise_name, timestamp) index.
+    """
+    user_id_str = current_user_payload.get("sub")
+    if not user_id_str:
+         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Could not validate credentials")
+
+    try:
+        user_id = uuid.UUID(user_id_str)
+    except ValueError:
+         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid user identifier")
+
+    return await workout_sets_service.exercise_progress(db, user_id, name, start_date, end_date)
+
+
+@router.post(
+    "/import",
+    response_model=workout_schemas.WorkoutImportReport,
+    summary="Bulk import historical workouts (CSV / NDJSON)"
+)
+async def import_workouts(
+    request: Request,
+    db: AsyncSession = Depends(get_db),
+    current_user_payload: dict = Depends(get_current_active_user),
+    format: Optional[Literal["csv", "ndjson"]] = Query(None, description="File format; defaults to the request Content-Type (text/csv or application/x-ndjson)"),
+    dry_run: bool = Query(False, description="Validate and report only, write nothing"),
+):
+    """
+    Imports workouts from the raw request body (not multipart), streamed in chunks.
+    - **csv**: header `timestamp,exercise,reps,weight[,workout]`, one set per line.
+    - **ndjson**: one `{"timestamp": ..., "exercises": [...]}` object per line.
+
+    Invalid lines are skipped and listed in the report; everything else is imported.
+    """
+    user_id_str = current_user_payload.get("sub")
+    if not user_id_str:
+         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Could not validate credentials")
+
+    try:
+        user_id = uuid.UUID(user_id_str)
+    except ValueError:
+         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid user identifier")
+
+    fmt = format or import_service.detect_format(request.headers.get("content-type"))
+    if fmt is None:
+        raise HTTPException(
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            detail="Send text/csv or application/x-ndjson, or pass ?format=csv|ndjson.",
+        )
+
+    try:
+        report = await import_service.import_workouts(db, user_id, request.stream(), fmt, dry_run=dry_run)
+    except import_service.ImportFormatError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    finally:
+        if not dry_run:
+            suggest_index.invalidate(user_id) # Reloaded with the imported names on next use
+    return report
+
+@router.delete(
+    "/{workout_id}",
+    status_code=status.HTTP_204_NO_CONTENT,
+    summary="Delete a workout session"
+)
+async def delete_workout(
+    workout_id: uuid.UUID,
+    db: AsyncSession = Depends(get_db),
+    current_user_payload: dict = Depends(get_current_active_user)
+):
+    """
+    Soft-deletes a workout: it disappears from every read, and delta sync reports it
+    as a tombstone. Its sets, the day's aggregate and the affected personal records
+    are corrected in the same transaction.
+    """
+    user_id_str = current_user_payload.get("sub")
+    if not user_id_str:
+         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Could not validate credentials")
+
+    try:
+        user_id = uuid.UUID(user_id_str)
+    except ValueError:
+         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid user identifier")
+
+    db_workout = await db.scalar(
+        select(WorkoutModel)
+        .where(WorkoutModel.id == workout_id, WorkoutModel.user_id == user_id, WorkoutModel.deleted_at.is_(None))
+        .with_for_update() # Two concurrent deletes must not both correct the aggregates
+    )
+    if db_workout is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Workout not found.")
+
+    try:
+        db_workout.deleted_at = func.now() # updated_at moves too (onupdate), so sync picks it up
+        await db.flush()
+        await workout_sets_service.delete_workout_sets(db, workout_id)
+        await insight_service.rebuild_day(db, user_id, insight_service.utc_day(db_workout.timestamp))
+        await records_service.rebuild_exercises(db, user_id, [ex["name"] for ex in db_workout.exercises or []])
+        await data_version_service.bump(db, user_id)
+        await db.commit()
+    except Exception as e:
+        await db.rollback()
+        logger.error(f"Database error deleting workout {workout_id}: {e}", exc_info=True)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Could not delete workout.",
+        )
 
-    return workouts
+    suggest_index.invalidate(user_id) # Name counts come from workout_sets
+    await response_cache.invalidate(user_id)
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
 
-# --- Add GET /workouts/{id}, PUT /workouts/{id}, DELETE /workouts/{id} later ---
\ No newline at end of file
+# --- Add GET /workouts/{id}, PUT /workouts/{id} later ---
\ No newline at end of file
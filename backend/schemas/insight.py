@@ -0,0 +1,66 @@
+# backend/schemas/insight.py
+from pydantic import BaseModel, Field
+from datetime import date, datetime
+from typing import Dict, List, Optional
+
+# --- Insight Dashboard Schemas ---
+
+class DailyAggregateRead(BaseModel):
+    day: date
+    workout_count: int
+    total_sets: int
+    total_volume: float
+    mood_count: int
+    mood_avg: Optional[float] = None
+    mood_min: Optional[int] = None
+    mood_max: Optional[int] = None
+
+    class Config:
+        from_attributes = True
+
+class InsightSummary(BaseModel):
+    days_in_range: int
+    active_days: int = Field(..., description="Days with at least one workout")
+    workout_count: int
+    total_sets: int
+    total_volume: float
+    mood_entry_count: int
+    mood_avg: Optional[float] = None
+    mood_avg_on_workout_days: Optional[float] = None
+    mood_avg_on_rest_days: Optional[float] = None
+    current_workout_streak: int = Field(..., description="Consecutive days (ending today or yesterday) with a workout")
+
+class InsightDashboard(BaseModel):
+    summary: InsightSummary
+    daily: List[DailyAggregateRead] # Oldest first, only days with activity
+
+
+# --- Mood vs Training Correlations ---
+
+class RollingCorrelation(BaseModel):
+    latest: Optional[float] = None # r for the most recent full window
+    mean: Optional[float] = None   # mean r across all windows with enough data
+
+class CorrelationReportData(BaseModel):
+    first_day: date
+    last_day: date
+    days: int
+    training_days: int
+    mood_days: int
+    volume_vs_mood: Optional[float] = None
+    volume_vs_next_day_mood: Optional[float] = None
+    volume_vs_sentiment: Optional[float] = None
+    leg_volume_vs_next_day_mood: Optional[float] = None
+    lagged_volume_vs_mood: List[Optional[float]] = Field(..., description="Index = lag in days (0 = same day)")
+    lagged_volume_vs_sentiment: List[Optional[float]]
+    mood_after_heavy_leg_day: Optional[float] = None
+    mood_after_other_days: Optional[float] = None
+    heavy_leg_day_count: int
+    rolling_volume_vs_mood: Dict[str, RollingCorrelation] = Field(..., examples=[{"7d": {"latest": 0.3, "mean": 0.1}}])
+
+class CorrelationReportRead(BaseModel):
+    computed_at: datetime
+    report: CorrelationReportData
+
+    class Config:
+        from_attributes = True
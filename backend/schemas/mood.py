@@ -2,7 +2,7 @@
 import uuid
 from pydantic import BaseModel, Field, field_validator
 from datetime import datetime
-from typing import Optional, List # Added List
+from typing import Any, Dict, Literal, Optional, List # Added List
 
 # --- Sentiment Analysis Result (from OpenAI service) ---
 class SentimentAnalysisResult(BaseModel):
@@ -33,6 +33,24 @@ class MoodRead(MoodBase): # Inherits mood_score and journal_text
     sentiment_label: Optional[str] = Field(None, examples=["Positive"])
     sentiment_intensity: Optional[int] = Field(None, ge=1, le=10, examples=[7])
     sentiment_summary: Optional[str] = Field(None, examples=["User felt optimistic."])
+    sentiment_status: Optional[str] = Field(None, examples=["pending"], description="pending | done | failed; null if there was no journal text")
 
     class Config:
-        from_attributes = True # Pydantic v2
\ No newline at end of file
+        from_attributes = True # Pydantic v2
+
+
+# --- Batch create (offline-queued entries replayed in one request) ---
+class MoodBatchCreate(BaseModel):
+    # Items stay raw here so each is validated against MoodCreate and reported on its own
+    items: List[Dict[str, Any]] = Field(..., min_length=1)
+
+class MoodBatchItemResult(BaseModel):
+    index: int # Position in the request's items
+    status: Literal["created", "invalid"]
+    entry: Optional[MoodRead] = None
+    errors: List[dict] = [] # Same shape as a 422's `errors` for that item
+
+class MoodBatchResult(BaseModel):
+    created: int
+    invalid: int
+    results: List[MoodBatchItemResult]
@@ -41,13 +41,19 @@ class SpotifyTrackRead(BaseModel):
     spotify_track_id: str
     played_at: datetime
     track_name: str
-    artist_name: str # Simple string representation for now
+    artist_name: str # Comma-separated artist names
     album_name: str # Simple string
-    # Add other fields if stored (e.g., spotify_uri, duration_ms)
+    track_uri: Optional[str] = None
+    duration_ms: Optional[int] = None
 
     class Config:
         from_attributes = True
 
+class SpotifySyncResult(BaseModel):
+    """ Response for the /spotify/sync endpoint """
+    inserted: int = Field(..., description="New plays stored by this sync")
+    last_played_at: Optional[datetime] = None # High-water mark after the sync
+
 class SpotifyConnectResponse(BaseModel):
     """ Response for the /spotify/connect endpoint """
     authorization_url: str
@@ -0,0 +1,29 @@
+# backend/schemas/sync.py
+import uuid
+from pydantic import BaseModel, Field
+from datetime import datetime
+from typing import List, Literal
+
+from .workout import WorkoutRead
+from .mood import MoodRead
+
+# --- Delta Sync Schemas ---
+
+class SyncWorkout(WorkoutRead):
+    updated_at: datetime
+
+class SyncMood(MoodRead):
+    updated_at: datetime
+
+class SyncTombstone(BaseModel):
+    """ A row deleted since the client's token: drop it locally. """
+    type: Literal["workout", "mood"] = Field(..., examples=["workout"])
+    id: uuid.UUID
+    deleted_at: datetime
+
+class SyncResponse(BaseModel):
+    workouts: List[SyncWorkout] = Field(..., description="Created or updated since the token (upsert by id)")
+    moods: List[SyncMood] = Field(..., description="Created or updated since the token (upsert by id)")
+    deleted: List[SyncTombstone]
+    next_since: str = Field(..., description="Pass back as ?since= on the next sync")
+    has_more: bool = Field(..., description="More changes are waiting: call again right away with next_since")
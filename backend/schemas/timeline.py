@@ -0,0 +1,20 @@
+# backend/schemas/timeline.py
+from pydantic import BaseModel, Field
+from datetime import datetime
+from typing import List, Literal, Optional, Union
+
+from .workout import WorkoutRead
+from .mood import MoodRead
+from .spotify import SpotifyTrackRead
+
+# --- Unified Timeline Schemas ---
+
+class TimelineItem(BaseModel):
+    """ One entry of the merged timeline; `data` holds the source's own read schema. """
+    type: Literal["workout", "mood", "spotify"] = Field(..., examples=["workout"])
+    timestamp: datetime # Sort key: Workout.timestamp / MoodEntry.created_at / SpotifyTrack.played_at
+    data: Union[WorkoutRead, MoodRead, SpotifyTrackRead]
+
+class TimelinePage(BaseModel):
+    items: List[TimelineItem]
+    next_cursor: Optional[str] = Field(None, description="Pass back as ?cursor= to fetch the next page; null when exhausted")
@@ -1,8 +1,10 @@
 # backend/schemas/workout.py
 import uuid
-from pydantic import BaseModel, Field, field_validator # Use field_validator in Pydantic v2
+from pydantic import AfterValidator, BaseModel, BeforeValidator, Field, TypeAdapter, field_validator # Use field_validator in Pydantic v2
+from pydantic_core import PydanticCustomError
 from datetime import datetime
-from typing import List, Optional
+from typing import Annotated, Any, Dict, List, Literal, Optional
+from typing_extensions import TypedDict # pydantic needs this one (not typing's) before Python 3.12
 
 # --- Schemas mirroring Flutter Models ---
 
@@ -40,16 +42,98 @@ class WorkoutCreate(WorkoutBase):
     # timestamp is set on the server
     pass
 
+# --- Lean ingest path: WorkoutCreate validated straight into the JSONB payload ---
+# Same fields, constraints, coercion and errors as WorkoutCreate, but validated into
+# plain dicts (pydantic-core builds them directly), so creating a workout doesn't
+# build one model object per exercise and set only to model_dump() them again.
+# The validators below reproduce the models' own errors (type, msg, loc, ctx), so
+# 422 bodies and batch `errors` are identical. Keep both in sync;
+# benchmarks/bench_schema_validation.py checks that they agree.
+
+def _dict_like(model: type, from_attributes: bool = False) -> BeforeValidator:
+    """
+    The error a BaseModel reports for non-dict input (e.g. a set sent as a number).
+    It depends on how the model is validated: FastAPI validates request bodies with
+    from_attributes=True, model_validate() doesn't by default.
+    """
+    def check(value):
+        if isinstance(value, dict):
+            return value
+        if from_attributes:
+            raise PydanticCustomError(
+                "model_attributes_type", "Input should be a valid dictionary or object to extract fields from",
+            )
+        raise PydanticCustomError(
+            "model_type", "Input should be a valid dictionary or instance of {class_name}",
+            {"class_name": model.__name__},
+        )
+    return BeforeValidator(check)
+
+def _check_exercise_sets_not_empty(exercises: List[dict]) -> List[dict]:
+    # Mirrors WorkoutBase.check_exercise_sets_not_empty
+    for ex in exercises:
+        if not ex["sets"]:
+            raise ValueError(f"Exercise '{ex['name']}' must contain at least one set.")
+    return exercises
+
+def _workout_create_payload(from_attributes: bool) -> Any:
+    class SetLogPayload(TypedDict):
+        reps: Annotated[int, Field(gt=0)]
+        weight: Annotated[float, Field(ge=0)]
+
+    class ExerciseLogPayload(TypedDict):
+        name: Annotated[str, Field(min_length=1)]
+        sets: List[Annotated[SetLogPayload, _dict_like(SetLogBase, from_attributes)]]
+
+    class WorkoutCreatePayload(TypedDict):
+        exercises: Annotated[
+            List[Annotated[ExerciseLogPayload, _dict_like(ExerciseLogBase, from_attributes)]],
+            Field(min_length=1), AfterValidator(_check_exercise_sets_not_empty),
+        ]
+
+    return Annotated[WorkoutCreatePayload, _dict_like(WorkoutCreate, from_attributes)]
+
+# Body type of POST /workouts/ (FastAPI validates bodies with from_attributes=True)
+WorkoutCreateBody = _workout_create_payload(from_attributes=True)
+# WorkoutCreate.model_validate(item) equivalent, for the batch endpoint
+workout_create_adapter = TypeAdapter(_workout_create_payload(from_attributes=False))
+
+class NewPersonalRecord(BaseModel):
+    """ A record broken by the workout just logged. """
+    exercise_name: str
+    record: Literal["max_weight", "best_e1rm", "best_volume"]
+    value: float
+
 class WorkoutRead(WorkoutBase):
     id: uuid.UUID
     user_id: uuid.UUID
     timestamp: datetime
     created_at: datetime # Added created_at from model
     exercises: List[ExerciseLogRead] # Use read schema for nested models
+    # Only filled in on POST /workouts (records broken by this workout)
+    new_pr: bool = False
+    new_personal_records: List[NewPersonalRecord] = []
 
     class Config:
         from_attributes = True # Pydantic v2 replacement for orm_mode
 
+# --- Batch create (offline-queued workouts replayed in one request) ---
+
+class WorkoutBatchCreate(BaseModel):
+    # Items stay raw here so each is validated against WorkoutCreate and reported on its own
+    items: List[Dict[str, Any]] = Field(..., min_length=1)
+
+class WorkoutBatchItemResult(BaseModel):
+    index: int # Position in the request's items
+    status: Literal["created", "invalid"]
+    workout: Optional[WorkoutRead] = None
+    errors: List[dict] = [] # Same shape as a 422's `errors` for that item
+
+class WorkoutBatchResult(BaseModel):
+    created: int
+    invalid: int
+    results: List[WorkoutBatchItemResult]
+
 # Optional: Schema for listing workouts (maybe less detail)
 class WorkoutList(BaseModel):
     id: uuid.UUID
@@ -58,4 +142,62 @@ class WorkoutList(BaseModel):
     total_sets: int # Example calculation
 
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+# --- Per-exercise progress (from the normalized workout_sets table) ---
+
+class ExerciseProgressPoint(BaseModel):
+    workout_id: uuid.UUID
+    timestamp: datetime
+    sets: int
+    total_reps: int
+    max_weight: float
+    volume: float # Sum of reps * weight
+
+    class Config:
+        from_attributes = True
+
+# --- Personal records (GET /workouts/records) ---
+
+class PersonalRecordRead(BaseModel):
+    exercise_name: str
+    max_weight: float
+    max_weight_reps: int
+    max_weight_workout_id: uuid.UUID
+    max_weight_at: datetime
+    best_e1rm: float = Field(..., description="Best estimated 1RM (Epley formula)")
+    best_e1rm_workout_id: uuid.UUID
+    best_e1rm_at: datetime
+    best_volume: float = Field(..., description="Most reps*weight for this exercise in a single workout")
+    best_volume_workout_id: uuid.UUID
+    best_volume_at: datetime
+
+    class Config:
+        from_attributes = True
+
+# --- Exercise autocomplete (GET /workouts/exercises/suggest) ---
+
+class ExerciseSuggestion(BaseModel):
+    name: str
+    source: Literal["user", "catalog"] # Logged by this user before, or from the global catalog
+    count: int = Field(..., description="Workouts in which the user logged this exercise (0 for catalog names)")
+
+# --- Bulk import (POST /workouts/import) ---
+
+class WorkoutImportRecord(WorkoutBase):
+    """ One historical workout from an import file; unlike WorkoutCreate it carries its own timestamp. """
+    timestamp: datetime
+
+class ImportRowError(BaseModel):
+    line: int # 1-based line number in the uploaded file
+    error: str
+
+class WorkoutImportReport(BaseModel):
+    format: str
+    dry_run: bool
+    lines_read: int
+    workouts_imported: int
+    sets_imported: int
+    error_count: int
+    errors: List[ImportRowError] # First IMPORT_MAX_ERRORS errors only
+    errors_truncated: bool
@@ -0,0 +1,54 @@
+# backend/scripts/add_sync_columns.py
+"""
+Adds the delta-sync columns and indexes to existing `workouts` / `mood_entries`
+tables (create_all only creates missing tables, never new columns).
+
+- updated_at: NOT NULL, defaults to now(); existing rows start at created_at so
+  a client's first sync after the upgrade isn't one giant "everything changed".
+- deleted_at: NULL (soft-delete tombstones).
+- (user_id, updated_at, id) index, built CONCURRENTLY so writes aren't blocked.
+
+Idempotent: re-running skips what already exists.
+
+Usage (from backend/):
+    python -m scripts.add_sync_columns
+"""
+import logging
+
+from sqlalchemy import text
+
+from db.session import engine
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+TABLES = {
+    # table: (created-at column, index name)
+    "workouts": ('"createdAt"', "ix_workouts_user_id_updated_at_id"),
+    "mood_entries": ("created_at", "ix_mood_entries_user_id_updated_at_id"),
+}
+
+
+def main():
+    # CREATE INDEX CONCURRENTLY can't run inside a transaction block
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        for table, (created_col, index_name) in TABLES.items():
+            logger.info(f"{table}: adding updated_at / deleted_at ...")
+            conn.execute(text(f"ALTER TABLE {table} ADD COLUMN IF NOT EXISTS deleted_at TIMESTAMPTZ"))
+            added = conn.execute(text(
+                "SELECT 1 FROM information_schema.columns WHERE table_name = :table AND column_name = 'updated_at'"
+            ), {"table": table}).first() is None
+            if added:
+                conn.execute(text(f"ALTER TABLE {table} ADD COLUMN updated_at TIMESTAMPTZ"))
+                conn.execute(text(f"UPDATE {table} SET updated_at = {created_col} WHERE updated_at IS NULL"))
+                conn.execute(text(f"ALTER TABLE {table} ALTER COLUMN updated_at SET DEFAULT now()"))
+                conn.execute(text(f"ALTER TABLE {table} ALTER COLUMN updated_at SET NOT NULL"))
+            logger.info(f"{table}: building {index_name} ...")
+            conn.execute(text(
+                f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {index_name} ON {table} (user_id, updated_at, id)"
+            ))
+    logger.info("Done.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+# backend/scripts/backfill_daily_aggregates.py
+"""
+Rebuilds `user_daily_aggregates` from raw workouts and mood entries.
+
+Safe to re-run: each user's rows are deleted and recomputed in one transaction.
+Uses the same `workout_totals` helper as the incremental path so both agree.
+
+Usage (from backend/):
+    python -m scripts.backfill_daily_aggregates            # all users
+    python -m scripts.backfill_daily_aggregates --user <uuid>
+"""
+import argparse
+import logging
+import uuid
+from collections import defaultdict
+
+from sqlalchemy import delete, insert, select, union
+
+from db.session import SessionLocal
+from models.insight import DailyAggregate
+from models.mood import MoodEntry
+from models.workout import Workout
+from services.insight_service import utc_day, workout_totals
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = 1000
+
+
+def _empty_day() -> dict:
+    return {"workout_count": 0, "total_sets": 0, "total_volume": 0.0,
+            "mood_count": 0, "mood_sum": 0, "mood_min": None, "mood_max": None}
+
+
+def rebuild_user(db, user_id: uuid.UUID) -> int:
+    """ Recomputes one user's aggregates; returns the number of day rows written. """
+    days = defaultdict(_empty_day)
+
+    workouts = db.execute(
+        select(Workout.timestamp, Workout.exercises).where(Workout.user_id == user_id, Workout.deleted_at.is_(None))
+        .execution_options(yield_per=BATCH_SIZE)
+    )
+    for timestamp, exercises in workouts:
+        total_sets, total_volume = workout_totals(exercises)
+        agg = days[utc_day(timestamp)]
+        agg["workout_count"] += 1
+        agg["total_sets"] += total_sets
+        agg["total_volume"] += total_volume
+
+    moods = db.execute(
+        select(MoodEntry.created_at, MoodEntry.mood_score).where(MoodEntry.user_id == user_id, MoodEntry.deleted_at.is_(None))
+        .execution_options(yield_per=BATCH_SIZE)
+    )
+    for created_at, score in moods:
+        agg = days[utc_day(created_at)]
+        agg["mood_count"] += 1
+        agg["mood_sum"] += score
+        agg["mood_min"] = score if agg["mood_min"] is None else min(agg["mood_min"], score)
+        agg["mood_max"] = score if agg["mood_max"] is None else max(agg["mood_max"], score)
+
+    db.execute(delete(DailyAggregate).where(DailyAggregate.user_id == user_id))
+    if days:
+        db.execute(insert(DailyAggregate), [{"user_id": user_id, "day": day, **agg} for day, agg in days.items()])
+    db.commit()
+    return len(days)
+
+
+def main(args):
+    with SessionLocal() as db:
+        if args.user:
+            user_ids = [uuid.UUID(args.user)]
+        else:
+            user_ids = db.scalars(union(select(Workout.user_id), select(MoodEntry.user_id))).all()
+
+        logger.info(f"Rebuilding daily aggregates for {len(user_ids)} user(s)...")
+        for index, user_id in enumerate(user_ids, start=1):
+            try:
+                written = rebuild_user(db, user_id)
+                logger.info(f"[{index}/{len(user_ids)}] user {user_id}: {written} day rows")
+            except Exception as e:
+                db.rollback()
+                logger.error(f"Failed to rebuild aggregates for user {user_id}: {e}", exc_info=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--user", help="Only rebuild this user ID")
+    main(parser.parse_args())
@@ -0,0 +1,76 @@
+# backend/scripts/backfill_sentiment.py
+"""
+Analyzes historical mood entries that have journal text but no sentiment yet
+(`sentiment_label IS NULL`), through the content-addressed cache and batched
+OpenAI requests (see services/sentiment_service.analyze_many).
+
+Walks the table in id order (keyset), so entries that still fail are not
+re-selected in the same run and the job always makes progress.
+
+Usage (from backend/):
+    python -m scripts.backfill_sentiment --page-size 200 --batch-size 20
+    OPENAI_USE_FAKE=true python -m scripts.backfill_sentiment   # dry run against the local fake
+"""
+import argparse
+import asyncio
+import logging
+
+from sqlalchemy import func, select, update
+
+from core.clients import get_openai_client
+from db.session import AsyncSessionLocal, async_engine
+from models.mood import MoodEntry
+from services import data_version_service, sentiment_service
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+async def main(args):
+    openai_client = get_openai_client()
+    last_id = None
+    analyzed = skipped = 0
+
+    while True:
+        async with AsyncSessionLocal() as db:
+            query = (
+                select(MoodEntry.id, MoodEntry.user_id, MoodEntry.journal_text)
+                .where(MoodEntry.sentiment_label.is_(None), MoodEntry.journal_text.is_not(None), MoodEntry.deleted_at.is_(None),
+                       func.length(func.trim(MoodEntry.journal_text)) > 0)
+                .order_by(MoodEntry.id)
+                .limit(args.page_size)
+            )
+            if last_id is not None:
+                query = query.where(MoodEntry.id > last_id)
+            page = (await db.execute(query)).all()
+            if not page:
+                break
+            last_id = page[-1].id
+
+            entries = {str(row.id): row.journal_text for row in page}
+            results = await sentiment_service.analyze_many(db, openai_client, entries, batch_size=args.batch_size)
+            if results:
+                # ORM bulk UPDATE by primary key: one executemany for the whole page
+                await db.execute(update(MoodEntry), [
+                    {"id": row.id, "sentiment_label": r.sentiment, "sentiment_intensity": r.intensity,
+                     "sentiment_summary": r.summary, "sentiment_status": "done"}
+                    for row in page if (r := results.get(str(row.id))) is not None
+                ])
+                # Invalidate the affected users' ETags (see data_version_service)
+                for user_id in sorted({row.user_id for row in page if str(row.id) in results}):
+                    await data_version_service.bump(db, user_id)
+            await db.commit()
+
+        analyzed += len(results)
+        skipped += len(page) - len(results)
+        logger.info(f"Page done: {len(results)}/{len(page)} analyzed (total {analyzed}, unresolved {skipped}); cache {sentiment_service.cache_stats}")
+
+    logger.info(f"Backfill complete: {analyzed} analyzed, {skipped} left unresolved.")
+    await async_engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--page-size", type=int, default=200, help="Entries read and committed per page")
+    parser.add_argument("--batch-size", type=int, default=sentiment_service.DEFAULT_BATCH_SIZE, help="Entries per OpenAI request")
+    asyncio.run(main(parser.parse_args()))
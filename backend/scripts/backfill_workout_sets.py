@@ -0,0 +1,65 @@
+# backend/scripts/backfill_workout_sets.py
+"""
+Populates `workout_sets` from the existing `workouts.exercises` JSONB.
+
+Walks workouts in id order (keyset) and expands each page in SQL with one
+INSERT ... SELECT over jsonb_array_elements (see workout_sets_service.BACKFILL_SQL).
+Safe to re-run: rows that already exist are skipped. With --rebuild, a user's
+rows are deleted first (e.g. after fixing bad JSONB by hand).
+
+Usage (from backend/):
+    python -m scripts.backfill_workout_sets                      # all workouts
+    python -m scripts.backfill_workout_sets --user <uuid> --rebuild
+"""
+import argparse
+import logging
+import uuid
+
+from sqlalchemy import delete, select
+
+from db.session import SessionLocal
+from models.workout import Workout, WorkoutSet
+from services.workout_sets_service import BACKFILL_SQL
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def main(args):
+    user_id = uuid.UUID(args.user) if args.user else None
+    last_id = None
+    workouts = inserted = 0
+
+    with SessionLocal() as db:
+        if args.rebuild:
+            if user_id is None:
+                raise SystemExit("--rebuild requires --user")
+            db.execute(delete(WorkoutSet).where(WorkoutSet.user_id == user_id))
+            db.commit()
+
+        while True:
+            query = select(Workout.id).order_by(Workout.id).limit(args.page_size)
+            if user_id is not None:
+                query = query.where(Workout.user_id == user_id)
+            if last_id is not None:
+                query = query.where(Workout.id > last_id)
+            ids = db.scalars(query).all()
+            if not ids:
+                break
+            last_id = ids[-1]
+
+            result = db.execute(BACKFILL_SQL, {"workout_ids": list(ids)})
+            db.commit()
+            workouts += len(ids)
+            inserted += result.rowcount
+            logger.info(f"{workouts} workouts scanned, {inserted} set rows inserted")
+
+    logger.info(f"Done: {inserted} set rows inserted for {workouts} workouts.")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--user", help="Only backfill this user ID")
+    parser.add_argument("--rebuild", action="store_true", help="Delete the user's set rows first (requires --user)")
+    parser.add_argument("--page-size", type=int, default=1000, help="Workouts per INSERT ... SELECT")
+    main(parser.parse_args())
@@ -0,0 +1,57 @@
+# backend/scripts/fix_timestamp_defaults.py
+"""
+Repairs `DEFAULT now()` on tables created by create_all while the models declared
+server_default='now()' as a quoted string. Postgres evaluated that literal once, at
+CREATE TABLE, so every later row got the table's creation time instead of its own.
+
+For every model column whose server default is now() this sets the column default
+back to the function. Rows already written keep their (frozen) value - they can't be
+recovered from the database alone.
+
+Idempotent: re-running just sets the same defaults again.
+
+Usage (from backend/):
+    python -m scripts.fix_timestamp_defaults [--dry-run]
+"""
+import argparse
+import logging
+
+from sqlalchemy import inspect, text
+
+import db.base # noqa: F401 - registers every model on Base.metadata
+from db.session import Base, engine
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def now_default_columns():
+    """ (table, column) of every model column declared with server_default=func.now(). """
+    for table in Base.metadata.sorted_tables:
+        for column in table.columns:
+            default = column.server_default
+            if default is not None and str(getattr(default, "arg", "")) == "now()":
+                yield table.name, column.name
+
+
+def main(args):
+    existing = set(inspect(engine).get_table_names())
+    with engine.begin() as conn:
+        for table, column in now_default_columns():
+            if table not in existing:
+                continue # create_all will create it with the right default
+            current = conn.execute(text(
+                "SELECT column_default FROM information_schema.columns WHERE table_name = :table AND column_name = :column"
+            ), {"table": table, "column": column}).scalar()
+            if current == "now()":
+                continue
+            logger.info(f"{table}.{column}: default {current!r} -> now()")
+            if not args.dry_run:
+                conn.execute(text(f'ALTER TABLE {table} ALTER COLUMN "{column}" SET DEFAULT now()'))
+    logger.info("Done." if not args.dry_run else "Dry run: nothing changed.")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dry-run", action="store_true", help="Only report the defaults that would change")
+    main(parser.parse_args())
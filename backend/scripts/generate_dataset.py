@@ -0,0 +1,398 @@
+# backend/scripts/generate_dataset.py
+"""
+Generates a synthetic, production-shaped dataset and bulk-loads it with COPY.
+
+Per user (all randomness from the user's own seeded RNG, so the output depends
+only on --seed, --end and the user's index - not on --jobs or chunking):
+- workouts: a training program (full body / upper-lower / push-pull-legs), 2-6
+  sessions a week with skipped days, realistic exercises JSONB (compound lifts
+  3-8 reps, accessories 8-15, bodyweight moves) and linear progressive overload
+  with a deload after repeated stalls; matching `workout_sets` rows are written
+  directly;
+- mood entries: most days, scores that drift around a personal baseline and lift
+  on training days, journal text for a share of them with sentiment already set;
+- Spotify plays: listening sessions drawn from a shared track catalog with
+  per-user favourites; played_at is unique per user as in production.
+
+Rows are COPY'd in chunks of --chunk-users users (one transaction per chunk),
+optionally in parallel (--jobs). With --defer-indexes the secondary indexes of the
+loaded tables are dropped first and rebuilt at the end, which is much faster for
+tens of millions of rows. `personal_records` and `user_daily_aggregates` are
+derived tables: pass --derived to rebuild them afterwards (or run
+scripts.rebuild_personal_records / scripts.backfill_daily_aggregates).
+
+Usage (from backend/, DATABASE_URL pointing at a local Postgres):
+    python -m scripts.generate_dataset --users 1000 --days 365 --seed 7 --jobs 4
+    python -m scripts.generate_dataset --users 50000 --days 730 --jobs 8 --defer-indexes --derived \\
+        --end 2026-01-01 --user-ids-out users.txt      # then: benchmarks.load_test --user-ids users.txt
+"""
+import argparse
+import io
+import logging
+import math
+import random
+import sys
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, datetime, timedelta, timezone
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+import orjson
+from sqlalchemy.engine import make_url
+
+from db.session import engine, sync_database_url
+import db.base # noqa: F401 - registers every model on Base.metadata
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+LOCAL_HOSTS = ("localhost", "127.0.0.1", "::1", None)
+
+# COPY column lists, in the order the generators emit values
+COLUMNS = {
+    "workouts": ("id", "user_id", "timestamp", '"createdAt"', "updated_at", "exercises"),
+    "workout_sets": ("workout_id", "exercise_index", "set_index", "user_id", "exercise_name", "reps", "weight", "timestamp"),
+    "mood_entries": ("id", "user_id", "mood_score", "journal_text", "sentiment_label", "sentiment_intensity",
+                     "sentiment_summary", "sentiment_status", "created_at", "updated_at"),
+    "spotify_tracks": ("id", "user_id", "spotify_track_id", "played_at", "track_name", "artist_name", "album_name",
+                       "track_uri", "duration_ms", "explicit", "popularity", "created_at"),
+}
+
+# name -> (kind, starting weight as a multiple of the user's strength base, increment in kg)
+EXERCISES = {
+    "Squat": ("compound", 1.2, 5.0), "Deadlift": ("compound", 1.5, 5.0), "Bench Press": ("compound", 1.0, 2.5),
+    "Overhead Press": ("compound", 0.6, 2.5), "Barbell Row": ("compound", 0.9, 2.5),
+    "Front Squat": ("compound", 0.9, 2.5), "Romanian Deadlift": ("compound", 1.1, 5.0),
+    "Incline Bench Press": ("compound", 0.8, 2.5), "Leg Press": ("compound", 2.0, 10.0),
+    "Hip Thrust": ("compound", 1.3, 5.0), "Pull Up": ("bodyweight", 0.0, 0.0), "Chin Up": ("bodyweight", 0.0, 0.0),
+    "Dip": ("bodyweight", 0.0, 0.0), "Push Up": ("bodyweight", 0.0, 0.0),
+    "Lat Pulldown": ("accessory", 0.7, 2.5), "Seated Cable Row": ("accessory", 0.7, 2.5),
+    "Dumbbell Curl": ("accessory", 0.15, 1.0), "Tricep Pushdown": ("accessory", 0.3, 2.5),
+    "Lateral Raise": ("accessory", 0.1, 1.0), "Leg Curl": ("accessory", 0.5, 2.5),
+    "Leg Extension": ("accessory", 0.6, 2.5), "Standing Calf Raise": ("accessory", 0.8, 5.0),
+    "Face Pull": ("accessory", 0.3, 2.5), "Bulgarian Split Squat": ("accessory", 0.3, 2.0),
+}
+
+PROGRAMS = {
+    "full_body": [
+        ["Squat", "Bench Press", "Barbell Row", "Dumbbell Curl"],
+        ["Deadlift", "Overhead Press", "Pull Up", "Tricep Pushdown"],
+    ],
+    "upper_lower": [
+        ["Bench Press", "Barbell Row", "Overhead Press", "Lat Pulldown", "Dumbbell Curl"],
+        ["Squat", "Romanian Deadlift", "Leg Press", "Leg Curl", "Standing Calf Raise"],
+        ["Incline Bench Press", "Seated Cable Row", "Dip", "Lateral Raise", "Tricep Pushdown"],
+        ["Deadlift", "Front Squat", "Bulgarian Split Squat", "Leg Extension", "Hip Thrust"],
+    ],
+    "push_pull_legs": [
+        ["Bench Press", "Overhead Press", "Dip", "Lateral Raise", "Tricep Pushdown"],
+        ["Deadlift", "Pull Up", "Barbell Row", "Face Pull", "Dumbbell Curl"],
+        ["Squat", "Leg Press", "Leg Curl", "Standing Calf Raise"],
+    ],
+}
+
+JOURNAL = {
+    "low": ["Rough day, couldn't focus at work.", "Slept badly and everything felt heavy.",
+            "Skipped lunch, irritable all afternoon.", "Feeling flat and a bit lonely tonight.",
+            "Stressed about deadlines, mind racing."],
+    "mid": ["An ordinary day, nothing special.", "Busy but manageable.", "Tired in the morning, better later.",
+            "Quiet evening at home.", "Work was fine, weather was grey."],
+    "high": ["Great session today, felt strong!", "Hit a new best and I'm buzzing.",
+             "Lovely walk with friends, really relaxed.", "Productive day and good sleep.",
+             "Energy was through the roof, very happy."],
+}
+EXTRA_SENTENCES = ["Coffee helped.", "Need more sleep.", "Stretched for ten minutes.", "Long commute.",
+                   "Cooked a proper dinner.", "Music on the way home was perfect.", "Drank enough water for once."]
+WORDS = ["Night", "Summer", "Echo", "Gold", "River", "Neon", "Glass", "Fire", "Wild", "Blue", "Paper", "Moon",
+         "City", "Heart", "Electric", "Silent", "Lost", "Young", "Velvet", "Storm", "Ocean", "Dream", "Static"]
+CATALOG_TRACKS = 20000
+CATALOG_ARTISTS = 2000
+_B62 = "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz"
+
+
+# --- COPY text format ---
+
+def _copy_value(value) -> str:
+    if value is None:
+        return "\\N"
+    if isinstance(value, bool):
+        return "t" if value else "f"
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value).replace("\\", "\\\\").replace("\t", "\\t").replace("\n", "\\n").replace("\r", "\\r")
+
+
+class TableBuffer:
+    def __init__(self):
+        self.lines: List[str] = []
+
+    def add(self, *values) -> None:
+        self.lines.append("\t".join(_copy_value(v) for v in values))
+
+    def to_file(self) -> io.StringIO:
+        return io.StringIO("\n".join(self.lines) + "\n")
+
+
+# --- Generation ---
+
+def _uuid(rng: random.Random) -> uuid.UUID:
+    return uuid.UUID(int=rng.getrandbits(128), version=4)
+
+
+def user_id_for(seed: int, index: int) -> uuid.UUID:
+    return _uuid(random.Random(f"{seed}:id:{index}"))
+
+
+def build_catalog(seed: int) -> List[tuple]:
+    """ Shared Spotify catalog: (track id, name, artist, album, duration_ms, explicit, popularity). """
+    rng = random.Random(f"{seed}:catalog")
+    artists = [" ".join(rng.sample(WORDS, 2)) for _ in range(CATALOG_ARTISTS)]
+    catalog = []
+    for _ in range(CATALOG_TRACKS):
+        track_id = "".join(rng.choice(_B62) for _ in range(22))
+        artist = artists[min(CATALOG_ARTISTS - 1, int(rng.paretovariate(1.2)) - 1)] # A few artists dominate
+        catalog.append((
+            track_id, " ".join(rng.sample(WORDS, rng.randint(1, 3))), artist, f"{rng.choice(WORDS)} {rng.choice(WORDS)}",
+            rng.randint(120_000, 360_000), rng.random() < 0.15, max(0, min(100, int(rng.gauss(55, 20)))),
+        ))
+    return catalog
+
+
+def _round_weight(value: float) -> float:
+    return max(0.0, round(value / 2.5) * 2.5)
+
+
+def _workout(rng: random.Random, day: List[str], state: Dict[str, list], strength: float) -> List[dict]:
+    exercises = []
+    for name in day:
+        kind, ratio, increment = EXERCISES[name]
+        # [working weight, sessions with all reps made, stalled sessions in a row, long-term capacity]
+        entry = state.get(name)
+        if entry is None:
+            start_weight = _round_weight(strength * ratio)
+            entry = state[name] = [start_weight, 0, 0, start_weight * rng.uniform(1.15, 1.6)]
+        if kind == "bodyweight":
+            target, weight, n_sets = rng.randint(5, 15), 0.0, rng.randint(3, 4)
+        elif kind == "compound":
+            target, weight, n_sets = rng.choice([3, 5, 5, 5, 8]), entry[0], rng.randint(3, 5)
+        else:
+            target, weight, n_sets = rng.choice([8, 10, 12, 15]), entry[0], rng.randint(2, 4)
+        sets = []
+        for set_index in range(n_sets):
+            # Fatigue in later sets, and more misses as the weight nears the lifter's capacity
+            miss = 0.05 * set_index + (2.0 * max(0.0, weight / entry[3] - 0.9) if entry[3] else 0.0)
+            reps = target - (1 if rng.random() < miss else 0)
+            sets.append({"reps": max(1, reps), "weight": weight})
+        exercises.append({"name": name, "sets": sets})
+        if kind == "bodyweight":
+            continue
+        # Linear progression: add weight after two clean sessions, deload 10% after three stalls
+        if all(s["reps"] >= target for s in sets):
+            entry[1], entry[2] = entry[1] + 1, 0
+            if entry[1] >= 2:
+                entry[0], entry[1] = entry[0] + increment, 0
+        else:
+            entry[2] += 1
+            if entry[2] >= 3:
+                entry[0], entry[2] = _round_weight(entry[0] * 0.9), 0
+    return exercises
+
+
+def generate_user(seed: int, index: int, start: datetime, days: int, catalog: Sequence[tuple],
+                  buffers: Dict[str, TableBuffer]) -> None:
+    rng = random.Random(f"{seed}:user:{index}")
+    user_id = user_id_for(seed, index)
+
+    program = PROGRAMS[rng.choice(list(PROGRAMS))]
+    sessions_per_week = rng.choice([2, 3, 3, 4, 4, 5, 6])
+    training_weekdays = set(rng.sample(range(7), sessions_per_week))
+    consistency = rng.uniform(0.6, 0.98)
+    strength = rng.lognormvariate(math.log(60), 0.3) # ~ bench press working weight, kg
+    training_hour = rng.choice([6, 7, 12, 17, 18, 19, 20])
+    mood_baseline = rng.gauss(6.0, 1.0)
+    mood_probability, journal_probability = rng.uniform(0.3, 0.95), rng.uniform(0.2, 0.9)
+    listens = rng.random() < 0.7
+    plays_per_day = rng.uniform(5, 40)
+    favourites = [catalog[rng.randrange(len(catalog))] for _ in range(200)]
+
+    lift_state: Dict[str, list] = {}
+    session = 0
+    mood_drift = 0.0
+    last_play: Optional[datetime] = None
+
+    for offset in range(days):
+        day_start = start + timedelta(days=offset)
+        trained = False
+
+        if day_start.weekday() in training_weekdays and rng.random() < consistency:
+            trained = True
+            session += 1
+            exercises = _workout(rng, program[session % len(program)], lift_state, strength)
+            at = day_start + timedelta(hours=training_hour, minutes=rng.randint(0, 59), seconds=rng.randint(0, 59))
+            logged_at = at + timedelta(minutes=rng.randint(45, 90))
+            workout_id = _uuid(rng)
+            buffers["workouts"].add(workout_id, user_id, at, logged_at, logged_at,
+                                    orjson.dumps(exercises).decode())
+            for exercise_index, exercise in enumerate(exercises):
+                for set_index, set_log in enumerate(exercise["sets"]):
+                    buffers["workout_sets"].add(workout_id, exercise_index, set_index, user_id, exercise["name"],
+                                                set_log["reps"], set_log["weight"], at)
+
+        if rng.random() < mood_probability:
+            mood_drift = 0.8 * mood_drift + rng.gauss(0, 0.8)
+            score = max(1, min(10, round(mood_baseline + mood_drift + (0.7 if trained else 0) + rng.gauss(0, 1.0))))
+            at = day_start + timedelta(hours=rng.randint(19, 23), minutes=rng.randint(0, 59))
+            journal = label = intensity = summary = status = None
+            if rng.random() < journal_probability:
+                tier = "low" if score <= 4 else "high" if score >= 7 else "mid"
+                journal = " ".join([rng.choice(JOURNAL[tier])] + rng.sample(EXTRA_SENTENCES, rng.randint(0, 2)))
+                label = {"low": "Negative", "mid": "Neutral", "high": "Positive"}[tier]
+                intensity = max(1, min(10, round(abs(score - 5.5) * 2) + rng.randint(0, 2)))
+                summary, status = f"User felt {label.lower()}.", "done"
+            buffers["mood_entries"].add(_uuid(rng), user_id, score, journal, label, intensity, summary, status, at, at)
+
+        if listens:
+            plays = int(rng.gammavariate(2.0, plays_per_day / 2.0))
+            cursor = day_start + timedelta(hours=rng.randint(7, 20), minutes=rng.randint(0, 59))
+            for _ in range(plays):
+                if last_play is not None and cursor <= last_play:
+                    cursor = last_play + timedelta(seconds=1) # (user_id, played_at) is unique
+                track = rng.choice(favourites) if rng.random() < 0.7 else catalog[rng.randrange(len(catalog))]
+                track_id, name, artist, album, duration_ms, explicit, popularity = track
+                buffers["spotify_tracks"].add(
+                    _uuid(rng), user_id, track_id, cursor, name, artist, album, f"spotify:track:{track_id}",
+                    duration_ms, explicit, popularity, cursor + timedelta(minutes=rng.randint(1, 90)),
+                )
+                last_play = cursor
+                cursor += timedelta(milliseconds=duration_ms)
+                if rng.random() < 0.1: # End of a listening session
+                    cursor += timedelta(hours=rng.uniform(1, 5))
+
+
+# --- Loading ---
+
+def _dsn() -> str:
+    url = make_url(sync_database_url).set(drivername="postgresql")
+    return url.render_as_string(hide_password=False)
+
+
+_worker_state: Dict[str, object] = {}
+
+
+def _worker_init(seed: int) -> None:
+    import psycopg2
+
+    _worker_state["conn"] = psycopg2.connect(_dsn())
+    _worker_state["catalog"] = build_catalog(seed)
+
+
+def load_chunk(task: Tuple[int, int, int, datetime, int, bool]) -> Dict[str, int]:
+    """ Generates users [first, last) and COPYs them in one transaction; returns rows per table. """
+    seed, first, last, start, days, replace = task
+    conn, catalog = _worker_state["conn"], _worker_state["catalog"]
+    buffers = {table: TableBuffer() for table in COLUMNS}
+    for index in range(first, last):
+        generate_user(seed, index, start, days, catalog, buffers)
+    try:
+        with conn.cursor() as cur:
+            if replace:
+                user_ids = [str(user_id_for(seed, index)) for index in range(first, last)]
+                for table in ("workouts", "mood_entries", "spotify_tracks"): # workout_sets cascade
+                    cur.execute(f"DELETE FROM {table} WHERE user_id = ANY(%s::uuid[])", (user_ids,))
+            for table, columns in COLUMNS.items():
+                if buffers[table].lines:
+                    cur.copy_expert(f"COPY {table} ({', '.join(columns)}) FROM STDIN", buffers[table].to_file())
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    return {table: len(buffer.lines) for table, buffer in buffers.items()}
+
+
+def _secondary_indexes():
+    tables = db.base.Base.metadata.tables
+    return [index for name in COLUMNS for index in tables[name].indexes if not index.unique]
+
+
+def _chunks(args, start: datetime) -> Iterator[tuple]:
+    for first in range(0, args.users, args.chunk_users):
+        yield args.seed, first, min(args.users, first + args.chunk_users), start, args.days, args.replace
+
+
+def main(args) -> int:
+    host = make_url(sync_database_url).host
+    if host not in LOCAL_HOSTS and not args.allow_remote:
+        logger.error(f"Refusing to load into a non-local database ({host}); pass --allow-remote if you mean it.")
+        return 1
+
+    end = datetime.combine(args.end, datetime.min.time(), tzinfo=timezone.utc)
+    start = end - timedelta(days=args.days)
+    db.base.Base.metadata.create_all(bind=engine)
+
+    if args.user_ids_out:
+        with open(args.user_ids_out, "w") as f:
+            f.writelines(f"{user_id_for(args.seed, index)}\n" for index in range(args.users))
+        logger.info(f"Wrote {args.users} user IDs to {args.user_ids_out}")
+
+    indexes = _secondary_indexes() if args.defer_indexes else []
+    if indexes:
+        with engine.begin() as conn:
+            for index in indexes:
+                index.drop(bind=conn, checkfirst=True)
+        logger.info(f"Dropped {len(indexes)} secondary indexes for the load.")
+
+    logger.info(f"Generating {args.users} users x {args.days} days ({start.date()} .. {args.end}), "
+                f"seed {args.seed}, {args.jobs} job(s) ...")
+    totals = {table: 0 for table in COLUMNS}
+    started = time.perf_counter()
+    tasks = list(_chunks(args, start))
+    if args.jobs > 1:
+        with ProcessPoolExecutor(args.jobs, initializer=_worker_init, initargs=(args.seed,)) as pool:
+            results = pool.map(load_chunk, tasks)
+            for done, rows in enumerate(results, start=1):
+                totals = {table: totals[table] + rows[table] for table in totals}
+                logger.info(f"[{done}/{len(tasks)}] {sum(totals.values()):,} rows, "
+                            f"{sum(totals.values()) / (time.perf_counter() - started):,.0f} rows/s")
+    else:
+        _worker_init(args.seed)
+        for done, task in enumerate(tasks, start=1):
+            rows = load_chunk(task)
+            totals = {table: totals[table] + rows[table] for table in totals}
+            logger.info(f"[{done}/{len(tasks)}] {sum(totals.values()):,} rows, "
+                        f"{sum(totals.values()) / (time.perf_counter() - started):,.0f} rows/s")
+        _worker_state["conn"].close()
+    logger.info(f"Loaded in {time.perf_counter() - started:.1f}s: " + ", ".join(f"{t}={n:,}" for t, n in totals.items()))
+
+    if indexes:
+        index_started = time.perf_counter()
+        with engine.begin() as conn:
+            for index in indexes:
+                index.create(bind=conn, checkfirst=True)
+        logger.info(f"Rebuilt {len(indexes)} indexes in {time.perf_counter() - index_started:.1f}s.")
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        for table in COLUMNS:
+            conn.exec_driver_sql(f"ANALYZE {table}")
+
+    if args.derived:
+        from scripts import backfill_daily_aggregates, rebuild_personal_records
+        rebuild_personal_records.main(argparse.Namespace(user=None, verify=False))
+        backfill_daily_aggregates.main(argparse.Namespace(user=None))
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=100)
+    parser.add_argument("--days", type=int, default=365, help="History depth per user")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--end", type=date.fromisoformat, default=datetime.now(timezone.utc).date(),
+                        help="Last day of history, YYYY-MM-DD (default: today; fix it for byte-identical reruns)")
+    parser.add_argument("--jobs", type=int, default=1, help="Parallel generator/loader processes")
+    parser.add_argument("--chunk-users", type=int, default=20, help="Users per COPY transaction")
+    parser.add_argument("--replace", action="store_true", help="Delete the generated users' existing rows first")
+    parser.add_argument("--defer-indexes", action="store_true", help="Drop secondary indexes during the load")
+    parser.add_argument("--derived", action="store_true", help="Rebuild personal_records and daily aggregates afterwards")
+    parser.add_argument("--user-ids-out", default=None, help="Write the generated user IDs here, one per line")
+    parser.add_argument("--allow-remote", action="store_true")
+    sys.exit(main(parser.parse_args()))
@@ -0,0 +1,111 @@
+# backend/scripts/rebuild_personal_records.py
+"""
+Recomputes `personal_records` by brute force from every workout's exercises JSONB.
+
+The fold uses records_service.workout_bests/merge_bests - the Python twin of the
+incremental upsert - so results don't depend on the order workouts were logged.
+
+    --verify   compare the stored table with the brute-force result and report
+               differences; writes nothing. Exits non-zero on any mismatch, so it
+               can run in CI against a seeded database.
+
+Usage (from backend/):
+    python -m scripts.rebuild_personal_records                   # rebuild all users
+    python -m scripts.rebuild_personal_records --user <uuid>
+    python -m scripts.rebuild_personal_records --verify
+"""
+import argparse
+import logging
+import math
+import sys
+import uuid
+from typing import Dict, List
+
+from sqlalchemy import delete, select
+
+from db.session import SessionLocal
+from models.workout import PersonalRecord, Workout
+from services.records_service import METRICS, merge_bests, upsert_records_stmt, workout_bests
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = 1000
+
+
+def brute_force_records(db, user_id: uuid.UUID) -> Dict[str, dict]:
+    records: Dict[str, dict] = {}
+    workouts = db.execute(
+        select(Workout.id, Workout.timestamp, Workout.exercises).where(Workout.user_id == user_id, Workout.deleted_at.is_(None))
+        .execution_options(yield_per=BATCH_SIZE)
+    )
+    for workout_id, timestamp, exercises in workouts:
+        for name, row in workout_bests(workout_id, timestamp, exercises).items():
+            records[name] = merge_bests(records.get(name), row)
+    return records
+
+
+def rebuild_user(db, user_id: uuid.UUID) -> int:
+    records = brute_force_records(db, user_id)
+    db.execute(delete(PersonalRecord).where(PersonalRecord.user_id == user_id))
+    rows = list(records.values())
+    for start in range(0, len(rows), BATCH_SIZE):
+        db.execute(upsert_records_stmt(user_id, rows[start:start + BATCH_SIZE]))
+    db.commit()
+    return len(rows)
+
+
+def verify_user(db, user_id: uuid.UUID) -> List[str]:
+    """ Differences between the stored records and the brute-force recomputation. """
+    expected = brute_force_records(db, user_id)
+    stored = {r.exercise_name: r for r in db.scalars(select(PersonalRecord).where(PersonalRecord.user_id == user_id))}
+    problems = []
+    for name in sorted(set(expected) | set(stored)):
+        if name not in stored:
+            problems.append(f"user {user_id} / '{name}': missing from personal_records")
+            continue
+        if name not in expected:
+            problems.append(f"user {user_id} / '{name}': stored but no workout has it")
+            continue
+        for columns in METRICS.values():
+            for col in columns:
+                want, got = expected[name][col], getattr(stored[name], col)
+                same = math.isclose(want, got, rel_tol=1e-9) if isinstance(want, float) else want == got
+                if not same:
+                    problems.append(f"user {user_id} / '{name}': {col} stored={got!r} expected={want!r}")
+    return problems
+
+
+def main(args) -> int:
+    with SessionLocal() as db:
+        if args.user:
+            user_ids = [uuid.UUID(args.user)]
+        else:
+            user_ids = db.scalars(select(Workout.user_id).distinct()).all()
+
+        mismatches = 0
+        for index, user_id in enumerate(user_ids, start=1):
+            if args.verify:
+                problems = verify_user(db, user_id)
+                mismatches += len(problems)
+                for problem in problems:
+                    logger.warning(problem)
+                continue
+            try:
+                written = rebuild_user(db, user_id)
+                logger.info(f"[{index}/{len(user_ids)}] user {user_id}: {written} exercise records")
+            except Exception as e:
+                db.rollback()
+                logger.error(f"Failed to rebuild records for user {user_id}: {e}", exc_info=True)
+
+    if args.verify:
+        logger.info(f"Verified {len(user_ids)} user(s): {mismatches} mismatch(es).")
+        return 1 if mismatches else 0
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--user", help="Only this user ID")
+    parser.add_argument("--verify", action="store_true", help="Compare stored records with a brute-force recomputation")
+    sys.exit(main(parser.parse_args()))
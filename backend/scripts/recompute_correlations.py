@@ -0,0 +1,87 @@
+# backend/scripts/recompute_correlations.py
+"""
+Nightly recomputation of mood-vs-training correlation reports for many users.
+
+Users are fanned out over a process pool: each worker loads one user's history
+into NumPy arrays, computes the report and hands it back; the parent writes
+the results in batches.
+
+Usage (from backend/):
+    python -m scripts.recompute_correlations                  # all users
+    python -m scripts.recompute_correlations --workers 8 --chunksize 16
+    python -m scripts.recompute_correlations --user <uuid>
+"""
+import argparse
+import logging
+import os
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Optional, Tuple
+
+from sqlalchemy import select, union
+
+from db.session import SessionLocal, engine
+from models.mood import MoodEntry
+from models.workout import Workout
+from services import analytics_service
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+WRITE_BATCH_SIZE = 200
+
+
+def _init_worker():
+    # Pooled connections inherited over fork must not be shared with the parent
+    engine.dispose(close=False)
+
+
+def _compute_for_user(user_id: uuid.UUID) -> Tuple[uuid.UUID, Optional[Dict], Optional[str]]:
+    """ Worker entry point: returns (user_id, report | None, error | None). """
+    try:
+        with SessionLocal() as db:
+            series = analytics_service.load_daily_series_sync(db, user_id)
+        if series is None:
+            return user_id, None, None
+        return user_id, analytics_service.compute_correlation_report(series), None
+    except Exception as e:
+        return user_id, None, repr(e)
+
+
+def main(args):
+    with SessionLocal() as db:
+        if args.user:
+            user_ids = [uuid.UUID(args.user)]
+        else:
+            user_ids = db.scalars(union(select(Workout.user_id), select(MoodEntry.user_id))).all()
+
+    logger.info(f"Recomputing correlation reports for {len(user_ids)} user(s) with {args.workers} worker(s)...")
+    written = failed = skipped = 0
+
+    with ProcessPoolExecutor(max_workers=args.workers, initializer=_init_worker) as pool, SessionLocal() as db:
+        pending = 0
+        for user_id, report, error in pool.map(_compute_for_user, user_ids, chunksize=args.chunksize):
+            if error:
+                failed += 1
+                logger.error(f"User {user_id}: {error}")
+                continue
+            if report is None:
+                skipped += 1
+                continue
+            db.execute(analytics_service.upsert_report_stmt(user_id, report))
+            written += 1
+            pending += 1
+            if pending >= WRITE_BATCH_SIZE:
+                db.commit()
+                pending = 0
+        db.commit()
+
+    logger.info(f"Done: {written} written, {skipped} without data, {failed} failed.")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--user", help="Only recompute this user ID")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--chunksize", type=int, default=8, help="Users handed to a worker per task")
+    main(parser.parse_args())
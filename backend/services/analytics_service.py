@@ -0,0 +1,240 @@
+# backend/services/analytics_service.py
+"""
+Columnar mood-vs-training analytics.
+
+A user's history is loaded ONCE into aligned per-day NumPy arrays (one slot per
+UTC day from first to last activity), then every statistic is computed with
+vectorized array operations - no per-row Python loops.
+"""
+import logging
+import uuid
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+from sqlalchemy import func, text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+from models.insight import CorrelationReport
+
+logger = logging.getLogger(__name__)
+
+# Keywords used to tag an exercise as lower-body ("leg day"). Matched on lowercase names.
+LEG_KEYWORDS = ("squat", "leg", "lunge", "deadlift", "calf", "hamstring", "glute", "hip thrust", "step up")
+
+# Signed sentiment: intensity * sign(label), so "very negative" and "very positive" don't correlate alike.
+SENTIMENT_SIGN = {"positive": 1.0, "neutral": 0.0, "negative": -1.0}
+
+ROLLING_WINDOWS = (7, 28)
+MAX_LAG_DAYS = 7
+
+# One row per logged set, flattened in SQL so Python never walks the JSONB.
+SET_ROWS_SQL = text("""
+    SELECT (w.timestamp AT TIME ZONE 'UTC')::date AS day,
+           ex->>'name'                          AS exercise_name,
+           COALESCE((s->>'reps')::float, 0)     AS reps,
+           COALESCE((s->>'weight')::float, 0)   AS weight
+    FROM workouts w
+    CROSS JOIN LATERAL jsonb_array_elements(COALESCE(w.exercises, '[]'::jsonb)) AS ex
+    CROSS JOIN LATERAL jsonb_array_elements(COALESCE(ex->'sets', '[]'::jsonb)) AS s
+    WHERE w.user_id = :user_id AND w.deleted_at IS NULL
+""")
+
+MOOD_ROWS_SQL = text("""
+    SELECT (created_at AT TIME ZONE 'UTC')::date AS day,
+           mood_score, sentiment_label, sentiment_intensity
+    FROM mood_entries
+    WHERE user_id = :user_id AND deleted_at IS NULL
+""")
+
+
+@dataclass
+class DailySeries:
+    """ Aligned per-day arrays; NaN marks a day without mood data. """
+    days: np.ndarray        # datetime64[D]
+    volume: np.ndarray      # total reps*weight per day (0 on rest days)
+    leg_volume: np.ndarray  # lower-body share of `volume`
+    mood: np.ndarray        # mean mood_score per day
+    sentiment: np.ndarray   # mean signed sentiment intensity per day
+
+
+# --- Loading ---
+
+def _columns(rows: Sequence[tuple], width: int) -> List[np.ndarray]:
+    """ Transposes DB rows into object columns in one C-level pass. """
+    if not rows:
+        return [np.empty(0, dtype=object) for _ in range(width)]
+    table = np.array(rows, dtype=object).reshape(len(rows), width)
+    return [table[:, i] for i in range(width)]
+
+
+def build_daily_series(set_rows: Sequence[tuple], mood_rows: Sequence[tuple]) -> Optional[DailySeries]:
+    """ Builds the aligned per-day arrays from (day, name, reps, weight) and (day, score, label, intensity) rows. """
+    set_day, set_name, reps, weight = _columns(set_rows, 4)
+    mood_day, score, label, intensity = _columns(mood_rows, 4)
+
+    set_day = set_day.astype("datetime64[D]")
+    mood_day = mood_day.astype("datetime64[D]")
+    all_days = np.concatenate([set_day, mood_day])
+    if all_days.size == 0:
+        return None
+
+    start = all_days.min()
+    n_days = int((all_days.max() - start).astype(int)) + 1
+    days = start + np.arange(n_days)
+
+    # Training: bincount scatters each set's volume into its day slot
+    set_idx = (set_day - start).astype(np.int64)
+    set_volume = reps.astype(float) * weight.astype(float)
+    names, name_idx = np.unique(set_name.astype(str), return_inverse=True)
+    lowered = np.char.lower(names)
+    is_leg_name = np.zeros(names.size, dtype=bool)
+    for keyword in LEG_KEYWORDS: # loops over keywords, not rows
+        is_leg_name |= np.char.find(lowered, keyword) >= 0
+    volume = np.bincount(set_idx, weights=set_volume, minlength=n_days)
+    leg_volume = np.bincount(set_idx, weights=set_volume * is_leg_name[name_idx], minlength=n_days)
+
+    # Mood: per-day mean via sum / count
+    mood_idx = (mood_day - start).astype(np.int64)
+    mood_counts = np.bincount(mood_idx, minlength=n_days)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mood = np.bincount(mood_idx, weights=score.astype(float), minlength=n_days) / mood_counts
+
+        # Map labels through their (few) distinct values; None intensity/label -> NaN
+        labels, label_idx = np.unique(np.char.lower(label.astype(str)), return_inverse=True)
+        label_sign = np.array([SENTIMENT_SIGN.get(v, np.nan) for v in labels], dtype=float)
+        signed = label_sign[label_idx] * intensity.astype(float)
+        has_sentiment = ~np.isnan(signed)
+        sentiment = (
+            np.bincount(mood_idx[has_sentiment], weights=signed[has_sentiment], minlength=n_days)
+            / np.bincount(mood_idx[has_sentiment], minlength=n_days)
+        )
+
+    return DailySeries(days=days, volume=volume, leg_volume=leg_volume, mood=mood, sentiment=sentiment)
+
+
+async def load_daily_series(db, user_id: uuid.UUID) -> Optional[DailySeries]:
+    """ Async loader for request handlers (AsyncSession). """
+    set_rows = (await db.execute(SET_ROWS_SQL, {"user_id": user_id})).all()
+    mood_rows = (await db.execute(MOOD_ROWS_SQL, {"user_id": user_id})).all()
+    return build_daily_series(set_rows, mood_rows)
+
+
+def load_daily_series_sync(db, user_id: uuid.UUID) -> Optional[DailySeries]:
+    """ Sync loader for scripts / the nightly batch (Session). """
+    set_rows = db.execute(SET_ROWS_SQL, {"user_id": user_id}).all()
+    mood_rows = db.execute(MOOD_ROWS_SQL, {"user_id": user_id}).all()
+    return build_daily_series(set_rows, mood_rows)
+
+
+# --- Vectorized statistics ---
+
+def pearson(x: np.ndarray, y: np.ndarray, min_pairs: int = 3) -> Optional[float]:
+    """ NaN-aware Pearson r over the days where both series have data. """
+    mask = ~(np.isnan(x) | np.isnan(y))
+    if mask.sum() < min_pairs:
+        return None
+    xm, ym = x[mask], y[mask]
+    xd, yd = xm - xm.mean(), ym - ym.mean()
+    denom = np.sqrt((xd * xd).sum() * (yd * yd).sum())
+    return float((xd * yd).sum() / denom) if denom > 0 else None
+
+
+def shift(values: np.ndarray, lag: int) -> np.ndarray:
+    """ shift(y, k)[t] == y[t + k]; slots past the end become NaN. """
+    if lag == 0:
+        return values
+    out = np.full_like(values, np.nan, dtype=float)
+    out[:-lag] = values[lag:]
+    return out
+
+
+def lagged_correlations(x: np.ndarray, y: np.ndarray, max_lag: int = MAX_LAG_DAYS) -> List[Optional[float]]:
+    """ r(x[t], y[t + lag]) for lag = 0..max_lag (e.g. training today vs mood `lag` days later). """
+    return [pearson(x, shift(y, lag)) for lag in range(max_lag + 1)]
+
+
+def rolling_correlation(x: np.ndarray, y: np.ndarray, window: int, min_pairs: int = 3) -> np.ndarray:
+    """
+    Trailing-window Pearson r for every day, via cumulative sums (O(n), no per-window loop).
+    Days whose window has fewer than `min_pairs` paired observations are NaN.
+    """
+    mask = ~(np.isnan(x) | np.isnan(y))
+    xv, yv = np.where(mask, x, 0.0), np.where(mask, y, 0.0)
+
+    def window_sum(values):
+        c = np.concatenate([[0.0], np.cumsum(values)])
+        return c[window:] - c[:-window] if values.size >= window else np.empty(0)
+
+    n = window_sum(mask.astype(float))
+    sx, sy = window_sum(xv), window_sum(yv)
+    sxx, syy, sxy = window_sum(xv * xv), window_sum(yv * yv), window_sum(xv * yv)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        cov = sxy - sx * sy / n
+        var = (sxx - sx * sx / n) * (syy - sy * sy / n)
+        r = cov / np.sqrt(var)
+    r[(n < min_pairs) | ~(var > 0)] = np.nan
+
+    out = np.full(x.size, np.nan)
+    out[window - 1:] = r
+    return out
+
+
+def _round(value: Optional[float]) -> Optional[float]:
+    return None if value is None or np.isnan(value) else round(float(value), 4)
+
+
+def compute_correlation_report(series: DailySeries, heavy_quantile: float = 0.75) -> Dict:
+    """ All dashboard statistics for one user, computed from the aligned arrays. """
+    volume, leg_volume, mood, sentiment = series.volume, series.leg_volume, series.mood, series.sentiment
+    next_day_mood = shift(mood, 1)
+
+    # "Heavy leg day": leg volume at or above the user's own upper quantile of non-zero leg days
+    leg_days = leg_volume > 0
+    heavy_leg = np.zeros_like(leg_days)
+    if leg_days.any():
+        heavy_leg = leg_volume >= np.quantile(leg_volume[leg_days], heavy_quantile)
+    has_next_mood = ~np.isnan(next_day_mood)
+
+    def mean_where(mask) -> Optional[float]:
+        selected = next_day_mood[mask & has_next_mood]
+        return float(selected.mean()) if selected.size else None
+
+    rolling = {}
+    for window in ROLLING_WINDOWS:
+        r = rolling_correlation(volume, mood, window)
+        valid = r[~np.isnan(r)]
+        rolling[f"{window}d"] = {
+            "latest": _round(valid[-1]) if valid.size else None,
+            "mean": _round(valid.mean()) if valid.size else None,
+        }
+
+    return {
+        "first_day": str(series.days[0]),
+        "last_day": str(series.days[-1]),
+        "days": int(series.days.size),
+        "training_days": int((volume > 0).sum()),
+        "mood_days": int((~np.isnan(mood)).sum()),
+        "volume_vs_mood": _round(pearson(volume, mood)),
+        "volume_vs_next_day_mood": _round(pearson(volume, next_day_mood)),
+        "volume_vs_sentiment": _round(pearson(volume, sentiment)),
+        "leg_volume_vs_next_day_mood": _round(pearson(leg_volume, next_day_mood)),
+        "lagged_volume_vs_mood": [_round(r) for r in lagged_correlations(volume, mood)],
+        "lagged_volume_vs_sentiment": [_round(r) for r in lagged_correlations(volume, sentiment)],
+        "mood_after_heavy_leg_day": _round(mean_where(heavy_leg)),
+        "mood_after_other_days": _round(mean_where(~heavy_leg)),
+        "heavy_leg_day_count": int(heavy_leg.sum()),
+        "rolling_volume_vs_mood": rolling,
+    }
+
+
+# --- Persistence ---
+
+def upsert_report_stmt(user_id: uuid.UUID, report: Dict):
+    """ INSERT ... ON CONFLICT (user_id) DO UPDATE for the stored report (usable by sync and async sessions). """
+    stmt = pg_insert(CorrelationReport).values(user_id=user_id, report=report)
+    return stmt.on_conflict_do_update(
+        index_elements=[CorrelationReport.user_id],
+        set_={"report": stmt.excluded.report, "computed_at": func.now()},
+    )
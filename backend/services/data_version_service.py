@@ -0,0 +1,175 @@
+# backend/services/data_version_service.py
+"""
+Per-user data version for conditional GETs (ETag / Last-Modified / 304).
+
+Writers call `bump(db, user_id)` inside their transaction; it upserts the user's
+`user_data_versions.updated_at` and, once the transaction COMMITS, publishes the
+new value to this process's in-memory map (an after_commit session hook - never
+before, or a reader could pair a new ETag with old data).
+
+Readers call `validators_for(...)` before running their query. The version comes
+from memory when it is at most DATA_VERSION_TTL_SECONDS old, else from one
+primary-key lookup - either way far cheaper than the list query + serialization
+a 304 avoids. Writes made by other worker processes become visible here within
+that TTL.
+"""
+import hashlib
+import logging
+import time
+import uuid
+from collections import OrderedDict
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Dict, Optional, Tuple
+
+from fastapi import Request, Response, status
+from sqlalchemy import event, func, literal_column, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from core.config import settings
+from models.data_version import UserDataVersion
+
+logger = logging.getLogger(__name__)
+
+_PENDING_KEY = "pending_data_versions" # Session.info key: versions to publish on commit
+
+
+class DataVersionCache:
+    """ Bounded LRU of user_id -> (version | None, loaded at). """
+
+    def __init__(self, maxsize: int, ttl_seconds: float):
+        self.maxsize = maxsize
+        self.ttl = ttl_seconds
+        self._entries: "OrderedDict[uuid.UUID, Tuple[Optional[datetime], float]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, user_id: uuid.UUID) -> Tuple[bool, Optional[datetime]]:
+        """ (found, version); found is False when absent or older than the TTL. """
+        entry = self._entries.get(user_id)
+        if entry is None or time.monotonic() - entry[1] > self.ttl:
+            self.misses += 1
+            return False, None
+        self._entries.move_to_end(user_id)
+        self.hits += 1
+        return True, entry[0]
+
+    def put(self, user_id: uuid.UUID, version: Optional[datetime]) -> None:
+        if self.maxsize <= 0:
+            return
+        current = self._entries.get(user_id)
+        if current is not None and current[0] is not None and version is not None and version < current[0]:
+            version = current[0] # Never move backwards (a slower reader racing a local write)
+        self._entries[user_id] = (version, time.monotonic())
+        self._entries.move_to_end(user_id)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def stats(self) -> Dict[str, int]:
+        return {"size": len(self._entries), "maxsize": self.maxsize, "hits": self.hits, "misses": self.misses}
+
+
+data_versions = DataVersionCache(settings.DATA_VERSION_CACHE_SIZE, settings.DATA_VERSION_TTL_SECONDS)
+
+
+# --- Writers ---
+
+def _bump_stmt(user_id: uuid.UUID):
+    stmt = pg_insert(UserDataVersion).values(user_id=user_id, updated_at=func.clock_timestamp())
+    table = UserDataVersion.__table__.c
+    return stmt.on_conflict_do_update(
+        index_elements=[table.user_id],
+        # Strictly increasing even if clocks of different DB sessions tie
+        set_={"updated_at": func.greatest(stmt.excluded.updated_at, table.updated_at + literal_column("interval '1 microsecond'"))},
+    ).returning(table.updated_at)
+
+
+async def bump(db: AsyncSession, user_id: uuid.UUID) -> datetime:
+    """ Marks the user's data as changed. Runs in the caller's transaction (no commit). """
+    version = (await db.execute(_bump_stmt(user_id))).scalar_one()
+    db.info.setdefault(_PENDING_KEY, {})[user_id] = version
+    return version
+
+
+@event.listens_for(Session, "after_commit")
+def _publish_committed_versions(session: Session) -> None:
+    for user_id, version in session.info.pop(_PENDING_KEY, {}).items():
+        data_versions.put(user_id, version)
+
+
+@event.listens_for(Session, "after_rollback")
+def _drop_pending_versions(session: Session) -> None:
+    session.info.pop(_PENDING_KEY, None)
+
+
+# --- Readers ---
+
+async def current_version(db: AsyncSession, user_id: uuid.UUID) -> Optional[datetime]:
+    """ The user's data version, or None if they have never written since versions were introduced. """
+    found, version = data_versions.get(user_id)
+    if found:
+        return version
+    version = await db.scalar(select(UserDataVersion.updated_at).where(UserDataVersion.user_id == user_id))
+    data_versions.put(user_id, version)
+    return version
+
+
+def _opaque(tag: str) -> str:
+    tag = tag.strip()
+    return tag[2:] if tag.startswith("W/") else tag
+
+
+class CacheValidators:
+    """ ETag / Last-Modified for one response of one user at one data version. """
+
+    def __init__(self, version: datetime, variant: str):
+        self.version = version
+        digest = hashlib.blake2s(variant.encode(), digest_size=6).hexdigest()
+        micros = int(version.timestamp() * 1_000_000)
+        self.etag = f'W/"{micros:x}-{digest}"'
+        self.last_modified = format_datetime(version.astimezone(timezone.utc).replace(microsecond=0), usegmt=True)
+
+    @property
+    def headers(self) -> Dict[str, str]:
+        # no-cache = store, but revalidate every time (which the 304 makes cheap)
+        return {"ETag": self.etag, "Last-Modified": self.last_modified, "Cache-Control": "private, no-cache"}
+
+    def matches(self, request: Request) -> bool:
+        """ True if the client's cached copy is current (If-None-Match wins over If-Modified-Since). """
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match is not None:
+            if if_none_match.strip() == "*":
+                return True
+            mine = _opaque(self.etag)
+            return any(_opaque(tag) == mine for tag in if_none_match.split(","))
+
+        if_modified_since = request.headers.get("if-modified-since")
+        if if_modified_since:
+            try:
+                since = parsedate_to_datetime(if_modified_since)
+            except (TypeError, ValueError):
+                return False
+            if since.tzinfo is None:
+                since = since.replace(tzinfo=timezone.utc)
+            return self.version.replace(microsecond=0) <= since
+        return False
+
+    def not_modified_response(self) -> Response:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=self.headers)
+
+    def apply(self, response: Response) -> None:
+        response.headers.update(self.headers)
+
+
+async def validators_for(request: Request, db: AsyncSession, user_id: uuid.UUID, extra: str = "") -> Optional[CacheValidators]:
+    """
+    Validators for this request, or None if the user has no version yet.
+    The ETag varies with the path, the query string and `extra` (e.g. today's date
+    for responses that also depend on the clock).
+    """
+    version = await current_version(db, user_id)
+    if version is None:
+        return None
+    return CacheValidators(version, f"{request.url.path}?{request.url.query}|{extra}")
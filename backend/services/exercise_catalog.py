@@ -0,0 +1,34 @@
+# backend/services/exercise_catalog.py
+"""
+Canonical exercise names offered by autocomplete to every user
+(services/exercise_suggest_service.py). Spelling here is the suggested spelling;
+matching is case- and whitespace-insensitive. Starts with the mobile app's
+built-in list (log_workout_screen.dart).
+"""
+
+EXERCISE_CATALOG = (
+    # Mobile app defaults
+    "Squat", "Bench Press", "Deadlift", "Overhead Press", "Barbell Row",
+    "Pull Up", "Lat Pulldown", "Leg Press",
+    # Legs
+    "Front Squat", "Goblet Squat", "Hack Squat", "Bulgarian Split Squat", "Lunge", "Walking Lunge",
+    "Romanian Deadlift", "Sumo Deadlift", "Stiff Leg Deadlift", "Hip Thrust", "Glute Bridge",
+    "Leg Extension", "Leg Curl", "Seated Leg Curl", "Standing Calf Raise", "Seated Calf Raise",
+    "Step Up", "Box Jump",
+    # Chest
+    "Incline Bench Press", "Decline Bench Press", "Close Grip Bench Press", "Dumbbell Bench Press",
+    "Incline Dumbbell Press", "Dumbbell Fly", "Cable Fly", "Chest Dip", "Push Up", "Machine Chest Press",
+    # Back
+    "Chin Up", "Pendlay Row", "Dumbbell Row", "Seated Cable Row", "T-Bar Row", "Face Pull",
+    "Straight Arm Pulldown", "Rack Pull", "Good Morning", "Back Extension", "Shrug",
+    # Shoulders
+    "Seated Dumbbell Press", "Arnold Press", "Push Press", "Lateral Raise", "Front Raise",
+    "Rear Delt Fly", "Upright Row",
+    # Arms
+    "Barbell Curl", "Dumbbell Curl", "Hammer Curl", "Preacher Curl", "Cable Curl",
+    "Tricep Pushdown", "Skull Crusher", "Overhead Tricep Extension", "Dip",
+    # Core
+    "Plank", "Hanging Leg Raise", "Cable Crunch", "Ab Wheel Rollout", "Russian Twist", "Sit Up",
+    # Olympic / full body
+    "Power Clean", "Clean and Jerk", "Snatch", "Kettlebell Swing", "Thruster", "Farmer's Walk",
+)
@@ -0,0 +1,173 @@
+# backend/services/exercise_suggest_service.py
+"""
+In-process exercise-name autocomplete (GET /workouts/exercises/suggest).
+
+Two prefix indexes are consulted per request, neither touching the database:
+- the global catalog (services/exercise_catalog.py), built once at import;
+- the user's own section: names they have logged with how often, loaded lazily
+  from `workout_sets` on first use, kept in a bounded LRU, and updated in place
+  by create_workout.
+
+Each index is a sorted array of (search key, name key) pairs searched with two
+bisects. Every word suffix of a name is a search key, so "press" also finds
+"Bench Press". Matching ignores case and repeated whitespace.
+
+The cache is per process: another worker only sees a new name once its copy of the
+user's section is evicted and reloaded.
+"""
+import bisect
+import heapq
+import logging
+import uuid
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Tuple
+
+from sqlalchemy import distinct, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.config import settings
+from models.workout import WorkoutSet
+from schemas.workout import ExerciseSuggestion
+from services.exercise_catalog import EXERCISE_CATALOG
+
+logger = logging.getLogger(__name__)
+
+_KEY_END = "\U0010ffff" # Sorts after any character a key can contain
+
+
+def normalize_name(name: str) -> str:
+    return " ".join(name.split()).casefold()
+
+
+def _search_keys(name_key: str) -> List[str]:
+    words = name_key.split(" ")
+    return [" ".join(words[i:]) for i in range(len(words))]
+
+
+class PrefixIndex:
+    """ Sorted (search key, name key) array + name key -> [display name, count]. """
+
+    def __init__(self):
+        self._keys: List[Tuple[str, str]] = []
+        self.names: Dict[str, list] = {}
+
+    @classmethod
+    def build(cls, names_with_counts: Iterable[Tuple[str, int]]) -> "PrefixIndex":
+        index = cls()
+        for name, count in names_with_counts:
+            key = normalize_name(name)
+            if not key:
+                continue
+            if key in index.names:
+                index.names[key][1] += count # Case/spacing variant of a name already seen
+            else:
+                index.names[key] = [name, count]
+        index._keys = sorted((search_key, key) for key in index.names for search_key in _search_keys(key))
+        return index
+
+    def add(self, name: str, count: int = 1) -> None:
+        key = normalize_name(name)
+        if not key:
+            return
+        entry = self.names.get(key)
+        if entry is not None:
+            entry[1] += count
+            return
+        self.names[key] = [name, count]
+        for search_key in _search_keys(key):
+            bisect.insort(self._keys, (search_key, key))
+
+    def matches(self, prefix_key: str) -> Dict[str, bool]:
+        """ name key -> True if the whole name starts with the prefix (vs. a later word). """
+        lo = bisect.bisect_left(self._keys, (prefix_key,))
+        hi = bisect.bisect_left(self._keys, (prefix_key + _KEY_END,))
+        found: Dict[str, bool] = {}
+        for search_key, key in self._keys[lo:hi]:
+            found[key] = found.get(key, False) or search_key == key
+        return found
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+
+class ExerciseSuggestIndex:
+    def __init__(self, catalog: Iterable[str], max_users: int = 1024):
+        self.catalog = PrefixIndex.build((name, 0) for name in catalog)
+        self.max_users = max_users
+        self._users: "OrderedDict[uuid.UUID, PrefixIndex]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    async def _load_user(self, db: AsyncSession, user_id: uuid.UUID) -> PrefixIndex:
+        result = await db.execute(
+            select(WorkoutSet.exercise_name, func.count(distinct(WorkoutSet.workout_id)).label("workouts"))
+            .where(WorkoutSet.user_id == user_id)
+            .group_by(WorkoutSet.exercise_name)
+            .order_by(func.count(distinct(WorkoutSet.workout_id)).desc()) # Most used spelling becomes the display name
+        )
+        return PrefixIndex.build(result.all())
+
+    async def user_section(self, db: AsyncSession, user_id: uuid.UUID) -> PrefixIndex:
+        section = self._users.get(user_id)
+        if section is not None:
+            self._users.move_to_end(user_id)
+            self.hits += 1
+            return section
+
+        self.misses += 1
+        section = await self._load_user(db, user_id)
+        if self.max_users > 0:
+            self._users[user_id] = section
+            while len(self._users) > self.max_users:
+                self._users.popitem(last=False)
+                self.evictions += 1
+        return section
+
+    def record_names(self, user_id: uuid.UUID, names: Iterable[str]) -> None:
+        """ A workout with these exercises was committed: bump counts if the user's section is loaded. """
+        section = self._users.get(user_id)
+        if section is None:
+            return # Built from the DB (including this workout) on next use
+        for name in {normalize_name(n): n for n in names}.values(): # Once per workout, however often it appears
+            section.add(name)
+
+    def invalidate(self, user_id: uuid.UUID) -> None:
+        self._users.pop(user_id, None)
+
+    async def suggest(self, db: AsyncSession, user_id: uuid.UUID, prefix: str, limit: int = 10) -> List[ExerciseSuggestion]:
+        """
+        The user's own names first (most logged first), then catalog names not already
+        listed. Within each group, names that start with the prefix beat names where a
+        later word matches.
+        """
+        prefix_key = normalize_name(prefix)
+        section = await self.user_section(db, user_id)
+
+        user_matches = section.matches(prefix_key)
+        ranked_user = heapq.nsmallest(
+            limit, user_matches.items(),
+            key=lambda item: (-section.names[item[0]][1], not item[1], item[0]),
+        )
+        suggestions = [
+            ExerciseSuggestion(name=section.names[key][0], source="user", count=section.names[key][1])
+            for key, _ in ranked_user
+        ]
+        if len(suggestions) < limit:
+            catalog_matches = [item for item in self.catalog.matches(prefix_key).items() if item[0] not in user_matches]
+            for key, _ in heapq.nsmallest(limit - len(suggestions), catalog_matches, key=lambda item: (not item[1], item[0])):
+                suggestions.append(ExerciseSuggestion(name=self.catalog.names[key][0], source="catalog", count=0))
+        return suggestions
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "cached_users": len(self._users),
+            "max_users": self.max_users,
+            "catalog_size": len(self.catalog),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+
+suggest_index = ExerciseSuggestIndex(EXERCISE_CATALOG, max_users=settings.EXERCISE_SUGGEST_CACHE_USERS)
@@ -0,0 +1,144 @@
+# backend/services/export_service.py
+"""
+"Download my data": streams a user's workouts, mood entries and Spotify plays.
+
+Each dataset is read through a server-side cursor (AsyncSession.stream with
+yield_per), serialized partition by partition and handed to the response in
+~64 KiB pieces, optionally gzip-compressed on the fly - so memory use does not
+depend on how much history the user has.
+
+The session is opened inside the generator (not via `get_db`): request-scoped
+dependencies are torn down before a StreamingResponse body is sent.
+"""
+import csv
+import io
+import logging
+import uuid
+import zlib
+from typing import AsyncIterator, Callable, Dict, Iterable, List, NamedTuple, Sequence
+
+from sqlalchemy import select
+
+from db.session import AsyncSessionLocal
+from schemas.timeline import TimelineItem
+from services.timeline_service import TIMELINE_SOURCES, TimelineSource
+
+logger = logging.getLogger(__name__)
+
+EXPORT_FORMATS = ("ndjson", "csv")
+EXPORT_DATASETS = tuple(TIMELINE_SOURCES) # workout, mood, spotify
+EXPORT_BATCH_SIZE = 1000 # Rows per server-side cursor fetch
+FLUSH_BYTES = 64 * 1024
+
+
+class CsvLayout(NamedTuple):
+    header: Sequence[str]
+    rows: Callable[[object], Iterable[Sequence]] # One ORM row -> CSV rows
+
+
+def _workout_rows(workout) -> Iterable[Sequence]:
+    # One line per set; the layout POST /workouts/import accepts, so exports round-trip
+    for exercise in workout.exercises or []:
+        for set_log in exercise.get("sets") or []:
+            yield (workout.timestamp.isoformat(), exercise.get("name"), set_log.get("reps"), set_log.get("weight"), workout.id)
+
+
+def _mood_rows(entry) -> Iterable[Sequence]:
+    yield (entry.id, entry.created_at.isoformat(), entry.mood_score, entry.journal_text,
+           entry.sentiment_label, entry.sentiment_intensity, entry.sentiment_summary)
+
+
+def _spotify_rows(track) -> Iterable[Sequence]:
+    yield (track.played_at.isoformat(), track.spotify_track_id, track.track_name, track.artist_name,
+           track.album_name, track.track_uri, track.duration_ms, track.explicit, track.popularity)
+
+
+CSV_LAYOUTS: Dict[str, CsvLayout] = {
+    "workout": CsvLayout(("timestamp", "exercise", "reps", "weight", "workout"), _workout_rows),
+    "mood": CsvLayout(("id", "created_at", "mood_score", "journal_text",
+                       "sentiment_label", "sentiment_intensity", "sentiment_summary"), _mood_rows),
+    "spotify": CsvLayout(("played_at", "spotify_track_id", "track_name", "artist_name", "album_name",
+                          "track_uri", "duration_ms", "explicit", "popularity"), _spotify_rows),
+}
+
+
+async def _stream_rows(db, source: TimelineSource, user_id: uuid.UUID) -> AsyncIterator[list]:
+    """ The user's rows of one source in yield_per-sized partitions (newest first, index order). """
+    time_col = getattr(source.model, source.time_attr)
+    query = (
+        select(source.model)
+        .where(source.model.user_id == user_id)
+        .order_by(time_col.desc(), source.model.id)
+        .execution_options(yield_per=EXPORT_BATCH_SIZE)
+    )
+    if hasattr(source.model, "deleted_at"):
+        query = query.where(source.model.deleted_at.is_(None)) # Skip sync tombstones
+    result = await db.stream_scalars(query)
+    async for partition in result.partitions():
+        yield partition
+        # Don't let the identity map accumulate the whole history. Not expunge_all():
+        # that discards the identity map the still-open stream is loading into.
+        for row in partition:
+            db.expunge(row)
+
+
+def _ndjson_lines(name: str, source: TimelineSource, rows: list) -> List[str]:
+    return [
+        TimelineItem(type=name, timestamp=getattr(row, source.time_attr), data=source.read_schema.model_validate(row))
+        .model_dump_json() + "\n"
+        for row in rows
+    ]
+
+
+async def _text_chunks(user_id: uuid.UUID, fmt: str, datasets: Sequence[str]) -> AsyncIterator[str]:
+    async with AsyncSessionLocal() as db:
+        # One snapshot for the whole export, even though the datasets are read one after another
+        await db.connection(execution_options={"isolation_level": "REPEATABLE READ"})
+        for name in datasets:
+            source = TIMELINE_SOURCES[name]
+            if fmt == "csv":
+                buffer = io.StringIO()
+                writer = csv.writer(buffer, lineterminator="\n")
+                writer.writerow(CSV_LAYOUTS[name].header)
+            async for rows in _stream_rows(db, source, user_id):
+                if fmt == "csv":
+                    for row in rows:
+                        writer.writerows(CSV_LAYOUTS[name].rows(row))
+                    yield buffer.getvalue()
+                    buffer.seek(0)
+                    buffer.truncate()
+                else:
+                    yield "".join(_ndjson_lines(name, source, rows))
+            if fmt == "csv" and buffer.tell():
+                yield buffer.getvalue() # Header of an empty dataset
+
+
+async def stream_export(
+    user_id: uuid.UUID, fmt: str = "ndjson", datasets: Sequence[str] = EXPORT_DATASETS, gzip: bool = False,
+) -> AsyncIterator[bytes]:
+    """
+    Response body generator. NDJSON lines have the TimelineItem shape
+    ({"type", "timestamp", "data"}); CSV covers exactly one dataset.
+    """
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 16 + zlib.MAX_WBITS) if gzip else None # 16+: gzip container
+    pending: List[bytes] = []
+    pending_size = 0
+    exported_bytes = 0
+
+    async for text in _text_chunks(user_id, fmt, datasets):
+        data = text.encode()
+        exported_bytes += len(data)
+        if compressor is not None:
+            data = compressor.compress(data)
+        if data:
+            pending.append(data)
+            pending_size += len(data)
+        if pending_size >= FLUSH_BYTES:
+            yield b"".join(pending)
+            pending, pending_size = [], 0
+
+    if compressor is not None:
+        pending.append(compressor.flush())
+    if pending:
+        yield b"".join(pending)
+    logger.info(f"Export for user {user_id} ({fmt}, {'/'.join(datasets)}): {exported_bytes} bytes uncompressed.")
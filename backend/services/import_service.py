@@ -0,0 +1,297 @@
+# backend/services/import_service.py
+"""
+Streaming bulk import of historical workouts (POST /workouts/import).
+
+The request body is consumed chunk by chunk and split into lines, so memory
+stays flat whatever the file size: at most one line of IMPORT_MAX_LINE_BYTES,
+IMPORT_CHUNK_SIZE validated workouts and IMPORT_MAX_ERRORS error entries are
+held at once.
+
+Formats:
+- ndjson: one workout per line, e.g.
+  {"timestamp": "2023-04-01T07:30:00Z", "exercises": [{"name": "Squat", "sets": [{"reps": 5, "weight": 100}]}]}
+- csv: one SET per line with a header row: timestamp,exercise,reps,weight[,workout]
+  Consecutive lines with the same `workout` key (default: the timestamp) form one
+  workout, and consecutive lines with the same exercise name within it one exercise.
+  Fields containing line breaks are not supported.
+
+Invalid lines (also over-long or non-UTF-8 ones) are skipped and reported; valid
+workouts are written per chunk with ONE multi-row INSERT (plus one executemany into
+workout_sets and one upsert each for the daily aggregates and personal records),
+committed together. (Multi-row INSERT rather than COPY keeps JSONB encoding and
+column defaults in SQLAlchemy's hands, like the Spotify ingestion.) Chunks are
+committed independently, so a failed import keeps what was written before the failure.
+"""
+import codecs
+import csv
+import logging
+import uuid
+from datetime import datetime
+from typing import AsyncIterator, List, Optional, Tuple
+
+from pydantic import TypeAdapter, ValidationError
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.config import settings
+from models.workout import Workout
+from schemas.workout import (
+    ExerciseLogBase, ImportRowError, WorkoutImportRecord, WorkoutImportReport,
+)
+from services import data_version_service, insight_service, records_service, workout_sets_service
+from services.response_cache_service import response_cache
+
+logger = logging.getLogger(__name__)
+
+IMPORT_FORMATS = ("csv", "ndjson")
+CSV_REQUIRED_COLUMNS = ("timestamp", "exercise", "reps", "weight")
+CONTENT_TYPE_FORMATS = {
+    "text/csv": "csv",
+    "application/csv": "csv",
+    "application/x-ndjson": "ndjson",
+    "application/ndjson": "ndjson",
+    "application/jsonl": "ndjson",
+    "application/x-jsonlines": "ndjson",
+}
+
+_timestamp_adapter = TypeAdapter(datetime)
+
+
+class ImportFormatError(ValueError):
+    """ The file as a whole can't be imported (unknown format, missing CSV columns). """
+
+
+def detect_format(content_type: Optional[str]) -> Optional[str]:
+    """ Maps a request Content-Type to an import format (None if unrecognised). """
+    if not content_type:
+        return None
+    return CONTENT_TYPE_FORMATS.get(content_type.split(";", 1)[0].strip().lower())
+
+
+def _describe(exc: ValidationError, field_names: Optional[dict] = None) -> str:
+    """ Compact one-line summary of a ValidationError, e.g. "reps: Input should be greater than 0". """
+    parts = []
+    for err in exc.errors():
+        loc = err["loc"]
+        if field_names is not None:
+            name = str(loc[-1]) if loc else "row"
+            loc_text = field_names.get(name, name)
+        else:
+            loc_text = ".".join(str(part) for part in loc) or "row"
+        parts.append(f"{loc_text}: {err['msg']}")
+    return "; ".join(parts)
+
+
+class _Report:
+    """ Running counters; keeps only the first `max_errors` errors. """
+
+    def __init__(self, fmt: str, dry_run: bool, max_errors: int):
+        self.fmt = fmt
+        self.dry_run = dry_run
+        self.max_errors = max_errors
+        self.lines_read = 0
+        self.workouts = 0
+        self.sets = 0
+        self.error_count = 0
+        self.errors: List[ImportRowError] = []
+
+    def error(self, line: int, message: str) -> None:
+        self.error_count += 1
+        if len(self.errors) < self.max_errors:
+            self.errors.append(ImportRowError(line=line, error=message))
+
+    def build(self) -> WorkoutImportReport:
+        return WorkoutImportReport(
+            format=self.fmt, dry_run=self.dry_run, lines_read=self.lines_read,
+            workouts_imported=self.workouts, sets_imported=self.sets,
+            error_count=self.error_count, errors=self.errors,
+            errors_truncated=self.error_count > len(self.errors),
+        )
+
+
+def _decode_line(raw: bytes, oversized: bool, limit: int, report: _Report) -> Optional[str]:
+    """ Counts one line; returns its text, or None after reporting why it is skipped. """
+    report.lines_read += 1
+    if report.lines_read == 1 and raw.startswith(codecs.BOM_UTF8):
+        raw = raw[len(codecs.BOM_UTF8):]
+    if oversized or len(raw) > limit:
+        report.error(report.lines_read, f"Line is longer than {limit} bytes")
+        return None
+    try:
+        return raw.decode("utf-8").rstrip("\r")
+    except UnicodeDecodeError as e:
+        report.error(report.lines_read, f"Line is not valid UTF-8 (byte {e.start + 1})")
+        return None
+
+
+async def iter_lines(
+    chunks: AsyncIterator[bytes], report: _Report, max_line_bytes: Optional[int] = None,
+) -> AsyncIterator[Tuple[int, str]]:
+    """
+    Splits UTF-8 (BOM tolerated) byte chunks into numbered lines. Lines longer than
+    `max_line_bytes` (default IMPORT_MAX_LINE_BYTES) or not valid UTF-8 are reported
+    as row errors and skipped; an over-long line is dropped as it arrives, not buffered.
+    """
+    limit = max_line_bytes or settings.IMPORT_MAX_LINE_BYTES
+    pending = b""
+    oversized = False # The current line passed the limit: its remaining bytes are discarded
+    async for chunk in chunks:
+        *lines, pending = (pending + chunk).split(b"\n")
+        for raw in lines:
+            line = _decode_line(raw, oversized, limit, report)
+            oversized = False
+            if line is not None:
+                yield report.lines_read, line
+        if len(pending) > limit:
+            oversized, pending = True, b""
+    if pending or oversized:
+        line = _decode_line(pending, oversized, limit, report)
+        if line is not None:
+            yield report.lines_read, line
+
+
+async def _ndjson_workouts(lines: AsyncIterator[Tuple[int, str]], report: _Report) -> AsyncIterator[WorkoutImportRecord]:
+    async for line_no, line in lines:
+        if not line.strip():
+            continue
+        try:
+            # Parse + validate in a single pass (pydantic-core), no intermediate dict
+            yield WorkoutImportRecord.model_validate_json(line)
+        except ValidationError as e:
+            report.error(line_no, _describe(e))
+
+
+async def _csv_workouts(lines: AsyncIterator[Tuple[int, str]], report: _Report) -> AsyncIterator[WorkoutImportRecord]:
+    columns = None
+    current_key = None
+    timestamp = None
+    exercises: List[ExerciseLogBase] = []
+
+    def finish() -> Optional[WorkoutImportRecord]:
+        if not exercises:
+            return None
+        # Every part was validated line by line; the workout-level rules (>= 1 exercise,
+        # no empty exercise) hold by construction.
+        return WorkoutImportRecord.model_construct(timestamp=timestamp, exercises=list(exercises))
+
+    async for line_no, line in lines:
+        if not line.strip():
+            continue
+        try:
+            values = next(csv.reader([line]))
+        except csv.Error as e: # e.g. a bare carriage return inside a field
+            if columns is None:
+                raise ImportFormatError(f"CSV header is malformed: {e}")
+            report.error(line_no, f"Malformed CSV line: {e}")
+            continue
+        if columns is None:
+            columns = {name.strip().lower(): index for index, name in enumerate(values)}
+            missing = [name for name in CSV_REQUIRED_COLUMNS if name not in columns]
+            if missing:
+                raise ImportFormatError(f"CSV header is missing column(s): {', '.join(missing)}")
+            continue
+
+        def field(name: str) -> Optional[str]:
+            index = columns.get(name)
+            return values[index].strip() if index is not None and index < len(values) else None
+
+        try:
+            row_timestamp = _timestamp_adapter.validate_python(field("timestamp"))
+        except ValidationError as e:
+            report.error(line_no, f"timestamp: {e.errors()[0]['msg']}")
+            continue
+        try:
+            exercise = ExerciseLogBase.model_validate(
+                {"name": field("exercise"), "sets": [{"reps": field("reps"), "weight": field("weight")}]}
+            )
+        except ValidationError as e:
+            # Report errors under the CSV column names (name -> exercise, sets.0.reps -> reps)
+            report.error(line_no, _describe(e, field_names={"name": "exercise"}))
+            continue
+
+        key = field("workout") or field("timestamp")
+        if key != current_key:
+            record = finish()
+            if record is not None:
+                yield record
+            current_key, timestamp, exercises = key, row_timestamp, []
+
+        if exercises and exercises[-1].name == exercise.name:
+            exercises[-1].sets.extend(exercise.sets)
+        else:
+            exercises.append(exercise)
+
+    if columns is None:
+        raise ImportFormatError("CSV file is empty (expected a header row)")
+    record = finish()
+    if record is not None:
+        yield record
+
+
+async def _write_chunk(db: AsyncSession, user_id: uuid.UUID, chunk: List[WorkoutImportRecord]) -> None:
+    rows = [
+        {
+            "id": uuid.uuid4(),
+            "user_id": user_id,
+            "timestamp": record.timestamp,
+            "exercises": [exercise.model_dump() for exercise in record.exercises],
+        }
+        for record in chunk
+    ]
+    await db.execute(insert(Workout).values(rows))
+    await workout_sets_service.record_sets(db, [
+        set_row
+        for row in rows
+        for set_row in workout_sets_service.set_rows(row["id"], user_id, row["timestamp"], row["exercises"])
+    ])
+    await insight_service.record_workouts_bulk(db, user_id, [(row["timestamp"], row["exercises"]) for row in rows])
+    await records_service.record_workouts_bulk(db, user_id, [(row["id"], row["timestamp"], row["exercises"]) for row in rows])
+    await data_version_service.bump(db, user_id)
+    await db.commit()
+    await response_cache.invalidate(user_id)
+
+
+async def import_workouts(
+    db: AsyncSession, user_id: uuid.UUID, chunks: AsyncIterator[bytes], fmt: str,
+    dry_run: bool = False, chunk_size: Optional[int] = None, max_errors: Optional[int] = None,
+) -> WorkoutImportReport:
+    """
+    Streams `chunks` (the raw request body) into the user's workouts.
+    With `dry_run`, only validates and reports. Raises ImportFormatError for
+    unusable files (nothing has been written in that case).
+    """
+    if fmt not in IMPORT_FORMATS:
+        raise ImportFormatError(f"Unsupported import format '{fmt}' (expected one of: {', '.join(IMPORT_FORMATS)})")
+    chunk_size = chunk_size or settings.IMPORT_CHUNK_SIZE
+    report = _Report(fmt, dry_run, settings.IMPORT_MAX_ERRORS if max_errors is None else max_errors)
+
+    parse = _csv_workouts if fmt == "csv" else _ndjson_workouts
+    chunk: List[WorkoutImportRecord] = []
+
+    async def flush() -> None:
+        if not dry_run:
+            await _write_chunk(db, user_id, chunk)
+        report.workouts += len(chunk)
+        report.sets += sum(len(exercise.sets) for record in chunk for exercise in record.exercises)
+        chunk.clear()
+
+    try:
+        async for record in parse(iter_lines(chunks, report), report):
+            chunk.append(record)
+            if len(chunk) >= chunk_size:
+                await flush()
+        if chunk:
+            await flush()
+    except ImportFormatError:
+        raise # Raised before anything is written
+    except Exception:
+        if not dry_run:
+            await db.rollback()
+        logger.exception(f"Workout import for user {user_id} failed after {report.workouts} workout(s).")
+        raise
+
+    logger.info(
+        f"Workout import for user {user_id}: {report.workouts} workouts / {report.sets} sets "
+        f"from {report.lines_read} lines, {report.error_count} error(s){' (dry run)' if dry_run else ''}."
+    )
+    return report.build()
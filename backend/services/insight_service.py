@@ -0,0 +1,189 @@
+# backend/services/insight_service.py
+import logging
+import uuid
+from datetime import date, datetime, time, timedelta, timezone
+from typing import Iterable, List, Optional, Tuple
+
+from sqlalchemy import Date, cast, func, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from models.insight import DailyAggregate
+from models.mood import MoodEntry
+from models.workout import Workout
+from schemas.insight import DailyAggregateRead, InsightDashboard, InsightSummary
+
+logger = logging.getLogger(__name__)
+
+
+# --- Incremental maintenance ---
+
+def workout_totals(exercises: Optional[Iterable[dict]]) -> Tuple[int, float]:
+    """ Returns (total_sets, total_volume) for a workout's exercises JSONB payload. """
+    total_sets = 0
+    total_volume = 0.0
+    for exercise in exercises or []:
+        for set_log in exercise.get("sets") or []:
+            total_sets += 1
+            total_volume += (set_log.get("reps") or 0) * (set_log.get("weight") or 0.0)
+    return total_sets, total_volume
+
+
+def utc_day(value: datetime) -> date:
+    """ Aggregates are bucketed by UTC calendar day (naive datetimes are assumed UTC). """
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc)
+    return value.date()
+
+
+def _upsert_daily(user_id: uuid.UUID, day, **increments):
+    """
+    INSERT ... ON CONFLICT (user_id, day) DO UPDATE that adds `increments` to the row.
+    mood_min/mood_max are merged with LEAST/GREATEST (which ignore NULLs in Postgres).
+    """
+    return _upsert_daily_rows([{"user_id": user_id, "day": day, **increments}])
+
+
+def _upsert_daily_rows(rows: list):
+    """ Multi-row form of `_upsert_daily`; every row must carry the same increment columns. """
+    stmt = pg_insert(DailyAggregate).values(rows)
+    excluded = stmt.excluded
+    table = DailyAggregate.__table__.c
+
+    updates = {"updated_at": func.now()}
+    for name in rows[0]:
+        if name in ("user_id", "day"):
+            continue
+        if name == "mood_min":
+            updates[name] = func.least(table.mood_min, excluded.mood_min)
+        elif name == "mood_max":
+            updates[name] = func.greatest(table.mood_max, excluded.mood_max)
+        else:
+            updates[name] = table[name] + excluded[name]
+
+    return stmt.on_conflict_do_update(index_elements=[table.user_id, table.day], set_=updates)
+
+
+async def record_workout(db: AsyncSession, user_id: uuid.UUID, timestamp: datetime, exercises: list) -> None:
+    """ Adds one workout to its day's aggregate. Runs in the caller's transaction (no commit). """
+    total_sets, total_volume = workout_totals(exercises)
+    await db.execute(_upsert_daily(
+        user_id, utc_day(timestamp),
+        workout_count=1, total_sets=total_sets, total_volume=total_volume,
+    ))
+
+
+async def record_workouts_bulk(db: AsyncSession, user_id: uuid.UUID, workouts: Iterable[Tuple[datetime, list]]) -> None:
+    """
+    Adds many (timestamp, exercises) workouts with ONE upsert (one row per touched day).
+    Runs in the caller's transaction (no commit).
+    """
+    days = {}
+    for timestamp, exercises in workouts:
+        total_sets, total_volume = workout_totals(exercises)
+        day = days.setdefault(utc_day(timestamp), {"workout_count": 0, "total_sets": 0, "total_volume": 0.0})
+        day["workout_count"] += 1
+        day["total_sets"] += total_sets
+        day["total_volume"] += total_volume
+    if days:
+        await db.execute(_upsert_daily_rows([{"user_id": user_id, "day": day, **totals} for day, totals in days.items()]))
+
+
+async def record_mood(db: AsyncSession, user_id: uuid.UUID, mood_score: int) -> None:
+    """
+    Adds one mood entry to today's aggregate. Runs in the caller's transaction (no commit).
+    The day comes from the DB's now() - the same value the row's created_at default uses.
+    """
+    day = cast(func.timezone("UTC", func.now()), Date)
+    await db.execute(_upsert_daily(
+        user_id, day,
+        mood_count=1, mood_sum=mood_score, mood_min=mood_score, mood_max=mood_score,
+    ))
+
+
+async def record_moods_bulk(db: AsyncSession, user_id: uuid.UUID, mood_scores: List[int]) -> None:
+    """ `record_mood` for several entries created in one transaction: ONE upsert. No commit. """
+    if not mood_scores:
+        return
+    day = cast(func.timezone("UTC", func.now()), Date)
+    await db.execute(_upsert_daily(
+        user_id, day,
+        mood_count=len(mood_scores), mood_sum=sum(mood_scores), mood_min=min(mood_scores), mood_max=max(mood_scores),
+    ))
+
+
+async def rebuild_day(db: AsyncSession, user_id: uuid.UUID, day: date) -> None:
+    """
+    Recomputes one day's aggregate from the user's live rows - used after a delete,
+    which increments can't undo (mood_min/mood_max). Runs in the caller's transaction (no commit).
+    """
+    start = datetime.combine(day, time.min, tzinfo=timezone.utc)
+    end = start + timedelta(days=1)
+
+    workouts = await db.scalars(
+        select(Workout.exercises)
+        .where(Workout.user_id == user_id, Workout.deleted_at.is_(None), Workout.timestamp >= start, Workout.timestamp < end)
+    )
+    totals = {"workout_count": 0, "total_sets": 0, "total_volume": 0.0}
+    for exercises in workouts:
+        total_sets, total_volume = workout_totals(exercises)
+        totals["workout_count"] += 1
+        totals["total_sets"] += total_sets
+        totals["total_volume"] += total_volume
+
+    mood_count, mood_sum, mood_min, mood_max = (await db.execute(
+        select(func.count(), func.coalesce(func.sum(MoodEntry.mood_score), 0), func.min(MoodEntry.mood_score), func.max(MoodEntry.mood_score))
+        .where(MoodEntry.user_id == user_id, MoodEntry.deleted_at.is_(None), MoodEntry.created_at >= start, MoodEntry.created_at < end)
+    )).one()
+    values = {**totals, "mood_count": mood_count, "mood_sum": mood_sum, "mood_min": mood_min, "mood_max": mood_max}
+
+    stmt = pg_insert(DailyAggregate).values(user_id=user_id, day=day, **values)
+    table = DailyAggregate.__table__.c
+    await db.execute(stmt.on_conflict_do_update(
+        index_elements=[table.user_id, table.day], set_={**values, "updated_at": func.now()},
+    ))
+
+
+# --- Dashboard ---
+
+async def generate_insights(db: AsyncSession, user_id: uuid.UUID, days: int = 30) -> InsightDashboard:
+    """ Builds the dashboard from at most `days` pre-aggregated rows. """
+    today = datetime.now(timezone.utc).date()
+    start = today - timedelta(days=days - 1)
+
+    result = await db.scalars(
+        select(DailyAggregate)
+        .where(DailyAggregate.user_id == user_id, DailyAggregate.day >= start, DailyAggregate.day <= today)
+        .order_by(DailyAggregate.day)
+    )
+    rows = result.all()
+
+    workout_days = [r for r in rows if r.workout_count]
+    mood_total = sum(r.mood_sum for r in rows)
+    mood_count = sum(r.mood_count for r in rows)
+
+    def mood_avg_of(subset) -> Optional[float]:
+        count = sum(r.mood_count for r in subset)
+        return round(sum(r.mood_sum for r in subset) / count, 2) if count else None
+
+    # Streak: consecutive workout days ending today (or yesterday, if today has none yet)
+    active = {r.day for r in workout_days}
+    cursor_day = today if today in active else today - timedelta(days=1)
+    streak = 0
+    while cursor_day in active:
+        streak += 1
+        cursor_day -= timedelta(days=1)
+
+    summary = InsightSummary(
+        days_in_range=days,
+        active_days=len(workout_days),
+        workout_count=sum(r.workout_count for r in rows),
+        total_sets=sum(r.total_sets for r in rows),
+        total_volume=round(sum(r.total_volume for r in rows), 2),
+        mood_entry_count=mood_count,
+        mood_avg=round(mood_total / mood_count, 2) if mood_count else None,
+        mood_avg_on_workout_days=mood_avg_of(workout_days),
+        mood_avg_on_rest_days=mood_avg_of([r for r in rows if not r.workout_count]),
+        current_workout_streak=streak,
+    )
+    return InsightDashboard(summary=summary, daily=[DailyAggregateRead.model_validate(r) for r in rows])
@@ -0,0 +1,218 @@
+# backend/services/job_queue.py
+"""
+Persisted background job queue with a bounded-concurrency asyncio worker pool.
+
+- Jobs are rows in `background_jobs`, inserted in the SAME transaction as the
+  data they refer to (see `enqueue`), so work is never lost or orphaned.
+- Workers claim one job at a time with SELECT ... FOR UPDATE SKIP LOCKED, so
+  several API processes can share the table safely.
+- Failures are retried with exponential backoff (+ jitter) up to max_attempts.
+- Jobs left 'running' by a crashed/restarted process are reclaimed after a lease.
+"""
+import asyncio
+import logging
+import random
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Awaitable, Callable, Dict, NamedTuple, Optional
+
+from sqlalchemy import func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.config import settings
+from db.session import AsyncSessionLocal
+from models.job import BackgroundJob
+
+logger = logging.getLogger(__name__)
+
+JobHandler = Callable[[dict], Awaitable[None]]
+FailureHook = Callable[[dict, str], Awaitable[None]]
+
+
+class PermanentJobError(Exception):
+    """ Raised by a handler when retrying cannot help (e.g. the target row is gone). """
+
+
+class _Registration(NamedTuple):
+    handler: JobHandler
+    on_failure: Optional[FailureHook] # Called once a job is given up on
+
+
+_handlers: Dict[str, _Registration] = {}
+
+
+def register_handler(kind: str, on_failure: Optional[FailureHook] = None):
+    """ Decorator registering `async def handler(payload: dict)` for jobs of `kind`. """
+    def decorator(func: JobHandler) -> JobHandler:
+        _handlers[kind] = _Registration(func, on_failure)
+        return func
+    return decorator
+
+
+def enqueue(db: AsyncSession, kind: str, payload: dict, max_attempts: Optional[int] = None) -> BackgroundJob:
+    """
+    Adds a job to the caller's session. It becomes visible when the caller commits;
+    call `job_queue.notify()` afterwards to wake an idle worker immediately.
+    """
+    job = BackgroundJob(
+        id=uuid.uuid4(), kind=kind, payload=payload, status="pending",
+        max_attempts=max_attempts or settings.JOB_MAX_ATTEMPTS,
+    )
+    db.add(job)
+    return job
+
+
+def backoff_seconds(attempts: int) -> float:
+    """ Exponential backoff with jitter: ~base, 2*base, 4*base ... capped. """
+    delay = min(settings.JOB_RETRY_MAX_SECONDS, settings.JOB_RETRY_BASE_SECONDS * (2 ** max(attempts - 1, 0)))
+    return delay * (0.5 + random.random() / 2)
+
+
+class _ClaimedJob(NamedTuple):
+    id: uuid.UUID
+    kind: str
+    payload: dict
+    attempts: int
+    max_attempts: int
+
+
+class JobQueue:
+    def __init__(self, session_factory=AsyncSessionLocal, concurrency: int = 4,
+                 poll_interval: float = 5.0, lease_seconds: int = 300):
+        self.session_factory = session_factory
+        self.concurrency = concurrency
+        self.poll_interval = poll_interval
+        self.lease_seconds = lease_seconds
+        self._wakeup = asyncio.Event()
+        self._workers: list = []
+        self._stopping = False
+        self.processed = 0
+        self.retried = 0
+        self.failed = 0
+
+    # --- Lifecycle ---
+
+    async def start(self) -> None:
+        self._stopping = False
+        await self.recover_stale_jobs()
+        self._workers = [asyncio.create_task(self._worker_loop(i)) for i in range(self.concurrency)]
+        logger.info(f"Background job queue started with {self.concurrency} worker(s).")
+
+    async def stop(self) -> None:
+        self._stopping = True
+        self._wakeup.set()
+        for task in self._workers:
+            task.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        logger.info("Background job queue stopped.")
+
+    def notify(self) -> None:
+        """ Wakes idle workers (new jobs were just committed). """
+        self._wakeup.set()
+
+    def stats(self) -> Dict[str, int]:
+        return {"workers": len(self._workers), "processed": self.processed,
+                "retried": self.retried, "failed": self.failed}
+
+    # --- Internals ---
+
+    async def recover_stale_jobs(self) -> int:
+        """ Returns jobs stuck in 'running' past the lease (process died mid-job) to 'pending'. """
+        cutoff = datetime.now(timezone.utc) - timedelta(seconds=self.lease_seconds)
+        async with self.session_factory() as db:
+            result = await db.execute(
+                update(BackgroundJob)
+                .where(BackgroundJob.status == "running", BackgroundJob.locked_at < cutoff)
+                .values(status="pending", locked_at=None, updated_at=func.now())
+            )
+            await db.commit()
+        if result.rowcount:
+            logger.warning(f"Recovered {result.rowcount} stale background job(s).")
+        return result.rowcount
+
+    async def _claim(self) -> Optional[_ClaimedJob]:
+        async with self.session_factory() as db:
+            job = (await db.scalars(
+                select(BackgroundJob)
+                .where(BackgroundJob.status == "pending", BackgroundJob.run_after <= func.now())
+                .order_by(BackgroundJob.run_after)
+                .limit(1)
+                .with_for_update(skip_locked=True)
+            )).first()
+            if job is None:
+                return None
+            job.status = "running"
+            job.attempts += 1
+            job.locked_at = func.now()
+            job.updated_at = func.now()
+            claimed = _ClaimedJob(job.id, job.kind, dict(job.payload or {}), job.attempts, job.max_attempts)
+            await db.commit()
+            return claimed
+
+    async def _finish(self, job_id: uuid.UUID, **values) -> None:
+        async with self.session_factory() as db:
+            await db.execute(
+                update(BackgroundJob).where(BackgroundJob.id == job_id)
+                .values(locked_at=None, updated_at=func.now(), **values)
+            )
+            await db.commit()
+
+    async def _run(self, job: _ClaimedJob) -> None:
+        registration = _handlers.get(job.kind)
+        try:
+            if registration is None:
+                raise PermanentJobError(f"No handler registered for job kind '{job.kind}'")
+            await registration.handler(job.payload)
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+            give_up = isinstance(e, PermanentJobError) or job.attempts >= job.max_attempts
+            if give_up:
+                self.failed += 1
+                logger.error(f"Job {job.id} ({job.kind}) failed permanently after {job.attempts} attempt(s): {error}")
+                await self._finish(job.id, status="failed", last_error=error)
+                if registration and registration.on_failure:
+                    try:
+                        await registration.on_failure(job.payload, error)
+                    except Exception as hook_error:
+                        logger.error(f"on_failure hook for job {job.id} raised: {hook_error}", exc_info=True)
+            else:
+                self.retried += 1
+                delay = backoff_seconds(job.attempts)
+                logger.warning(f"Job {job.id} ({job.kind}) attempt {job.attempts} failed, retrying in {delay:.1f}s: {error}")
+                await self._finish(
+                    job.id, status="pending", last_error=error,
+                    run_after=datetime.now(timezone.utc) + timedelta(seconds=delay),
+                )
+            return
+
+        self.processed += 1
+        await self._finish(job.id, status="done", last_error=None)
+
+    async def _worker_loop(self, index: int) -> None:
+        while not self._stopping:
+            try:
+                job = await self._claim()
+                if job is None:
+                    # Idle: sleep until notified or the next poll (picks up retries whose backoff expired)
+                    try:
+                        await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval)
+                    except asyncio.TimeoutError:
+                        pass
+                    self._wakeup.clear()
+                    continue
+                await self._run(job)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                # DB hiccup while claiming/finishing: back off briefly, never kill the worker
+                logger.error(f"Job worker {index} error: {e}", exc_info=True)
+                await asyncio.sleep(self.poll_interval)
+
+
+# Process-wide queue, started/stopped by the app lifespan in main.py
+job_queue = JobQueue(
+    concurrency=settings.JOB_WORKER_CONCURRENCY,
+    poll_interval=settings.JOB_POLL_INTERVAL_SECONDS,
+    lease_seconds=settings.JOB_LEASE_SECONDS,
+)
@@ -1,13 +1,40 @@
 # backend/services/openai_service.py
+import hashlib
+import json
 import logging
+import re
+import unicodedata
 from openai import AsyncOpenAI # Use the async client
 # --- ADD THIS IMPORT ---
-from typing import Optional
+from typing import Dict, Optional
 # --- END ADD ---
 from schemas.mood import SentimentAnalysisResult # Import result schema
 
 logger = logging.getLogger(__name__)
 
+# Model + prompt identity. Bump SENTIMENT_PROMPT_VERSION whenever the rules/prompts
+# below change so cached results from the old prompt are no longer reused.
+SENTIMENT_MODEL = "gpt-3.5-turbo"
+SENTIMENT_PROMPT_VERSION = "v1"
+
+SENTIMENT_RULES = """Rules:
+    1. Classify the overall sentiment as one of: "Positive", "Negative", "Neutral".
+    2. Rate the emotional intensity on a scale from 1 (very low) to 10 (very high). This reflects the strength of the expressed emotion, regardless of whether it's positive or negative. Neutral entries should generally have low intensity (1-3).
+    3. Provide a concise, one-sentence summary of the emotional tone.
+    4. Attempt to capture nuance like sarcasm or mixed feelings in the summary if possible. Intensity should reflect the dominant emotion."""
+
+
+def normalize_journal_text(text: str) -> str:
+    """ Canonical form used for cache keys: NFC, trimmed, internal whitespace collapsed. """
+    return re.sub(r"\s+", " ", unicodedata.normalize("NFC", text)).strip()
+
+
+def sentiment_cache_key(text: str) -> str:
+    """ Content address of an analysis: hash of normalized text + model + prompt version. """
+    material = f"{SENTIMENT_MODEL}\x00{SENTIMENT_PROMPT_VERSION}\x00{normalize_journal_text(text)}"
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
 async def analyze_journal_entry(
     openai_client: AsyncOpenAI, # Inject the client instance
     text: str
@@ -24,11 +51,7 @@ async def analyze_journal_entry(
     # Construct the prompt for OpenAI's ChatCompletion endpoint with JSON mode
     prompt = f"""Analyze the following journal entry. Provide the output ONLY in valid JSON format with EXACTLY these keys: "sentiment", "intensity", and "summary".
 
-    Rules:
-    1. Classify the overall sentiment as one of: "Positive", "Negative", "Neutral".
-    2. Rate the emotional intensity on a scale from 1 (very low) to 10 (very high). This reflects the strength of the expressed emotion, regardless of whether it's positive or negative. Neutral entries should generally have low intensity (1-3).
-    3. Provide a concise, one-sentence summary of the emotional tone.
-    4. Attempt to capture nuance like sarcasm or mixed feelings in the summary if possible. Intensity should reflect the dominant emotion.
+    {SENTIMENT_RULES}
 
     Journal Entry:
     \"\"\"
@@ -42,8 +65,7 @@ async def analyze_journal_entry(
         logger.info(f"Sending journal text to OpenAI for analysis (first 50 chars): {text[:50]}...")
         response = await openai_client.chat.completions.create(
             # Consider cost/performance: gpt-3.5-turbo might be sufficient and cheaper
-            model="gpt-3.5-turbo",
-            # model="gpt-4-turbo-preview", # Or your preferred GPT-4 model ID
+            model=SENTIMENT_MODEL, # Consider gpt-4-turbo-preview etc.; bump SENTIMENT_PROMPT_VERSION if changed
             response_format={"type": "json_object"}, # Enable JSON mode
             messages=[
                 {
@@ -76,4 +98,68 @@ async def analyze_journal_entry(
     except Exception as e:
         # Log OpenAI API errors
         logger.error(f"Error calling OpenAI API for sentiment analysis: {e}", exc_info=True)
-        return None # Return None on failure
\ No newline at end of file
+        return None # Return None on failure
+
+
+async def analyze_journal_entries_batch(
+    openai_client: AsyncOpenAI,
+    entries: Dict[str, str], # {caller-chosen id: journal text}
+) -> Dict[str, SentimentAnalysisResult]:
+    """
+    Analyzes many journal entries in ONE JSON-mode chat completion.
+    Results are mapped back by id; entries the model skipped or answered invalidly
+    are simply missing from the returned dict (callers may retry them).
+    """
+    entries = {entry_id: text for entry_id, text in entries.items() if text and text.strip()}
+    if not entries:
+        return {}
+
+    payload = json.dumps([{"id": entry_id, "text": text} for entry_id, text in entries.items()], ensure_ascii=False)
+    prompt = f"""Analyze each journal entry in the JSON array below independently. Return ONLY a valid JSON object of the form {{"results": [{{"id": "...", "sentiment": "...", "intensity": 0, "summary": "..."}}]}} with exactly one result per input id, copying the id verbatim.
+
+    {SENTIMENT_RULES}
+
+    Journal Entries:
+    \"\"\"
+    {payload}
+    \"\"\"
+
+    JSON Output:
+    """
+
+    try:
+        logger.info(f"Sending batch of {len(entries)} journal entries to OpenAI for analysis...")
+        response = await openai_client.chat.completions.create(
+            model=SENTIMENT_MODEL,
+            response_format={"type": "json_object"},
+            messages=[
+                {
+                    "role": "system",
+                    "content": "You are an expert sentiment analysis assistant. Analyze each journal entry based on the rules provided and return ONLY a valid JSON object with a 'results' array of {'id', 'sentiment', 'intensity', 'summary'} objects."
+                },
+                {"role": "user", "content": prompt}
+            ],
+            temperature=0.3,
+            max_tokens=min(4096, 60 + 120 * len(entries)), # ~120 tokens per result
+            timeout=60.0,
+        )
+        content_str = response.choices[0].message.content if response.choices and response.choices[0].message else None
+        if not content_str:
+            logger.warning("Received no valid choice/content from OpenAI API for batch.")
+            return {}
+        raw_results = json.loads(content_str).get("results", [])
+    except Exception as e:
+        logger.error(f"Error calling OpenAI API for batch sentiment analysis: {e}", exc_info=True)
+        return {}
+
+    results: Dict[str, SentimentAnalysisResult] = {}
+    for item in raw_results if isinstance(raw_results, list) else []:
+        entry_id = str(item.get("id")) if isinstance(item, dict) else None
+        if entry_id not in entries:
+            continue
+        try:
+            results[entry_id] = SentimentAnalysisResult.model_validate(item)
+        except Exception as validation_error:
+            logger.warning(f"Invalid batch result for entry {entry_id}: {validation_error}")
+    logger.info(f"Batch sentiment analysis returned {len(results)}/{len(entries)} valid results.")
+    return results
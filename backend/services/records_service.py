@@ -0,0 +1,190 @@
+# backend/services/records_service.py
+"""
+Personal records (heaviest set, best estimated 1RM, best single-workout volume)
+per user and exercise.
+
+`record_workout` folds ONE new workout into `personal_records` with a single
+multi-row upsert - O(exercises in the workout), no history scan. The same
+"better" rule is implemented twice: in SQL for the upsert and in Python
+(`merge_bests`) for the brute-force rebuild, which the rebuild script's
+--verify mode compares against the stored table.
+"""
+import logging
+import uuid
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import and_, case, delete, func, literal_column, or_, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from models.workout import PersonalRecord, Workout, WorkoutSet
+from schemas.workout import NewPersonalRecord
+
+logger = logging.getLogger(__name__)
+
+# metric -> columns that travel with it (the metric value first)
+METRICS: Dict[str, Tuple[str, ...]] = {
+    "max_weight": ("max_weight", "max_weight_reps", "max_weight_workout_id", "max_weight_at"),
+    "best_e1rm": ("best_e1rm", "best_e1rm_workout_id", "best_e1rm_at"),
+    "best_volume": ("best_volume", "best_volume_workout_id", "best_volume_at"),
+}
+
+# metric -> columns compared in order, higher is better; full ties go to the earlier
+# workout, then the lower workout id. At equal weight, more reps is the better max_weight.
+RANK_COLUMNS: Dict[str, Tuple[str, ...]] = {
+    "max_weight": ("max_weight", "max_weight_reps"),
+    "best_e1rm": ("best_e1rm",),
+    "best_volume": ("best_volume",),
+}
+
+
+def estimated_1rm(weight: float, reps: int) -> float:
+    """ Epley: w * (1 + reps/30); a single is its own 1RM. """
+    return float(weight) if reps <= 1 else weight * (1 + reps / 30)
+
+
+def workout_bests(workout_id: uuid.UUID, timestamp: datetime, exercises: Iterable[dict]) -> Dict[str, dict]:
+    """ One workout's bests per exercise name, shaped like personal_records rows (minus user_id). """
+    if timestamp.tzinfo is None:
+        timestamp = timestamp.replace(tzinfo=timezone.utc) # Naive = UTC (as stored); keeps comparisons valid
+    bests: Dict[str, dict] = {}
+    for exercise in exercises or []:
+        name = exercise["name"]
+        row = bests.get(name)
+        if row is None:
+            row = bests[name] = {
+                "exercise_name": name,
+                "max_weight": -1.0, "max_weight_reps": 0, "max_weight_workout_id": workout_id, "max_weight_at": timestamp,
+                "best_e1rm": -1.0, "best_e1rm_workout_id": workout_id, "best_e1rm_at": timestamp,
+                "best_volume": 0.0, "best_volume_workout_id": workout_id, "best_volume_at": timestamp,
+            }
+        for set_log in exercise.get("sets") or []:
+            reps, weight = set_log["reps"], float(set_log["weight"])
+            if weight > row["max_weight"] or (weight == row["max_weight"] and reps > row["max_weight_reps"]):
+                row["max_weight"], row["max_weight_reps"] = weight, reps
+            row["best_e1rm"] = max(row["best_e1rm"], estimated_1rm(weight, reps))
+            row["best_volume"] += reps * weight # Repeated entries of one exercise add up
+    return {name: row for name, row in bests.items() if row["max_weight"] >= 0} # Drop exercises without sets
+
+
+def _better(new: dict, old: dict, metric: str) -> bool:
+    # Ties -> earlier workout, then lower id: batch workouts share a timestamp, and the
+    # winner mustn't depend on the order the workouts are folded in
+    for column in RANK_COLUMNS[metric]:
+        if new[column] != old[column]:
+            return new[column] > old[column]
+    if new[f"{metric}_at"] != old[f"{metric}_at"]:
+        return new[f"{metric}_at"] < old[f"{metric}_at"]
+    return new[f"{metric}_workout_id"] < old[f"{metric}_workout_id"]
+
+
+def merge_bests(current: Optional[dict], new: dict) -> dict:
+    """ Python twin of the upsert's CASE logic: per metric, the better row by RANK_COLUMNS wins (ties -> earlier workout, lower id). """
+    if current is None:
+        return dict(new)
+    merged = dict(current)
+    for metric, columns in METRICS.items():
+        if _better(new, current, metric):
+            merged.update({col: new[col] for col in columns})
+    return merged
+
+
+def upsert_records_stmt(user_id: uuid.UUID, rows: List[dict]):
+    """ Multi-row upsert of per-exercise bests (at most one row per exercise_name). """
+    stmt = pg_insert(PersonalRecord).values([{"user_id": user_id, **row} for row in rows])
+    excluded = stmt.excluded
+    table = PersonalRecord.__table__.c
+
+    updates = {"updated_at": func.now()}
+    for metric, columns in METRICS.items():
+        # Lexicographic: RANK_COLUMNS descending, then _at and _workout_id ascending (same order as _better)
+        keys = [(excluded[col] > table[col], excluded[col] == table[col]) for col in RANK_COLUMNS[metric]]
+        keys += [
+            (excluded[col] < table[col], excluded[col] == table[col])
+            for col in (f"{metric}_at", f"{metric}_workout_id")
+        ]
+        better = or_(*(and_(*(equal for _, equal in keys[:i]), wins) for i, (wins, _) in enumerate(keys)))
+        for col in columns:
+            updates[col] = case((better, excluded[col]), else_=table[col])
+
+    return stmt.on_conflict_do_update(index_elements=[table.user_id, table.exercise_name], set_=updates)
+
+
+async def record_workout(
+    db: AsyncSession, user_id: uuid.UUID, workout_id: uuid.UUID, timestamp: datetime, exercises: list,
+) -> List[NewPersonalRecord]:
+    """
+    Folds one workout into the user's records. Runs in the caller's transaction (no commit).
+    Returns the records this workout broke; the first log of an exercise sets a baseline
+    and is not reported.
+    """
+    bests = workout_bests(workout_id, timestamp, exercises)
+    if not bests:
+        return []
+
+    table = PersonalRecord.__table__.c
+    stmt = upsert_records_stmt(user_id, list(bests.values())).returning(
+        table.exercise_name,
+        *(table[metric] for metric in METRICS),
+        *(table[f"{metric}_workout_id"] for metric in METRICS),
+        literal_column("(xmax = 0)").label("inserted"), # Postgres: true if the row was just inserted
+    )
+    result = await db.execute(stmt)
+
+    broken: List[NewPersonalRecord] = []
+    for row in result.mappings():
+        if row["inserted"]:
+            continue
+        for metric in METRICS:
+            if row[f"{metric}_workout_id"] == workout_id:
+                broken.append(NewPersonalRecord(exercise_name=row["exercise_name"], record=metric, value=row[metric]))
+    return broken
+
+
+async def record_workouts_bulk(db: AsyncSession, user_id: uuid.UUID, workouts: Iterable[Tuple[uuid.UUID, datetime, list]]) -> None:
+    """ Folds many (workout_id, timestamp, exercises) with ONE upsert (bulk import). No commit. """
+    merged: Dict[str, dict] = {}
+    for workout_id, timestamp, exercises in workouts:
+        for name, row in workout_bests(workout_id, timestamp, exercises).items():
+            merged[name] = merge_bests(merged.get(name), row)
+    if merged:
+        await db.execute(upsert_records_stmt(user_id, list(merged.values())))
+
+
+async def rebuild_exercises(db: AsyncSession, user_id: uuid.UUID, exercise_names: Iterable[str]) -> None:
+    """
+    Recomputes the records of these exercises from the user's remaining workouts - used
+    after a delete, which an upsert can't undo. Reads only the workouts that contain one
+    of the names (via workout_sets), so call it after the deleted workout's sets are gone.
+    Runs in the caller's transaction (no commit).
+    """
+    names = set(exercise_names)
+    if not names:
+        return
+    containing = (
+        select(WorkoutSet.workout_id)
+        .where(WorkoutSet.user_id == user_id, WorkoutSet.exercise_name.in_(names))
+        .distinct()
+    )
+    result = await db.execute(
+        select(Workout.id, Workout.timestamp, Workout.exercises)
+        .where(Workout.id.in_(containing), Workout.deleted_at.is_(None))
+    )
+    records: Dict[str, dict] = {}
+    for workout_id, timestamp, exercises in result:
+        for name, row in workout_bests(workout_id, timestamp, exercises).items():
+            if name in names:
+                records[name] = merge_bests(records.get(name), row)
+
+    await db.execute(delete(PersonalRecord).where(PersonalRecord.user_id == user_id, PersonalRecord.exercise_name.in_(names)))
+    if records:
+        await db.execute(upsert_records_stmt(user_id, list(records.values())))
+
+
+async def get_records(db: AsyncSession, user_id: uuid.UUID, exercise_name: Optional[str] = None) -> List[PersonalRecord]:
+    query = select(PersonalRecord).where(PersonalRecord.user_id == user_id).order_by(PersonalRecord.exercise_name)
+    if exercise_name:
+        query = query.where(PersonalRecord.exercise_name == exercise_name)
+    result = await db.scalars(query)
+    return list(result.all())
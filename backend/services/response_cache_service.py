@@ -0,0 +1,273 @@
+# backend/services/response_cache_service.py
+"""
+Per-user cache of rendered responses for the hottest reads: the insights
+dashboard and the first page of the workout and mood history lists.
+
+Keys are `rc:{user}:{generation}:{variant}`:
+- generation: a per-user token replaced by `invalidate(user_id)`, which the
+  writers (create_workout, create_mood_entry, Spotify ingestion, imports and the
+  sentiment job) call right after they commit. Entries of older generations are
+  never read again and simply age out. A reader that computed from pre-write data
+  stores under the generation it started with, so it cannot resurrect stale data.
+- variant: path + query string + the user's data version
+  (services/data_version_service.py), so a per-process memory cache also misses
+  within DATA_VERSION_TTL_SECONDS of a write made by another worker.
+
+Backends (RESPONSE_CACHE_BACKEND):
+- "memory": bounded LRU (entries and bytes) in this process.
+- "redis":  any Redis-protocol server (core/redis_client.py), shared by workers;
+            testing/fake_redis.py is a local stand-in.
+- "off":    always compute.
+
+A cold key is computed once per worker: concurrent misses for the same key wait
+for the first request's result instead of all running the query. Backend errors
+are logged and treated as misses, so Redis being down never fails a request.
+"""
+import asyncio
+import hashlib
+import itertools
+import logging
+import secrets
+import time
+import uuid
+from collections import OrderedDict
+from typing import Awaitable, Callable, Dict, Optional, Tuple
+
+import orjson
+from fastapi import Request, Response
+
+from core.config import settings
+from core.redis_client import RedisClient
+
+logger = logging.getLogger(__name__)
+
+_UNCACHED_HEADERS = ("content-length", "content-type")
+
+
+class MemoryBackend:
+    """ LRU of key -> (value, expires at), bounded by entry count and total bytes. """
+
+    name = "memory"
+
+    def __init__(self, max_entries: int, max_bytes: int, generation_ttl: float):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.generation_ttl = generation_ttl
+        self._entries: "OrderedDict[str, Tuple[bytes, float]]" = OrderedDict()
+        self._bytes = 0
+        # user_id -> (token, replaced at), oldest first; kept for generation_ttl only
+        self._generations: "OrderedDict[uuid.UUID, Tuple[str, float]]" = OrderedDict()
+        self._tokens = itertools.count(1)
+        self.evictions = 0
+
+    async def generation(self, user_id: uuid.UUID) -> str:
+        entry = self._generations.get(user_id)
+        if entry is None or time.monotonic() - entry[1] > self.generation_ttl:
+            return "0"
+        return entry[0]
+
+    async def invalidate(self, user_id: uuid.UUID) -> None:
+        now = time.monotonic()
+        self._generations[user_id] = (str(next(self._tokens)), now)
+        self._generations.move_to_end(user_id)
+        while self._generations:
+            _, (_, replaced_at) = next(iter(self._generations.items()))
+            if now - replaced_at <= self.generation_ttl:
+                break
+            self._generations.popitem(last=False)
+
+    async def get(self, key: str) -> Optional[bytes]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry[1] <= time.monotonic():
+            self._discard(key)
+            return None
+        self._entries.move_to_end(key)
+        return entry[0]
+
+    async def set(self, key: str, value: bytes, ttl: float) -> None:
+        if len(value) > self.max_bytes or self.max_entries <= 0:
+            return
+        self._discard(key)
+        self._entries[key] = (value, time.monotonic() + ttl)
+        self._bytes += len(value)
+        while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+            _, (evicted, _) = self._entries.popitem(last=False)
+            self._bytes -= len(evicted)
+            self.evictions += 1
+
+    def _discard(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= len(entry[0])
+
+    async def close(self) -> None:
+        pass
+
+    def stats(self) -> Dict[str, int]:
+        return {"entries": len(self._entries), "bytes": self._bytes, "evictions": self.evictions}
+
+
+class RedisBackend:
+    """ Shared across workers; Redis expires the entries itself. """
+
+    name = "redis"
+
+    def __init__(self, client: RedisClient, generation_ttl: float):
+        self.client = client
+        self.generation_ttl = generation_ttl
+
+    @staticmethod
+    def _generation_key(user_id: uuid.UUID) -> str:
+        return f"rc:gen:{user_id}"
+
+    async def generation(self, user_id: uuid.UUID) -> str:
+        token = await self.client.execute("GET", self._generation_key(user_id))
+        return token.decode() if token else "0"
+
+    async def invalidate(self, user_id: uuid.UUID) -> None:
+        await self.client.execute(
+            "SET", self._generation_key(user_id), secrets.token_hex(8), "PX", int(self.generation_ttl * 1000),
+        )
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return await self.client.execute("GET", key)
+
+    async def set(self, key: str, value: bytes, ttl: float) -> None:
+        await self.client.execute("SET", key, value, "PX", max(1, int(ttl * 1000)))
+
+    async def close(self) -> None:
+        await self.client.close()
+
+    def stats(self) -> Dict[str, int]:
+        return {}
+
+
+def _encode(response: Response) -> bytes:
+    headers = {k: v for k, v in response.headers.items() if k not in _UNCACHED_HEADERS}
+    meta = orjson.dumps({"media_type": response.media_type, "headers": headers})
+    return meta + b"\n" + response.body
+
+
+def _decode(raw: bytes) -> Response:
+    meta, body = raw.split(b"\n", 1)
+    meta = orjson.loads(meta)
+    return Response(content=body, media_type=meta["media_type"], headers=meta["headers"])
+
+
+class ResponseCache:
+    def __init__(self, backend, ttl_seconds: float):
+        self.backend = backend # None = disabled
+        self.ttl = ttl_seconds
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0 # Misses that waited for another request's computation
+        self.stores = 0
+        self.invalidations = 0
+        self.errors = 0
+
+    @staticmethod
+    def variant(request: Request, extra: str = "") -> str:
+        return hashlib.blake2s(f"{request.url.path}?{request.url.query}|{extra}".encode(), digest_size=12).hexdigest()
+
+    async def cached(
+        self, user_id: uuid.UUID, variant: str, compute: Callable[[], Awaitable[Response]],
+    ) -> Response:
+        """
+        The cached response for (user, variant), else `compute()`'s, which is then stored.
+        `compute` must return a fully rendered Response (body + headers worth caching).
+        """
+        if self.backend is None:
+            return await compute()
+        try:
+            key = f"rc:{user_id}:{await self.backend.generation(user_id)}:{variant}"
+            raw = await self.backend.get(key)
+        except Exception as e:
+            self.errors += 1
+            logger.warning(f"Response cache ({self.backend.name}) read failed, serving uncached: {e}")
+            return await compute()
+        if raw is not None:
+            self.hits += 1
+            return _decode(raw)
+
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            self.coalesced += 1
+            raw = await asyncio.shield(inflight)
+            # None: the computing request failed or was cancelled - don't inherit that, compute ourselves
+            return _decode(raw) if raw is not None else await compute()
+
+        self.misses += 1
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        raw = None
+        try:
+            response = await compute()
+            if response.status_code == 200:
+                raw = _encode(response)
+            future.set_result(raw)
+            if raw is not None:
+                try:
+                    await self.backend.set(key, raw, self.ttl)
+                    self.stores += 1
+                except Exception as e:
+                    self.errors += 1
+                    logger.warning(f"Response cache ({self.backend.name}) write failed: {e}")
+            return response
+        finally:
+            if not future.done():
+                future.set_result(None)
+            self._inflight.pop(key, None)
+
+    async def invalidate(self, user_id: uuid.UUID) -> None:
+        """ Call after committing a write that changes what the user's cached reads return. """
+        if self.backend is None:
+            return
+        self.invalidations += 1
+        try:
+            await self.backend.invalidate(user_id)
+        except Exception as e:
+            # Stale reads are still bounded by the data version in the key and by the TTL
+            self.errors += 1
+            logger.error(f"Response cache ({self.backend.name}) invalidation failed for user {user_id}: {e}")
+
+    async def close(self) -> None:
+        if self.backend is not None:
+            await self.backend.close()
+
+    def stats(self) -> Dict[str, float]:
+        lookups = self.hits + self.misses + self.coalesced
+        stats = {
+            "backend": self.backend.name if self.backend else "off",
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "stores": self.stores,
+            "invalidations": self.invalidations,
+            "errors": self.errors,
+            "inflight": len(self._inflight),
+        }
+        if self.backend is not None:
+            stats.update(self.backend.stats())
+        return stats
+
+
+def build_response_cache() -> ResponseCache:
+    ttl = settings.RESPONSE_CACHE_TTL_SECONDS
+    generation_ttl = 2 * ttl + 60 # Outlives every entry stored under the previous generation
+    backend_name = settings.RESPONSE_CACHE_BACKEND.lower()
+    if backend_name == "memory":
+        backend = MemoryBackend(settings.RESPONSE_CACHE_MAX_ENTRIES, settings.RESPONSE_CACHE_MAX_BYTES, generation_ttl)
+    elif backend_name == "redis":
+        backend = RedisBackend(RedisClient(settings.RESPONSE_CACHE_REDIS_URL), generation_ttl)
+    elif backend_name == "off":
+        backend = None
+    else:
+        raise ValueError(f"Unknown RESPONSE_CACHE_BACKEND: {settings.RESPONSE_CACHE_BACKEND!r}")
+    return ResponseCache(backend, ttl)
+
+
+response_cache = build_response_cache()
@@ -0,0 +1,250 @@
+# backend/services/sentiment_service.py
+"""
+Background sentiment analysis for mood entries.
+
+`create_mood_entry` saves the row with sentiment_status='pending' and enqueues a
+job in the same transaction; a job_queue worker then calls OpenAI and fills in
+sentiment_label / sentiment_intensity / sentiment_summary. POST /moods/batch
+enqueues ONE job for all of its entries, analyzed with one batched completion.
+"""
+import logging
+import uuid
+from typing import Dict, Iterable, List, Optional
+
+from openai import AsyncOpenAI
+from sqlalchemy import select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.clients import get_openai_client
+from db.session import AsyncSessionLocal
+from models.mood import MoodEntry, SentimentCache
+from schemas.mood import SentimentAnalysisResult
+from services import data_version_service, openai_service
+from services.job_queue import PermanentJobError, enqueue, register_handler
+from services.response_cache_service import response_cache
+
+logger = logging.getLogger(__name__)
+
+SENTIMENT_JOB = "sentiment_analysis"
+SENTIMENT_BATCH_JOB = "sentiment_analysis_batch"
+DEFAULT_BATCH_SIZE = 20 # Entries per batched chat completion
+
+# Process-wide cache counters (hits avoided an OpenAI call)
+cache_stats = {"hits": 0, "misses": 0}
+
+
+# --- Content-addressed result cache ---
+
+async def lookup_cached(db: AsyncSession, keys: Iterable[str]) -> Dict[str, SentimentAnalysisResult]:
+    """ Returns {cache_key: result} for the keys already analyzed (one query). """
+    keys = list(set(keys))
+    if not keys:
+        return {}
+    rows = (await db.scalars(select(SentimentCache).where(SentimentCache.cache_key.in_(keys)))).all()
+    return {
+        row.cache_key: SentimentAnalysisResult(
+            sentiment=row.sentiment_label, intensity=row.sentiment_intensity, summary=row.sentiment_summary or "",
+        )
+        for row in rows
+    }
+
+
+def cache_insert_stmt(results: Dict[str, SentimentAnalysisResult]):
+    """ Multi-row INSERT ... ON CONFLICT DO NOTHING of fresh results (caller executes + commits). """
+    return pg_insert(SentimentCache).values([
+        {
+            "cache_key": key, "sentiment_label": result.sentiment,
+            "sentiment_intensity": result.intensity, "sentiment_summary": result.summary,
+            "model": openai_service.SENTIMENT_MODEL, "prompt_version": openai_service.SENTIMENT_PROMPT_VERSION,
+        }
+        for key, result in results.items()
+    ]).on_conflict_do_nothing(index_elements=[SentimentCache.cache_key])
+
+
+def _uncached_texts(keys: Dict[str, str], found: Dict[str, SentimentAnalysisResult], entries: Dict[str, str]) -> Dict[str, str]:
+    """ {cache_key: text} still to analyze (each distinct text once); updates cache_stats. """
+    misses: Dict[str, str] = {}
+    for entry_id, key in keys.items():
+        if key not in found:
+            misses.setdefault(key, entries[entry_id])
+    cache_stats["hits"] += len(keys) - sum(1 for key in keys.values() if key in misses)
+    cache_stats["misses"] += len(misses)
+    return misses
+
+
+async def analyze_many(
+    db: AsyncSession, openai_client: AsyncOpenAI, entries: Dict[str, str], batch_size: int = DEFAULT_BATCH_SIZE,
+) -> Dict[str, SentimentAnalysisResult]:
+    """
+    Analyzes {id: journal_text} through the cache, sending only unseen texts to OpenAI
+    in batched requests. Duplicate texts within `entries` are analyzed once.
+    New results are added to the cache in the caller's transaction (caller commits).
+    """
+    keys = {
+        entry_id: openai_service.sentiment_cache_key(text)
+        for entry_id, text in entries.items() if needs_analysis(text)
+    }
+    found = await lookup_cached(db, keys.values())
+
+    miss_items = list(_uncached_texts(keys, found, entries).items())
+    for start in range(0, len(miss_items), batch_size):
+        # The cache key doubles as the batch item id, so results map straight back
+        fresh = await openai_service.analyze_journal_entries_batch(openai_client, dict(miss_items[start:start + batch_size]))
+        if fresh:
+            await db.execute(cache_insert_stmt(fresh))
+            found.update(fresh)
+
+    return {entry_id: found[key] for entry_id, key in keys.items() if key in found}
+
+
+def needs_analysis(journal_text: Optional[str]) -> bool:
+    return bool(journal_text and journal_text.strip())
+
+
+def enqueue_sentiment_analysis(db: AsyncSession, mood_entry: MoodEntry) -> None:
+    """
+    Marks the entry pending and queues its analysis in the caller's transaction.
+    The entry must have its `id` assigned already (set it explicitly before flush).
+    """
+    mood_entry.sentiment_status = "pending"
+    enqueue(db, SENTIMENT_JOB, {"mood_entry_id": str(mood_entry.id)})
+
+
+def enqueue_sentiment_batch(db: AsyncSession, mood_entry_ids: List[uuid.UUID]) -> None:
+    """
+    Queues ONE job analyzing all of these entries, in the caller's transaction.
+    The caller inserts them with sentiment_status='pending'.
+    """
+    enqueue(db, SENTIMENT_BATCH_JOB, {"mood_entry_ids": [str(entry_id) for entry_id in mood_entry_ids]})
+
+
+async def _mark_failed(payload: dict, error: str) -> None:
+    async with AsyncSessionLocal() as db:
+        user_id = await db.scalar(
+            update(MoodEntry).where(MoodEntry.id == uuid.UUID(payload["mood_entry_id"]))
+            .values(sentiment_status="failed").returning(MoodEntry.user_id)
+        )
+        if user_id is not None:
+            await data_version_service.bump(db, user_id)
+        await db.commit()
+    if user_id is not None:
+        await response_cache.invalidate(user_id)
+
+
+@register_handler(SENTIMENT_JOB, on_failure=_mark_failed)
+async def run_sentiment_job(payload: dict) -> None:
+    mood_entry_id = uuid.UUID(payload["mood_entry_id"])
+
+    # Read, then release the connection before the (slow) OpenAI call
+    async with AsyncSessionLocal() as db:
+        entry = await db.get(MoodEntry, mood_entry_id)
+        journal_text = entry.journal_text if entry else None
+        user_id = entry.user_id if entry else None
+    if entry is None or entry.deleted_at is not None:
+        raise PermanentJobError(f"Mood entry {mood_entry_id} no longer exists")
+    if not needs_analysis(journal_text):
+        async with AsyncSessionLocal() as db:
+            await db.execute(update(MoodEntry).where(MoodEntry.id == mood_entry_id).values(sentiment_status=None))
+            await data_version_service.bump(db, user_id)
+            await db.commit()
+        await response_cache.invalidate(user_id)
+        return
+
+    cache_key = openai_service.sentiment_cache_key(journal_text)
+    async with AsyncSessionLocal() as db:
+        result = (await lookup_cached(db, [cache_key])).get(cache_key)
+    fresh = result is None
+    cache_stats["misses" if fresh else "hits"] += 1
+
+    if fresh:
+        result = await openai_service.analyze_journal_entry(get_openai_client(), journal_text)
+        if result is None:
+            # analyze_journal_entry logs and swallows API/parse errors; raise so the queue retries
+            raise RuntimeError("Sentiment analysis returned no result")
+
+    async with AsyncSessionLocal() as db:
+        if fresh:
+            await db.execute(cache_insert_stmt({cache_key: result}))
+        await db.execute(
+            update(MoodEntry).where(MoodEntry.id == mood_entry_id).values(
+                sentiment_label=result.sentiment,
+                sentiment_intensity=result.intensity,
+                sentiment_summary=result.summary,
+                sentiment_status="done",
+            )
+        )
+        await data_version_service.bump(db, user_id) # The entry's sentiment fields changed under cached lists
+        await db.commit()
+    await response_cache.invalidate(user_id)
+    logger.info(f"Sentiment stored for mood entry {mood_entry_id}: {result.sentiment} ({result.intensity})")
+
+
+async def _mark_batch_failed(payload: dict, error: str) -> None:
+    async with AsyncSessionLocal() as db:
+        user_ids = (await db.scalars(
+            update(MoodEntry)
+            .where(MoodEntry.id.in_([uuid.UUID(i) for i in payload["mood_entry_ids"]]), MoodEntry.sentiment_status == "pending")
+            .values(sentiment_status="failed").returning(MoodEntry.user_id)
+        )).all()
+        for user_id in set(user_ids):
+            await data_version_service.bump(db, user_id)
+        await db.commit()
+    for user_id in set(user_ids):
+        await response_cache.invalidate(user_id)
+
+
+@register_handler(SENTIMENT_BATCH_JOB, on_failure=_mark_batch_failed)
+async def run_sentiment_batch_job(payload: dict) -> None:
+    """
+    Analyzes a batch's still-pending entries: cached texts are free, the rest go to
+    OpenAI in batched completions. Entries the model skipped make the job retry;
+    entries already done are not sent again.
+    """
+    mood_entry_ids = [uuid.UUID(i) for i in payload["mood_entry_ids"]]
+
+    # Read, then release the connection before the (slow) OpenAI calls
+    async with AsyncSessionLocal() as db:
+        rows = (await db.execute(
+            select(MoodEntry.id, MoodEntry.user_id, MoodEntry.journal_text)
+            .where(MoodEntry.id.in_(mood_entry_ids), MoodEntry.sentiment_status == "pending", MoodEntry.deleted_at.is_(None))
+        )).all()
+        entries = {str(row.id): row.journal_text for row in rows}
+        keys = {entry_id: openai_service.sentiment_cache_key(text) for entry_id, text in entries.items() if needs_analysis(text)}
+        found = await lookup_cached(db, keys.values())
+    if not rows:
+        return
+
+    fresh: Dict[str, SentimentAnalysisResult] = {}
+    miss_items = list(_uncached_texts(keys, found, entries).items())
+    for start in range(0, len(miss_items), DEFAULT_BATCH_SIZE):
+        fresh.update(await openai_service.analyze_journal_entries_batch(
+            get_openai_client(), dict(miss_items[start:start + DEFAULT_BATCH_SIZE])
+        ))
+    found.update(fresh)
+
+    results = {entry_id: found[key] for entry_id, key in keys.items() if key in found}
+    async with AsyncSessionLocal() as db:
+        if fresh:
+            await db.execute(cache_insert_stmt(fresh))
+        if results:
+            # ORM bulk UPDATE by primary key: one executemany for the whole batch
+            await db.execute(update(MoodEntry), [
+                {"id": uuid.UUID(entry_id), "sentiment_label": r.sentiment, "sentiment_intensity": r.intensity,
+                 "sentiment_summary": r.summary, "sentiment_status": "done"}
+                for entry_id, r in results.items()
+            ])
+        blank = [uuid.UUID(entry_id) for entry_id in entries if entry_id not in keys]
+        if blank: # Nothing to analyze: settled, not pending
+            await db.execute(update(MoodEntry).where(MoodEntry.id.in_(blank)).values(sentiment_status=None))
+        user_ids = {row.user_id for row in rows}
+        for user_id in user_ids:
+            await data_version_service.bump(db, user_id)
+        await db.commit()
+    for user_id in user_ids:
+        await response_cache.invalidate(user_id)
+
+    missing = len(keys) - len(results)
+    logger.info(f"Sentiment batch: {len(results)} stored ({len(fresh)} fresh), {missing} missing")
+    if missing:
+        raise RuntimeError(f"{missing} entries got no sentiment result") # Retried; stored ones are skipped
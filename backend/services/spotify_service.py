@@ -0,0 +1,160 @@
+# backend/services/spotify_service.py
+"""
+Incremental ingestion of the Spotify 'recently played' history.
+
+Each sync resumes from the per-user high-water mark (`spotify_sync_state.last_played_at`)
+using Spotify's `after` cursor, and writes every page with ONE multi-row
+INSERT ... ON CONFLICT (user_id, played_at) DO NOTHING, so re-syncing is idempotent.
+"""
+import logging
+import math
+import uuid
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import List, Optional, Tuple
+
+import httpx
+from sqlalchemy import func
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.config import settings
+from models.spotify import SpotifySyncState, SpotifyTrack
+from services import data_version_service
+from services.response_cache_service import response_cache
+from schemas.spotify import SpotifyPlayHistoryObject
+
+logger = logging.getLogger(__name__)
+
+RECENTLY_PLAYED_PATH = "/me/player/recently-played"
+PAGE_LIMIT = 50 # Spotify's maximum for this endpoint
+
+
+class SpotifyNotConnectedError(Exception):
+    """ The user has not linked (or has revoked) their Spotify account. """
+
+
+class SpotifyAPIError(Exception):
+    def __init__(self, status_code: int, message: str, retry_after: Optional[int] = None):
+        super().__init__(f"Spotify API error {status_code}: {message}")
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+
+def _parse_retry_after(value: Optional[str]) -> Optional[int]:
+    """
+    Retry-After header -> seconds to wait. It may be delta-seconds or an HTTP-date;
+    anything unparseable gives None (the API error is still reported).
+    """
+    value = (value or "").strip()
+    if value.isdigit():
+        return int(value)
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError, IndexError):
+        return None
+    if retry_at is None:
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc) # HTTP-dates are always GMT
+    return max(0, math.ceil((retry_at - datetime.now(timezone.utc)).total_seconds()))
+
+
+def _to_ms(value: datetime) -> int:
+    return int(value.timestamp() * 1000)
+
+
+def play_to_row(user_id: uuid.UUID, play: SpotifyPlayHistoryObject) -> dict:
+    """ Flattens one validated play into a spotify_tracks row. """
+    track = play.track
+    return {
+        "id": uuid.uuid4(),
+        "user_id": user_id,
+        "spotify_track_id": track.id,
+        "played_at": play.played_at,
+        "track_name": track.name,
+        "artist_name": ", ".join(artist.name for artist in track.artists),
+        "album_name": track.album.name,
+        "track_uri": track.uri,
+        "duration_ms": track.duration_ms,
+        "explicit": track.explicit,
+        "popularity": track.popularity,
+    }
+
+
+async def fetch_recently_played_page(
+    http: httpx.AsyncClient, access_token: str, after_ms: Optional[int], limit: int = PAGE_LIMIT,
+) -> Tuple[List[SpotifyPlayHistoryObject], Optional[int], bool]:
+    """ One API call. Returns (plays, next `after` cursor, has_more). """
+    params = {"limit": limit}
+    if after_ms is not None:
+        params["after"] = after_ms
+    response = await http.get(RECENTLY_PLAYED_PATH, params=params, headers={"Authorization": f"Bearer {access_token}"})
+    if response.status_code != 200:
+        retry_after = _parse_retry_after(response.headers.get("Retry-After"))
+        raise SpotifyAPIError(response.status_code, response.text[:200], retry_after)
+
+    body = response.json()
+    plays = [SpotifyPlayHistoryObject.model_validate(item) for item in body.get("items") or []]
+    cursors = body.get("cursors") or {}
+    next_after = int(cursors["after"]) if cursors.get("after") else None
+    return plays, next_after, bool(body.get("next"))
+
+
+async def ingest_recently_played(
+    db: AsyncSession, http: httpx.AsyncClient, user_id: uuid.UUID, access_token: str,
+    max_pages: Optional[int] = None,
+) -> int:
+    """
+    Pulls plays newer than the user's high-water mark and stores them.
+    Each page is committed together with the advanced high-water mark, so an
+    interrupted sync resumes where it stopped. Returns the number of new rows.
+    """
+    max_pages = max_pages or settings.SPOTIFY_SYNC_MAX_PAGES
+    state = await db.get(SpotifySyncState, user_id)
+    after_ms = _to_ms(state.last_played_at) if state and state.last_played_at else None
+
+    inserted = 0
+    for _ in range(max_pages):
+        plays, next_after, has_more = await fetch_recently_played_page(http, access_token, after_ms)
+        if not plays:
+            break
+
+        rows = [play_to_row(user_id, play) for play in plays]
+        result = await db.execute(
+            pg_insert(SpotifyTrack).values(rows)
+            .on_conflict_do_nothing(index_elements=[SpotifyTrack.user_id, SpotifyTrack.played_at])
+            .returning(SpotifyTrack.id)
+        )
+        page_inserted = len(result.all())
+        if page_inserted:
+            await data_version_service.bump(db, user_id)
+        inserted += page_inserted
+
+        newest = max(play.played_at for play in plays)
+        await db.execute(_advance_state_stmt(user_id, newest))
+        await db.commit()
+        if page_inserted:
+            await response_cache.invalidate(user_id)
+
+        after_ms = next_after if next_after is not None else _to_ms(newest)
+        if not has_more:
+            break
+
+    await db.execute(_advance_state_stmt(user_id, None))
+    await db.commit()
+    logger.info(f"Spotify sync for user {user_id}: {inserted} new play(s).")
+    return inserted
+
+
+def _advance_state_stmt(user_id: uuid.UUID, newest: Optional[datetime]):
+    """ Upserts the sync state; the high-water mark only ever moves forward. """
+    now = datetime.now(timezone.utc)
+    stmt = pg_insert(SpotifySyncState).values(user_id=user_id, last_played_at=newest, last_synced_at=now)
+    return stmt.on_conflict_do_update(
+        index_elements=[SpotifySyncState.user_id],
+        set_={
+            "last_played_at": func.greatest(SpotifySyncState.last_played_at, stmt.excluded.last_played_at),
+            "last_synced_at": stmt.excluded.last_synced_at,
+        },
+    )
@@ -0,0 +1,228 @@
+# backend/services/spotify_token_service.py
+"""
+Spotify OAuth token store with an in-process cache and single-flight refresh.
+
+- Tokens live encrypted in `spotify_accounts` (core/security.py).
+- `get_access_token` serves from memory until the token is within
+  SPOTIFY_TOKEN_REFRESH_MARGIN_SECONDS of `expires_at`, then refreshes proactively.
+- Concurrent callers for the same user share ONE load/refresh task instead of
+  stampeding Spotify's token endpoint. A forced refresh (Spotify rejected the
+  token) never joins a plain load, which could return that same token.
+- The cache is a bounded LRU; entries whose access token has expired are dropped.
+"""
+import asyncio
+import logging
+import urllib.parse
+import uuid
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from typing import Dict, NamedTuple, Optional
+
+import httpx
+from sqlalchemy import func
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+from core.clients import get_spotify_accounts_http_client
+from core.config import settings
+from core.security import create_oauth_state, decrypt_secret, encrypt_secret, verify_oauth_state
+from db.session import AsyncSessionLocal
+from models.spotify import SpotifyAccount
+from schemas.spotify import SpotifyTokenData
+from services.spotify_service import SpotifyAPIError, SpotifyNotConnectedError
+
+logger = logging.getLogger(__name__)
+
+OAUTH_STATE_PURPOSE = "spotify_connect"
+TOKEN_PATH = "/api/token"
+
+
+# --- OAuth flow ---
+
+def create_authorization_url(user_id: uuid.UUID) -> str:
+    params = {
+        "client_id": settings.SPOTIFY_CLIENT_ID,
+        "response_type": "code",
+        "redirect_uri": settings.SPOTIFY_REDIRECT_URI,
+        "scope": settings.SPOTIFY_SCOPES,
+        "state": create_oauth_state(user_id, OAUTH_STATE_PURPOSE),
+    }
+    return f"{settings.SPOTIFY_ACCOUNTS_BASE_URL}/authorize?{urllib.parse.urlencode(params)}"
+
+
+def user_id_from_state(state: Optional[str]) -> Optional[uuid.UUID]:
+    return verify_oauth_state(state, OAUTH_STATE_PURPOSE) if state else None
+
+
+async def _token_request(form: dict) -> dict:
+    response = await get_spotify_accounts_http_client().post(TOKEN_PATH, data=form)
+    if response.status_code != 200:
+        raise SpotifyAPIError(response.status_code, response.text[:200])
+    return response.json()
+
+
+def _token_data_from(body: dict, previous_refresh_token: Optional[str] = None) -> SpotifyTokenData:
+    return SpotifyTokenData(
+        access_token=body["access_token"],
+        # Spotify may omit refresh_token on refresh: keep using the previous one
+        refresh_token=body.get("refresh_token") or previous_refresh_token,
+        expires_at=datetime.now(timezone.utc) + timedelta(seconds=int(body.get("expires_in", 3600))),
+    )
+
+
+async def _save_tokens(user_id: uuid.UUID, tokens: SpotifyTokenData, scope: Optional[str] = None) -> None:
+    values = {
+        "user_id": user_id,
+        "access_token_encrypted": encrypt_secret(tokens.access_token),
+        "refresh_token_encrypted": encrypt_secret(tokens.refresh_token) if tokens.refresh_token else None,
+        "expires_at": tokens.expires_at,
+        "updated_at": func.now(),
+    }
+    if scope is not None:
+        values["scope"] = scope
+    stmt = pg_insert(SpotifyAccount).values(**values)
+    update_cols = {k: stmt.excluded[k] for k in values if k != "user_id"}
+    async with AsyncSessionLocal() as db:
+        await db.execute(stmt.on_conflict_do_update(index_elements=[SpotifyAccount.user_id], set_=update_cols))
+        await db.commit()
+
+
+async def exchange_code(user_id: uuid.UUID, code: str) -> SpotifyTokenData:
+    """ Completes the OAuth callback: code -> tokens, stored encrypted and cached. """
+    body = await _token_request({
+        "grant_type": "authorization_code", "code": code, "redirect_uri": settings.SPOTIFY_REDIRECT_URI,
+    })
+    tokens = _token_data_from(body)
+    await _save_tokens(user_id, tokens, scope=body.get("scope"))
+    token_cache.put(user_id, tokens)
+    return tokens
+
+
+# --- Cached access with single-flight refresh ---
+
+class _Inflight(NamedTuple):
+    task: asyncio.Task
+    forced: bool # Refreshes at Spotify even if the stored token still looks fresh
+
+
+class SpotifyTokenCache:
+    def __init__(self, refresh_margin_seconds: int, maxsize: int = 10000):
+        self.refresh_margin = timedelta(seconds=refresh_margin_seconds)
+        self.maxsize = maxsize
+        self._tokens: "OrderedDict[uuid.UUID, SpotifyTokenData]" = OrderedDict()
+        self._inflight: Dict[uuid.UUID, _Inflight] = {}
+        self.hits = 0        # Served from memory
+        self.db_loads = 0    # Loaded from spotify_accounts (cold cache / other process refreshed)
+        self.refreshes = 0   # Calls to Spotify's token endpoint
+        self.refresh_failures = 0
+        self.coalesced = 0   # Callers that joined an in-flight load/refresh instead of starting one
+        self.evictions = 0
+
+    def _fresh(self, tokens: Optional[SpotifyTokenData]) -> bool:
+        return bool(tokens and tokens.expires_at and tokens.expires_at - self.refresh_margin > datetime.now(timezone.utc))
+
+    def _get(self, user_id: uuid.UUID) -> Optional[SpotifyTokenData]:
+        """ Cached tokens, marked recently used; an expired access token is dropped (the DB has the refresh token). """
+        tokens = self._tokens.get(user_id)
+        if tokens is None:
+            return None
+        if not tokens.expires_at or tokens.expires_at <= datetime.now(timezone.utc):
+            del self._tokens[user_id]
+            return None
+        self._tokens.move_to_end(user_id)
+        return tokens
+
+    def put(self, user_id: uuid.UUID, tokens: SpotifyTokenData) -> None:
+        if self.maxsize <= 0:
+            return
+        self._tokens[user_id] = tokens
+        self._tokens.move_to_end(user_id)
+        while len(self._tokens) > self.maxsize:
+            self._tokens.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self, user_id: uuid.UUID) -> None:
+        self._tokens.pop(user_id, None)
+
+    async def get_access_token(self, user_id: uuid.UUID, force_refresh: bool = False) -> str:
+        tokens = self._get(user_id)
+        if not force_refresh and self._fresh(tokens):
+            self.hits += 1
+            return tokens.access_token
+
+        inflight = self._inflight.get(user_id)
+        if inflight is not None and (inflight.forced or not force_refresh):
+            self.coalesced += 1
+            task = inflight.task
+        else:
+            # A forced caller can't join a plain load (it may return the token Spotify just
+            # rejected): its refresh runs after that load, so one user never refreshes twice at once
+            previous = inflight.task if inflight else None
+            task = asyncio.create_task(self._load_after(previous, user_id, force_refresh))
+            self._inflight[user_id] = _Inflight(task, force_refresh)
+            task.add_done_callback(lambda done: self._forget(user_id, done))
+        # shield: a cancelled request must not cancel the refresh other callers are awaiting
+        tokens = await asyncio.shield(task)
+        return tokens.access_token
+
+    def _forget(self, user_id: uuid.UUID, task: asyncio.Task) -> None:
+        inflight = self._inflight.get(user_id)
+        if inflight is not None and inflight.task is task: # Not a task chained after it
+            del self._inflight[user_id]
+
+    async def _load_after(self, previous: Optional[asyncio.Task], user_id: uuid.UUID, force_refresh: bool) -> SpotifyTokenData:
+        if previous is not None:
+            await asyncio.wait([previous]) # Its own callers get its result or error
+        return await self._load_or_refresh(user_id, force_refresh)
+
+    async def _load_or_refresh(self, user_id: uuid.UUID, force_refresh: bool) -> SpotifyTokenData:
+        async with AsyncSessionLocal() as db:
+            account = await db.get(SpotifyAccount, user_id)
+        if account is None:
+            self.invalidate(user_id)
+            raise SpotifyNotConnectedError(f"No Spotify tokens stored for user {user_id}")
+        self.db_loads += 1
+
+        tokens = SpotifyTokenData(
+            access_token=decrypt_secret(account.access_token_encrypted),
+            refresh_token=decrypt_secret(account.refresh_token_encrypted) if account.refresh_token_encrypted else None,
+            expires_at=account.expires_at,
+        )
+        if self._fresh(tokens) and not force_refresh:
+            self.put(user_id, tokens) # e.g. another worker process already refreshed it
+            return tokens
+        if not tokens.refresh_token:
+            raise SpotifyNotConnectedError(f"Spotify token for user {user_id} expired and no refresh token is stored")
+
+        try:
+            self.refreshes += 1
+            body = await _token_request({"grant_type": "refresh_token", "refresh_token": tokens.refresh_token})
+        except (SpotifyAPIError, httpx.HTTPError) as e:
+            self.refresh_failures += 1
+            if isinstance(e, SpotifyAPIError) and e.status_code in (400, 401):
+                # invalid_grant: the user revoked access
+                self.invalidate(user_id)
+                raise SpotifyNotConnectedError(f"Spotify refresh rejected for user {user_id}: {e}") from e
+            raise
+
+        refreshed = _token_data_from(body, previous_refresh_token=tokens.refresh_token)
+        await _save_tokens(user_id, refreshed)
+        self.put(user_id, refreshed)
+        logger.info(f"Refreshed Spotify access token for user {user_id} (expires {refreshed.expires_at}).")
+        return refreshed
+
+    def stats(self) -> Dict[str, int]:
+        return {"cached_users": len(self._tokens), "maxsize": self.maxsize, "evictions": self.evictions,
+                "inflight": len(self._inflight), "hits": self.hits,
+                "db_loads": self.db_loads, "refreshes": self.refreshes,
+                "refresh_failures": self.refresh_failures, "coalesced": self.coalesced}
+
+
+token_cache = SpotifyTokenCache(
+    refresh_margin_seconds=settings.SPOTIFY_TOKEN_REFRESH_MARGIN_SECONDS,
+    maxsize=settings.SPOTIFY_TOKEN_CACHE_SIZE,
+)
+
+
+async def get_access_token(user_id: uuid.UUID, force_refresh: bool = False) -> str:
+    """ Valid access token for the user; raises SpotifyNotConnectedError if not linked. """
+    return await token_cache.get_access_token(user_id, force_refresh=force_refresh)
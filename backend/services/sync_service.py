@@ -0,0 +1,110 @@
+# backend/services/sync_service.py
+"""
+Delta sync for the mobile client (GET /api/v1/sync).
+
+Every write to `workouts` / `mood_entries` moves the row's `updated_at`, and
+deletes only set `deleted_at` (a tombstone), so "what changed since token T" is
+one (user_id, updated_at, id) index range scan per table. Cost and payload scale
+with the number of changes, not with the length of the history.
+
+The token is a composite keyset cursor (core/pagination.py) with one
+(updated_at, id) position per table. updated_at is the writing transaction's
+now(), and a slow transaction can commit rows stamped earlier than rows that are
+already visible. To cover that, a final page doesn't advance a position past
+`now() - SYNC_SAFETY_WINDOW_SECONDS`. The next sync re-sends those few recent rows,
+which is harmless because clients upsert by id.
+"""
+import logging
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import func, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.config import settings
+from core.pagination import decode_multi_cursor, encode_multi_cursor
+from models.mood import MoodEntry
+from models.workout import Workout
+from schemas.sync import SyncMood, SyncResponse, SyncTombstone, SyncWorkout
+
+logger = logging.getLogger(__name__)
+
+# type -> (model, schema for live rows)
+SYNC_SOURCES = {
+    "workout": (Workout, SyncWorkout),
+    "mood": (MoodEntry, SyncMood),
+}
+
+_MIN_ID = uuid.UUID(int=0)
+
+Position = Optional[Tuple[datetime, uuid.UUID]]
+
+
+def _after(model, position: Position):
+    """ Rows strictly after `position` in (updated_at, id) ASC order; None = from the beginning. """
+    if position is None:
+        return True
+    return tuple_(model.updated_at, model.id) > tuple_(*position) # Row comparison: one index range
+
+
+async def _changed_rows(db: AsyncSession, model, user_id: uuid.UUID, position: Position, limit: int) -> list:
+    result = await db.scalars(
+        select(model)
+        .where(model.user_id == user_id, _after(model, position))
+        .order_by(model.updated_at, model.id)
+        .limit(limit + 1) # One extra row tells whether more changes are waiting
+    )
+    return list(result.all())
+
+
+def _next_position(previous: Position, rows: list, has_more: bool, horizon: Tuple[datetime, uuid.UUID]) -> Position:
+    if not rows:
+        return previous
+    last = (rows[-1].updated_at, rows[-1].id)
+    if has_more:
+        return last # Must make progress; the rest of the backlog follows immediately
+    position = min(last, horizon) # Re-send the in-flight window next time
+    if previous is not None and position <= previous:
+        return previous
+    return position
+
+
+async def changes_since(db: AsyncSession, user_id: uuid.UUID, since: Optional[str], limit: int) -> SyncResponse:
+    """
+    Up to `limit` changed rows per table after the client's token (all history when
+    `since` is None). Raises HTTP 400 (via decode_multi_cursor) on a malformed token.
+    """
+    positions: Dict[str, Position] = {name: None for name in SYNC_SOURCES}
+    if since:
+        decoded = decode_multi_cursor(since)
+        positions.update({name: pos for name, pos in decoded.items() if name in SYNC_SOURCES})
+
+    now = await db.scalar(select(func.now()))
+    horizon = (now - timedelta(seconds=settings.SYNC_SAFETY_WINDOW_SECONDS), _MIN_ID)
+
+    live: Dict[str, list] = {}
+    deleted: List[SyncTombstone] = []
+    any_more = False
+    for name, (model, schema) in SYNC_SOURCES.items():
+        rows = await _changed_rows(db, model, user_id, positions[name], limit)
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        any_more = any_more or has_more
+        positions[name] = _next_position(positions[name], rows, has_more, horizon)
+
+        live[name] = []
+        for row in rows:
+            if row.deleted_at is not None:
+                deleted.append(SyncTombstone(type=name, id=row.id, deleted_at=row.deleted_at))
+            else:
+                live[name].append(schema.model_validate(row))
+
+    logger.debug(f"Sync for user {user_id}: {len(live['workout'])} workouts, {len(live['mood'])} moods, {len(deleted)} deletions")
+    return SyncResponse(
+        workouts=live["workout"],
+        moods=live["mood"],
+        deleted=deleted,
+        next_since=encode_multi_cursor(positions),
+        has_more=any_more,
+    )
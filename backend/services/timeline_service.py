@@ -0,0 +1,114 @@
+# backend/services/timeline_service.py
+import heapq
+import logging
+import uuid
+from typing import AsyncIterator, Dict, List, NamedTuple, Optional, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.pagination import decode_multi_cursor, encode_multi_cursor, keyset_after
+from models.mood import MoodEntry
+from models.spotify import SpotifyTrack
+from models.workout import Workout
+from schemas.mood import MoodRead
+from schemas.spotify import SpotifyTrackRead
+from schemas.timeline import TimelineItem
+from schemas.workout import WorkoutRead
+
+logger = logging.getLogger(__name__)
+
+
+class TimelineSource(NamedTuple):
+    """ A per-user table that can be merged into the timeline. """
+    model: type
+    time_attr: str     # Column the timeline is ordered by (DESC)
+    read_schema: type  # Pydantic schema used for the item's `data`
+
+
+# Every source must have a (user_id, <time_attr> DESC, id) index so each
+# per-source page is an index range scan.
+TIMELINE_SOURCES: Dict[str, TimelineSource] = {
+    "workout": TimelineSource(Workout, "timestamp", WorkoutRead),
+    "mood": TimelineSource(MoodEntry, "created_at", MoodRead),
+    "spotify": TimelineSource(SpotifyTrack, "played_at", SpotifyTrackRead),
+}
+
+
+async def _fetch_source_page(
+    db: AsyncSession, source: TimelineSource, user_id: uuid.UUID,
+    position: Optional[Tuple], limit: int,
+) -> list:
+    """ Next `limit` rows of one source after its keyset position (None = from the top). """
+    time_col = getattr(source.model, source.time_attr)
+    query = (
+        select(source.model)
+        .where(source.model.user_id == user_id)
+        .order_by(time_col.desc(), source.model.id)
+        .limit(limit)
+    )
+    if hasattr(source.model, "deleted_at"):
+        query = query.where(source.model.deleted_at.is_(None)) # Skip sync tombstones
+    if position is not None:
+        query = query.where(keyset_after(time_col, source.model.id, position))
+    result = await db.scalars(query)
+    return list(result.all())
+
+
+async def get_timeline_page(
+    db: AsyncSession, user_id: uuid.UUID, limit: int, cursor: Optional[str] = None,
+) -> Tuple[List[TimelineItem], Optional[str]]:
+    """
+    K-way merges the user's sources by time (newest first) and returns one page.
+
+    Each source is read with its own keyset position, and at most `limit` rows are
+    fetched per source - the most one page can possibly consume from it.
+    """
+    if cursor:
+        positions = decode_multi_cursor(cursor)
+        active = {name: pos for name, pos in positions.items() if name in TIMELINE_SOURCES}
+    else:
+        active = {name: None for name in TIMELINE_SOURCES}
+
+    # Fetch each source's candidate rows (sequential: one AsyncSession = one connection)
+    rows_by_source = {}
+    for name, position in active.items():
+        rows_by_source[name] = await _fetch_source_page(db, TIMELINE_SOURCES[name], user_id, position, limit)
+
+    # Each per-source list is already sorted by time DESC, so heapq.merge is a true k-way merge
+    streams = [
+        [(getattr(row, TIMELINE_SOURCES[name].time_attr), name, row) for row in rows]
+        for name, rows in rows_by_source.items()
+    ]
+    merged = heapq.merge(*streams, key=lambda entry: entry[0], reverse=True)
+
+    page: List[TimelineItem] = []
+    consumed: Dict[str, int] = {name: 0 for name in rows_by_source}
+    next_positions = dict(active)
+    for timestamp, name, row in merged:
+        if len(page) >= limit:
+            break
+        source = TIMELINE_SOURCES[name]
+        page.append(TimelineItem(type=name, timestamp=timestamp, data=source.read_schema.model_validate(row)))
+        consumed[name] += 1
+        next_positions[name] = (timestamp, row.id)
+
+    # A source is exhausted once it returned a short page and all of it was consumed
+    for name, rows in rows_by_source.items():
+        if len(rows) < limit and consumed[name] == len(rows):
+            next_positions.pop(name, None)
+
+    next_cursor = encode_multi_cursor(next_positions) if next_positions else None
+    logger.debug(f"Timeline page for user {user_id}: {len(page)} items, consumed={consumed}")
+    return page, next_cursor
+
+
+async def stream_timeline_page(items: List[TimelineItem], next_cursor: Optional[str]) -> AsyncIterator[bytes]:
+    """ Serializes a TimelinePage item by item so the response body is never built in one piece. """
+    yield b'{"items":['
+    for index, item in enumerate(items):
+        if index:
+            yield b","
+        yield item.model_dump_json().encode()
+    cursor_json = f'"{next_cursor}"' if next_cursor else "null" # Cursor is base64url: no escaping needed
+    yield f'],"next_cursor":{cursor_json}}}'.encode()
@@ -0,0 +1,93 @@
+# backend/services/workout_sets_service.py
+"""
+Maintains `workout_sets`, the normalized per-set copy of `Workout.exercises`,
+and answers per-exercise questions from it with indexed aggregates.
+"""
+import logging
+import uuid
+from datetime import datetime
+from typing import Iterable, List, Optional
+
+from sqlalchemy import delete, func, insert, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from models.workout import WorkoutSet
+from schemas.workout import ExerciseProgressPoint
+
+logger = logging.getLogger(__name__)
+
+# Backfill straight from the JSONB in SQL (same walk as analytics_service.SET_ROWS_SQL,
+# WITH ORDINALITY for the positions). Idempotent: existing rows are skipped.
+BACKFILL_SQL = text("""
+    INSERT INTO workout_sets (workout_id, exercise_index, set_index, user_id, exercise_name, reps, weight, timestamp)
+    SELECT w.id, ex.ord - 1, s.ord - 1, w.user_id,
+           ex.value->>'name', (s.value->>'reps')::int, (s.value->>'weight')::float, w.timestamp
+    FROM workouts w
+    CROSS JOIN LATERAL jsonb_array_elements(COALESCE(w.exercises, '[]'::jsonb)) WITH ORDINALITY AS ex(value, ord)
+    CROSS JOIN LATERAL jsonb_array_elements(COALESCE(ex.value->'sets', '[]'::jsonb)) WITH ORDINALITY AS s(value, ord)
+    WHERE w.id = ANY(:workout_ids) AND w.deleted_at IS NULL
+      AND ex.value->>'name' IS NOT NULL AND s.value->>'reps' IS NOT NULL AND s.value->>'weight' IS NOT NULL
+    ON CONFLICT DO NOTHING
+""")
+
+
+def set_rows(workout_id: uuid.UUID, user_id: uuid.UUID, timestamp: datetime, exercises: Iterable[dict]) -> List[dict]:
+    """ Flattens a workout's exercises JSONB payload into workout_sets rows. """
+    return [
+        {
+            "workout_id": workout_id,
+            "exercise_index": exercise_index,
+            "set_index": set_index,
+            "user_id": user_id,
+            "exercise_name": exercise["name"],
+            "reps": set_log["reps"],
+            "weight": set_log["weight"],
+            "timestamp": timestamp,
+        }
+        for exercise_index, exercise in enumerate(exercises or [])
+        for set_index, set_log in enumerate(exercise.get("sets") or [])
+    ]
+
+
+async def record_sets(db: AsyncSession, rows: List[dict]) -> None:
+    """ Inserts set rows (one executemany). Runs in the caller's transaction (no commit). """
+    if rows:
+        await db.execute(insert(WorkoutSet), rows)
+
+
+async def record_workout_sets(
+    db: AsyncSession, workout_id: uuid.UUID, user_id: uuid.UUID, timestamp: datetime, exercises: list,
+) -> None:
+    await record_sets(db, set_rows(workout_id, user_id, timestamp, exercises))
+
+
+async def delete_workout_sets(db: AsyncSession, workout_id: uuid.UUID) -> None:
+    """ Drops a (soft-)deleted workout's sets so per-exercise queries stop seeing them. No commit. """
+    await db.execute(delete(WorkoutSet).where(WorkoutSet.workout_id == workout_id))
+
+
+async def exercise_progress(
+    db: AsyncSession, user_id: uuid.UUID, exercise_name: str,
+    start_date: Optional[datetime] = None, end_date: Optional[datetime] = None,
+) -> List[ExerciseProgressPoint]:
+    """ Per-workout aggregates for one exercise, oldest first - an index range scan on workout_sets. """
+    query = (
+        select(
+            WorkoutSet.workout_id,
+            WorkoutSet.timestamp,
+            func.count().label("sets"),
+            func.sum(WorkoutSet.reps).label("total_reps"),
+            func.max(WorkoutSet.weight).label("max_weight"),
+            func.sum(WorkoutSet.reps * WorkoutSet.weight).label("volume"),
+        )
+        .where(WorkoutSet.user_id == user_id, WorkoutSet.exercise_name == exercise_name)
+        .group_by(WorkoutSet.workout_id, WorkoutSet.timestamp)
+        .order_by(WorkoutSet.timestamp, WorkoutSet.workout_id)
+    )
+    if start_date:
+        query = query.where(WorkoutSet.timestamp >= start_date)
+    if end_date:
+        query = query.where(WorkoutSet.timestamp <= end_date)
+
+    result = await db.execute(query)
+    return [ExerciseProgressPoint.model_validate(row) for row in result.all()]
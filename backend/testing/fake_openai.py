@@ -0,0 +1,89 @@
+# backend/testing/fake_openai.py
+"""
+Local stand-in for `openai.AsyncOpenAI`, covering only what the app calls:
+`await client.chat.completions.create(...)` returning `.choices[0].message.content`.
+
+It classifies journal text with a keyword heuristic so results are deterministic,
+and can simulate latency and transient failures to exercise the job queue's retries.
+Enable for the whole app with OPENAI_USE_FAKE=true, or pass an instance directly.
+"""
+import asyncio
+import json
+import random
+import re
+from types import SimpleNamespace
+from typing import Optional
+
+POSITIVE_WORDS = {"great", "good", "happy", "strong", "energized", "proud", "calm", "excited", "love", "pr"}
+NEGATIVE_WORDS = {"bad", "tired", "sad", "sore", "stressed", "angry", "anxious", "exhausted", "awful", "hate"}
+
+# Journal text is embedded in the prompt between triple quotes (see services/openai_service.py)
+_JOURNAL_RE = re.compile(r'"""\s*(.*?)\s*"""', re.DOTALL)
+
+
+def classify(text: str) -> dict:
+    words = re.findall(r"[a-z']+", text.lower())
+    positive = sum(w in POSITIVE_WORDS for w in words)
+    negative = sum(w in NEGATIVE_WORDS for w in words)
+    if positive > negative:
+        sentiment = "Positive"
+    elif negative > positive:
+        sentiment = "Negative"
+    else:
+        sentiment = "Neutral"
+    intensity = min(10, 2 + 2 * abs(positive - negative)) if sentiment != "Neutral" else 2
+    return {"sentiment": sentiment, "intensity": intensity, "summary": f"Entry reads as {sentiment.lower()}."}
+
+
+def _parse_batch(body: str) -> Optional[list]:
+    try:
+        parsed = json.loads(body)
+    except ValueError:
+        return None
+    if isinstance(parsed, list) and all(isinstance(i, dict) and "id" in i and "text" in i for i in parsed):
+        return parsed
+    return None
+
+
+class _FakeCompletions:
+    def __init__(self, owner: "FakeAsyncOpenAI"):
+        self._owner = owner
+
+    async def create(self, *, messages, model: str = "fake", **kwargs):
+        owner = self._owner
+        owner.calls += 1
+        if owner.latency:
+            await asyncio.sleep(owner.latency)
+        if owner.failure_rate and owner._rng.random() < owner.failure_rate:
+            raise RuntimeError("Simulated OpenAI failure")
+
+        prompt = messages[-1]["content"]
+        match = _JOURNAL_RE.search(prompt)
+        body = match.group(1) if match else prompt
+        batch = _parse_batch(body)
+        if batch is not None:
+            # Batched prompt: body is a JSON array of {"id", "text"}
+            owner.batched_entries += len(batch)
+            results = [{"id": item["id"], **owner.responder(item["text"], prompt)} for item in batch]
+            content = json.dumps({"results": results})
+        else:
+            content = json.dumps(owner.responder(body, prompt))
+        message = SimpleNamespace(role="assistant", content=content)
+        return SimpleNamespace(model=model, choices=[SimpleNamespace(index=0, message=message, finish_reason="stop")])
+
+
+class FakeAsyncOpenAI:
+    """
+    Args:
+        latency: seconds to sleep per call (simulates network/model time).
+        failure_rate: probability [0, 1] that a call raises.
+        responder: fn(journal_text, full_prompt) -> dict to serialize as the reply.
+    """
+    def __init__(self, latency: float = 0.0, failure_rate: float = 0.0, seed: Optional[int] = 0, responder=None):
+        self.latency = latency
+        self.failure_rate = failure_rate
+        self.responder = responder or (lambda text, prompt: classify(text))
+        self.calls = 0
+        self.batched_entries = 0 # Entries received through batched prompts
+        self._rng = random.Random(seed)
+        self.chat = SimpleNamespace(completions=_FakeCompletions(self))
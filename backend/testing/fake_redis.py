@@ -0,0 +1,153 @@
+# backend/testing/fake_redis.py
+"""
+Local stand-in for a Redis server: the RESP protocol over TCP with the handful of
+commands the response cache uses (PING, AUTH, SELECT, GET, SET [EX|PX] [NX], DEL,
+EXISTS, INCR, EXPIRE, PEXPIRE, TTL, DBSIZE, FLUSHDB, FLUSHALL). One keyspace, expiry
+checked on access.
+
+In-process (e.g. from a benchmark):
+    server = FakeRedisServer(); port = await server.start()
+    client = RedisClient(f"redis://127.0.0.1:{port}/0")
+
+As a server (then set RESPONSE_CACHE_BACKEND=redis, RESPONSE_CACHE_REDIS_URL=redis://127.0.0.1:6390/0):
+    python -m testing.fake_redis --port 6390
+"""
+import argparse
+import asyncio
+import time
+from typing import Dict, List, Optional, Tuple
+
+
+def _bulk(value: Optional[bytes]) -> bytes:
+    if value is None:
+        return b"$-1\r\n"
+    return b"$%d\r\n%s\r\n" % (len(value), value)
+
+
+def _int(value: int) -> bytes:
+    return b":%d\r\n" % value
+
+
+OK = b"+OK\r\n"
+
+
+class FakeRedisServer:
+    def __init__(self):
+        self.data: Dict[bytes, Tuple[bytes, Optional[float]]] = {}
+        self.commands = 0 # Commands served, for tests/benchmarks
+        self._server: Optional[asyncio.AbstractServer] = None
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> int:
+        self._server = await asyncio.start_server(self._handle, host, port)
+        return self._server.sockets[0].getsockname()[1]
+
+    async def stop(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+
+    def _get(self, key: bytes) -> Optional[bytes]:
+        entry = self.data.get(key)
+        if entry is None:
+            return None
+        value, expires_at = entry
+        if expires_at is not None and expires_at <= time.monotonic():
+            del self.data[key]
+            return None
+        return value
+
+    def _expire(self, key: bytes, seconds: float) -> int:
+        value = self._get(key)
+        if value is None:
+            return 0
+        self.data[key] = (value, time.monotonic() + seconds)
+        return 1
+
+    def dispatch(self, args: List[bytes]) -> bytes:
+        self.commands += 1
+        name = args[0].upper().decode()
+        if name == "PING":
+            return b"+PONG\r\n"
+        if name in ("AUTH", "SELECT"):
+            return OK
+        if name == "GET":
+            return _bulk(self._get(args[1]))
+        if name == "SET":
+            key, value, expires_at = args[1], args[2], None
+            options = [a.upper() for a in args[3:]]
+            if b"EX" in options:
+                expires_at = time.monotonic() + float(args[3 + options.index(b"EX") + 1])
+            if b"PX" in options:
+                expires_at = time.monotonic() + float(args[3 + options.index(b"PX") + 1]) / 1000
+            if b"NX" in options and self._get(key) is not None:
+                return _bulk(None)
+            self.data[key] = (value, expires_at)
+            return OK
+        if name in ("DEL", "EXISTS"):
+            found = [key for key in args[1:] if self._get(key) is not None]
+            if name == "DEL":
+                for key in found:
+                    del self.data[key]
+            return _int(len(found))
+        if name == "INCR":
+            current = self._get(args[1])
+            try:
+                value = int(current or 0) + 1
+            except ValueError:
+                return b"-ERR value is not an integer or out of range\r\n"
+            self.data[args[1]] = (str(value).encode(), self.data.get(args[1], (None, None))[1])
+            return _int(value)
+        if name == "EXPIRE":
+            return _int(self._expire(args[1], float(args[2])))
+        if name == "PEXPIRE":
+            return _int(self._expire(args[1], float(args[2]) / 1000))
+        if name == "TTL":
+            if self._get(args[1]) is None:
+                return _int(-2)
+            expires_at = self.data[args[1]][1]
+            return _int(-1 if expires_at is None else int(expires_at - time.monotonic()))
+        if name == "DBSIZE":
+            return _int(sum(1 for key in list(self.data) if self._get(key) is not None))
+        if name in ("FLUSHDB", "FLUSHALL"):
+            self.data.clear()
+            return OK
+        return b"-ERR unknown command '%s'\r\n" % args[0]
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                header = await reader.readline()
+                if not header:
+                    break
+                if not header.startswith(b"*"):
+                    writer.write(b"-ERR Protocol error: expected '*'\r\n")
+                    break
+                args = []
+                for _ in range(int(header[1:-2])):
+                    length = int((await reader.readline())[1:-2])
+                    args.append((await reader.readexactly(length + 2))[:-2])
+                try:
+                    writer.write(self.dispatch(args))
+                except (IndexError, ValueError):
+                    writer.write(b"-ERR wrong number or type of arguments\r\n")
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+
+async def _serve(port: int) -> None:
+    server = FakeRedisServer()
+    await server.start(port=port)
+    print(f"Fake Redis listening on 127.0.0.1:{port}")
+    await asyncio.Event().wait()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=6390)
+    try:
+        asyncio.run(_serve(parser.parse_args().port))
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,148 @@
+# backend/testing/fake_spotify.py
+"""
+Local fake of the Spotify Web API endpoints the app uses.
+
+Implements GET /v1/me/player/recently-played with Spotify's paging semantics
+(`limit`, `after`/`before` in unix ms, `cursors`, `next`), newest plays first,
+and the accounts service's POST /api/token (authorization_code / refresh_token grants).
+
+In-process (no network):
+    fake = FakeSpotify(); fake.add_plays("token-a", generate_plays(120))
+    http = httpx.AsyncClient(transport=httpx.ASGITransport(app=fake.app), base_url="http://fake-spotify/v1")
+
+As a real HTTP server (then set SPOTIFY_API_BASE_URL=http://127.0.0.1:8901/v1):
+    uvicorn testing.fake_spotify:app --port 8901     # any bearer token sees the demo history
+"""
+import itertools
+import random
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional
+
+from fastapi import FastAPI, Form, Header, HTTPException, Query
+
+MAX_LIMIT = 50
+
+
+def _ms(value: datetime) -> int:
+    return int(value.timestamp() * 1000)
+
+
+def make_play(track_id: str, name: str, artist: str, album: str, played_at: datetime, duration_ms: int = 200000) -> dict:
+    """ A recently-played item shaped like Spotify's PlayHistoryObject. """
+    return {
+        "track": {
+            "id": track_id,
+            "name": name,
+            "artists": [{"id": f"artist-{artist.lower().replace(' ', '-')}", "name": artist}],
+            "album": {"id": f"album-{album.lower().replace(' ', '-')}", "name": album, "images": []},
+            "duration_ms": duration_ms,
+            "explicit": False,
+            "popularity": 50,
+            "preview_url": None,
+            "uri": f"spotify:track:{track_id}",
+        },
+        "played_at": played_at.isoformat().replace("+00:00", "Z"),
+        "context": None,
+    }
+
+
+def generate_plays(count: int, end: Optional[datetime] = None, seed: int = 0) -> List[dict]:
+    """ `count` plays spaced a few minutes apart, ending at `end` (default: now). """
+    rng = random.Random(seed)
+    played_at = end or datetime.now(timezone.utc)
+    plays = []
+    for i in range(count):
+        n = rng.randrange(500)
+        plays.append(make_play(f"track{n:04d}", f"Song {n}", f"Artist {n % 40}", f"Album {n % 90}", played_at))
+        played_at -= timedelta(minutes=rng.randint(3, 6))
+    return plays
+
+
+class FakeSpotify:
+    def __init__(self, accept_any_token: bool = False):
+        self.accept_any_token = accept_any_token
+        self.history: Dict[str, List[dict]] = {} # token -> plays (any order)
+        self.requests = 0
+        self.token_requests = 0 # Hits on POST /api/token (refresh stampede checks)
+        self.access_token_ttl = 3600
+        self.refresh_tokens: Dict[str, str] = {} # refresh token -> history token it mints access for
+        self._minted = itertools.count(1)
+        self.app = self._build_app()
+
+    def add_plays(self, token: str, plays: List[dict]) -> None:
+        self.history.setdefault(token, []).extend(plays)
+
+    def issue_tokens(self, history_token: str) -> dict:
+        """ Token response for a user whose plays were added under `history_token`. """
+        refresh_token = f"refresh-{history_token}"
+        self.refresh_tokens[refresh_token] = history_token
+        access_token = f"{history_token}#{next(self._minted)}"
+        self.history.setdefault(access_token, self.history.setdefault(history_token, []))
+        return {"access_token": access_token, "token_type": "Bearer", "scope": "user-read-recently-played",
+                "expires_in": self.access_token_ttl, "refresh_token": refresh_token}
+
+    def _plays_for(self, authorization: Optional[str]) -> List[dict]:
+        if not authorization or not authorization.startswith("Bearer "):
+            raise HTTPException(status_code=401, detail={"status": 401, "message": "No token provided"})
+        token = authorization[len("Bearer "):]
+        if token in self.history:
+            return self.history[token]
+        if self.accept_any_token and self.history:
+            return next(iter(self.history.values()))
+        raise HTTPException(status_code=401, detail={"status": 401, "message": "Invalid access token"})
+
+    def _build_app(self) -> FastAPI:
+        app = FastAPI(title="Fake Spotify")
+
+        @app.get("/v1/me/player/recently-played")
+        async def recently_played(
+            limit: int = Query(20, ge=1, le=MAX_LIMIT),
+            after: Optional[int] = None,
+            before: Optional[int] = None,
+            authorization: Optional[str] = Header(None),
+        ):
+            self.requests += 1
+            if after is not None and before is not None:
+                raise HTTPException(status_code=400, detail="Only one of after/before may be given")
+            plays = sorted(self._plays_for(authorization), key=lambda p: p["played_at"], reverse=True)
+            stamped = [(_ms(datetime.fromisoformat(p["played_at"].replace("Z", "+00:00"))), p) for p in plays]
+
+            if after is not None:
+                # Oldest `limit` plays strictly newer than `after`, returned newest first
+                newer = [sp for sp in stamped if sp[0] > after]
+                page = newer[-limit:]
+                has_more = len(newer) > len(page)
+            else:
+                older = [sp for sp in stamped if before is None or sp[0] < before]
+                page = older[:limit]
+                has_more = len(older) > len(page)
+
+            cursors = {"after": str(page[0][0]), "before": str(page[-1][0])} if page else None
+            next_url = None
+            if has_more and page:
+                param = f"after={page[0][0]}" if after is not None else f"before={page[-1][0]}"
+                next_url = f"/v1/me/player/recently-played?limit={limit}&{param}"
+            return {"items": [p for _, p in page], "cursors": cursors, "next": next_url, "limit": limit}
+
+        @app.post("/api/token")
+        async def token(
+            grant_type: str = Form(...),
+            code: Optional[str] = Form(None),
+            refresh_token: Optional[str] = Form(None),
+        ):
+            self.token_requests += 1
+            if grant_type == "authorization_code" and code:
+                return self.issue_tokens(code) # The code names the history to expose
+            if grant_type == "refresh_token" and refresh_token in self.refresh_tokens:
+                body = self.issue_tokens(self.refresh_tokens[refresh_token])
+                body.pop("refresh_token") # Like Spotify, usually no new refresh token
+                return body
+            raise HTTPException(status_code=400, detail={"error": "invalid_grant"})
+
+        return app
+
+
+# Standalone demo server: `uvicorn testing.fake_spotify:app`
+_demo = FakeSpotify(accept_any_token=True)
+_demo.add_plays("demo", generate_plays(200))
+app = _demo.app
@@ -0,0 +1,67 @@
+# backend/testing/query_count.py
+"""
+Query-count assertions for tests, so an endpoint that starts issuing one query
+per item fails CI instead of production.
+
+Counts every SQL statement the given engine executes inside the block, from any
+thread or task (TestClient runs the app in its own thread):
+
+    from db.session import async_engine
+    from testing.query_count import assert_max_queries
+
+    def test_workout_history_is_constant_queries(client, auth_headers):
+        with assert_max_queries(async_engine, 4):
+            client.get("/api/v1/workouts/?limit=50", headers=auth_headers)
+
+On failure the message lists the statements, most repeated first, which usually
+points straight at the N+1 loop. `count_queries()` is the non-asserting form.
+"""
+import threading
+from collections import Counter
+from contextlib import contextmanager
+from typing import Iterator, List
+
+from sqlalchemy import event
+
+from core.instrumentation import compact_statement
+
+
+class QueryLog:
+    """ Statements seen while the block was active. """
+
+    def __init__(self):
+        self.statements: List[str] = []
+        self._lock = threading.Lock()
+
+    def _record(self, conn, cursor, statement, parameters, context, executemany):
+        with self._lock:
+            self.statements.append(statement)
+
+    @property
+    def count(self) -> int:
+        return len(self.statements)
+
+    def most_repeated(self, top: int = 10) -> List[str]:
+        return [f"{n} x {compact_statement(statement, 300)}" for statement, n in Counter(self.statements).most_common(top)]
+
+
+@contextmanager
+def count_queries(engine) -> Iterator[QueryLog]:
+    """ `engine` is an Engine or AsyncEngine; the log fills in as statements complete. """
+    sync_engine = getattr(engine, "sync_engine", engine)
+    log = QueryLog()
+    event.listen(sync_engine, "after_cursor_execute", log._record)
+    try:
+        yield log
+    finally:
+        event.remove(sync_engine, "after_cursor_execute", log._record)
+
+
+@contextmanager
+def assert_max_queries(engine, max_queries: int) -> Iterator[QueryLog]:
+    """ Fails (AssertionError) if the block executes more than `max_queries` statements. """
+    with count_queries(engine) as log:
+        yield log
+    if log.count > max_queries:
+        details = "\n  ".join(log.most_repeated())
+        raise AssertionError(f"Expected at most {max_queries} queries, {log.count} were executed:\n  {details}")
@@ -0,0 +1,124 @@
+# backend/tests/conftest.py
+"""
+Shared test fixtures. Run from backend/:
+
+    TEST_DATABASE_URL=postgresql://postgres@127.0.0.1:5432/fitness_test python -m pytest -q
+
+Tests that need PostgreSQL use the `db_engine` (async tests) or `client` (HTTP,
+via TestClient) fixtures. They run against TEST_DATABASE_URL only -- its tables
+are dropped, recreated and truncated between tests, so point it at a throwaway
+database -- and are skipped when it isn't set. Everything else runs anywhere.
+"""
+import os
+import time
+import uuid
+
+# Settings are read when core.config is first imported, so the environment has to
+# be in place before any app module is. DATABASE_URL is always overridden: tests
+# never fall back to the (dev/prod) database configured in backend/.env.
+TEST_DATABASE_URL = os.environ.get("TEST_DATABASE_URL")
+TEST_JWT_SECRET = "test-jwt-secret"
+
+os.environ.update({
+    "DATABASE_URL": TEST_DATABASE_URL or "postgresql://postgres@127.0.0.1:1/unused",
+    "SUPABASE_URL": "http://supabase.test",
+    "SUPABASE_ANON_KEY": "test-anon-key",
+    "SUPABASE_SERVICE_ROLE_KEY": "test-service-role-key",
+    "SUPABASE_JWT_SECRET": TEST_JWT_SECRET,
+    "OPENAI_API_KEY": "test-openai-key",
+    "OPENAI_USE_FAKE": "true",
+    "SPOTIFY_CLIENT_ID": "test-client-id",
+    "SPOTIFY_CLIENT_SECRET": "test-client-secret",
+    "SPOTIFY_REDIRECT_URI": "http://localhost:8000/api/v1/spotify/callback",
+    "SPOTIFY_API_BASE_URL": "http://fake-spotify/v1",
+    "SPOTIFY_ACCOUNTS_BASE_URL": "http://fake-spotify",
+    "APP_SECRET_KEY": "test-app-secret",
+    "JOB_WORKERS_ENABLED": "false", # Tests drive the job queue themselves
+    "RESPONSE_CACHE_BACKEND": "memory",
+    "METRICS_ENABLED": "true",
+    "DB_DIAGNOSTICS_ENABLED": "false",
+})
+
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+from jose import jwt
+from sqlalchemy import text
+
+from db.session import Base, async_engine, engine
+import db.base # noqa: F401 -- registers every model on Base.metadata
+
+
+def mint_token(user_id: uuid.UUID, ttl_seconds: int = 3600) -> str:
+    """ A Supabase-style access token the auth dependency accepts. """
+    now = int(time.time())
+    claims = {
+        "sub": str(user_id), "aud": "authenticated", "role": "authenticated",
+        "email": f"test-{user_id.hex[:8]}@example.com", "iat": now, "exp": now + ttl_seconds,
+    }
+    return jwt.encode(claims, TEST_JWT_SECRET, algorithm="HS256")
+
+
+@pytest.fixture(scope="session")
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture(scope="session")
+def database():
+    """ Fresh schema in TEST_DATABASE_URL, created once per run. """
+    if not TEST_DATABASE_URL:
+        pytest.skip("TEST_DATABASE_URL is not set")
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def clean_db(database):
+    """ Empties every table before the test. """
+    tables = ", ".join(table.name for table in Base.metadata.sorted_tables)
+    with engine.begin() as conn:
+        conn.execute(text(f"TRUNCATE {tables} RESTART IDENTITY CASCADE"))
+    return database
+
+
+@pytest.fixture
+async def db_engine(clean_db, anyio_backend):
+    """
+    For async tests using the app's AsyncSessionLocal / async_engine. asyncpg
+    connections belong to the event loop that opened them, so the pool is
+    emptied before the test's loop goes away.
+    """
+    yield async_engine
+    await async_engine.dispose()
+
+
+@pytest.fixture
+def client(clean_db):
+    """ TestClient with the app's lifespan (which disposes the async engine on exit). """
+    from main import app
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+@pytest.fixture
+async def async_client(db_engine):
+    """
+    HTTP client for async tests that also await services directly: requests run on
+    the test's own event loop. The app's lifespan is not run (no job workers).
+    """
+    from main import app
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as test_client:
+        yield test_client
+
+
+@pytest.fixture
+def user_id() -> uuid.UUID:
+    return uuid.uuid4()
+
+
+@pytest.fixture
+def auth_headers(user_id) -> dict:
+    return {"Authorization": f"Bearer {mint_token(user_id)}"}
@@ -0,0 +1,87 @@
+# backend/tests/test_analytics.py
+import json
+from datetime import date, datetime, timedelta, timezone
+
+import numpy as np
+import pytest
+from sqlalchemy import func, select
+
+from db.session import SessionLocal
+from services.analytics_service import (
+    build_daily_series, lagged_correlations, pearson, rolling_correlation, shift,
+)
+
+
+def naive_pearson(pairs) -> float:
+    pairs = [(x, y) for x, y in pairs if not (np.isnan(x) or np.isnan(y))]
+    if len(pairs) < 3:
+        return None
+    xs, ys = zip(*pairs)
+    if np.std(xs) == 0 or np.std(ys) == 0:
+        return None
+    return float(np.corrcoef(xs, ys)[0, 1])
+
+
+def close(a, b) -> bool:
+    return (a is None and b is None) or (a is not None and b is not None and abs(a - b) < 1e-9)
+
+
+@pytest.fixture
+def series():
+    rng = np.random.default_rng(6)
+    volume = np.where(rng.random(120) < 0.4, 0.0, rng.uniform(1000, 8000, 120))
+    mood = np.where(rng.random(120) < 0.3, np.nan, rng.integers(1, 11, 120).astype(float))
+    return volume, mood
+
+
+def test_vectorized_statistics_match_naive_loops(series):
+    volume, mood = series
+    assert close(pearson(volume, mood), naive_pearson(zip(volume, mood)))
+
+    for lag, r in enumerate(lagged_correlations(volume, mood, max_lag=7)):
+        assert close(r, naive_pearson((volume[t], mood[t + lag]) for t in range(len(volume) - lag)))
+    assert np.isnan(shift(mood, 3)[-3:]).all()
+
+    for window in (7, 28):
+        rolling = rolling_correlation(volume, mood, window)
+        assert np.isnan(rolling[:window - 1]).all()
+        for end in range(window - 1, len(volume)):
+            expected = naive_pearson(zip(volume[end - window + 1:end + 1], mood[end - window + 1:end + 1]))
+            assert close(None if np.isnan(rolling[end]) else float(rolling[end]), expected), (window, end)
+
+
+def test_daily_series_aligns_sets_and_moods_by_day():
+    day = date(2025, 3, 1)
+    set_rows = [(day, "Back Squat", 5, 100.0), (day, "Bench", 5, 60.0), (day + timedelta(days=3), "Leg Press", 10, 50.0)]
+    mood_rows = [(day, 6, "Positive", 4), (day, 8, "negative", 2), (day + timedelta(days=1), 3, None, None)]
+    series = build_daily_series(set_rows, mood_rows)
+
+    assert [str(d) for d in series.days] == ["2025-03-01", "2025-03-02", "2025-03-03", "2025-03-04"]
+    assert series.volume.tolist() == [800.0, 0.0, 0.0, 500.0]
+    assert series.leg_volume.tolist() == [500.0, 0.0, 0.0, 500.0]
+    assert series.mood[:2].tolist() == [7.0, 3.0] and np.isnan(series.mood[2:]).all()
+    assert series.sentiment[0] == 1.0 and np.isnan(series.sentiment[1:]).all() # (4 - 2) / 2
+    assert build_daily_series([], []) is None
+
+
+def test_correlation_report_is_computed_then_served_from_storage(client, auth_headers):
+    assert client.get("/api/v1/insights/correlations", headers=auth_headers).status_code == 404
+
+    with SessionLocal() as db:
+        started = db.scalar(select(func.now()))
+    today = datetime.now(timezone.utc).replace(hour=12, minute=0, second=0, microsecond=0)
+    history = "\n".join(
+        json.dumps({"timestamp": (today - timedelta(days=days)).isoformat(),
+                    "exercises": [{"name": "Squat", "sets": [{"reps": 5, "weight": 60 + 10 * days}]}]})
+        for days in range(1, 11)
+    )
+    client.post("/api/v1/workouts/import", content=history.encode(),
+                headers={**auth_headers, "Content-Type": "application/x-ndjson"})
+    client.post("/api/v1/moods/", json={"mood_score": 7}, headers=auth_headers)
+
+    computed = client.get("/api/v1/insights/correlations", params={"refresh": True}, headers=auth_headers).json()
+    assert (computed["report"]["days"], computed["report"]["training_days"], computed["report"]["mood_days"]) == (11, 10, 1)
+
+    stored = client.get("/api/v1/insights/correlations", headers=auth_headers).json()
+    assert stored["report"] == computed["report"]
+    assert datetime.fromisoformat(stored["computed_at"]) >= started
@@ -0,0 +1,48 @@
+# backend/tests/test_batch_create.py
+from sqlalchemy import select
+
+from core.config import settings
+from db.session import SessionLocal
+from models.job import BackgroundJob
+from services.sentiment_service import SENTIMENT_BATCH_JOB
+
+SQUAT = {"exercises": [{"name": "Squat", "sets": [{"reps": 5, "weight": 100}]}]}
+
+
+def test_workout_batch_creates_the_valid_items_and_reports_the_rest(client, auth_headers):
+    bad = {"exercises": [{"name": "Squat", "sets": [{"reps": 0, "weight": 100}]}]}
+    response = client.post("/api/v1/workouts/batch", json={"items": [SQUAT, bad, SQUAT, {}]}, headers=auth_headers)
+    assert response.status_code == 200
+    body = response.json()
+    assert (body["created"], body["invalid"]) == (2, 2)
+    assert [(r["index"], r["status"]) for r in body["results"]] == [(0, "created"), (1, "invalid"), (2, "created"), (3, "invalid")]
+
+    # Each invalid item carries the errors a single create would have answered 422 with
+    single = client.post("/api/v1/workouts/", json=bad, headers=auth_headers)
+    assert single.status_code == 422
+    assert [(e["loc"][-4:], e["type"]) for e in body["results"][1]["errors"]] == \
+        [(e["loc"][-4:], e["type"]) for e in single.json()["errors"]]
+
+    history = client.get("/api/v1/workouts/", headers=auth_headers).json()
+    assert sorted(item["id"] for item in history) == sorted(r["workout"]["id"] for r in body["results"] if r["workout"])
+
+
+def test_mood_batch_queues_one_sentiment_job_for_all_its_entries(client, auth_headers):
+    items = [{"mood_score": 6, "journal_text": "Good day"}, {"mood_score": 11}, {"mood_score": 3},
+             {"mood_score": 8, "journal_text": "Great lift, felt strong"}]
+    body = client.post("/api/v1/moods/batch", json={"items": items}, headers=auth_headers).json()
+    assert (body["created"], body["invalid"]) == (3, 1)
+    entries = {r["index"]: r["entry"] for r in body["results"] if r["status"] == "created"}
+    assert [entries[i]["sentiment_status"] for i in (0, 2, 3)] == ["pending", None, "pending"]
+
+    with SessionLocal() as db:
+        jobs = db.scalars(select(BackgroundJob)).all()
+    assert [job.kind for job in jobs] == [SENTIMENT_BATCH_JOB]
+    assert sorted(jobs[0].payload["mood_entry_ids"]) == sorted([entries[0]["id"], entries[3]["id"]])
+
+
+def test_batches_are_bounded(client, auth_headers):
+    for path, item in (("/api/v1/workouts/batch", SQUAT), ("/api/v1/moods/batch", {"mood_score": 5})):
+        too_many = client.post(path, json={"items": [item] * (settings.BATCH_MAX_ITEMS + 1)}, headers=auth_headers)
+        assert too_many.status_code == 413
+        assert client.post(path, json={"items": []}, headers=auth_headers).status_code == 422
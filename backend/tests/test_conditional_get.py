@@ -0,0 +1,119 @@
+# backend/tests/test_conditional_get.py
+"""
+ETag / Last-Modified validators (services/data_version_service.py): history reads
+answer 304 while the user's data version is unchanged, and any write moves it.
+"""
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import update
+from starlette.requests import Request
+
+from db.session import AsyncSessionLocal, SessionLocal, async_engine
+from models.data_version import UserDataVersion
+from services import data_version_service
+from services.data_version_service import CacheValidators, data_versions
+from testing.query_count import count_queries
+
+SQUAT = {"exercises": [{"name": "Squat", "sets": [{"reps": 5, "weight": 100}]}]}
+VERSION = datetime(2025, 6, 1, 12, 0, 0, 250000, tzinfo=timezone.utc)
+
+
+def request_with(headers: dict) -> Request:
+    raw = [(name.lower().encode(), value.encode()) for name, value in headers.items()]
+    return Request({"type": "http", "method": "GET", "path": "/", "query_string": b"", "headers": raw})
+
+
+@pytest.mark.parametrize("headers, expected", [
+    ({}, False),
+    ({"If-None-Match": "*"}, True),
+    ({"If-None-Match": '"other", MINE'}, True), # Any tag of a list
+    ({"If-None-Match": "MINE_STRONG"}, True), # Weak comparison: W/ is ignored
+    ({"If-None-Match": '"other"'}, False),
+    ({"If-None-Match": '"other"', "If-Modified-Since": "Sun, 01 Jun 2025 12:00:00 GMT"}, False), # ETag wins
+    ({"If-Modified-Since": "Sun, 01 Jun 2025 12:00:00 GMT"}, True), # Second precision
+    ({"If-Modified-Since": "Sun, 01 Jun 2025 13:00:00 GMT"}, True),
+    ({"If-Modified-Since": "Sun, 01 Jun 2025 11:59:59 GMT"}, False),
+    ({"If-Modified-Since": "yesterday"}, False),
+])
+def test_validators_match(headers, expected):
+    validators = CacheValidators(VERSION, "/api/v1/workouts/?")
+    etag = validators.etag
+    headers = {name: value.replace("MINE_STRONG", etag[2:]).replace("MINE", etag) for name, value in headers.items()}
+    assert validators.matches(request_with(headers)) is expected
+
+
+def test_etag_varies_with_version_and_variant():
+    etag = CacheValidators(VERSION, "a").etag
+    assert etag.startswith('W/"')
+    assert CacheValidators(VERSION, "b").etag != etag
+    assert CacheValidators(VERSION + timedelta(microseconds=1), "a").etag != etag
+    assert CacheValidators(VERSION, "a").last_modified == "Sun, 01 Jun 2025 12:00:00 GMT"
+
+
+def test_history_revalidates_until_the_next_write(client, auth_headers):
+    # Never written: nothing to validate against
+    assert "ETag" not in client.get("/api/v1/workouts/", headers=auth_headers).headers
+
+    client.post("/api/v1/workouts/", json=SQUAT, headers=auth_headers)
+    first = client.get("/api/v1/workouts/", headers=auth_headers)
+    etag, last_modified = first.headers["ETag"], first.headers["Last-Modified"]
+    assert first.headers["Cache-Control"] == "private, no-cache"
+
+    with count_queries(async_engine) as log:
+        cached = client.get("/api/v1/workouts/", headers={**auth_headers, "If-None-Match": etag})
+    assert (cached.status_code, cached.content, cached.headers["ETag"]) == (304, b"", etag)
+    assert log.count == 0 # Version from memory, the list query skipped
+
+    assert client.get(
+        "/api/v1/workouts/", headers={**auth_headers, "If-Modified-Since": last_modified},
+    ).status_code == 304
+    other_page = client.get("/api/v1/workouts/", params={"limit": 5}, headers={**auth_headers, "If-None-Match": etag})
+    assert other_page.status_code == 200 and other_page.headers["ETag"] != etag
+
+    # A write of any kind moves the user's version
+    client.post("/api/v1/moods/", json={"mood_score": 4}, headers=auth_headers)
+    after_write = client.get("/api/v1/workouts/", headers={**auth_headers, "If-None-Match": etag})
+    assert after_write.status_code == 200 and after_write.headers["ETag"] != etag
+    assert len(after_write.json()) == 1
+    assert client.get("/api/v1/moods/", headers={**auth_headers, "If-None-Match": etag}).status_code == 200
+
+
+def test_writes_from_other_workers_are_seen_after_the_ttl(client, auth_headers, user_id, monkeypatch):
+    monkeypatch.setattr(data_versions, "ttl", 60)
+    client.post("/api/v1/workouts/", json=SQUAT, headers=auth_headers)
+    etag = client.get("/api/v1/workouts/", headers=auth_headers).headers["ETag"]
+
+    # Another process bumps the version: this one still trusts its in-memory copy...
+    with SessionLocal() as db:
+        db.execute(update(UserDataVersion).where(UserDataVersion.user_id == user_id)
+                   .values(updated_at=UserDataVersion.updated_at + timedelta(seconds=1)))
+        db.commit()
+    conditional = {**auth_headers, "If-None-Match": etag}
+    assert client.get("/api/v1/workouts/", headers=conditional).status_code == 304
+
+    # ...until the entry is older than DATA_VERSION_TTL_SECONDS
+    monkeypatch.setattr(data_versions, "ttl", 0)
+    refreshed = client.get("/api/v1/workouts/", headers=conditional)
+    assert refreshed.status_code == 200 and refreshed.headers["ETag"] != etag
+
+
+@pytest.mark.anyio
+async def test_versions_are_published_only_on_commit(db_engine):
+    user_id = uuid.uuid4()
+    async with AsyncSessionLocal() as db:
+        await data_version_service.bump(db, user_id)
+        await db.rollback()
+    assert data_versions.get(user_id) == (False, None)
+
+    async with AsyncSessionLocal() as db:
+        version = await data_version_service.bump(db, user_id)
+        assert data_versions.get(user_id) == (False, None) # Not before the commit
+        await db.commit()
+    assert data_versions.get(user_id) == (True, version)
+
+    async with AsyncSessionLocal() as db:
+        bumped = await data_version_service.bump(db, user_id)
+        await db.commit()
+    assert bumped > version # Strictly increasing
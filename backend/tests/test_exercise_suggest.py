@@ -0,0 +1,75 @@
+# backend/tests/test_exercise_suggest.py
+import random
+
+import pytest
+
+from db.session import async_engine
+from routers import workouts as workouts_router
+from services.exercise_catalog import EXERCISE_CATALOG
+from services.exercise_suggest_service import ExerciseSuggestIndex, PrefixIndex, normalize_name
+from testing.query_count import assert_max_queries, count_queries
+
+
+def workout(*names: str) -> dict:
+    return {"exercises": [{"name": name, "sets": [{"reps": 5, "weight": 100}]} for name in names]}
+
+
+def naive_matches(names, prefix: str) -> dict:
+    prefix_key = normalize_name(prefix)
+    found = {}
+    for name in names:
+        key = normalize_name(name)
+        words = key.split(" ")
+        if any(" ".join(words[i:]).startswith(prefix_key) for i in range(len(words))):
+            found[key] = key.startswith(prefix_key)
+    return found
+
+
+def test_prefix_index_matches_a_scan_of_every_word_suffix():
+    rng = random.Random(15)
+    index = PrefixIndex.build((name, 0) for name in EXERCISE_CATALOG[:40])
+    for name in EXERCISE_CATALOG[40:]:
+        index.add(name) # Incremental inserts keep the array sorted
+    prefixes = ["", "s", "SQ", "press", "bench  p", "row", "zz", "t-b", "dumbbell "] + [
+        rng.choice(EXERCISE_CATALOG)[:rng.randint(1, 6)] for _ in range(30)
+    ]
+    for prefix in prefixes:
+        assert index.matches(normalize_name(prefix)) == naive_matches(EXERCISE_CATALOG, prefix), prefix
+
+
+@pytest.fixture
+def suggest_index(monkeypatch) -> ExerciseSuggestIndex:
+    index = ExerciseSuggestIndex(EXERCISE_CATALOG, max_users=8)
+    monkeypatch.setattr(workouts_router, "suggest_index", index)
+    return index
+
+
+def suggest(client, headers, prefix: str, limit: int = 10) -> list:
+    response = client.get("/api/v1/workouts/exercises/suggest", params={"prefix": prefix, "limit": limit}, headers=headers)
+    assert response.status_code == 200
+    return [(item["name"], item["source"], item["count"]) for item in response.json()]
+
+
+def test_user_names_rank_first_and_follow_new_workouts(client, auth_headers, suggest_index):
+    client.post("/api/v1/workouts/batch", json={"items": [workout("Squat", "Paused Squat")] * 2 + [workout("paused  squat")]},
+                headers=auth_headers)
+    assert suggest(client, auth_headers, "squ", limit=4) == [
+        ("Paused Squat", "user", 3), ("Squat", "user", 2), ("Bulgarian Split Squat", "catalog", 0), ("Front Squat", "catalog", 0),
+    ]
+    assert suggest_index.stats()["misses"] == 1
+
+    client.post("/api/v1/workouts/", json=workout("Squat", "Squat", "Zercher Squat"), headers=auth_headers)
+    with count_queries(async_engine) as log:
+        warm = suggest(client, auth_headers, "SQUAT", limit=3)
+    # Equal counts: a name starting with the prefix beats a later-word match
+    assert warm == [("Squat", "user", 3), ("Paused Squat", "user", 3), ("Zercher Squat", "user", 1)]
+    assert [statement for statement in log.statements if "workout_sets" in statement] == [] # Served from memory
+    assert suggest_index.stats()["hits"] == 1
+
+
+def test_deletes_reload_the_users_names(client, auth_headers, suggest_index):
+    created = client.post("/api/v1/workouts/", json=workout("Zercher Squat"), headers=auth_headers).json()
+    assert suggest(client, auth_headers, "zer") == [("Zercher Squat", "user", 1)]
+    client.delete(f"/api/v1/workouts/{created['id']}", headers=auth_headers)
+    with assert_max_queries(async_engine, 2):
+        assert suggest(client, auth_headers, "zer") == []
@@ -0,0 +1,74 @@
+# backend/tests/test_export.py
+import csv
+import gzip
+import io
+import json
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from services import export_service
+from tests.conftest import mint_token
+
+WORKOUTS = [
+    {"exercises": [{"name": "Squat", "sets": [{"reps": 5, "weight": 100}, {"reps": 5, "weight": 102.5}]}]},
+    {"exercises": [{"name": "Bench, paused", "sets": [{"reps": 8, "weight": 60}]},
+                   {"name": "Row", "sets": [{"reps": 10, "weight": 50}]}]},
+]
+
+
+def seed(client, headers) -> None:
+    now = datetime.now(timezone.utc)
+    history = "\n".join(json.dumps({"timestamp": (now - timedelta(days=day)).isoformat(), **WORKOUTS[day % 2]})
+                        for day in range(1, 8))
+    client.post("/api/v1/workouts/import", content=history.encode(),
+                headers={**headers, "Content-Type": "application/x-ndjson"})
+    for score in (3, 7, 9):
+        client.post("/api/v1/moods/", json={"mood_score": score, "journal_text": f"Day scored {score}"}, headers=headers)
+
+
+def export(client, headers, **params):
+    response = client.get("/api/v1/export/", params=params, headers=headers)
+    assert response.status_code == 200, response.text
+    return response
+
+
+def test_ndjson_export_streams_every_row_in_timeline_shape(client, auth_headers, monkeypatch):
+    monkeypatch.setattr(export_service, "EXPORT_BATCH_SIZE", 2) # Several server-side cursor partitions per dataset
+    seed(client, auth_headers)
+
+    response = export(client, auth_headers)
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    assert 'filename="fmmt-export-all-' in response.headers["content-disposition"]
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert [line["type"] for line in lines] == ["workout"] * 7 + ["mood"] * 3
+    workout_times = [line["timestamp"] for line in lines[:7]]
+    assert workout_times == sorted(workout_times, reverse=True)
+    assert sorted(line["data"]["mood_score"] for line in lines[7:]) == [3, 7, 9]
+
+    compressed = export(client, auth_headers, gzip=True)
+    assert compressed.headers["content-type"] == "application/gzip"
+    assert gzip.decompress(compressed.content) == response.content
+
+
+def test_workout_csv_export_reimports_to_the_same_sets(client, auth_headers):
+    seed(client, auth_headers)
+    exported = export(client, auth_headers, format="csv", include="workout").text
+    rows = list(csv.reader(io.StringIO(exported)))
+    assert rows[0] == ["timestamp", "exercise", "reps", "weight", "workout"]
+    assert len(rows) == 1 + 4 * 2 + 3 * 2 # One line per set
+
+    other = {"Authorization": f"Bearer {mint_token(uuid.uuid4())}"}
+    imported = client.post("/api/v1/workouts/import", content=exported.encode(),
+                           headers={**other, "Content-Type": "text/csv"}).json()
+    assert imported["workouts_imported"] == 7
+    reexported = list(csv.reader(io.StringIO(export(client, other, format="csv", include="workout").text)))
+    assert sorted(row[:4] for row in reexported[1:]) == sorted(row[:4] for row in rows[1:])
+
+
+def test_csv_needs_exactly_one_dataset_and_empty_exports_are_valid(client, auth_headers):
+    response = client.get("/api/v1/export/", params={"format": "csv", "include": ["workout", "mood"]}, headers=auth_headers)
+    assert response.status_code == 400
+    assert export(client, auth_headers, format="csv", include="mood").text.splitlines() == [
+        "id,created_at,mood_score,journal_text,sentiment_label,sentiment_intensity,sentiment_summary",
+    ]
+    assert export(client, auth_headers).content == b""
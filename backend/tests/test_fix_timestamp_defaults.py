@@ -0,0 +1,29 @@
+# backend/tests/test_fix_timestamp_defaults.py
+from argparse import Namespace
+
+from sqlalchemy import text
+
+from db.session import engine
+from scripts import fix_timestamp_defaults
+
+
+def column_default(table: str, column: str) -> str:
+    with engine.connect() as conn:
+        return conn.execute(text(
+            "SELECT column_default FROM information_schema.columns WHERE table_name = :table AND column_name = :column"
+        ), {"table": table, "column": column}).scalar()
+
+
+def test_frozen_now_defaults_are_restored(database):
+    assert ("mood_entries", "created_at") in set(fix_timestamp_defaults.now_default_columns())
+    assert column_default("mood_entries", "created_at") == "now()"
+
+    # What create_all made of the old server_default='now()'
+    with engine.begin() as conn:
+        conn.execute(text("ALTER TABLE mood_entries ALTER COLUMN created_at SET DEFAULT 'now()'"))
+    assert column_default("mood_entries", "created_at").endswith("::timestamp with time zone")
+
+    fix_timestamp_defaults.main(Namespace(dry_run=True))
+    assert column_default("mood_entries", "created_at") != "now()"
+    fix_timestamp_defaults.main(Namespace(dry_run=False))
+    assert column_default("mood_entries", "created_at") == "now()"
@@ -0,0 +1,61 @@
+# backend/tests/test_generate_dataset.py
+import json
+from argparse import Namespace
+from datetime import date, datetime, timezone
+
+import pytest
+from sqlalchemy import text
+
+from db.session import engine
+from schemas.workout import WorkoutCreate
+from scripts import generate_dataset
+from scripts.generate_dataset import COLUMNS, TableBuffer, build_catalog, generate_user, user_id_for
+
+START = datetime(2025, 1, 1, tzinfo=timezone.utc)
+
+
+@pytest.fixture(scope="module")
+def catalog():
+    return build_catalog(7)
+
+
+def generate(catalog, seed: int, index: int, days: int = 60) -> dict:
+    buffers = {table: TableBuffer() for table in COLUMNS}
+    generate_user(seed, index, START, days, catalog, buffers)
+    return {table: buffer.lines for table, buffer in buffers.items()}
+
+
+def test_users_depend_only_on_seed_and_index(catalog):
+    first = generate(catalog, 7, 3)
+    assert generate(catalog, 7, 3) == first
+    assert generate(catalog, 7, 4) != first and generate(catalog, 8, 3) != first
+    assert all(line.split("\t")[1] == str(user_id_for(7, 3)) for line in first["workouts"])
+
+    for line in first["workouts"]: # The exercises JSONB is something the API itself would accept
+        WorkoutCreate.model_validate({"exercises": json.loads(line.split("\t")[-1])})
+    sets = sum(len(exercise["sets"]) for line in first["workouts"] for exercise in json.loads(line.split("\t")[-1]))
+    assert sets == len(first["workout_sets"])
+
+
+def count_rows(user_ids) -> dict:
+    with engine.connect() as conn:
+        return {table: conn.execute(text(f"SELECT count(*) FROM {table} WHERE user_id = ANY(CAST(:ids AS uuid[]))"),
+                                    {"ids": list(user_ids)}).scalar()
+                for table in COLUMNS}
+
+
+def test_load_is_repeatable_with_replace(clean_db, tmp_path):
+    args = Namespace(users=3, days=45, seed=11, end=date(2025, 3, 1), jobs=1, chunk_users=2, replace=True,
+                     defer_indexes=True, derived=True, user_ids_out=str(tmp_path / "users.txt"), allow_remote=False)
+    assert generate_dataset.main(args) == 0
+    user_ids = (tmp_path / "users.txt").read_text().split()
+    assert user_ids == [str(user_id_for(11, index)) for index in range(3)]
+    loaded = count_rows(user_ids)
+    assert loaded["workouts"] > 0 and loaded["mood_entries"] > 0
+
+    assert generate_dataset.main(args) == 0 # --replace: same rows again, not twice as many
+    assert count_rows(user_ids) == loaded
+    with engine.connect() as conn:
+        assert conn.execute(text("SELECT count(DISTINCT user_id) FROM personal_records")).scalar() == 3 # --derived
+        indexes = {row[0] for row in conn.execute(text("SELECT indexname FROM pg_indexes WHERE tablename = 'workouts'"))}
+    assert {index.name for index in generate_dataset._secondary_indexes() if index.table.name == "workouts"} <= indexes
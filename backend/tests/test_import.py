@@ -0,0 +1,157 @@
+# backend/tests/test_import.py
+import json
+import uuid
+from typing import AsyncIterator, List
+
+import pytest
+
+from core.config import settings
+from services.import_service import ImportFormatError, _Report, import_workouts, iter_lines
+
+BOM = b"\xef\xbb\xbf"
+
+
+async def chunked(data: bytes, size: int) -> AsyncIterator[bytes]:
+    for start in range(0, len(data), size):
+        yield data[start:start + size]
+
+
+async def split_lines(data: bytes, size: int, max_line_bytes: int = None):
+    report = _Report("ndjson", dry_run=True, max_errors=100)
+    lines = [line async for line in iter_lines(chunked(data, size), report, max_line_bytes)]
+    return lines, [(error.line, error.error) for error in report.errors]
+
+
+async def dry_run(data: bytes, fmt: str, size: int = 7):
+    return await import_workouts(None, uuid.uuid4(), chunked(data, size), fmt, dry_run=True, chunk_size=2)
+
+
+def ndjson(*workouts) -> bytes:
+    return b"".join(json.dumps(workout).encode() + b"\n" for workout in workouts)
+
+
+def workout(day: int, *sets) -> dict:
+    return {"timestamp": f"2024-01-{day:02d}T07:00:00Z",
+            "exercises": [{"name": "Squat", "sets": [{"reps": reps, "weight": weight} for reps, weight in sets]}]}
+
+
+# --- Line splitting ---
+
+@pytest.mark.anyio
+async def test_lines_are_the_same_whatever_the_chunk_boundaries():
+    data = BOM + "a,b\r\nweight éé \U0001f4aa\n\nlast".encode()
+    expected = [(1, "a,b"), (2, "weight éé \U0001f4aa"), (3, ""), (4, "last")]
+    for size in range(1, len(data) + 1): # Splits the BOM and every multi-byte character somewhere
+        assert await split_lines(data, size) == (expected, [])
+
+
+@pytest.mark.anyio
+async def test_bom_is_only_stripped_from_the_first_line():
+    lines, _ = await split_lines(b"first\n" + BOM + b"second\n", 4)
+    assert lines == [(1, "first"), (2, "\ufeffsecond")]
+
+
+@pytest.mark.anyio
+async def test_over_long_lines_are_reported_and_skipped():
+    data = b"ok\n" + b"x" * 100 + b"\nafter\n" + b"y" * 21 + b"\n" + b"z" * 20 + b"\n" + b"w" * 50
+    for size in (1, 7, 64, len(data)):
+        lines, errors = await split_lines(data, size, max_line_bytes=20)
+        assert lines == [(1, "ok"), (3, "after"), (5, "z" * 20)]
+        assert errors == [(2, "Line is longer than 20 bytes"), (4, "Line is longer than 20 bytes"),
+                          (6, "Line is longer than 20 bytes")]
+
+
+@pytest.mark.anyio
+async def test_invalid_utf8_lines_are_reported_and_skipped():
+    lines, errors = await split_lines(b"good\nab\xff\xfecd\nfine\n\xc3", 3)
+    assert lines == [(1, "good"), (3, "fine")]
+    assert errors == [(2, "Line is not valid UTF-8 (byte 3)"), (4, "Line is not valid UTF-8 (byte 1)")]
+
+
+# --- Parsing (dry run, no database) ---
+
+@pytest.mark.anyio
+async def test_csv_import_groups_sets_and_reports_bad_rows():
+    data = BOM + (
+        "timestamp,exercise,reps,weight\r\n"
+        "2024-01-01T07:00:00Z,Squat,5,100\r\n"
+        "2024-01-01T07:00:00Z,Squat,5,105\r\n"
+        "2024-01-01T07:00:00Z,Bench,8,60\r\n"
+        "2024-01-02T07:00:00Z,Squat,0,100\r\n" # reps must be positive
+        "2024-01-02T07:00:00Z,Dead\rlift,5,140\r\n" # bare CR inside a field
+        "not-a-date,Squat,5,100\r\n"
+        "2024-01-03T07:00:00Z,Row,10,50\r\n"
+    ).encode() + b"2024-01-03T07:00:00Z,Row,10,\xff\r\n"
+    for size in (1, 7, len(data)):
+        report = await dry_run(data, "csv", size)
+        assert (report.lines_read, report.workouts_imported, report.sets_imported) == (9, 2, 4)
+        assert [error.line for error in report.errors] == [5, 6, 7, 9]
+        assert report.errors[0].error.startswith("reps: Input should be greater than 0")
+        assert report.errors[1].error.startswith("Malformed CSV line")
+        assert report.errors[3].error == "Line is not valid UTF-8 (byte 29)"
+
+
+@pytest.mark.anyio
+async def test_csv_without_required_columns_is_rejected():
+    with pytest.raises(ImportFormatError, match="missing column"):
+        await dry_run(b"timestamp,exercise\n2024-01-01T07:00:00Z,Squat\n", "csv")
+    with pytest.raises(ImportFormatError, match="malformed"):
+        await dry_run(b"timestamp,exer\rcise,reps,weight\n", "csv")
+
+
+@pytest.mark.anyio
+async def test_ndjson_import_reports_bad_rows():
+    data = BOM + ndjson(workout(1, (5, 100), (5, 105))) + b"{not json\n" + ndjson(
+        workout(2, (5, -1)), {"exercises": []}, workout(3, (3, 120)),
+    ) + b"\n" + b'{"timestamp": "2024-01-04T07:00:00Z", "exercises": [{"name": "\xff"}]}'
+    report = await dry_run(data, "ndjson")
+    assert (report.lines_read, report.workouts_imported, report.sets_imported) == (7, 2, 3)
+    assert [error.line for error in report.errors] == [2, 3, 4, 7]
+    assert report.errors[-1].error.startswith("Line is not valid UTF-8")
+
+
+@pytest.mark.anyio
+async def test_error_list_is_truncated_but_counted():
+    data = ndjson(*[workout(1, (0, 100))] * 5)
+    report = await import_workouts(None, uuid.uuid4(), chunked(data, 100), "ndjson", dry_run=True, max_errors=2)
+    assert (report.error_count, len(report.errors), report.errors_truncated) == (5, 2, True)
+
+
+# --- POST /workouts/import ---
+
+def body_chunks(data: bytes, size: int = 50) -> List[bytes]:
+    return [data[start:start + size] for start in range(0, len(data), size)]
+
+
+def test_import_keeps_importing_past_bad_bytes_after_earlier_chunks_committed(client, auth_headers, monkeypatch):
+    monkeypatch.setattr(settings, "IMPORT_CHUNK_SIZE", 2)
+    monkeypatch.setattr(settings, "IMPORT_MAX_LINE_BYTES", 400)
+    data = (
+        ndjson(*[workout(day, (5, 100 + day)) for day in range(1, 6)]) # 2 chunks committed before the bad bytes
+        + b'{"timestamp": "2024-01-06T07:00:00Z", "exercises": [{"name": "Squ\xe0t", "sets": []}]}\n'
+        + b"[" * 1000 + b"\n" # Over the line limit
+        + ndjson(workout(7, (5, 110)))
+    )
+    response = client.post(
+        "/api/v1/workouts/import", content=iter(body_chunks(data)),
+        headers={**auth_headers, "Content-Type": "application/x-ndjson"},
+    )
+    assert response.status_code == 200
+    report = response.json()
+    assert (report["lines_read"], report["workouts_imported"], report["sets_imported"]) == (8, 6, 6)
+    assert [(error["line"], error["error"]) for error in report["errors"]] == [
+        (6, "Line is not valid UTF-8 (byte 66)"), (7, "Line is longer than 400 bytes"),
+    ]
+
+    stored = client.get("/api/v1/workouts/", params={"limit": 50}, headers=auth_headers).json()
+    assert sorted(item["timestamp"][:10] for item in stored) == [f"2024-01-{day:02d}" for day in (1, 2, 3, 4, 5, 7)]
+
+
+def test_import_rejects_unusable_files_with_400(client, auth_headers):
+    response = client.post(
+        "/api/v1/workouts/import", params={"format": "csv"}, content=b"date,exercise\n2024-01-01,Squat\n",
+        headers=auth_headers,
+    )
+    assert response.status_code == 400
+    assert "missing column" in response.json()["detail"]
+    assert client.get("/api/v1/workouts/", headers=auth_headers).json() == []
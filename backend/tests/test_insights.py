@@ -0,0 +1,66 @@
+# backend/tests/test_insights.py
+"""
+user_daily_aggregates, maintained by every write path, must equal a rebuild from raw
+rows (scripts/backfill_daily_aggregates.py), and the dashboard reads from it.
+"""
+import json
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import func, select
+
+from db.session import SessionLocal
+from models.insight import DailyAggregate
+from scripts.backfill_daily_aggregates import rebuild_user
+
+SQUAT = {"exercises": [{"name": "Squat", "sets": [{"reps": 5, "weight": 100}, {"reps": 5, "weight": 110}]}]}
+COLUMNS = ("day", "workout_count", "total_sets", "total_volume", "mood_count", "mood_sum", "mood_min", "mood_max")
+
+
+def aggregates(user_id: uuid.UUID) -> list:
+    with SessionLocal() as db:
+        rows = db.scalars(select(DailyAggregate).where(DailyAggregate.user_id == user_id).order_by(DailyAggregate.day))
+        return [tuple(getattr(row, column) for column in COLUMNS) for row in rows]
+
+
+def db_now() -> datetime:
+    with SessionLocal() as db:
+        return db.scalar(select(func.now()))
+
+
+def test_incremental_aggregates_match_a_rebuild_and_feed_the_dashboard(client, auth_headers, user_id):
+    started = db_now()
+    today = datetime.now(timezone.utc).replace(hour=12, minute=0, second=0, microsecond=0)
+
+    client.post("/api/v1/workouts/", json=SQUAT, headers=auth_headers)
+    deleted = client.post("/api/v1/workouts/", json=SQUAT, headers=auth_headers).json()["id"]
+    client.post("/api/v1/workouts/batch", json={"items": [SQUAT] * 2}, headers=auth_headers)
+    history = "\n".join(json.dumps({"timestamp": (today - timedelta(days=days)).isoformat(), **SQUAT})
+                        for days in (1, 2, 2, 5))
+    client.post("/api/v1/workouts/import", content=history.encode(),
+                headers={**auth_headers, "Content-Type": "application/x-ndjson"})
+    moods = [client.post("/api/v1/moods/", json={"mood_score": score}, headers=auth_headers).json()["id"]
+             for score in (2, 9, 6)]
+    client.post("/api/v1/moods/batch", json={"items": [{"mood_score": 4}, {"mood_score": 7}]}, headers=auth_headers)
+
+    # Deletes can't be undone by increments (min/max): the day is rebuilt
+    assert client.delete(f"/api/v1/workouts/{deleted}", headers=auth_headers).status_code == 204
+    assert client.delete(f"/api/v1/moods/{moods[1]}", headers=auth_headers).status_code == 204
+
+    incremental = aggregates(user_id)
+    today_row = incremental[-1]
+    assert today_row == (today.date(), 3, 6, 3 * 1050.0, 4, 19, 2, 7)
+    with SessionLocal() as db:
+        assert all(row.updated_at >= started for row in db.scalars(
+            select(DailyAggregate).where(DailyAggregate.user_id == user_id)))
+
+    with SessionLocal() as db:
+        rebuild_user(db, user_id)
+    assert aggregates(user_id) == incremental
+
+    dashboard = client.get("/api/v1/insights/", params={"days": 7}, headers=auth_headers).json()
+    assert {key: dashboard["summary"][key] for key in (
+        "days_in_range", "active_days", "workout_count", "total_sets", "mood_entry_count", "mood_avg", "current_workout_streak",
+    )} == {"days_in_range": 7, "active_days": 4, "workout_count": 7, "total_sets": 14, "mood_entry_count": 4, "mood_avg": 4.75,
+           "current_workout_streak": 3}
+    assert [day["day"] for day in dashboard["daily"]] == [row[0].isoformat() for row in incremental]
@@ -0,0 +1,275 @@
+# backend/tests/test_job_queue.py
+"""
+Background job queue (services/job_queue.py) and the sentiment jobs it runs,
+against PostgreSQL and the fake OpenAI client.
+"""
+import asyncio
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import func, select, update
+
+from core.config import settings
+from db.session import AsyncSessionLocal
+from models.job import BackgroundJob
+from models.mood import MoodEntry
+from services import job_queue as job_queue_module, sentiment_service
+from services.job_queue import JobQueue, backoff_seconds, enqueue, register_handler
+from testing.fake_openai import FakeAsyncOpenAI
+
+pytestmark = pytest.mark.anyio
+
+TEST_JOB = "test_record"
+
+
+async def wait_for(predicate, timeout: float = 10.0):
+    """ Polls `await predicate()` until it returns something truthy. """
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    while True:
+        result = await predicate()
+        if result:
+            return result
+        if loop.time() > deadline:
+            raise AssertionError(f"Timed out after {timeout}s waiting for {predicate.__name__}")
+        await asyncio.sleep(0.02)
+
+
+async def get_job(job_id: uuid.UUID) -> BackgroundJob:
+    async with AsyncSessionLocal() as db:
+        return await db.get(BackgroundJob, job_id)
+
+
+async def jobs_of_kind(kind: str):
+    async with AsyncSessionLocal() as db:
+        return (await db.scalars(select(BackgroundJob).where(BackgroundJob.kind == kind))).all()
+
+
+async def enqueue_jobs(kind: str, payloads) -> list:
+    async with AsyncSessionLocal() as db:
+        jobs = [enqueue(db, kind, payload) for payload in payloads]
+        await db.commit()
+    return [job.id for job in jobs]
+
+
+@pytest.fixture
+def fake_openai(monkeypatch):
+    """ Installs a FakeAsyncOpenAI for the sentiment jobs; tests tune latency/failure_rate. """
+    fake = FakeAsyncOpenAI()
+    monkeypatch.setattr(sentiment_service, "get_openai_client", lambda: fake)
+    return fake
+
+
+@pytest.fixture
+def handlers(monkeypatch):
+    """ Private handler registry, so test handlers don't leak into other tests. """
+    monkeypatch.setattr(job_queue_module, "_handlers", dict(job_queue_module._handlers))
+    return job_queue_module._handlers
+
+
+@pytest.fixture
+async def make_queue():
+    """ JobQueue factory; every queue created is stopped at the end of the test. """
+    queues = []
+
+    def factory(**kwargs) -> JobQueue:
+        kwargs.setdefault("concurrency", 1)
+        kwargs.setdefault("poll_interval", 0.05)
+        queue = JobQueue(**kwargs)
+        queues.append(queue)
+        return queue
+
+    yield factory
+    for queue in queues:
+        await queue.stop()
+
+
+def test_backoff_grows_exponentially_with_jitter_and_is_capped():
+    base, cap = settings.JOB_RETRY_BASE_SECONDS, settings.JOB_RETRY_MAX_SECONDS
+    for attempts in (1, 2, 3, 4):
+        delay = base * 2 ** (attempts - 1)
+        assert all(delay / 2 <= backoff_seconds(attempts) <= delay for _ in range(50))
+    assert all(cap / 2 <= backoff_seconds(50) <= cap for _ in range(50))
+
+
+async def test_new_mood_is_pending_until_a_worker_stores_its_sentiment(
+    async_client, auth_headers, fake_openai, make_queue,
+):
+    fake_openai.latency = 0.3
+    response = await async_client.post(
+        "/api/v1/moods/", json={"mood_score": 8, "journal_text": "Great session, felt strong and happy"},
+        headers=auth_headers,
+    )
+    assert response.status_code == 201
+    created = response.json()
+    assert created["sentiment_status"] == "pending"
+    assert created["sentiment_label"] is None
+    mood_id = uuid.UUID(created["id"])
+
+    queue = make_queue()
+    await queue.start()
+
+    async def openai_called():
+        return fake_openai.calls == 1
+    await wait_for(openai_called)
+    async with AsyncSessionLocal() as db:
+        assert (await db.get(MoodEntry, mood_id)).sentiment_status == "pending" # Still waiting on the model
+
+    async def analyzed():
+        async with AsyncSessionLocal() as db:
+            entry = await db.get(MoodEntry, mood_id)
+            return entry if entry.sentiment_status == "done" else None
+    entry = await wait_for(analyzed)
+    assert (entry.sentiment_label, entry.sentiment_intensity) == ("Positive", 8)
+    assert entry.sentiment_summary
+
+    async def job_done():
+        [job] = await jobs_of_kind(sentiment_service.SENTIMENT_JOB)
+        return job if job.status == "done" else None
+    job = await wait_for(job_done) # Marked done after the handler's own commit
+    assert (job.attempts, job.locked_at) == (1, None)
+    assert queue.processed == 1 and fake_openai.calls == 1
+
+    # Cached history was invalidated by the worker
+    history = (await async_client.get("/api/v1/moods/", headers=auth_headers)).json()
+    assert [(item["id"], item["sentiment_status"]) for item in history] == [(str(mood_id), "done")]
+
+
+async def test_failing_job_retries_with_backoff_then_marks_the_entry_failed(
+    async_client, auth_headers, fake_openai, make_queue, monkeypatch,
+):
+    fake_openai.failure_rate = 1.0
+    monkeypatch.setattr(settings, "JOB_MAX_ATTEMPTS", 3)
+    monkeypatch.setattr(settings, "JOB_RETRY_BASE_SECONDS", 0.1)
+    delays = []
+
+    def recording_backoff(attempts):
+        delays.append((attempts, backoff_seconds(attempts)))
+        return delays[-1][1]
+    monkeypatch.setattr(job_queue_module, "backoff_seconds", recording_backoff)
+
+    response = await async_client.post(
+        "/api/v1/moods/", json={"mood_score": 3, "journal_text": "Tired and sore"}, headers=auth_headers,
+    )
+    mood_id = uuid.UUID(response.json()["id"])
+    [job] = await jobs_of_kind(sentiment_service.SENTIMENT_JOB)
+    assert job.max_attempts == 3
+
+    queue = make_queue()
+    await queue.start()
+
+    async def given_up():
+        current = await get_job(job.id)
+        return current if current.status == "failed" else None
+    job = await wait_for(given_up)
+
+    assert job.attempts == 3 and fake_openai.calls == 3
+    assert job.last_error == "RuntimeError: Sentiment analysis returned no result"
+    assert [attempts for attempts, _ in delays] == [1, 2] # No retry scheduled after the last attempt
+    assert 0.05 <= delays[0][1] <= 0.1 and 0.1 <= delays[1][1] <= 0.2
+    assert (queue.retried, queue.failed, queue.processed) == (2, 1, 0)
+
+    async def entry_failed(): # The on_failure hook runs after the job is marked failed
+        async with AsyncSessionLocal() as db:
+            return (await db.get(MoodEntry, mood_id)).sentiment_status == "failed"
+    await wait_for(entry_failed)
+
+
+async def test_jobs_are_stamped_per_row_and_claimed_oldest_first(db_engine, handlers, make_queue):
+    async with AsyncSessionLocal() as db:
+        started = await db.scalar(select(func.now()))
+    job_ids = [(await enqueue_jobs(TEST_JOB, [{"n": n}]))[0] for n in range(3)] # One transaction each
+    jobs = [await get_job(job_id) for job_id in job_ids]
+    assert all(job.created_at >= started and job.run_after >= started for job in jobs)
+    assert [job.run_after for job in jobs] == sorted({job.run_after for job in jobs}) # Distinct and increasing
+
+    queue = make_queue()
+    assert [(await queue._claim()).id for _ in job_ids] == job_ids
+
+
+async def test_retry_is_not_claimed_before_its_backoff_expires(db_engine, handlers, make_queue):
+    [job_id] = await enqueue_jobs(TEST_JOB, [{"n": 0}])
+    async with AsyncSessionLocal() as db:
+        await db.execute(update(BackgroundJob).values(run_after=datetime.now(timezone.utc) + timedelta(minutes=1)))
+        await db.commit()
+    queue = make_queue()
+    assert await queue._claim() is None
+    assert (await get_job(job_id)).status == "pending"
+
+
+async def test_skip_locked_claims_skip_rows_another_worker_holds(db_engine, handlers, make_queue):
+    first, second = await enqueue_jobs(TEST_JOB, [{"n": 0}, {"n": 1}])
+    queue = make_queue()
+    async with AsyncSessionLocal() as other_worker:
+        # Another worker's claim transaction is still open on the oldest job
+        locked = (await other_worker.scalars(
+            select(BackgroundJob).order_by(BackgroundJob.run_after).limit(1).with_for_update(skip_locked=True)
+        )).one()
+        assert locked.id == first
+
+        claimed = await asyncio.wait_for(queue._claim(), timeout=5) # Must not block on the locked row
+        assert claimed.id == second and claimed.attempts == 1
+        assert await queue._claim() is None
+        await other_worker.rollback()
+
+    assert (await queue._claim()).id == first
+
+
+async def test_two_worker_pools_process_each_job_exactly_once(db_engine, handlers, make_queue):
+    seen = []
+
+    @register_handler(TEST_JOB)
+    async def record(payload: dict) -> None:
+        seen.append(payload["n"])
+        await asyncio.sleep(0.01)
+
+    job_ids = await enqueue_jobs(TEST_JOB, [{"n": n} for n in range(40)])
+    pools = [make_queue(concurrency=4), make_queue(concurrency=4)]
+    for pool in pools:
+        await pool.start()
+
+    async def all_done():
+        return all(job.status == "done" for job in await jobs_of_kind(TEST_JOB))
+    await wait_for(all_done)
+
+    assert sorted(seen) == list(range(40))
+    assert sum(pool.processed for pool in pools) == len(job_ids)
+    assert all(job.attempts == 1 for job in await jobs_of_kind(TEST_JOB))
+
+
+async def test_job_left_running_by_a_crashed_worker_is_recovered_after_the_lease(db_engine, handlers, make_queue):
+    started, release = asyncio.Event(), asyncio.Event()
+    seen = []
+
+    @register_handler(TEST_JOB)
+    async def record(payload: dict) -> None:
+        started.set()
+        await release.wait() # Hangs in the first process
+        seen.append(payload["n"])
+
+    [job_id] = await enqueue_jobs(TEST_JOB, [{"n": 7}])
+    crashed = make_queue()
+    await crashed.start()
+    await asyncio.wait_for(started.wait(), timeout=5)
+    await crashed.stop() # Workers die mid-job: the row stays 'running'
+    job = await get_job(job_id)
+    assert (job.status, job.attempts) == ("running", 1) and job.locked_at is not None
+
+    restarted = make_queue(lease_seconds=60)
+    assert await restarted.recover_stale_jobs() == 0 # Lease not expired: could still be running elsewhere
+
+    async with AsyncSessionLocal() as db:
+        await db.execute(
+            update(BackgroundJob).where(BackgroundJob.id == job_id)
+            .values(locked_at=datetime.now(timezone.utc) - timedelta(seconds=61))
+        )
+        await db.commit()
+    release.set()
+    await restarted.start() # Recovers stale jobs, then runs them
+
+    async def finished():
+        current = await get_job(job_id)
+        return current if current.status == "done" else None
+    job = await wait_for(finished)
+    assert job.attempts == 2 and seen == [7]
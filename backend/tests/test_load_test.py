@@ -0,0 +1,40 @@
+# backend/tests/test_load_test.py
+"""
+benchmarks/load_test.py driven in-process (no uvicorn): a short stage against the
+app through ASGITransport, and the /metrics-derived DB breakdown.
+"""
+import uuid
+
+import pytest
+
+from benchmarks import load_test
+from tests.conftest import TEST_JWT_SECRET
+
+pytestmark = pytest.mark.anyio
+
+
+def test_percentile_picks_the_nearest_rank():
+    values = [float(v) for v in range(1, 101)]
+    assert [load_test.percentile(values, pct) for pct in (50, 95, 99, 100)] == [51.0, 96.0, 100.0, 100.0]
+    assert load_test.percentile([], 95) == 0.0
+
+
+async def test_stage_reports_every_operation_and_its_db_time(async_client):
+    tokens = [load_test.mint_token(TEST_JWT_SECRET, uuid.uuid4()) for _ in range(2)]
+    await load_test.seed(async_client, tokens, workouts=5, moods=5, batch=3, seed_=1)
+
+    before = await load_test.scrape(async_client)
+    stage = await load_test.run_stage(async_client, tokens, load_test.MIXES["write_heavy"],
+                                      concurrency=2, duration=0.5, seed_=1)
+    breakdown = load_test.db_breakdown(before, await load_test.scrape(async_client))
+
+    assert stage["errors"] == 0 and stage["requests"] == sum(op["requests"] for op in stage["operations"].values())
+    assert set(stage["operations"]) <= set(load_test.MIXES["write_heavy"])
+    for op in stage["operations"].values():
+        assert op["p50_ms"] <= op["p95_ms"] <= op["p99_ms"] <= op["max_ms"]
+        assert set(op["status"]) <= {"200", "201", "304"}
+
+    posted = stage["operations"]["POST /workouts"]["requests"]
+    assert breakdown["POST /api/v1/workouts/"]["requests"] == posted
+    assert breakdown["POST /api/v1/workouts/"]["queries_per_request"] > 0
+    assert not any(route.endswith("/metrics") for route in breakdown)
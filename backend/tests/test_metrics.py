@@ -0,0 +1,78 @@
+# backend/tests/test_metrics.py
+"""
+Prometheus text rendering (core/metrics.py) and what MetricsMiddleware records
+for real requests, read back through GET /metrics.
+"""
+import re
+import uuid
+
+from core.config import settings
+from core.instrumentation import HTTP_LATENCY, HTTP_REQUESTS, REQUEST_DB_QUERIES
+from core.metrics import Registry
+
+WORKOUT_ROUTE = "/api/v1/workouts/{workout_id}"
+
+
+def test_registry_renders_the_text_exposition_format():
+    registry = Registry()
+    calls = registry.counter("calls_total", "Calls made", ("service",))
+    depth = registry.gauge("queue_depth", "Jobs waiting")
+    latency = registry.histogram("latency_seconds", 'Latency, "quoted"', ("route",), buckets=(0.1, 1.0))
+    registry.add_stats_source("cache", lambda: {"size": 3, "enabled": True, "name": "lru", "hit_rate": 0.5})
+    registry.add_stats_source("broken", lambda: 1 / 0)
+
+    calls.inc('a"b\\c')
+    calls.inc('a"b\\c', amount=2)
+    depth.set(4)
+    depth.dec()
+    for value in (0.05, 0.1, 0.5, 3):
+        latency.observe(value, "/x")
+
+    assert registry.render().splitlines() == [
+        "# HELP calls_total Calls made", "# TYPE calls_total counter",
+        'calls_total{service="a\\"b\\\\c"} 3',
+        "# HELP queue_depth Jobs waiting", "# TYPE queue_depth gauge",
+        "queue_depth 3",
+        '# HELP latency_seconds Latency, \\"quoted\\"', "# TYPE latency_seconds histogram",
+        'latency_seconds_bucket{route="/x",le="0.1"} 2', # Buckets are cumulative and inclusive
+        'latency_seconds_bucket{route="/x",le="1"} 3',
+        'latency_seconds_bucket{route="/x",le="+Inf"} 4',
+        'latency_seconds_sum{route="/x"} 3.65',
+        'latency_seconds_count{route="/x"} 4',
+        "# HELP app_component_stat Numeric stats() values of in-process caches and workers",
+        "# TYPE app_component_stat gauge",
+        'app_component_stat{component="cache",stat="size"} 3', # Booleans and strings are skipped
+        'app_component_stat{component="cache",stat="hit_rate"} 0.5',
+    ]
+
+
+def scrape(client) -> str:
+    response = client.get(settings.METRICS_PATH)
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    return response.text
+
+
+def sample(text: str, name: str, **labels) -> float:
+    wanted = ",".join(f'{key}="{value}"' for key, value in labels.items())
+    match = re.search(rf"^{re.escape(name)}{{{re.escape(wanted)}}} (\S+)$", text, re.MULTILINE)
+    return float(match.group(1)) if match else 0.0
+
+
+def test_requests_are_recorded_per_route_template(client, auth_headers):
+    requests_before = HTTP_REQUESTS.value("DELETE", WORKOUT_ROUTE, "404")
+    latency_before = HTTP_LATENCY.count("DELETE", WORKOUT_ROUTE)
+    queries_before = REQUEST_DB_QUERIES.count("DELETE", WORKOUT_ROUTE)
+
+    for _ in range(3): # Three different ids, one route label
+        missing = client.delete(f"/api/v1/workouts/{uuid.uuid4()}", headers=auth_headers)
+        assert missing.status_code == 404
+    client.get("/no/such/path")
+
+    text = scrape(client)
+    assert sample(text, "http_requests_total", method="DELETE", route=WORKOUT_ROUTE, status="404") == requests_before + 3
+    assert sample(text, "http_request_duration_seconds_count", method="DELETE", route=WORKOUT_ROUTE) == latency_before + 3
+    assert sample(text, "http_request_db_queries_count", method="DELETE", route=WORKOUT_ROUTE) == queries_before + 3
+    assert sample(text, "http_requests_total", method="GET", route="unmatched", status="404") >= 1
+    assert sample(text, "db_queries_total", route=WORKOUT_ROUTE) >= 3 # One lookup per request, at least
+    assert 'app_component_stat{component="auth_token_cache",stat="hits"}' in text
@@ -0,0 +1,70 @@
+# backend/tests/test_pagination.py
+import uuid
+from datetime import datetime, timezone
+
+import pytest
+from fastapi import HTTPException
+
+from core.pagination import NEXT_CURSOR_HEADER, decode_cursor, encode_cursor
+
+SQUAT = {"exercises": [{"name": "Squat", "sets": [{"reps": 5, "weight": 100}]}]}
+
+
+def test_cursor_round_trips_and_rejects_garbage():
+    position = (datetime(2025, 6, 1, 12, 30, 0, 123456, tzinfo=timezone.utc), uuid.uuid4())
+    token = encode_cursor(*position)
+    assert "=" not in token and decode_cursor(token) == position
+    for bad in ("", "not-a-cursor", encode_cursor(position[0], position[1])[:-4]):
+        with pytest.raises(HTTPException) as raised:
+            decode_cursor(bad)
+        assert raised.value.status_code == 400
+
+
+def walk(client, headers, path: str, limit: int) -> list:
+    """ Every page of a history list via X-Next-Cursor, as a list of pages of ids. """
+    pages, params = [], {"limit": limit}
+    while True:
+        response = client.get(path, params=params, headers=headers)
+        assert response.status_code == 200
+        pages.append([item["id"] for item in response.json()])
+        if NEXT_CURSOR_HEADER not in response.headers:
+            return pages
+        params = {"limit": limit, "cursor": response.headers[NEXT_CURSOR_HEADER]}
+
+
+def test_workout_cursor_pages_cover_ties_without_gaps_or_duplicates(client, auth_headers):
+    for _ in range(4):
+        client.post("/api/v1/workouts/", json=SQUAT, headers=auth_headers)
+    client.post("/api/v1/workouts/batch", json={"items": [SQUAT] * 12}, headers=auth_headers) # 12 equal timestamps
+
+    everything = [item["id"] for item in client.get("/api/v1/workouts/", params={"limit": 100}, headers=auth_headers).json()]
+    pages = walk(client, auth_headers, "/api/v1/workouts/", limit=5)
+    assert [len(page) for page in pages] == [5, 5, 5, 1]
+    assert [workout_id for page in pages for workout_id in page] == everything # Same order as one big page
+
+
+def test_cursor_pages_stay_stable_while_new_rows_arrive(client, auth_headers):
+    for _ in range(6):
+        client.post("/api/v1/moods/", json={"mood_score": 5}, headers=auth_headers)
+    first = client.get("/api/v1/moods/", params={"limit": 3}, headers=auth_headers)
+    client.post("/api/v1/moods/", json={"mood_score": 9}, headers=auth_headers) # Newest: lands before the cursor
+
+    by_cursor = client.get("/api/v1/moods/", params={"limit": 3, "cursor": first.headers[NEXT_CURSOR_HEADER]},
+                           headers=auth_headers).json()
+    by_offset = client.get("/api/v1/moods/", params={"limit": 3, "skip": 3}, headers=auth_headers).json()
+    first_ids = {item["id"] for item in first.json()}
+    assert not first_ids & {item["id"] for item in by_cursor}
+    assert first_ids & {item["id"] for item in by_offset} # What offset paging would have repeated
+
+
+def test_malformed_cursor_is_a_400(client, auth_headers):
+    for path in ("/api/v1/workouts/", "/api/v1/moods/"):
+        assert client.get(path, params={"cursor": "garbage"}, headers=auth_headers).status_code == 400
+
+
+def test_mood_history_is_newest_first(client, auth_headers):
+    created = [client.post("/api/v1/moods/", json={"mood_score": score}, headers=auth_headers).json()
+               for score in range(1, 6)]
+    history = client.get("/api/v1/moods/", headers=auth_headers).json()
+    assert [item["id"] for item in history] == [item["id"] for item in reversed(created)]
+    assert len({item["created_at"] for item in history}) == 5 # One per row, not the table's creation time
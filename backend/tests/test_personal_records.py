@@ -0,0 +1,147 @@
+# backend/tests/test_personal_records.py
+"""
+personal_records, maintained incrementally by the write paths, must always equal a
+brute-force fold (workout_bests + merge_bests) over the user's live workouts.
+"""
+import json
+import math
+import random
+import uuid
+from typing import Dict
+
+from sqlalchemy import func, select
+
+from db.session import SessionLocal
+from models.workout import PersonalRecord, Workout
+from services.records_service import METRICS, merge_bests, workout_bests
+
+EXERCISES = ("Squat", "Bench", "Deadlift")
+
+
+def random_workout(rng: random.Random) -> dict:
+    # Few distinct weights/reps so ties (same value, different workout) are common
+    return {"exercises": [
+        {"name": name, "sets": [{"reps": rng.choice([1, 3, 5]), "weight": rng.choice([60, 80, 100])}
+                                for _ in range(rng.randint(1, 3))]}
+        for name in rng.sample(EXERCISES, rng.randint(1, len(EXERCISES)))
+    ]}
+
+
+def brute_force(user_id: uuid.UUID) -> Dict[str, dict]:
+    with SessionLocal() as db:
+        workouts = db.execute(
+            select(Workout.id, Workout.timestamp, Workout.exercises)
+            .where(Workout.user_id == user_id, Workout.deleted_at.is_(None))
+        ).all()
+    records: Dict[str, dict] = {}
+    for workout_id, timestamp, exercises in workouts:
+        for name, row in workout_bests(workout_id, timestamp, exercises).items():
+            records[name] = merge_bests(records.get(name), row)
+    return records
+
+
+def assert_records_match_brute_force(user_id: uuid.UUID) -> Dict[str, PersonalRecord]:
+    expected = brute_force(user_id)
+    with SessionLocal() as db:
+        stored = {r.exercise_name: r for r in db.scalars(select(PersonalRecord).where(PersonalRecord.user_id == user_id))}
+    assert set(stored) == set(expected)
+    for name, want in expected.items():
+        for column in (column for columns in METRICS.values() for column in columns):
+            got = getattr(stored[name], column)
+            if isinstance(want[column], float):
+                assert math.isclose(got, want[column], rel_tol=1e-9), (name, column, got, want[column])
+            else:
+                assert got == want[column], (name, column, got, want[column])
+    return stored
+
+
+def test_records_follow_creates_batches_imports_and_deletes(client, auth_headers, user_id):
+    rng = random.Random(14)
+    created_ids = []
+    for _ in range(12):
+        response = client.post("/api/v1/workouts/", json=random_workout(rng), headers=auth_headers)
+        assert response.status_code == 201
+        created_ids.append(response.json()["id"])
+        assert_records_match_brute_force(user_id)
+
+    batch = client.post(
+        "/api/v1/workouts/batch", json={"items": [random_workout(rng) for _ in range(6)]}, headers=auth_headers,
+    ).json()
+    created_ids += [result["workout"]["id"] for result in batch["results"]]
+    assert_records_match_brute_force(user_id)
+
+    lines = [
+        json.dumps({"timestamp": f"2023-0{month}-01T07:00:00Z", **random_workout(rng)}) for month in range(1, 7)
+    ]
+    imported = client.post(
+        "/api/v1/workouts/import", content="\n".join(lines).encode(),
+        headers={**auth_headers, "Content-Type": "application/x-ndjson"},
+    ).json()
+    assert imported["workouts_imported"] == 6
+    assert_records_match_brute_force(user_id)
+
+    # Deleting record holders first makes rebuild_exercises fall back to the next best workout
+    for _ in range(8):
+        stored = assert_records_match_brute_force(user_id)
+        holders = {str(record.max_weight_workout_id) for record in stored.values()} & set(created_ids)
+        victim = sorted(holders)[0] if holders else rng.choice(created_ids)
+        assert client.delete(f"/api/v1/workouts/{victim}", headers=auth_headers).status_code == 204
+        created_ids.remove(victim)
+        assert_records_match_brute_force(user_id)
+
+    served = client.get("/api/v1/workouts/records", headers=auth_headers).json()
+    stored = assert_records_match_brute_force(user_id)
+    assert [(r["exercise_name"], r["max_weight"], r["best_e1rm_workout_id"]) for r in served] == [
+        (name, record.max_weight, str(record.best_e1rm_workout_id)) for name, record in sorted(stored.items())
+    ]
+
+
+def test_create_reports_broken_records_but_not_the_first_baseline(client, auth_headers, user_id):
+    def log(weight: float, reps: int = 5) -> dict:
+        body = {"exercises": [{"name": "Squat", "sets": [{"reps": reps, "weight": weight}]}]}
+        return client.post("/api/v1/workouts/", json=body, headers=auth_headers).json()
+
+    with SessionLocal() as db:
+        started = db.scalar(select(func.now()))
+    first = log(100)
+    assert (first["new_pr"], first["new_personal_records"]) == (False, [])
+    assert assert_records_match_brute_force(user_id)["Squat"].updated_at >= started # Stamped on insert too
+
+    heavier = log(105)
+    assert heavier["new_pr"] is True
+    assert {r["record"] for r in heavier["new_personal_records"]} == {"max_weight", "best_e1rm", "best_volume"}
+
+    tie = log(105) # Equal is not better: the earlier workout keeps every record
+    assert (tie["new_pr"], tie["new_personal_records"]) == (False, [])
+
+    more_reps = log(100, reps=8) # Lighter, but a better estimated 1RM and volume
+    assert {r["record"] for r in more_reps["new_personal_records"]} == {"best_e1rm", "best_volume"}
+    assert_records_match_brute_force(user_id)
+
+    client.delete(f"/api/v1/workouts/{heavier['id']}", headers=auth_headers)
+    stored = assert_records_match_brute_force(user_id)
+    assert (stored["Squat"].max_weight, str(stored["Squat"].max_weight_workout_id)) == (105, tie["id"])
+
+
+def test_more_reps_at_the_same_weight_is_a_better_max_weight_across_workouts(client, auth_headers, user_id):
+    def squat(weight: float, reps: int) -> dict:
+        return {"exercises": [{"name": "Squat", "sets": [{"reps": reps, "weight": weight}]}]}
+
+    first = client.post("/api/v1/workouts/", json=squat(100, 5), headers=auth_headers).json()
+    fewer = client.post("/api/v1/workouts/", json=squat(100, 3), headers=auth_headers).json()
+    assert "max_weight" not in {r["record"] for r in fewer["new_personal_records"]}
+    more = client.post("/api/v1/workouts/", json=squat(100, 8), headers=auth_headers).json()
+    assert "max_weight" in {r["record"] for r in more["new_personal_records"]} # Upsert path
+    stored = assert_records_match_brute_force(user_id)["Squat"]
+    assert (stored.max_weight, stored.max_weight_reps, str(stored.max_weight_workout_id)) == (100, 8, more["id"])
+
+    # Same outcome whatever the fold order: one bulk upsert, then a rebuild after a delete
+    lines = [json.dumps({"timestamp": f"2023-01-0{day}T07:00:00Z", **squat(120, reps)}) for day, reps in ((2, 8), (1, 5), (3, 8))]
+    client.post("/api/v1/workouts/import", content="\n".join(lines).encode(),
+                headers={**auth_headers, "Content-Type": "application/x-ndjson"})
+    stored = assert_records_match_brute_force(user_id)["Squat"]
+    assert (stored.max_weight, stored.max_weight_reps) == (120, 8)
+    assert stored.max_weight_at.day == 2 # Earlier of the two 120x8 workouts
+
+    client.delete(f"/api/v1/workouts/{first['id']}", headers=auth_headers)
+    assert assert_records_match_brute_force(user_id)["Squat"].max_weight_at.day == 2
@@ -0,0 +1,129 @@
+# backend/tests/test_query_budgets.py
+"""
+Statement budgets for the hot routes (testing/query_count.py) - constant in the
+number of rows or items, so an N+1 fails here - and the runtime N+1 detector of
+core/instrumentation.py.
+"""
+import logging
+
+import httpx
+import pytest
+from fastapi import FastAPI
+from sqlalchemy import create_engine, text
+
+from core.config import settings
+from core.instrumentation import MetricsMiddleware, REPEATED_QUERY_REQUESTS, configure_diagnostics
+from db.session import async_engine
+from services.data_version_service import data_versions
+from testing.query_count import assert_max_queries
+
+WORKOUT = {"exercises": [
+    {"name": "Squat", "sets": [{"reps": 5, "weight": 100}, {"reps": 5, "weight": 105}]},
+    {"name": "Bench", "sets": [{"reps": 8, "weight": 60}]},
+]}
+
+
+@pytest.fixture
+def history(client, auth_headers):
+    """ 30 workouts and 10 mood entries, written in bulk. """
+    client.post("/api/v1/workouts/batch", json={"items": [WORKOUT] * 30}, headers=auth_headers)
+    client.post("/api/v1/moods/batch", json={"items": [{"mood_score": 6, "journal_text": "fine"}] * 10},
+                headers=auth_headers)
+
+
+@pytest.fixture
+def cold_versions(monkeypatch):
+    """ Read the data version from the database every time (worst case: +1 statement per read). """
+    monkeypatch.setattr(data_versions, "ttl", -1)
+
+
+def test_history_list_is_one_query_plus_the_version(client, auth_headers, history, cold_versions):
+    for params in ({"limit": 50}, {"limit": 10, "skip": 10}):
+        with assert_max_queries(async_engine, 2):
+            page = client.get("/api/v1/workouts/", params=params, headers=auth_headers)
+        assert page.status_code == 200 and len(page.json()) == min(params["limit"], 30)
+
+
+def test_timeline_is_one_query_per_source(client, auth_headers, history, cold_versions):
+    with assert_max_queries(async_engine, 4): # Version + workouts, moods and tracks
+        page = client.get("/api/v1/timeline/", params={"limit": 100}, headers=auth_headers)
+    assert page.status_code == 200 and len(page.json()["items"]) == 40
+
+
+def test_create_is_constant_in_exercises_and_history(client, auth_headers, history):
+    big = {"exercises": [
+        {"name": f"Exercise {i}", "sets": [{"reps": 5, "weight": 20 + i}] * 3} for i in range(12)
+    ]}
+    for body in (WORKOUT, big):
+        with assert_max_queries(async_engine, 6):
+            assert client.post("/api/v1/workouts/", json=body, headers=auth_headers).status_code == 201
+
+
+@pytest.mark.parametrize("items", [1, 10, 30])
+def test_batch_create_is_constant_in_items(client, auth_headers, items):
+    with assert_max_queries(async_engine, 5) as log:
+        response = client.post("/api/v1/workouts/batch", json={"items": [WORKOUT] * items}, headers=auth_headers)
+    assert response.status_code == 200 and response.json()["created"] == items
+    assert not any(statement.startswith("SELECT") for statement in log.statements) # Writes only
+
+
+def test_assert_max_queries_lists_the_repeated_statement():
+    sqlite = create_engine("sqlite://") # Only the message formatting is under test: no Postgres needed
+    with pytest.raises(AssertionError, match=r"at most 1 queries, 3 were executed:\n  3 x SELECT 1"):
+        with assert_max_queries(sqlite, 1):
+            with sqlite.connect() as conn:
+                for _ in range(3):
+                    conn.execute(text("SELECT 1"))
+
+
+# --- Runtime N+1 detection (DB_DIAGNOSTICS_ENABLED) ---
+
+@pytest.fixture
+def diagnostics():
+    configure_diagnostics(True, slow_query_ms=60_000, repeated_query_threshold=2)
+    yield
+    configure_diagnostics(settings.DB_DIAGNOSTICS_ENABLED)
+
+
+@pytest.fixture
+async def repeating_app(db_engine):
+    app = FastAPI()
+
+    @app.get("/repeat/{times}")
+    async def repeat(times: int):
+        async with async_engine.connect() as conn:
+            for i in range(times):
+                await conn.execute(text("SELECT CAST(:i AS INTEGER)"), {"i": i}) # One template, N executions
+            await conn.execute(text("SELECT 'once'"))
+        return {"ran": times}
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=MetricsMiddleware(app)), base_url="http://test") as http:
+        yield http
+
+
+@pytest.mark.anyio
+async def test_repeated_statement_template_is_flagged_above_the_threshold(repeating_app, diagnostics, caplog):
+    caplog.set_level(logging.WARNING, logger="db.diagnostics")
+    flagged_before = REPEATED_QUERY_REQUESTS.value("/repeat/{times}")
+
+    assert (await repeating_app.get("/repeat/2")).status_code == 200 # At the threshold: fine
+    assert caplog.records == [] and REPEATED_QUERY_REQUESTS.value("/repeat/{times}") == flagged_before
+
+    await repeating_app.get("/repeat/5")
+    assert REPEATED_QUERY_REQUESTS.value("/repeat/{times}") == flagged_before + 1
+    [record] = caplog.records # Once per template per request, not per execution
+    assert record.name == "db.diagnostics"
+    assert "Possible N+1: GET /repeat/{times} ran the same statement 5 times (threshold 2)" in record.getMessage()
+    assert "SELECT CAST" in record.getMessage() and "'once'" not in record.getMessage()
+
+
+@pytest.mark.anyio
+async def test_nothing_is_tracked_while_diagnostics_are_off(repeating_app, caplog):
+    configure_diagnostics(False, repeated_query_threshold=2)
+    try:
+        caplog.set_level(logging.WARNING, logger="db.diagnostics")
+        flagged_before = REPEATED_QUERY_REQUESTS.value("/repeat/{times}")
+        await repeating_app.get("/repeat/5")
+        assert caplog.records == [] and REPEATED_QUERY_REQUESTS.value("/repeat/{times}") == flagged_before
+    finally:
+        configure_diagnostics(settings.DB_DIAGNOSTICS_ENABLED)
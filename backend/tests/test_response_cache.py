@@ -0,0 +1,170 @@
+# backend/tests/test_response_cache.py
+import asyncio
+import uuid
+
+import pytest
+from fastapi import Response
+
+from core.redis_client import RedisClient
+from services.response_cache_service import MemoryBackend, RedisBackend, ResponseCache, response_cache
+from testing.fake_redis import FakeRedisServer
+
+pytestmark = pytest.mark.anyio
+
+
+class Source:
+    """ Stands in for a list query: counts calls and renders the user's current data. """
+
+    def __init__(self):
+        self.calls = 0
+        self.version = 0
+        self.status_code = 200
+        self.release = None # asyncio.Event to hold computations at
+
+    async def compute(self) -> Response:
+        self.calls += 1
+        version = self.version # Snapshot taken when the "query" starts
+        if self.release is not None:
+            await self.release.wait()
+        return Response(content=b'{"version": %d}' % version, status_code=self.status_code,
+                        media_type="application/json", headers={"ETag": f'W/"{version}"'})
+
+
+@pytest.fixture(params=["memory", "redis"])
+async def cache(request):
+    if request.param == "memory":
+        yield ResponseCache(MemoryBackend(max_entries=100, max_bytes=1 << 20, generation_ttl=600), ttl_seconds=60)
+        return
+    server = FakeRedisServer()
+    port = await server.start()
+    cache = ResponseCache(RedisBackend(RedisClient(f"redis://127.0.0.1:{port}/0"), generation_ttl=600), ttl_seconds=60)
+    yield cache
+    await cache.close()
+    await server.stop()
+
+
+async def test_hits_replay_body_and_headers(cache):
+    source, user_id = Source(), uuid.uuid4()
+    first = await cache.cached(user_id, "list", source.compute)
+    second = await cache.cached(user_id, "list", source.compute)
+    assert source.calls == 1 and (cache.hits, cache.misses, cache.stores) == (1, 1, 1)
+    assert (second.body, second.media_type, second.headers["ETag"]) == (first.body, "application/json", 'W/"0"')
+
+    assert (await cache.cached(user_id, "other-page", source.compute)) is not None
+    assert source.calls == 2 # Variants are cached separately
+
+
+async def test_invalidate_starts_a_new_generation_for_that_user_only(cache):
+    source, user_id, other_user = Source(), uuid.uuid4(), uuid.uuid4()
+    await cache.cached(user_id, "list", source.compute)
+    await cache.cached(other_user, "list", source.compute)
+
+    source.version = 1
+    await cache.invalidate(user_id)
+    assert (await cache.cached(user_id, "list", source.compute)).body == b'{"version": 1}'
+    assert (await cache.cached(other_user, "list", source.compute)).body == b'{"version": 0}'
+    assert source.calls == 3
+
+
+async def test_a_read_started_before_a_write_cannot_serve_stale_data_after_it(cache):
+    source, user_id = Source(), uuid.uuid4()
+    source.release = asyncio.Event()
+    slow_read = asyncio.create_task(cache.cached(user_id, "list", source.compute))
+    await asyncio.sleep(0.01) # Snapshot of version 0 taken
+
+    source.version = 1 # The write commits...
+    await cache.invalidate(user_id) # ...and invalidates while the read is still rendering
+    source.release.set()
+    assert (await slow_read).body == b'{"version": 0}'
+
+    # Stored under the old generation: never read again
+    assert (await cache.cached(user_id, "list", source.compute)).body == b'{"version": 1}'
+
+
+async def test_concurrent_misses_compute_once(cache):
+    source, user_id = Source(), uuid.uuid4()
+    source.release = asyncio.Event()
+    pages = [asyncio.create_task(cache.cached(user_id, "list", source.compute)) for _ in range(10)]
+    await asyncio.sleep(0.01)
+    source.release.set()
+    assert {page.body for page in await asyncio.gather(*pages)} == {b'{"version": 0}'}
+    assert source.calls == 1 and (cache.misses, cache.coalesced) == (1, 9)
+    assert cache.stats()["inflight"] == 0
+
+
+async def test_waiters_compute_themselves_when_the_first_computation_fails(cache):
+    user_id, source = uuid.uuid4(), Source()
+    release = asyncio.Event()
+
+    async def failing() -> Response:
+        await release.wait()
+        raise RuntimeError("database unavailable")
+
+    first = asyncio.create_task(cache.cached(user_id, "list", failing))
+    await asyncio.sleep(0.01)
+    waiter = asyncio.create_task(cache.cached(user_id, "list", source.compute))
+    await asyncio.sleep(0.01)
+    release.set()
+    with pytest.raises(RuntimeError):
+        await first
+    assert (await waiter).body == b'{"version": 0}' and source.calls == 1
+
+
+async def test_only_200_responses_are_stored(cache):
+    source, user_id = Source(), uuid.uuid4()
+    source.status_code = 304
+    await cache.cached(user_id, "list", source.compute)
+    await cache.cached(user_id, "list", source.compute)
+    assert source.calls == 2 and cache.stores == 0
+
+
+async def test_backend_errors_are_misses_not_failures(cache, monkeypatch):
+    source, user_id = Source(), uuid.uuid4()
+
+    async def broken(*args):
+        raise ConnectionError("cache down")
+    monkeypatch.setattr(cache.backend, "get", broken)
+    monkeypatch.setattr(cache.backend, "invalidate", broken)
+
+    assert (await cache.cached(user_id, "list", source.compute)).body == b'{"version": 0}'
+    await cache.invalidate(user_id)
+    assert cache.errors == 2
+
+
+async def test_memory_backend_is_bounded_by_entries_and_bytes():
+    backend = MemoryBackend(max_entries=2, max_bytes=10, generation_ttl=600)
+    await backend.set("a", b"1234", ttl=60)
+    await backend.set("b", b"1234", ttl=60)
+    await backend.get("a") # Most recently used
+    await backend.set("c", b"12", ttl=60)
+    assert (await backend.get("b"), backend.evictions) == (None, 1)
+
+    await backend.set("d", b"123456", ttl=60) # 4 + 2 + 6 bytes > 10
+    assert backend.stats() == {"entries": 2, "bytes": 8, "evictions": 2}
+    await backend.set("huge", b"x" * 11, ttl=60) # Larger than the whole cache: not stored
+    assert await backend.get("huge") is None and await backend.get("d") == b"123456"
+
+    await backend.set("expired", b"1", ttl=-1)
+    assert await backend.get("expired") is None
+
+
+# --- Wired into the history lists ---
+
+def test_history_first_page_is_cached_until_a_write(client, auth_headers):
+    squat = {"exercises": [{"name": "Squat", "sets": [{"reps": 5, "weight": 100}]}]}
+    client.post("/api/v1/workouts/", json=squat, headers=auth_headers)
+    hits, invalidations = response_cache.hits, response_cache.invalidations
+
+    first = client.get("/api/v1/workouts/", headers=auth_headers)
+    second = client.get("/api/v1/workouts/", headers=auth_headers)
+    assert second.content == first.content and second.headers["ETag"] == first.headers["ETag"]
+    assert response_cache.hits == hits + 1
+
+    client.post("/api/v1/workouts/", json=squat, headers=auth_headers)
+    assert response_cache.invalidations == invalidations + 1
+    assert len(client.get("/api/v1/workouts/", headers=auth_headers).json()) == 2
+
+    hits = response_cache.hits
+    for _ in range(2):
+        assert len(client.get("/api/v1/workouts/", params={"skip": 1}, headers=auth_headers).json()) == 1
+    assert response_cache.hits == hits # Later pages are never cached
@@ -0,0 +1,44 @@
+# backend/tests/test_sentiment_cache.py
+"""
+Content-addressed sentiment cache and batched analysis (services/sentiment_service.py),
+against PostgreSQL and the fake OpenAI client.
+"""
+import pytest
+from sqlalchemy import func, select
+
+from db.session import AsyncSessionLocal
+from models.mood import SentimentCache
+from services import openai_service
+from services.sentiment_service import analyze_many
+from testing.fake_openai import FakeAsyncOpenAI
+
+pytestmark = pytest.mark.anyio
+
+
+def test_cache_key_ignores_whitespace_and_unicode_form():
+    key = openai_service.sentiment_cache_key("Felt  strong\ttoday, café")
+    assert openai_service.sentiment_cache_key("  Felt strong today, café ") == key
+    assert openai_service.sentiment_cache_key("Felt strong today") != key
+
+
+async def test_analyze_many_sends_each_distinct_text_once_then_hits_the_cache(db_engine):
+    fake = FakeAsyncOpenAI()
+    entries = {
+        "a": "Great session, felt strong", "b": "great  session, felt strong ", "c": "Great session, felt strong",
+        "d": "Tired and sore", "e": "   ", "f": "Calm and happy",
+    }
+    async with AsyncSessionLocal() as db:
+        started = await db.scalar(select(func.now()))
+        results = await analyze_many(db, fake, entries, batch_size=2)
+        await db.commit()
+
+    assert sorted(results) == ["a", "b", "c", "d", "f"] # Blank text is not analyzed
+    assert results["a"] == results["c"] and results["a"].sentiment == "Positive"
+    assert results["d"].sentiment == "Negative"
+    assert (fake.calls, fake.batched_entries) == (2, 4) # a/c share a key; b differs only in case; batches of 2
+
+    async with AsyncSessionLocal() as db:
+        rows = (await db.scalars(select(SentimentCache))).all()
+        assert len(rows) == 4 and all(row.created_at >= started for row in rows)
+        again = await analyze_many(db, fake, entries)
+    assert again == results and fake.calls == 2 # Everything served from the cache
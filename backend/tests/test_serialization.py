@@ -0,0 +1,46 @@
+# backend/tests/test_serialization.py
+import json
+import uuid
+from collections import namedtuple
+from datetime import datetime, timezone
+from typing import List
+
+import pytest
+from asyncpg.pgproto.pgproto import UUID as AsyncpgUUID
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_model_field
+
+from core.serialization import FastJSONResponse, rows_as_dicts
+from routers.workouts import WORKOUT_READ_DEFAULTS
+from schemas.workout import WorkoutRead
+
+WorkoutRow = namedtuple("WorkoutRow", ["exercises", "id", "user_id", "timestamp", "created_at"])
+
+
+def asyncpg_uuid() -> uuid.UUID:
+    return AsyncpgUUID(str(uuid.uuid4()))
+
+
+@pytest.mark.anyio
+async def test_fast_path_matches_the_validated_response_for_driver_rows():
+    user_id = asyncpg_uuid()
+    rows = [
+        WorkoutRow([{"name": "Squat", "sets": [{"reps": 5, "weight": 100.0}, {"reps": 3, "weight": 112.5}]}],
+                   asyncpg_uuid(), user_id, datetime(2025, 3, 1, 7, 30, tzinfo=timezone.utc),
+                   datetime(2025, 3, 1, 7, 31, 2, 123456, tzinfo=timezone.utc)),
+        WorkoutRow([{"name": "Bench", "sets": [{"reps": 8, "weight": 0.0}]}],
+                   asyncpg_uuid(), user_id, datetime(2025, 2, 27, tzinfo=timezone.utc),
+                   datetime(2025, 2, 27, tzinfo=timezone.utc)),
+    ]
+    field = create_model_field(name="Response_read_workouts", type_=List[WorkoutRead], mode="serialization")
+    validated = JSONResponse(await serialize_response(field=field, response_content=rows)).body
+
+    fast = FastJSONResponse(rows_as_dicts(rows, WORKOUT_READ_DEFAULTS)).body
+    assert json.loads(fast) == json.loads(validated)
+    assert json.loads(fast)[0]["id"] == str(rows[0].id)
+
+
+def test_unsupported_types_still_raise():
+    with pytest.raises(TypeError):
+        FastJSONResponse({"value": object()})
@@ -0,0 +1,202 @@
+# backend/tests/test_spotify_service.py
+import uuid
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+
+import httpx
+import pytest
+from sqlalchemy import delete, func, select, update
+
+from core.pagination import NEXT_CURSOR_HEADER
+from db.session import AsyncSessionLocal
+from models.spotify import SpotifySyncState, SpotifyTrack
+from routers import spotify as spotify_router
+from services import spotify_service, spotify_token_service
+from services.spotify_service import SpotifyAPIError, _parse_retry_after, _to_ms, fetch_recently_played_page
+from testing.fake_spotify import FakeSpotify, generate_plays
+from testing.query_count import count_queries
+
+NOW = datetime(2025, 6, 1, 12, tzinfo=timezone.utc)
+
+
+def rate_limited(retry_after: str) -> httpx.AsyncClient:
+    """ Client whose Spotify answers every call with 429 and the given Retry-After. """
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(429, headers={"Retry-After": retry_after}, json={"error": {"status": 429}})
+    return httpx.AsyncClient(transport=httpx.MockTransport(handler), base_url="http://fake-spotify/v1")
+
+
+def http_date(delta: timedelta) -> str:
+    return format_datetime(datetime.now(timezone.utc) + delta, usegmt=True)
+
+
+@pytest.mark.parametrize("header, expected", [
+    ("7", 7), (" 30 ", 30), ("0", 0),
+    (None, None), ("", None), ("soon", None), ("-5", None), ("1.5", None), ("Mon, 99 Foo 2025", None),
+])
+def test_parse_retry_after(header, expected):
+    assert _parse_retry_after(header) == expected
+
+
+def test_parse_retry_after_accepts_http_dates():
+    assert 118 <= _parse_retry_after(http_date(timedelta(seconds=120))) <= 120
+    assert _parse_retry_after(http_date(timedelta(minutes=-5))) == 0 # Already passed: retry now
+    assert _parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize("header, expected", [("12", 12), ("not-a-number", None)])
+async def test_rate_limited_page_raises_api_error_with_parsed_retry_after(header, expected):
+    async with rate_limited(header) as http:
+        with pytest.raises(SpotifyAPIError) as raised:
+            await fetch_recently_played_page(http, "token", after_ms=None)
+    assert (raised.value.status_code, raised.value.retry_after) == (429, expected)
+
+
+@pytest.mark.parametrize("header, expected", [("12", "12"), ("garbage", None)])
+def test_sync_passes_spotify_rate_limits_through(client, auth_headers, monkeypatch, header, expected):
+    async def access_token(user_id, force_refresh=False):
+        return "token"
+    monkeypatch.setattr(spotify_token_service, "get_access_token", access_token)
+    monkeypatch.setattr(spotify_router, "get_spotify_http_client", lambda: rate_limited(header))
+
+    response = client.post("/api/v1/spotify/sync", headers=auth_headers)
+    assert response.status_code == 429
+    assert response.headers.get("Retry-After") == expected
+
+
+# --- Incremental ingestion against testing/fake_spotify.py ---
+
+@pytest.fixture
+def fake_spotify() -> FakeSpotify:
+    return FakeSpotify()
+
+
+@pytest.fixture
+def spotify_calls() -> list:
+    """ Query params of every recently-played call made through `spotify_http`. """
+    return []
+
+
+@pytest.fixture
+async def spotify_http(fake_spotify, spotify_calls):
+    async def record(request: httpx.Request) -> None:
+        spotify_calls.append(dict(request.url.params))
+
+    async with httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=fake_spotify.app), base_url="http://fake-spotify/v1",
+        event_hooks={"request": [record]},
+    ) as http:
+        yield http
+
+
+async def ingest(http: httpx.AsyncClient, user_id: uuid.UUID, token: str = "token-a") -> int:
+    async with AsyncSessionLocal() as db:
+        return await spotify_service.ingest_recently_played(db, http, user_id, token)
+
+
+async def high_water_mark(user_id: uuid.UUID) -> datetime:
+    async with AsyncSessionLocal() as db:
+        return (await db.get(SpotifySyncState, user_id)).last_played_at
+
+
+async def stored_play_times(user_id: uuid.UUID) -> list:
+    async with AsyncSessionLocal() as db:
+        return (await db.scalars(
+            select(SpotifyTrack.played_at).where(SpotifyTrack.user_id == user_id).order_by(SpotifyTrack.played_at.desc())
+        )).all()
+
+
+def track_inserts(log) -> list:
+    return [statement for statement in log.statements if statement.startswith("INSERT INTO spotify_tracks")]
+
+
+@pytest.mark.anyio
+async def test_sync_resumes_after_the_high_water_mark_with_one_insert_per_page(
+    db_engine, fake_spotify, spotify_http, spotify_calls, user_id,
+):
+    fake_spotify.add_plays("token-a", generate_plays(30, end=NOW - timedelta(days=1), seed=1))
+    with count_queries(db_engine) as log:
+        assert await ingest(spotify_http, user_id) == 30
+    assert "after" not in spotify_calls[0] # First sync: no cursor yet
+    assert len(track_inserts(log)) == 1
+    first_mark = await high_water_mark(user_id)
+    assert first_mark == NOW - timedelta(days=1)
+
+    # 120 newer plays: three pages of 50/50/20 after the stored mark
+    fake_spotify.add_plays("token-a", generate_plays(120, end=NOW, seed=2))
+    spotify_calls.clear()
+    with count_queries(db_engine) as log:
+        assert await ingest(spotify_http, user_id) == 120
+    assert spotify_calls[0]["after"] == str(_to_ms(first_mark))
+    assert len(spotify_calls) == 3
+    assert len(track_inserts(log)) == 3 # One multi-row INSERT per page, not per play
+    assert await high_water_mark(user_id) == NOW
+
+    stored = await stored_play_times(user_id)
+    assert len(stored) == 150 and stored[0] == NOW
+
+    # Nothing new: one call from the latest mark, nothing written
+    spotify_calls.clear()
+    with count_queries(db_engine) as log:
+        assert await ingest(spotify_http, user_id) == 0
+    assert spotify_calls == [{"limit": "50", "after": str(_to_ms(NOW))}]
+    assert track_inserts(log) == []
+
+
+@pytest.mark.anyio
+async def test_reingesting_already_stored_plays_is_a_no_op(db_engine, fake_spotify, spotify_http, user_id):
+    plays = generate_plays(40, end=NOW, seed=3)
+    fake_spotify.add_plays("token-a", plays)
+    async with AsyncSessionLocal() as db:
+        started = await db.scalar(select(func.now()))
+    assert await ingest(spotify_http, user_id) == 40
+    before = await stored_play_times(user_id)
+    async with AsyncSessionLocal() as db:
+        created = (await db.scalars(select(SpotifyTrack.created_at).where(SpotifyTrack.user_id == user_id))).all()
+    assert all(created_at >= started for created_at in created) # Stamped per row, not at CREATE TABLE
+
+    # Sync state lost: the whole history comes back and every row conflicts
+    async with AsyncSessionLocal() as db:
+        await db.execute(delete(SpotifySyncState).where(SpotifySyncState.user_id == user_id))
+        await db.commit()
+    assert await ingest(spotify_http, user_id) == 0
+
+    # Mark rewound (e.g. restored from an old backup): the overlap is skipped, the mark doesn't regress
+    async with AsyncSessionLocal() as db:
+        await db.execute(
+            update(SpotifySyncState).where(SpotifySyncState.user_id == user_id)
+            .values(last_played_at=NOW - timedelta(days=30))
+        )
+        await db.commit()
+    assert await ingest(spotify_http, user_id) == 0
+    assert await stored_play_times(user_id) == before
+    assert await high_water_mark(user_id) == NOW
+
+
+@pytest.mark.anyio
+async def test_tracks_are_served_from_the_local_table(
+    async_client, auth_headers, fake_spotify, spotify_http, user_id, monkeypatch,
+):
+    fake_spotify.add_plays("token-a", generate_plays(30, end=NOW, seed=4))
+    fake_spotify.add_plays("token-b", generate_plays(5, end=NOW, seed=5))
+    await ingest(spotify_http, user_id)
+    await ingest(spotify_http, uuid.uuid4(), token="token-b") # Someone else's plays
+    stored = await stored_play_times(user_id)
+
+    def no_spotify_calls():
+        raise AssertionError("GET /spotify/tracks must not call Spotify")
+    monkeypatch.setattr(spotify_router, "get_spotify_http_client", no_spotify_calls)
+    requests_before = fake_spotify.requests
+
+    first = await async_client.get("/api/v1/spotify/tracks", params={"limit": 20}, headers=auth_headers)
+    assert first.status_code == 200
+    second = await async_client.get(
+        "/api/v1/spotify/tracks", params={"limit": 20, "cursor": first.headers[NEXT_CURSOR_HEADER]}, headers=auth_headers,
+    )
+    assert NEXT_CURSOR_HEADER not in second.headers
+
+    items = first.json() + second.json()
+    assert [datetime.fromisoformat(item["played_at"]) for item in items] == stored
+    assert {item["user_id"] for item in items} == {str(user_id)}
+    assert fake_spotify.requests == requests_before
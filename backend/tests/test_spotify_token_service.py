@@ -0,0 +1,178 @@
+# backend/tests/test_spotify_token_service.py
+import asyncio
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import httpx
+import pytest
+from sqlalchemy import func, select, update
+
+from core.security import decrypt_secret
+from db.session import AsyncSessionLocal
+from models.spotify import SpotifyAccount
+from schemas.spotify import SpotifyTokenData
+from services import spotify_token_service
+from services.spotify_token_service import SpotifyTokenCache
+from testing.fake_spotify import FakeSpotify
+
+pytestmark = pytest.mark.anyio
+
+
+def tokens(access_token: str, expires_in: timedelta = timedelta(hours=1)) -> SpotifyTokenData:
+    return SpotifyTokenData(access_token=access_token, refresh_token="refresh",
+                            expires_at=datetime.now(timezone.utc) + expires_in)
+
+
+class ScriptedTokenCache(SpotifyTokenCache):
+    """ Loads without a database: each load/refresh waits for `release` and mints the next token. """
+
+    def __init__(self, **kwargs):
+        super().__init__(refresh_margin_seconds=60, **kwargs)
+        self.loads = [] # force_refresh flag of each load, in start order
+        self.release = asyncio.Event()
+        self.fail_next = False
+
+    async def _load_or_refresh(self, user_id, force_refresh):
+        self.loads.append(force_refresh)
+        await self.release.wait()
+        if self.fail_next:
+            self.fail_next = False
+            raise RuntimeError("database unavailable")
+        loaded = tokens(f"token-{len(self.loads)}")
+        self.put(user_id, loaded)
+        return loaded
+
+
+async def started(*coroutines) -> list:
+    """ Starts the calls in order, each getting as far as it can before the next. """
+    tasks = []
+    for coroutine in coroutines:
+        tasks.append(asyncio.create_task(coroutine))
+        await asyncio.sleep(0)
+    return tasks
+
+
+async def test_forced_refresh_does_not_join_an_inflight_plain_load():
+    cache, user_id = ScriptedTokenCache(), uuid.uuid4()
+    plain, forced, forced_again = await started(
+        cache.get_access_token(user_id),
+        cache.get_access_token(user_id, force_refresh=True), # e.g. Spotify just rejected the cached token
+        cache.get_access_token(user_id, force_refresh=True),
+    )
+    assert cache.loads == [False] # The forced refresh waits for the plain load instead of overlapping it
+
+    cache.release.set()
+    assert await asyncio.gather(plain, forced, forced_again) == ["token-1", "token-2", "token-2"]
+    assert cache.loads == [False, True]
+    assert cache.coalesced == 1 and cache.stats()["inflight"] == 0
+
+
+async def test_plain_callers_join_an_inflight_forced_refresh():
+    cache, user_id = ScriptedTokenCache(), uuid.uuid4()
+    calls = await started(
+        cache.get_access_token(user_id, force_refresh=True),
+        cache.get_access_token(user_id),
+        cache.get_access_token(user_id),
+    )
+    cache.release.set()
+    assert await asyncio.gather(*calls) == ["token-1"] * 3
+    assert cache.loads == [True] and cache.coalesced == 2
+
+
+async def test_forced_refresh_still_runs_when_the_load_before_it_fails():
+    cache, user_id = ScriptedTokenCache(), uuid.uuid4()
+    cache.fail_next = True
+    plain, forced = await started(cache.get_access_token(user_id), cache.get_access_token(user_id, force_refresh=True))
+    cache.release.set()
+    with pytest.raises(RuntimeError):
+        await plain
+    assert await forced == "token-2"
+
+
+async def test_cache_is_a_bounded_lru():
+    cache = ScriptedTokenCache(maxsize=2)
+    cache.release.set()
+    first, second, third = uuid.uuid4(), uuid.uuid4(), uuid.uuid4()
+    cache.put(first, tokens("first"))
+    cache.put(second, tokens("second"))
+    assert await cache.get_access_token(first) == "first" # Now the most recently used
+    cache.put(third, tokens("third"))
+
+    assert cache.stats()["cached_users"] == 2 and cache.evictions == 1
+    assert await cache.get_access_token(first) == "first"
+    assert await cache.get_access_token(third) == "third"
+    assert await cache.get_access_token(second) == "token-1" # Evicted: loaded again
+    assert cache.hits == 3
+
+
+async def test_expired_entries_are_dropped():
+    cache, user_id = ScriptedTokenCache(), uuid.uuid4()
+    cache.release.set()
+    cache.put(user_id, tokens("stale", expires_in=timedelta(seconds=-1)))
+    assert cache.stats()["cached_users"] == 1
+    assert await cache.get_access_token(user_id) == "token-1"
+    assert cache.loads == [False]
+
+
+async def test_zero_maxsize_disables_caching():
+    cache, user_id = ScriptedTokenCache(maxsize=0), uuid.uuid4()
+    cache.release.set()
+    assert [await cache.get_access_token(user_id) for _ in range(2)] == ["token-1", "token-2"]
+    assert cache.stats()["cached_users"] == 0
+
+
+# --- Against PostgreSQL and testing/fake_spotify.py's token endpoint ---
+
+@pytest.fixture
+def fake_accounts(monkeypatch) -> FakeSpotify:
+    fake = FakeSpotify()
+    http = httpx.AsyncClient(transport=httpx.ASGITransport(app=fake.app), base_url="http://fake-spotify")
+    monkeypatch.setattr(spotify_token_service, "get_spotify_accounts_http_client", lambda: http)
+    return fake
+
+
+@pytest.fixture
+def token_cache(monkeypatch) -> SpotifyTokenCache:
+    cache = SpotifyTokenCache(refresh_margin_seconds=120)
+    monkeypatch.setattr(spotify_token_service, "token_cache", cache)
+    return cache
+
+
+async def test_tokens_are_stored_encrypted_and_refreshed_once_for_concurrent_callers(
+    db_engine, fake_accounts, token_cache, user_id,
+):
+    async with AsyncSessionLocal() as db:
+        started = await db.scalar(select(func.now()))
+    connected = await spotify_token_service.exchange_code(user_id, "history-a")
+    assert connected.access_token == "history-a#1"
+    async with AsyncSessionLocal() as db:
+        account = await db.get(SpotifyAccount, user_id)
+    assert account.created_at >= started and account.updated_at >= started
+    assert "history-a" not in account.access_token_encrypted + account.refresh_token_encrypted
+    assert decrypt_secret(account.refresh_token_encrypted) == "refresh-history-a"
+
+    # About to expire, cold cache (e.g. a restarted process): 20 requests, one refresh
+    async with AsyncSessionLocal() as db:
+        await db.execute(
+            update(SpotifyAccount).where(SpotifyAccount.user_id == user_id)
+            .values(expires_at=datetime.now(timezone.utc) + timedelta(seconds=30))
+        )
+        await db.commit()
+    token_cache.invalidate(user_id)
+    results = await asyncio.gather(*(spotify_token_service.get_access_token(user_id) for _ in range(20)))
+    assert set(results) == {"history-a#2"}
+    assert fake_accounts.token_requests == 2 # Code exchange + one refresh
+    assert (token_cache.refreshes, token_cache.coalesced) == (1, 19)
+
+    assert await spotify_token_service.get_access_token(user_id) == "history-a#2" # Cached
+    assert await spotify_token_service.get_access_token(user_id, force_refresh=True) == "history-a#3"
+    async with AsyncSessionLocal() as db:
+        account = await db.get(SpotifyAccount, user_id)
+    assert decrypt_secret(account.access_token_encrypted) == "history-a#3"
+    assert account.updated_at > account.created_at
+    assert decrypt_secret(account.refresh_token_encrypted) == "refresh-history-a" # Kept: Spotify sent none
+
+
+async def test_unknown_user_is_not_connected(db_engine, token_cache):
+    with pytest.raises(spotify_token_service.SpotifyNotConnectedError):
+        await spotify_token_service.get_access_token(uuid.uuid4())
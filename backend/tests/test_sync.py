@@ -0,0 +1,118 @@
+# backend/tests/test_sync.py
+"""
+GET /api/v1/sync/: changed rows and tombstones after the client's token, paged by
+(updated_at, id), with the final position held back by the safety window.
+"""
+import uuid
+from datetime import timedelta
+
+import pytest
+from sqlalchemy import func, select
+
+from core.config import settings
+from db.session import SessionLocal
+from models.workout import Workout
+
+SQUAT = {"exercises": [{"name": "Squat", "sets": [{"reps": 5, "weight": 100}]}]}
+
+
+def sync(client, headers, since=None, limit=None) -> dict:
+    params = {key: value for key, value in (("since", since), ("limit", limit)) if value is not None}
+    response = client.get("/api/v1/sync/", params=params, headers=headers)
+    assert response.status_code == 200
+    return response.json()
+
+
+def sync_all(client, headers, since=None, limit=None):
+    """ Follows has_more to the end: (workout ids, mood ids, tombstones, final token, calls). """
+    workouts, moods, deleted, calls = [], [], [], 0
+    while True:
+        page = sync(client, headers, since, limit)
+        calls += 1
+        workouts += [item["id"] for item in page["workouts"]]
+        moods += [item["id"] for item in page["moods"]]
+        deleted += [(item["type"], item["id"]) for item in page["deleted"]]
+        since = page["next_since"]
+        if not page["has_more"]:
+            return workouts, moods, deleted, since, calls
+
+
+def add_workout(user_id: uuid.UUID, updated_seconds_ago: float) -> str:
+    """ A workout whose updated_at lies in the past, as left by a slow or old transaction. """
+    with SessionLocal() as db:
+        now = db.scalar(select(func.now()))
+        stamp = now - timedelta(seconds=updated_seconds_ago)
+        workout = Workout(id=uuid.uuid4(), user_id=user_id, timestamp=stamp, updated_at=stamp, exercises=SQUAT["exercises"])
+        db.add(workout)
+        workout_id = str(workout.id)
+        db.commit()
+    return workout_id
+
+
+@pytest.fixture
+def no_safety_window(monkeypatch):
+    monkeypatch.setattr(settings, "SYNC_SAFETY_WINDOW_SECONDS", 0)
+
+
+def test_sync_pages_through_changes_and_reports_deletions(client, auth_headers, no_safety_window):
+    batch = client.post("/api/v1/workouts/batch", json={"items": [SQUAT] * 5}, headers=auth_headers).json()
+    workout_ids = [result["workout"]["id"] for result in batch["results"]] # One transaction: equal updated_at
+    mood_ids = [client.post("/api/v1/moods/", json={"mood_score": score}, headers=auth_headers).json()["id"]
+                for score in (3, 7)]
+    add_workout(uuid.uuid4(), updated_seconds_ago=5) # Someone else's
+
+    workouts, moods, deleted, token, calls = sync_all(client, auth_headers, limit=2)
+    assert sorted(workouts) == sorted(workout_ids) and len(workouts) == 5 # Ties split across pages, none lost
+    assert sorted(moods) == sorted(mood_ids) and deleted == []
+    assert calls == 3
+
+    assert sync_all(client, auth_headers, since=token)[:3] == ([], [], [])
+
+    # Deletes come back as tombstones only
+    assert client.delete(f"/api/v1/workouts/{workout_ids[0]}", headers=auth_headers).status_code == 204
+    assert client.delete(f"/api/v1/moods/{mood_ids[1]}", headers=auth_headers).status_code == 204
+    workouts, moods, deleted, token, _ = sync_all(client, auth_headers, since=token)
+    assert (workouts, moods) == ([], [])
+    assert sorted(deleted) == [("mood", mood_ids[1]), ("workout", workout_ids[0])]
+
+    # A full sync still carries them, so a fresh client never shows deleted rows
+    workouts, moods, deleted, _, _ = sync_all(client, auth_headers)
+    assert workout_ids[0] not in workouts and len(workouts) == 4 and moods == [mood_ids[0]]
+    assert len(deleted) == 2
+
+
+def test_safety_window_resends_recent_rows_to_catch_slow_commits(client, auth_headers, user_id, monkeypatch):
+    monkeypatch.setattr(settings, "SYNC_SAFETY_WINDOW_SECONDS", 30)
+    old_id = add_workout(user_id, updated_seconds_ago=120)
+    first = client.post("/api/v1/workouts/", json=SQUAT, headers=auth_headers).json()["id"]
+
+    page = sync(client, auth_headers)
+    assert sorted(item["id"] for item in page["workouts"]) == sorted([old_id, first])
+
+    # A transaction that started 10s ago commits now, stamped before the row already synced
+    late_id = add_workout(user_id, updated_seconds_ago=10)
+    page = sync(client, auth_headers, since=page["next_since"])
+    assert sorted(item["id"] for item in page["workouts"]) == sorted([first, late_id]) # Old row not re-sent
+    assert page["has_more"] is False
+
+    # Without the window the token moves past the newest row and the late commit is lost
+    monkeypatch.setattr(settings, "SYNC_SAFETY_WINDOW_SECONDS", 0)
+    page = sync(client, auth_headers)
+    add_workout(user_id, updated_seconds_ago=10)
+    assert sync(client, auth_headers, since=page["next_since"])["workouts"] == []
+
+
+def test_rows_created_after_a_sync_are_all_delivered(client, auth_headers, no_safety_window):
+    client.post("/api/v1/workouts/", json=SQUAT, headers=auth_headers)
+    token = sync(client, auth_headers)["next_since"]
+
+    # Each insert stamps its own updated_at, after the token's position
+    created = [client.post("/api/v1/workouts/", json=SQUAT, headers=auth_headers).json()["id"] for _ in range(8)]
+    page = sync(client, auth_headers, since=token)
+    assert [item["id"] for item in page["workouts"]] == created
+
+
+def test_malformed_tokens_are_rejected(client, auth_headers):
+    for token in ("not-a-token", "eyJ3b3Jrb3V0IjogWzFdfQ"): # Not base64 JSON / a position of the wrong shape
+        response = client.get("/api/v1/sync/", params={"since": token}, headers=auth_headers)
+        assert response.status_code == 400
@@ -0,0 +1,62 @@
+# backend/tests/test_timeline.py
+import json
+from datetime import datetime, timedelta, timezone
+
+from db.session import SessionLocal
+from models.spotify import SpotifyTrack
+
+SQUAT = {"exercises": [{"name": "Squat", "sets": [{"reps": 5, "weight": 100}]}]}
+
+
+def seed_history(client, headers, user_id, now: datetime) -> None:
+    """ 6 imported workouts, 4 moods (now) and 8 plays, interleaved over the last days. """
+    history = "\n".join(json.dumps({"timestamp": (now - timedelta(hours=10 * i + 3)).isoformat(), **SQUAT})
+                        for i in range(6))
+    client.post("/api/v1/workouts/import", content=history.encode(),
+                headers={**headers, "Content-Type": "application/x-ndjson"})
+    for score in range(4):
+        client.post("/api/v1/moods/", json={"mood_score": score + 1}, headers=headers)
+    with SessionLocal() as db:
+        db.add_all(SpotifyTrack(user_id=user_id, spotify_track_id=f"track{i}", track_name=f"Song {i}", artist_name="Artist",
+                                album_name="Album", played_at=now - timedelta(hours=7 * i + 1))
+                   for i in range(8))
+        db.commit()
+
+
+def walk(client, headers, limit: int) -> list:
+    """ Every timeline page via next_cursor, as a list of pages of items. """
+    pages, params = [], {"limit": limit}
+    while True:
+        response = client.get("/api/v1/timeline/", params=params, headers=headers)
+        assert response.status_code == 200
+        body = response.json()
+        pages.append(body["items"])
+        if body["next_cursor"] is None:
+            return pages
+        params = {"limit": limit, "cursor": body["next_cursor"]}
+
+
+def test_timeline_merges_every_source_newest_first_across_pages(client, auth_headers, user_id):
+    seed_history(client, auth_headers, user_id, datetime.now(timezone.utc))
+
+    everything = client.get("/api/v1/timeline/", params={"limit": 100}, headers=auth_headers).json()
+    assert everything["next_cursor"] is None
+    items = everything["items"]
+    assert sorted(item["type"] for item in items) == ["mood"] * 4 + ["spotify"] * 8 + ["workout"] * 6
+    times = [datetime.fromisoformat(item["timestamp"]) for item in items]
+    assert times == sorted(times, reverse=True)
+    assert {item["type"] for item in items[:4]} == {"mood"} # Logged just now
+
+    pages = walk(client, auth_headers, limit=5)
+    assert [len(page) for page in pages] == [5, 5, 5, 3]
+    assert [item["data"]["id"] for page in pages for item in page] == [item["data"]["id"] for item in items]
+
+
+def test_deleted_rows_leave_the_timeline_and_bad_cursors_are_rejected(client, auth_headers, user_id):
+    workout = client.post("/api/v1/workouts/", json=SQUAT, headers=auth_headers).json()
+    client.post("/api/v1/moods/", json={"mood_score": 5}, headers=auth_headers)
+    assert client.delete(f"/api/v1/workouts/{workout['id']}", headers=auth_headers).status_code == 204
+
+    items = client.get("/api/v1/timeline/", headers=auth_headers).json()["items"]
+    assert [item["type"] for item in items] == ["mood"]
+    assert client.get("/api/v1/timeline/", params={"cursor": "garbage"}, headers=auth_headers).status_code == 400
@@ -0,0 +1,72 @@
+# backend/tests/test_token_cache.py
+"""
+Verified-token cache (core/token_cache.py) and its use in the auth dependency.
+No database involved.
+"""
+import time
+import uuid
+
+import pytest
+from fastapi import HTTPException
+from jose import jwt
+
+from core import dependencies
+from core.token_cache import VerifiedTokenCache
+from tests.conftest import mint_token
+
+pytestmark = pytest.mark.anyio
+
+
+def test_entries_expire_at_the_token_exp_and_tokens_without_exp_are_not_cached():
+    cache = VerifiedTokenCache(maxsize=4)
+    cache.put("live", {"sub": "a", "exp": time.time() + 60})
+    cache.put("no-exp", {"sub": "b"})
+    cache.put("expired", {"sub": "c", "exp": time.time() - 1})
+    assert cache.get("live") == {"sub": "a", "exp": pytest.approx(time.time() + 60, abs=5)}
+    assert cache.get("no-exp") is None and cache.get("expired") is None
+
+    cache.put("short", {"sub": "d", "exp": time.time() + 0.05})
+    time.sleep(0.1)
+    assert cache.get("short") is None
+    assert cache.stats() == {"size": 1, "maxsize": 4, "hits": 1, "misses": 3, "evictions": 0}
+
+
+def test_cache_is_a_bounded_lru_keyed_by_digest():
+    cache = VerifiedTokenCache(maxsize=2)
+    exp = time.time() + 60
+    for token in ("a", "b"):
+        cache.put(token, {"sub": token, "exp": exp})
+    assert cache.get("a") is not None # "b" is now least recently used
+    cache.put("c", {"sub": "c", "exp": exp})
+    assert cache.get("b") is None and cache.get("a") is not None and cache.get("c") is not None
+    assert cache.evictions == 1
+    assert not any(isinstance(key, str) for key in cache._entries) # Raw tokens are never stored
+
+    disabled = VerifiedTokenCache(maxsize=0)
+    disabled.put("a", {"sub": "a", "exp": exp})
+    assert disabled.get("a") is None
+
+
+async def test_dependency_verifies_each_token_once(monkeypatch):
+    monkeypatch.setattr(dependencies, "token_cache", VerifiedTokenCache(maxsize=8))
+    decodes = []
+    real_decode = jwt.decode
+
+    def counting_decode(*args, **kwargs):
+        decodes.append(args[0])
+        return real_decode(*args, **kwargs)
+    monkeypatch.setattr(dependencies.jwt, "decode", counting_decode)
+
+    user_id = uuid.uuid4()
+    token = mint_token(user_id)
+    for _ in range(3):
+        payload = await dependencies.get_token_data_optional(authorization=f"Bearer {token}")
+        assert payload["sub"] == str(user_id)
+    assert len(decodes) == 1
+
+    forged = jwt.encode(jwt.get_unverified_claims(token), "wrong-secret", algorithm="HS256")
+    for _ in range(2): # A failed verification is not cached
+        with pytest.raises(HTTPException) as raised:
+            await dependencies.get_token_data_optional(authorization=f"Bearer {forged}")
+        assert raised.value.status_code == 401
+    assert len(decodes) == 3
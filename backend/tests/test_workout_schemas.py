@@ -0,0 +1,88 @@
+# backend/tests/test_workout_schemas.py
+"""
+The lean workout validators (schemas/workout.py) must agree exactly with
+WorkoutCreate: same output for valid input, same errors for invalid input.
+No database involved.
+"""
+from typing import Any, Callable
+
+import pytest
+from pydantic import TypeAdapter, ValidationError
+
+from schemas.workout import WorkoutCreate, WorkoutCreateBody, workout_create_adapter
+
+VALID_WORKOUTS = [
+    {"exercises": [{"name": "Squat", "sets": [{"reps": 5, "weight": 100}]}]},
+    # Coercion: numeric strings, whole floats as reps, ints as weights
+    {"exercises": [{"name": "Squat", "sets": [{"reps": "5", "weight": "102.5"}, {"reps": 3.0, "weight": 0}]}]},
+    # Extra keys are ignored at every level
+    {"exercises": [{"name": "Bench", "sets": [{"reps": 8, "weight": 60, "rpe": 8}], "notes": "paused"}], "mood": 7},
+    {"exercises": [{"name": "Row", "sets": [{"reps": 12, "weight": 40.25}] * 3},
+                   {"name": "Row", "sets": [{"reps": 10, "weight": 1e3}]}]},
+]
+
+INVALID_WORKOUTS = [
+    None, 5, "workout", [], {},
+    {"exercises": "abc"},
+    {"exercises": []},
+    {"exercises": [None, 3, "Squat"]},
+    {"exercises": [{"name": "", "sets": []}]},
+    {"exercises": [{"name": "Squat", "sets": []}, {"name": "Bench", "sets": []}]},
+    {"exercises": [{"name": 5, "sets": {}}]},
+    {"exercises": [{"sets": [{"reps": 5, "weight": 100}]}]},
+    {"exercises": [{"name": "Squat", "sets": [None, "5x100", {"reps": 5}]}]},
+    {"exercises": [{"name": "Squat", "sets": [{"reps": 0, "weight": -2.5}, {"reps": 1.5, "weight": "heavy"}]}]},
+    {"exercises": [{"name": "Squat", "sets": [{"reps": "abc", "weight": None}]}]},
+    {"exercises": [{"name": "Squat", "sets": [{"reps": 5, "weight": 100}]}, {"name": "Bench", "sets": []}]},
+]
+
+
+def outcome(validate: Callable[[Any], list], item: Any):
+    try:
+        return "ok", validate(item)
+    except ValidationError as e:
+        return "invalid", e.errors(include_url=False)
+
+
+body_adapter = TypeAdapter(WorkoutCreateBody)
+
+# (WorkoutCreate path, lean path); FastAPI validates bodies with from_attributes=True
+PATHS = {
+    "batch item": (
+        lambda item: [ex.model_dump() for ex in WorkoutCreate.model_validate(item).exercises],
+        lambda item: workout_create_adapter.validate_python(item)["exercises"],
+    ),
+    "request body": (
+        lambda item: WorkoutCreate.model_validate(item, from_attributes=True).model_dump()["exercises"],
+        lambda item: body_adapter.validate_python(item, from_attributes=True)["exercises"],
+    ),
+}
+
+
+@pytest.mark.parametrize("path", PATHS)
+@pytest.mark.parametrize("item", VALID_WORKOUTS + INVALID_WORKOUTS)
+def test_lean_validation_matches_workout_create(path, item):
+    model_path, lean_path = PATHS[path]
+    expected, actual = outcome(model_path, item), outcome(lean_path, item)
+    # repr() so that 100 vs 100.0 (or "5" vs 5) counts as a difference too
+    assert repr(actual) == repr(expected)
+
+
+@pytest.mark.parametrize("item, verdict", [(item, "ok") for item in VALID_WORKOUTS] +
+                                          [(item, "invalid") for item in INVALID_WORKOUTS])
+def test_cases_are_what_they_claim(item, verdict):
+    # Otherwise the equivalence above could hold with both paths rejecting everything
+    assert outcome(PATHS["batch item"][1], item)[0] == verdict
+
+
+def test_lean_output_is_plain_json_ready_data():
+    exercises = workout_create_adapter.validate_python(VALID_WORKOUTS[1])["exercises"]
+    assert exercises == [{"name": "Squat", "sets": [{"reps": 5, "weight": 102.5}, {"reps": 3, "weight": 0.0}]}]
+    assert type(exercises[0]) is dict and type(exercises[0]["sets"][1]["weight"]) is float
+
+
+def test_non_dict_errors_depend_on_from_attributes_like_the_models():
+    batch_errors = outcome(PATHS["batch item"][1], 5)[1]
+    body_errors = outcome(PATHS["request body"][1], 5)[1]
+    assert [error["type"] for error in batch_errors] == ["model_type"]
+    assert [error["type"] for error in body_errors] == ["model_attributes_type"]
@@ -0,0 +1,109 @@
+# backend/tests/test_workout_sets.py
+"""
+workout_sets, the normalized copy of Workout.exercises: kept in step by the write
+paths and rebuilt from the JSONB by scripts/backfill_workout_sets.py.
+"""
+import uuid
+from argparse import Namespace
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import select, update
+
+from db.session import SessionLocal
+from models.workout import Workout, WorkoutSet
+from scripts import backfill_workout_sets
+from services.workout_sets_service import set_rows
+
+SQUAT_DAY = {"exercises": [
+    {"name": "Squat", "sets": [{"reps": 5, "weight": 100}, {"reps": 5, "weight": 102.5}]},
+    {"name": "Bench", "sets": [{"reps": 8, "weight": 60}]},
+    {"name": "Squat", "sets": [{"reps": 10, "weight": 70}]}, # Same name again: its own exercise_index
+]}
+
+
+def stored_sets(user_id: uuid.UUID) -> set:
+    with SessionLocal() as db:
+        return {
+            (s.workout_id, s.exercise_index, s.set_index, s.user_id, s.exercise_name, s.reps, s.weight, s.timestamp)
+            for s in db.scalars(select(WorkoutSet).where(WorkoutSet.user_id == user_id))
+        }
+
+
+def expected_sets(user_id: uuid.UUID) -> set:
+    """ workout_sets as derived from the JSONB of every live workout. """
+    with SessionLocal() as db:
+        workouts = db.scalars(select(Workout).where(Workout.user_id == user_id, Workout.deleted_at.is_(None))).all()
+    return {
+        tuple(row[key] for key in ("workout_id", "exercise_index", "set_index", "user_id",
+                                   "exercise_name", "reps", "weight", "timestamp"))
+        for workout in workouts
+        for row in set_rows(workout.id, workout.user_id, workout.timestamp, workout.exercises)
+    }
+
+
+def add_legacy_workouts(user_id: uuid.UUID, count: int) -> list:
+    """ Workouts written before workout_sets existed: JSONB only. """
+    start = datetime(2024, 1, 1, 7, tzinfo=timezone.utc)
+    workouts = [
+        Workout(id=uuid.uuid4(), user_id=user_id, timestamp=start + timedelta(days=day), exercises=[
+            {"name": "Deadlift", "sets": [{"reps": 5, "weight": 140 + day}, {"reps": 3, "weight": 150 + day}]},
+            {"name": "Row", "sets": [{"reps": 10, "weight": 50}]},
+        ])
+        for day in range(count)
+    ]
+    ids = [workout.id for workout in workouts]
+    with SessionLocal() as db:
+        db.add_all(workouts)
+        db.commit()
+    return ids
+
+
+def backfill(**overrides) -> None:
+    backfill_workout_sets.main(Namespace(**{"user": None, "rebuild": False, "page_size": 2, **overrides}))
+
+
+def test_write_paths_keep_workout_sets_in_step_with_the_jsonb(client, auth_headers, user_id):
+    created = client.post("/api/v1/workouts/", json=SQUAT_DAY, headers=auth_headers).json()
+    batch = client.post("/api/v1/workouts/batch", json={"items": [
+        {"exercises": [{"name": "Squat", "sets": [{"reps": 3, "weight": 110}]}]},
+        {"exercises": [{"name": "Row", "sets": [{"reps": 12, "weight": 40}, {"reps": 12, "weight": 42.5}]}]},
+    ]}, headers=auth_headers).json()
+    assert batch["created"] == 2
+
+    assert len(stored_sets(user_id)) == 7
+    assert stored_sets(user_id) == expected_sets(user_id)
+
+    assert client.delete(f"/api/v1/workouts/{created['id']}", headers=auth_headers).status_code == 204
+    assert len(stored_sets(user_id)) == 3
+    assert stored_sets(user_id) == expected_sets(user_id)
+
+    progress = client.get("/api/v1/workouts/exercises/progress", params={"name": "Squat"}, headers=auth_headers).json()
+    assert [(point["sets"], point["total_reps"], point["max_weight"], point["volume"]) for point in progress] == [
+        (1, 3, 110.0, 330.0),
+    ]
+
+
+def test_backfill_rebuilds_sets_from_the_jsonb_and_is_idempotent(clean_db):
+    user_id, other_user = uuid.uuid4(), uuid.uuid4()
+    workout_ids = add_legacy_workouts(user_id, 5)
+    add_legacy_workouts(other_user, 1)
+    with SessionLocal() as db:
+        db.execute(update(Workout).where(Workout.id == workout_ids[0]).values(deleted_at=datetime.now(timezone.utc)))
+        db.commit()
+    assert stored_sets(user_id) == set()
+
+    backfill() # Pages of 2 workouts
+    assert len(stored_sets(user_id)) == 4 * 3 # The soft-deleted workout is skipped
+    assert stored_sets(user_id) == expected_sets(user_id)
+    assert len(stored_sets(other_user)) == 3
+
+    backfill(page_size=1000) # Re-run: nothing duplicated
+    assert len(stored_sets(user_id)) == 12
+
+    # Rows edited out of band are restored from the JSONB by --rebuild, for that user only
+    with SessionLocal() as db:
+        db.execute(update(WorkoutSet).values(weight=0))
+        db.commit()
+    backfill(user=str(user_id), rebuild=True)
+    assert stored_sets(user_id) == expected_sets(user_id)
+    assert {row[6] for row in stored_sets(other_user)} == {0}